@@ -1,12 +1,18 @@
 # services/importacio.py
+from __future__ import annotations
+
+import io
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from django.db import transaction
-import pandas as pd
 from pathlib import Path
 from django.utils.dateparse import parse_date
+from ceeb_web.lazy_imports import lazy_import
 from ..models import SeguimentAlumnat
 
+pd = lazy_import("pandas")
+
 SHEET_TO_FIELD = {
     "BC": "bc",
     "JOC": "cj",
@@ -87,12 +93,157 @@ def parse_progres_percent(v) -> Optional[float]:
     except ValueError:
         return None
 
+# === IMPORTACIÓ EN BLOC ===
+# Tots els alumnes existents es carreguen un cop en índexs normalitzats
+# (document i correu en minúscules); cada fila es resol en memòria i els canvis
+# s'apliquen amb bulk_create/bulk_update per lots. Les files es validen abans
+# d'entrar al lot (longituds dels camps), perquè un error de BD no faci fallar
+# tot el lot sense saber quina fila l'ha provocat.
+
+BULK_BATCH_SIZE = 500
+
+MATCH_FIELDS = (
+    "id", "document", "correu", "nom", "cognom1", "cognom2",
+    "nom_i_cognom", "data_naixement", *SHEET_TO_FIELD.values(),
+)
+
+
+def _find_progres_col(columns) -> Optional[str]:
+    # Troba la columna de "Progres" tolerant a espais
+    for col in columns:
+        if str(col).strip().lower() == "progres":
+            return col
+    # Si no troba, busca per substring
+    for col in columns:
+        if "progres" in str(col).strip().lower():
+            return col
+    return None
+
+
+def _invalid_row_values(row, camp_model: str, tret: str) -> List[str]:
+    """Valors de la fila que la BD rebutjaria (massa llargs per al camp)."""
+    values = {
+        "document": row.nif,
+        "correu": row.email,
+        "nom": row.nom,
+        "cognom1": row.cognom1,
+        "cognom2": row.cognom2,
+        "nom_i_cognom": row.nom_i_cognom,
+        camp_model: tret,
+    }
+    problems = []
+    for name, value in values.items():
+        max_length = SeguimentAlumnat._meta.get_field(name).max_length
+        if value and max_length and len(str(value)) > max_length:
+            problems.append(f"{name} supera {max_length} caràcters")
+    return problems
+
+
+def _normalize_sheet(df: pd.DataFrame, progres_col: Optional[str]) -> pd.DataFrame:
+    """Una fila per alumne amb els valors ja nets i parsejats."""
+    def col(name: str) -> pd.Series:
+        if name in df.columns:
+            return df[name].map(_clean_str)
+        return pd.Series([""] * len(df), index=df.index, dtype=object)
+
+    out = pd.DataFrame(index=df.index)
+    out["nif"] = col("Nif")
+    out["nom"] = col("Nom")
+    out["cognoms"] = col("Cognoms")
+    out["email"] = col("Correu electrònic").str.lower()
+    if "Data naixement" in df.columns:
+        out["data_naixement"] = df["Data naixement"].map(_parse_date_safe)
+    else:
+        out["data_naixement"] = None
+    if progres_col:
+        out["progres"] = df[progres_col].map(parse_progres_percent)
+    else:
+        out["progres"] = None
+    cognoms_split = out["cognoms"].map(_split_cognoms)
+    out["cognom1"] = cognoms_split.map(lambda t: t[0])
+    out["cognom2"] = cognoms_split.map(lambda t: t[1])
+    out["nom_i_cognom"] = (out["nom"] + " " + out["cognoms"]).str.strip()
+    out = out.astype(object)
+    out["nom_i_cognom"] = out["nom_i_cognom"].where(out["nom_i_cognom"] != "", None)
+    # NaN/NaT -> None perquè els "if valor" de sota es comportin com abans
+    return out.where(out.notna(), None)
+
+
+class _AlumnesIndex:
+    def __init__(self, alumnes):
+        self.by_document: Dict[str, List[SeguimentAlumnat]] = defaultdict(list)
+        self.by_email: Dict[str, List[SeguimentAlumnat]] = defaultdict(list)
+        for obj in alumnes:
+            self.add(obj)
+
+    @staticmethod
+    def _keys(obj) -> Tuple[str, str]:
+        return (obj.document or "").lower(), (obj.correu or "").lower()
+
+    def add(self, obj) -> None:
+        doc, mail = self._keys(obj)
+        if doc:
+            self.by_document[doc].append(obj)
+        if mail:
+            self.by_email[mail].append(obj)
+
+    def remove(self, obj, keys: Tuple[str, str]) -> None:
+        doc, mail = keys
+        if doc and obj in self.by_document.get(doc, []):
+            self.by_document[doc].remove(obj)
+        if mail and obj in self.by_email.get(mail, []):
+            self.by_email[mail].remove(obj)
+
+
+def _apply_row_changes(obj, row, camp_model: str, tret: str, llindar: float) -> set:
+    # === ACTUALITZACIÓ DE DADES PERSONALS (si venen informades) ===
+    changed_fields = set()
+
+    if row.nif and (obj.document or "").strip().lower() != row.nif.lower():
+        obj.document = row.nif
+        changed_fields.add("document")
+
+    if row.email and (obj.correu or "").strip().lower() != row.email:
+        obj.correu = row.email
+        changed_fields.add("correu")
+
+    if row.nom and (obj.nom or "") != row.nom:
+        obj.nom = row.nom
+        changed_fields.add("nom")
+
+    if row.cognom1 and (obj.cognom1 or "") != row.cognom1:
+        obj.cognom1 = row.cognom1
+        changed_fields.add("cognom1")
+
+    # cognom2 només si ve informat
+    if row.cognom2 and (obj.cognom2 or "") != row.cognom2:
+        obj.cognom2 = row.cognom2
+        changed_fields.add("cognom2")
+
+    if row.nom_i_cognom and (obj.nom_i_cognom or "") != row.nom_i_cognom:
+        obj.nom_i_cognom = row.nom_i_cognom
+        changed_fields.add("nom_i_cognom")
+
+    if row.data_naixement and obj.data_naixement != row.data_naixement:
+        obj.data_naixement = row.data_naixement
+        changed_fields.add("data_naixement")
+
+    # === ACTUALITZACIÓ DEL BLOC (bc/cj/cg) NOMÉS SI progres > llindar ===
+    if row.progres is not None and row.progres > llindar:
+        valor_actual = getattr(obj, camp_model) or ""
+        if valor_actual != tret:
+            setattr(obj, camp_model, tret)
+            changed_fields.add(camp_model)
+
+    return changed_fields
+
+
 @transaction.atomic
 def importar_excel_seguiment(file_obj, sheet_choice: str = "ALL", llindar: float = 80.0) -> ImportResult:
     # IMPORTANT: aquest "tret" és el que omplirem a bc/cj/cg
     tret = extreure_tret_des_nom_fitxer(getattr(file_obj, "name", "fitxer"))
 
-    xls = pd.ExcelFile(file_obj)
+    xls = pd.ExcelFile(io.BytesIO(file_obj.read()))
 
     if sheet_choice == "ALL":
         sheets = [s for s in xls.sheet_names if s in SHEET_TO_FIELD]
@@ -102,6 +253,12 @@ def importar_excel_seguiment(file_obj, sheet_choice: str = "ALL", llindar: float
     actualitzats = ignorats = no_trobats = creats = 0
     errors: List[str] = []
 
+    index = _AlumnesIndex(SeguimentAlumnat.objects.only(*MATCH_FIELDS).order_by("pk"))
+
+    to_create: List[SeguimentAlumnat] = []
+    to_update: Dict[int, SeguimentAlumnat] = {}
+    update_fields: set = set()
+
     for sheet in sheets:
         df = pd.read_excel(xls, sheet_name=sheet)
 
@@ -111,48 +268,34 @@ def importar_excel_seguiment(file_obj, sheet_choice: str = "ALL", llindar: float
             continue
 
         camp_model = SHEET_TO_FIELD[sheet]  # "bc" / "cj" / "cg"
+        rows = _normalize_sheet(df, _find_progres_col(df.columns))
 
-        
-        # Troba la columna de "Progres" tolerant a espais
-        progres_col = None
-        for col in df.columns:
-            if col.strip().lower() == "progres":
-                progres_col = col
-                break
-        if not progres_col:
-            # Si no troba, busca per substring
-            for col in df.columns:
-                if "progres" in col.strip().lower():
-                    progres_col = col
-                    break
-
-        for idx, row in df.iterrows():
-            rownum = idx + 2  # capçalera + 1
-
-            nif = _clean_str(row.get("Nif", None))
-            nom = _clean_str(row.get("Nom", None))
-            cognoms = _clean_str(row.get("Cognoms", None))
-            email = _clean_str(row.get("Correu electrònic", None)).lower()
-            data_naixement = _parse_date_safe(row.get("Data naixement", None))
-            progres = parse_progres_percent(row.get(progres_col)) if progres_col else None
-            cognom1, cognom2 = _split_cognoms(cognoms)
-            nom_i_cognom = " ".join([nom, cognoms]).strip() or None
+        for row in rows.itertuples():
+            rownum = row.Index + 2  # capçalera + 1
+            nom_i_cognom = row.nom_i_cognom
             # si no podem identificar alumne -> ignorem
-            if not nif and not email:
+            if not row.nif and not row.email:
                 ignorats += 1
                 errors.append(f"WARNING: {nom_i_cognom}: ignorat (sense identificador: nif ni email) a {sheet}")
                 continue
 
             # si no hi ha progres vàlid -> ignorem
-            if progres is None:
+            if row.progres is None:
                 ignorats += 1
                 errors.append(f"WARNING: {nom_i_cognom}: ignorat (progrés no vàlid) a {sheet}")
                 continue
 
             # si no supera el llindar -> ignorem
-            if progres <= llindar:
+            if row.progres <= llindar:
                 ignorats += 1
-                errors.append(f"WARNING: {nom_i_cognom}: ignorat (progrés {progres} ≤ {llindar}) a {sheet}")
+                errors.append(f"WARNING: {nom_i_cognom}: ignorat (progrés {row.progres} ≤ {llindar}) a {sheet}")
+                continue
+
+            problems = _invalid_row_values(row, camp_model, tret)
+            if problems:
+                errors.append(
+                    f"Full {sheet}, fila {rownum}, alumne {nom_i_cognom}: error ({'; '.join(problems)}). No es desa."
+                )
                 continue
 
             try:
@@ -160,84 +303,59 @@ def importar_excel_seguiment(file_obj, sheet_choice: str = "ALL", llindar: float
                 obj = None
 
                 # 1) per NIF
-                if nif:
-                    qs = SeguimentAlumnat.objects.filter(document__iexact=nif)
-                    if qs.count() == 1:
-                        obj = qs.first()
-                    elif qs.count() > 1:
-                        errors.append(f"Full {sheet}, alumne {nom_i_cognom}: NIF duplicat a BD ({nif}). No s'actualitza.")
+                if row.nif:
+                    matches = index.by_document.get(row.nif.lower(), [])
+                    if len(matches) == 1:
+                        obj = matches[0]
+                    elif len(matches) > 1:
+                        errors.append(f"Full {sheet}, alumne {nom_i_cognom}: NIF duplicat a BD ({row.nif}). No s'actualitza.")
                         ignorats += 1
                         continue
 
                 # 2) fallback per correu només si no hi ha NIF i és únic
-                if obj is None and (not nif) and email:
-                    qs = SeguimentAlumnat.objects.filter(correu__iexact=email)
-                    if qs.count() == 1:
-                        obj = qs.first()
-                    elif qs.count() > 1:
-                        errors.append(f"Full {sheet}, alumne {nom_i_cognom}: correu duplicat a BD ({email}). No s'actualitza.")
+                if obj is None and (not row.nif) and row.email:
+                    matches = index.by_email.get(row.email, [])
+                    if len(matches) == 1:
+                        obj = matches[0]
+                    elif len(matches) > 1:
+                        errors.append(f"Full {sheet}, alumne {nom_i_cognom}: correu duplicat a BD ({row.email}). No s'actualitza.")
                         ignorats += 1
                         continue
 
-                is_new = False
                 if obj is None:
-                    # CREEM registre nou
+                    # CREEM registre nou (es desa en bloc al final)
                     obj = SeguimentAlumnat(
-                        document=nif or None,
-                        correu=email or None,
+                        document=row.nif or None,
+                        correu=row.email or None,
                     )
-                    is_new = True
-
-                # === ACTUALITZACIÓ DE DADES PERSONALS (si venen informades) ===
-                changed_fields = set()
-
-                if nif and (obj.document or "").strip().lower() != nif.lower():
-                    obj.document = nif
-                    changed_fields.add("document")
-
-                if email and (obj.correu or "").strip().lower() != email:
-                    obj.correu = email
-                    changed_fields.add("correu")
-
-                if nom and (obj.nom or "") != nom:
-                    obj.nom = nom
-                    changed_fields.add("nom")
-
-                if cognom1 and (obj.cognom1 or "") != cognom1:
-                    obj.cognom1 = cognom1
-                    changed_fields.add("cognom1")
-
-                # cognom2 només si ve informat
-                if cognom2 and (obj.cognom2 or "") != cognom2:
-                    obj.cognom2 = cognom2
-                    changed_fields.add("cognom2")
-
-                if nom_i_cognom and (obj.nom_i_cognom or "") != nom_i_cognom:
-                    obj.nom_i_cognom = nom_i_cognom
-                    changed_fields.add("nom_i_cognom")
-
-                if data_naixement and obj.data_naixement != data_naixement:
-                    obj.data_naixement = data_naixement
-                    changed_fields.add("data_naixement")
-
-                # === ACTUALITZACIÓ DEL BLOC (bc/cj/cg) NOMÉS SI progres > llindar ===
-                if progres is not None and progres > llindar:
-                    valor_actual = getattr(obj, camp_model) or ""
-                    if valor_actual != tret:
-                        setattr(obj, camp_model, tret)
-                        changed_fields.add(camp_model)
-
-                # === GUARDAT ===
-                if is_new:
-                    obj.save()  # cal save complet en creació
+                    _apply_row_changes(obj, row, camp_model, tret, llindar)
+                    index.add(obj)
+                    to_create.append(obj)
                     creats += 1
-                else:
-                    if changed_fields:
-                        obj.save(update_fields=list(changed_fields))
-                        actualitzats += 1
+                    continue
+
+                old_keys = index._keys(obj)
+                changed_fields = _apply_row_changes(obj, row, camp_model, tret, llindar)
+                if not changed_fields:
+                    continue
+                if {"document", "correu"} & changed_fields:
+                    index.remove(obj, old_keys)
+                    index.add(obj)
+                if obj.pk is not None:
+                    to_update[obj.pk] = obj
+                    update_fields |= changed_fields
+                actualitzats += 1
 
             except Exception as e:
-                errors.append(f"Full{sheet} {nom_i_cognom}: error ({e})")
+                errors.append(f"Full {sheet}, fila {rownum}, alumne {nom_i_cognom}: error ({e})")
+
+    # === GUARDAT ===
+    if to_create:
+        SeguimentAlumnat.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+    if to_update:
+        SeguimentAlumnat.objects.bulk_update(
+            list(to_update.values()), sorted(update_fields), batch_size=BULK_BATCH_SIZE
+        )
 
     return ImportResult(
         fulls_processats=sheets,
@@ -1,3 +1,101 @@
+import io
+
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 
-# Create your tests here.
+from .models import SeguimentAlumnat
+from .services.importacio import importar_excel_seguiment
+
+
+def _excel_upload(sheets, name="tret 12.xlsx"):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for sheet, rows in sheets.items():
+            pd.DataFrame(rows).to_excel(writer, sheet_name=sheet, index=False)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+def _row(nif, email, progres, nom="Anna", cognoms="Puig Soler"):
+    return {
+        "Nif": nif,
+        "Nom": nom,
+        "Cognoms": cognoms,
+        "Correu electrònic": email,
+        "Data naixement": "2001-02-03",
+        "Progres ": progres,
+    }
+
+
+class ImportarExcelSeguimentTests(TestCase):
+    def test_bulk_import_matches_creates_and_updates_across_sheets(self):
+        existing = SeguimentAlumnat.objects.create(document="12345678a", correu="old@example.com", nom="Anna")
+        SeguimentAlumnat.objects.create(document="DUP", nom="X")
+        SeguimentAlumnat.objects.create(document="dup", nom="Y")
+        upload = _excel_upload(
+            {
+                "BC": [
+                    _row("12345678A", "anna@example.com", "90%"),
+                    _row("", "nou@example.com", "95", nom="Pau", cognoms="Vidal"),
+                    _row("DUP", "", "99"),
+                    _row("", "", "99"),
+                    _row("555", "baix@example.com", "50"),
+                ],
+                "JOC": [
+                    _row("", "NOU@example.com", "0.85", nom="Pau", cognoms="Vidal"),
+                    _row("12345678A", "anna@example.com", "81"),
+                ],
+            }
+        )
+
+        with self.assertNumQueries(5):
+            result = importar_excel_seguiment(upload, "ALL")
+
+        self.assertEqual(result.fulls_processats, ["BC", "JOC"])
+        self.assertEqual(result.creats, 1)
+        self.assertEqual(result.actualitzats, 3)
+        self.assertEqual(result.ignorats, 3)
+        self.assertEqual(result.tret, "12")
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.correu, "anna@example.com")
+        self.assertEqual(existing.cognom1, "Puig")
+        self.assertEqual(existing.cognom2, "Soler")
+        self.assertEqual((existing.bc, existing.cj), ("12", "12"))
+        self.assertEqual(str(existing.data_naixement), "2001-02-03")
+
+        nou = SeguimentAlumnat.objects.get(correu="nou@example.com")
+        self.assertEqual((nou.bc, nou.cj, nou.nom_i_cognom), ("12", "12", "Pau Vidal"))
+        self.assertTrue(any("NIF duplicat" in e for e in result.errors))
+
+    def test_rerun_without_changes_writes_nothing(self):
+        upload = _excel_upload({"GIO": [_row("777", "g@example.com", "100")]})
+        importar_excel_seguiment(upload, "GIO")
+
+        upload = _excel_upload({"GIO": [_row("777", "g@example.com", "100")]})
+        with self.assertNumQueries(3):
+            result = importar_excel_seguiment(upload, "GIO")
+        self.assertEqual((result.creats, result.actualitzats), (0, 0))
+
+    def test_rows_the_database_would_reject_are_reported_with_their_row_number(self):
+        upload = _excel_upload(
+            {
+                "BC": [
+                    _row("111", "ok@example.com", "90"),
+                    _row("X" * 40, "llarg@example.com", "90"),
+                    _row("222", "ok2@example.com", "90"),
+                ]
+            }
+        )
+
+        with self.assertNumQueries(4):
+            result = importar_excel_seguiment(upload, "BC")
+
+        self.assertEqual(result.creats, 2)
+        self.assertEqual(
+            sorted(SeguimentAlumnat.objects.values_list("document", flat=True)),
+            ["111", "222"],
+        )
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn("Full BC, fila 3,", result.errors[0])
+        self.assertIn("document supera 32", result.errors[0])
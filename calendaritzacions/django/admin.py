@@ -11,6 +11,7 @@ from calendaritzacions.django.models import (
     WorkspaceChangeLog,
     WorkspaceResourceIncident,
     WorkspaceResourceMatch,
+    WorkspaceViewSnapshot,
 )
 
 
@@ -79,3 +80,11 @@ class WorkspaceChangeLogAdmin(admin.ModelAdmin):
     list_filter = ("action", "created_at")
     search_fields = ("action", "note", "run__input_name")
     readonly_fields = ("created_at",)
+
+
+@admin.register(WorkspaceViewSnapshot)
+class WorkspaceViewSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("id", "workspace", "view", "revision", "updated_at")
+    list_filter = ("view",)
+    search_fields = ("revision", "workspace__run__input_name")
+    readonly_fields = ("created_at", "updated_at")
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calendaritzacions_django", "0012_calendarizationrun_pattern_master_engine"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkspaceViewSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "view",
+                    models.CharField(
+                        choices=[
+                            ("calendar", "Calendar"),
+                            ("linkage", "Linkage"),
+                            ("venue_sheets", "Venue sheets"),
+                            ("impact", "Impact"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("revision", models.CharField(max_length=128)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                ("facets", models.JSONField(blank=True, default=list)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "workspace",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="view_snapshots",
+                        to="calendaritzacions_django.assignmentworkspace",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("workspace", "view"),
+                "constraints": [
+                    models.UniqueConstraint(fields=("workspace", "view"), name="cal_wvs_ws_view_uniq"),
+                ],
+            },
+        ),
+    ]
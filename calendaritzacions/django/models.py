@@ -455,3 +455,36 @@ class WorkspaceChangeLog(models.Model):
 
     def __str__(self) -> str:
         return f"{self.action} on workspace {self.workspace_id}"
+
+
+class WorkspaceViewSnapshot(models.Model):
+    """Materialized payload of one workspace tab for a given workspace revision."""
+
+    VIEW_CALENDAR = "calendar"
+    VIEW_LINKAGE = "linkage"
+    VIEW_VENUE_SHEETS = "venue_sheets"
+    VIEW_IMPACT = "impact"
+
+    VIEW_CHOICES = (
+        (VIEW_CALENDAR, "Calendar"),
+        (VIEW_LINKAGE, "Linkage"),
+        (VIEW_VENUE_SHEETS, "Venue sheets"),
+        (VIEW_IMPACT, "Impact"),
+    )
+
+    workspace = models.ForeignKey(AssignmentWorkspace, on_delete=models.CASCADE, related_name="view_snapshots")
+    view = models.CharField(max_length=32, choices=VIEW_CHOICES)
+    revision = models.CharField(max_length=128)
+    payload = models.JSONField(default=dict, blank=True)
+    facets = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("workspace", "view")
+        constraints = (
+            models.UniqueConstraint(fields=("workspace", "view"), name="cal_wvs_ws_view_uniq"),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.view} snapshot of workspace {self.workspace_id} ({self.revision})"
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import gzip
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 
 KNOWN_AUDIT_FILENAMES = (
@@ -22,6 +23,14 @@ KNOWN_AUDIT_FILENAMES = (
     "kpis.json",
 )
 
+# taules de files que el resource solver escriu en JSON Lines comprimit (audit.write_tabular_audit)
+TABULAR_AUDIT_SUFFIX = ".jsonl.gz"
+KNOWN_TABULAR_AUDIT_FILENAMES = (
+    "team_catalog.jsonl.gz",
+    "resource_pressure.jsonl.gz",
+    "candidate_catalog.jsonl.gz",
+)
+
 KNOWN_AUDIT_PREFIXES = (
     "kpis_",
     "run_manifest_",
@@ -48,6 +57,10 @@ def discover_audit_paths(output_path: str) -> dict[str, str]:
         candidate = directory / filename
         if candidate.exists() and candidate.is_file():
             discovered[candidate.stem] = str(candidate)
+    for filename in KNOWN_TABULAR_AUDIT_FILENAMES:
+        candidate = directory / filename
+        if candidate.exists() and candidate.is_file():
+            discovered[filename[: -len(TABULAR_AUDIT_SUFFIX)]] = str(candidate)
     for candidate in directory.glob("*.json"):
         if candidate.name in KNOWN_AUDIT_FILENAMES:
             continue
@@ -57,10 +70,34 @@ def discover_audit_paths(output_path: str) -> dict[str, str]:
 
 
 def read_json_file(path: str) -> Any:
+    if is_tabular_audit_path(path):
+        return list(iter_audit_rows(path))
     with Path(path).open("r", encoding="utf-8") as handle:
         return json.load(handle)
 
 
+def is_tabular_audit_path(path: str | Path) -> bool:
+    return str(path).endswith(TABULAR_AUDIT_SUFFIX)
+
+
+def iter_audit_rows(path: str | Path) -> Iterator[Any]:
+    """Yield the rows of a tabular audit one at a time.
+
+    ``.jsonl.gz`` tables are decompressed and parsed line by line; legacy
+    ``.json`` artifacts holding a list are parsed whole and then yielded.
+    """
+    if is_tabular_audit_path(path):
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    with Path(path).open("r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    if isinstance(payload, list):
+        yield from payload
+
+
 def read_audit_artifact(run, artifact: str) -> dict[str, Any]:
     audit_paths = run.audit_paths if isinstance(run.audit_paths, dict) else {}
     path = audit_paths.get(artifact)
@@ -13,7 +13,10 @@ from calendaritzacions.django.models import (
     WorkspaceAssignment,
     WorkspaceResourceIncident,
     WorkspaceResourceMatch,
+    WorkspaceViewSnapshot,
 )
+from calendaritzacions.django.services.workspace_views import materialized_workspace_view
+from ceeb_web.profiling import profiled
 
 
 TYPE_LABELS = {
@@ -51,9 +54,20 @@ EMPTY_VIEW = {
 }
 
 
+@profiled("calendaritzacions.workspace_impact")
 def get_workspace_impact_view(workspace: AssignmentWorkspace) -> dict[str, Any]:
     """Return aggregate impact analytics for the workspace overview tab."""
 
+    return materialized_workspace_view(
+        workspace,
+        WorkspaceViewSnapshot.VIEW_IMPACT,
+        lambda: build_workspace_impact_view(workspace),
+    )
+
+
+def build_workspace_impact_view(workspace: AssignmentWorkspace) -> dict[str, Any]:
+    """Build the impact payload from the workspace rows (uncached)."""
+
     assignments = {
         assignment.team_id: assignment
         for assignment in WorkspaceAssignment.objects.filter(workspace=workspace).order_by("team_name", "team_id")
@@ -738,4 +752,4 @@ def _text_sort(value: str) -> str:
     return str(value or "").casefold()
 
 
-__all__ = ["get_workspace_impact_view"]
+__all__ = ["build_workspace_impact_view", "get_workspace_impact_view"]
@@ -0,0 +1,243 @@
+"""Materialized workspace tabs and their filtered, paginated JSON API.
+
+The calendar, linkage, venue-sheet and impact tabs regroup every assignment,
+match and incident of a workspace in Python. Their payloads only change when
+the workspace is re-hydrated (``updated_at``) or edited (a new
+``WorkspaceChangeLog`` row), so each one is stored in ``WorkspaceViewSnapshot``
+under that revision and rebuilt only when the revision moves.
+
+Each snapshot also keeps a facet index (group, league, venue, level tokens per
+item) so ``query_workspace_view`` can filter, count facets and paginate
+without rebuilding the payload.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from collections import Counter
+from typing import Any, Callable, Iterable
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+
+from calendaritzacions.django.models import (
+    AssignmentWorkspace,
+    WorkspaceChangeLog,
+    WorkspaceViewSnapshot,
+)
+
+# canviar-lo quan canvii la forma dels payloads materialitzats
+WORKSPACE_VIEW_VERSION = 2
+FACET_KEYS = ("group", "league", "venue", "level")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# clau de la llista paginable de cada pestanya
+VIEW_ITEMS_KEY = {
+    WorkspaceViewSnapshot.VIEW_CALENDAR: "groups",
+    WorkspaceViewSnapshot.VIEW_LINKAGE: "groups",
+    WorkspaceViewSnapshot.VIEW_VENUE_SHEETS: "sheets",
+    WorkspaceViewSnapshot.VIEW_IMPACT: "affected_rows",
+}
+
+
+class UnknownWorkspaceViewError(ValueError):
+    """The requested tab is not one of the materialized workspace views."""
+
+
+def workspace_revision(workspace: AssignmentWorkspace) -> str:
+    """Revision of the workspace content: hydration plus the last change log entry."""
+
+    from calendaritzacions.django.services.workspaces import HYDRATION_VERSION
+
+    last_change_id = (
+        WorkspaceChangeLog.objects.filter(workspace=workspace).order_by("-id").values_list("id", flat=True).first()
+    )
+    updated_at = workspace.updated_at.isoformat() if workspace.updated_at else "-"
+    return f"v{WORKSPACE_VIEW_VERSION}:h{HYDRATION_VERSION}:{updated_at}:c{last_change_id or 0}"
+
+
+def materialized_workspace_view(
+    workspace: AssignmentWorkspace,
+    view: str,
+    build: Callable[[], dict[str, Any]],
+) -> dict[str, Any]:
+    """Return the stored payload of ``view`` for the current revision, building it if needed."""
+
+    return _current_snapshot(workspace, view, build).payload
+
+
+def query_workspace_view(
+    workspace: AssignmentWorkspace,
+    view: str,
+    *,
+    filters: dict[str, Iterable[str]] | None = None,
+    search: str = "",
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> dict[str, Any]:
+    """Filter one materialized tab by facet tokens and free text and return one page of items."""
+
+    build = _view_builders().get(view)
+    if build is None:
+        raise UnknownWorkspaceViewError(f"Unknown workspace view {view!r}.")
+    ensure_workspace_current(workspace)
+    snapshot = _current_snapshot(workspace, view, lambda: build(workspace))
+    items_key = VIEW_ITEMS_KEY[view]
+    items = list(snapshot.payload.get(items_key) or [])
+    item_facets = list(snapshot.facets or [])
+    selected = {
+        key: {str(token).strip() for token in (filters or {}).get(key, ()) if str(token).strip()}
+        for key in FACET_KEYS
+    }
+    needle = str(search or "").strip().casefold()
+
+    facet_counts: dict[str, Counter] = {key: Counter() for key in FACET_KEYS}
+    facet_labels: dict[str, dict[str, str]] = {key: {} for key in FACET_KEYS}
+    matched: list[dict[str, Any]] = []
+    for item, facets in zip(items, item_facets):
+        if needle and needle not in str(item.get("filter_text") or "").casefold():
+            continue
+        misses = [key for key in FACET_KEYS if selected[key] and not selected[key] & set(facets.get(key, {}))]
+        if not misses:
+            matched.append(item)
+        # cada faceta compta els items que passen la resta de filtres
+        for key in FACET_KEYS:
+            if misses and misses != [key]:
+                continue
+            for token, label in facets.get(key, {}).items():
+                facet_counts[key][token] += 1
+                facet_labels[key].setdefault(token, label)
+
+    page_size = max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    num_pages = max(1, math.ceil(len(matched) / page_size))
+    page = max(1, min(int(page or 1), num_pages))
+    start = (page - 1) * page_size
+    return {
+        "view": view,
+        "revision": snapshot.revision,
+        "meta": {key: value for key, value in snapshot.payload.items() if key != items_key},
+        "items": matched[start:start + page_size],
+        "facets": {
+            key: [
+                {"token": token, "label": facet_labels[key][token], "count": count, "selected": token in selected[key]}
+                for token, count in sorted(facet_counts[key].items(), key=lambda item: facet_labels[key][item[0]].casefold())
+            ]
+            for key in FACET_KEYS
+        },
+        "filters": {key: sorted(tokens) for key, tokens in selected.items()},
+        "search": search,
+        "pagination": {
+            "page": page,
+            "page_size": page_size,
+            "total": len(matched),
+            "num_pages": num_pages,
+        },
+    }
+
+
+def _current_snapshot(
+    workspace: AssignmentWorkspace,
+    view: str,
+    build: Callable[[], dict[str, Any]],
+) -> WorkspaceViewSnapshot:
+    revision = workspace_revision(workspace)
+    snapshot = WorkspaceViewSnapshot.objects.filter(workspace=workspace, view=view).first()
+    if snapshot is not None and snapshot.revision == revision:
+        return snapshot
+
+    payload = json.loads(json.dumps(build(), cls=DjangoJSONEncoder))
+    facets = [_item_facets(view, item) for item in payload.get(VIEW_ITEMS_KEY[view]) or []]
+    if snapshot is None:
+        snapshot = WorkspaceViewSnapshot(workspace=workspace, view=view)
+    snapshot.revision = revision
+    snapshot.payload = payload
+    snapshot.facets = facets
+    try:
+        with transaction.atomic():
+            snapshot.save()
+    except IntegrityError:
+        # una altra peticio l'ha materialitzat alhora; el payload és el mateix
+        pass
+    return snapshot
+
+
+def _item_facets(view: str, item: dict[str, Any]) -> dict[str, dict[str, str]]:
+    if view == WorkspaceViewSnapshot.VIEW_CALENDAR:
+        rows = item.get("rows") or []
+        values = {
+            "group": [item.get("group_id")],
+            "league": [row.get("league") for row in rows],
+            "venue": [row.get("venue") for row in rows],
+            "level": [row.get("level") for row in rows],
+        }
+    elif view == WorkspaceViewSnapshot.VIEW_LINKAGE:
+        teams = item.get("teams") or []
+        values = {
+            "group": [item.get("linkage_group")],
+            "league": [team.get("league") for team in teams],
+            "venue": [item.get("venue")],
+            "level": [team.get("level") for team in teams],
+        }
+    elif view == WorkspaceViewSnapshot.VIEW_VENUE_SHEETS:
+        matches = [
+            match
+            for row in item.get("rows") or []
+            for match in [*(row.get("matches") or []), *(row.get("overflow_matches") or [])]
+        ]
+        values = {
+            "group": [match.get("group_id") for match in matches],
+            "league": [match.get("league") for match in matches],
+            "venue": [item.get("venue")],
+            "level": [match.get("level") for match in matches],
+        }
+    else:
+        values = {
+            "group": [item.get("group_id")],
+            "league": [item.get("league")],
+            "venue": [],
+            "level": [item.get("level")],
+        }
+    return {
+        key: {_facet_token(label): str(label).strip() for label in labels if str(label or "").strip()}
+        for key, labels in values.items()
+    }
+
+
+def _facet_token(value: Any) -> str:
+    return str(value or "").strip().casefold().replace(" ", "-")
+
+
+def _view_builders() -> dict[str, Callable[[AssignmentWorkspace], dict[str, Any]]]:
+    from calendaritzacions.django.services.workspace_impact import build_workspace_impact_view
+    from calendaritzacions.django.services.workspaces import (
+        build_workspace_calendar_view,
+        build_workspace_linkage_view,
+        build_workspace_venue_round_sheets,
+    )
+
+    return {
+        WorkspaceViewSnapshot.VIEW_CALENDAR: build_workspace_calendar_view,
+        WorkspaceViewSnapshot.VIEW_LINKAGE: build_workspace_linkage_view,
+        WorkspaceViewSnapshot.VIEW_VENUE_SHEETS: build_workspace_venue_round_sheets,
+        WorkspaceViewSnapshot.VIEW_IMPACT: build_workspace_impact_view,
+    }
+
+
+def ensure_workspace_current(workspace: AssignmentWorkspace) -> None:
+    from calendaritzacions.django.services.workspaces import _workspace_is_current, hydrate_workspace_from_audits
+
+    if not _workspace_is_current(workspace):
+        hydrate_workspace_from_audits(workspace.run, workspace=workspace)
+
+
+__all__ = [
+    "FACET_KEYS",
+    "UnknownWorkspaceViewError",
+    "ensure_workspace_current",
+    "VIEW_ITEMS_KEY",
+    "materialized_workspace_view",
+    "query_workspace_view",
+    "workspace_revision",
+]
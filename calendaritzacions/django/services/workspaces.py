@@ -19,8 +19,11 @@ from calendaritzacions.django.models import (
     WorkspaceAssignment,
     WorkspaceResourceIncident,
     WorkspaceResourceMatch,
+    WorkspaceViewSnapshot,
 )
-from calendaritzacions.django.services.audit_reader import discover_audit_paths, read_json_file
+from calendaritzacions.django.services.audit_reader import discover_audit_paths, iter_audit_rows, read_json_file
+from calendaritzacions.django.services.workspace_views import materialized_workspace_view
+from ceeb_web.profiling import profiled
 
 HYDRATION_VERSION = 8
 MAX_POSITIVE_SMALLINT = 32767
@@ -625,12 +628,23 @@ def get_workspace_team_detail(
     }
 
 
+@profiled("calendaritzacions.workspace_calendar")
 def get_workspace_calendar_view(workspace: AssignmentWorkspace) -> dict[str, Any]:
     """Return a read-only calendar matrix grouped by workspace group."""
 
     if not _workspace_is_current(workspace):
         hydrate_workspace_from_audits(workspace.run, workspace=workspace)
 
+    return materialized_workspace_view(
+        workspace,
+        WorkspaceViewSnapshot.VIEW_CALENDAR,
+        lambda: build_workspace_calendar_view(workspace),
+    )
+
+
+def build_workspace_calendar_view(workspace: AssignmentWorkspace) -> dict[str, Any]:
+    """Build the calendar payload from the workspace rows (uncached)."""
+
     assignments = list(
         WorkspaceAssignment.objects.filter(workspace=workspace).order_by(
             "group_id",
@@ -826,12 +840,23 @@ def get_workspace_calendar_view(workspace: AssignmentWorkspace) -> dict[str, Any
     }
 
 
+@profiled("calendaritzacions.workspace_linkage")
 def get_workspace_linkage_view(workspace: AssignmentWorkspace) -> dict[str, Any]:
     """Return linkage groups with assigned teams, context and violations."""
 
     if not _workspace_is_current(workspace):
         hydrate_workspace_from_audits(workspace.run, workspace=workspace)
 
+    return materialized_workspace_view(
+        workspace,
+        WorkspaceViewSnapshot.VIEW_LINKAGE,
+        lambda: build_workspace_linkage_view(workspace),
+    )
+
+
+def build_workspace_linkage_view(workspace: AssignmentWorkspace) -> dict[str, Any]:
+    """Build the linkage payload from the workspace rows (uncached)."""
+
     assignments = list(
         WorkspaceAssignment.objects.filter(workspace=workspace).order_by(
             "team_name",
@@ -903,6 +928,7 @@ def get_workspace_linkage_view(workspace: AssignmentWorkspace) -> dict[str, Any]
             "team_name": assignment.team_name or assignment.team_id,
             "entity": assignment.entity,
             "competition": competition,
+            "league": str(team.get("league_name") or "").strip(),
             "modality": modality,
             "category": str(team.get("category") or "").strip(),
             "subcategory": str(team.get("subcategory") or "").strip(),
@@ -1027,12 +1053,23 @@ def get_workspace_linkage_view(workspace: AssignmentWorkspace) -> dict[str, Any]
     }
 
 
+@profiled("calendaritzacions.workspace_venue_sheets")
 def get_workspace_venue_round_sheets(workspace: AssignmentWorkspace) -> dict[str, Any]:
     """Return visual match sheets grouped by venue and round."""
 
     if not _workspace_is_current(workspace):
         hydrate_workspace_from_audits(workspace.run, workspace=workspace)
 
+    return materialized_workspace_view(
+        workspace,
+        WorkspaceViewSnapshot.VIEW_VENUE_SHEETS,
+        lambda: build_workspace_venue_round_sheets(workspace),
+    )
+
+
+def build_workspace_venue_round_sheets(workspace: AssignmentWorkspace) -> dict[str, Any]:
+    """Build the venue sheets payload from the workspace rows (uncached)."""
+
     payloads = _read_payloads(workspace.run)
     pressure_rows = _venue_pressure_rows(payloads.get("resource_pressure", []))
     venue_meta = _venue_sheet_meta(pressure_rows)
@@ -1068,6 +1105,7 @@ def get_workspace_venue_round_sheets(workspace: AssignmentWorkspace) -> dict[str
     for key, sheet in sorted(matches_by_venue_round.items(), key=lambda item: (_text_sort(item[1]["venue"]), item[1]["round"])):
         venue_key, _round_index = key
         meta = venue_meta.get(venue_key, _empty_venue_meta(sheet["venue"], venue_key))
+        meta["requested_team_ids"] = sorted(meta["requested_team_ids"])
         if not meta["slots"]:
             for slot_key in sorted(sheet["slots"]):
                 day, hour_slot = slot_key.split("||", 1)
@@ -1099,7 +1137,7 @@ def get_workspace_venue_round_sheets(workspace: AssignmentWorkspace) -> dict[str
                     "matches": matches[:max_courts],
                     "overflow_matches": matches[max_courts:],
                     "match_count": len(matches),
-                    "empty_cells": range(max(0, max_courts - min(len(matches), max_courts))),
+                    "empty_cells": list(range(max(0, max_courts - min(len(matches), max_courts)))),
                     "saturation_pct": _pct(len(matches), max_courts),
                     "over_capacity": len(matches) > int(slot.get("estimated_capacity") or max_courts),
                 }
@@ -1109,7 +1147,7 @@ def get_workspace_venue_round_sheets(workspace: AssignmentWorkspace) -> dict[str
                 **meta,
                 "round": sheet["round"],
                 "round_label": sheet["round_label"],
-                "court_columns": range(1, max_courts + 1),
+                "court_columns": list(range(1, max_courts + 1)),
                 "overflow_colspan": max_courts + 2,
                 "rows": rows,
                 "match_count": total_matches,
@@ -1119,6 +1157,14 @@ def get_workspace_venue_round_sheets(workspace: AssignmentWorkspace) -> dict[str
                 "linkage_group_count": len(sheet_linkage_groups),
                 "modality_filter": " ".join(sorted({_filter_token(value) for value in sheet_modalities if value})),
                 "linkage_filter": " ".join(sorted({_filter_token(value) for value in sheet_linkage_groups if value})),
+                "filter_text": _calendar_filter_text(
+                    [
+                        meta.get("venue"),
+                        sheet["round_label"],
+                        *sorted(sheet_modalities, key=_text_sort),
+                        *sorted(sheet_linkage_groups, key=_text_sort),
+                    ]
+                ),
             }
         )
 
@@ -1943,10 +1989,7 @@ def _read_dict(path: str | None) -> dict[str, Any]:
 def _read_list(path: str | None) -> list[dict[str, Any]]:
     if not path:
         return []
-    payload = read_json_file(str(Path(path)))
-    if not isinstance(payload, list):
-        return []
-    return [item for item in payload if isinstance(item, dict)]
+    return [item for item in iter_audit_rows(str(Path(path))) if isinstance(item, dict)]
 
 
 def _list_dicts(value: Any) -> list[dict[str, Any]]:
@@ -2951,6 +2994,8 @@ def _venue_sheet_match(
         "home_team_name": match.payload.get("home_team_name", "") or (home_assignment.team_name if home_assignment else match.home_team_id),
         "away_team_name": match.payload.get("away_team_name", "") or (away_assignment.team_name if away_assignment else match.away_team_id),
         "competition": _assignment_competition_label(home_assignment) if home_assignment else "",
+        "league": str(_assignment_team(home_assignment).get("league_name") or "").strip() if home_assignment else "",
+        "level": _workspace_level_label(_assignment_team(home_assignment).get("level")) if home_assignment else "",
         "modality": _assignment_modality(home_assignment) if home_assignment else "",
         "home_entity": home_assignment.entity if home_assignment else "",
         "home_number": home_assignment.assigned_number if home_assignment else None,
@@ -9,6 +9,7 @@ from calendaritzacions.django.views import (
     ResourceWorkspaceIncidentDetailView,
     ResourceWorkspaceOverviewView,
     ResourceWorkspaceTeamDetailView,
+    ResourceWorkspaceViewJsonView,
     RunCreateView,
     RunDeleteView,
     RunDetailView,
@@ -41,4 +42,9 @@ urlpatterns = [
         ResourceWorkspaceTeamDetailView.as_view(),
         name="resource_workspace_team",
     ),
+    path(
+        "runs/<int:pk>/workspace/views/<slug:view>/",
+        ResourceWorkspaceViewJsonView.as_view(),
+        name="resource_workspace_view_api",
+    ),
 ]
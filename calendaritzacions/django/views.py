@@ -160,6 +160,40 @@ class ResourceWorkspaceTeamDetailView(CalendaritzacionsAccessMixin, DetailView):
         return context
 
 
+class ResourceWorkspaceViewJsonView(CalendaritzacionsAccessMixin, View):
+    """One page of a materialized workspace tab, filtered by group, league, venue or level."""
+
+    def get(self, request, *args, **kwargs):
+        run = get_object_or_404(CalendarizationRun, pk=kwargs["pk"])
+        workspace = _get_or_create_workspace_for_run(run)
+        try:
+            from calendaritzacions.django.services.workspace_views import (
+                FACET_KEYS,
+                UnknownWorkspaceViewError,
+                query_workspace_view,
+            )
+        except ModuleNotFoundError as exc:
+            if exc.name != "calendaritzacions.django.services.workspace_views":
+                raise
+            raise Http404("Resource workspace service is not available.") from exc
+        filters = {
+            key: [token for value in request.GET.getlist(key) for token in value.split(",") if token.strip()]
+            for key in FACET_KEYS
+        }
+        try:
+            payload = query_workspace_view(
+                workspace,
+                kwargs["view"],
+                filters=filters,
+                search=request.GET.get("q", ""),
+                page=_int_param(request.GET.get("page"), 1),
+                page_size=_int_param(request.GET.get("page_size"), 50),
+            )
+        except UnknownWorkspaceViewError as exc:
+            raise Http404(str(exc)) from exc
+        return JsonResponse(payload)
+
+
 class RunDeleteView(CalendaritzacionsAccessMixin, View):
     def post(self, request, *args, **kwargs):
         run = get_object_or_404(CalendarizationRun, pk=kwargs["pk"])
@@ -327,6 +361,13 @@ def _read_component_log_tail(path_value: str, *, limit: int = 8) -> list[str]:
     return lines[-limit:]
 
 
+def _int_param(value: object, default: int) -> int:
+    try:
+        return int(str(value))
+    except (TypeError, ValueError):
+        return default
+
+
 def _get_workspace_services():
     try:
         from calendaritzacions.django.services.workspaces import (
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import gzip
 import itertools
 import json
 import math
@@ -24,6 +25,11 @@ from calendaritzacions.engine.variants.resource_solver.types import (
     SolverContext,
 )
 
+# payloads de files homogenies (un dict per equip, candidat o recurs) que creixen amb la mida del run
+TABULAR_AUDIT_PAYLOADS = frozenset({"candidate_catalog", "resource_pressure", "team_catalog"})
+TABULAR_AUDIT_SUFFIX = ".jsonl.gz"
+TABULAR_AUDIT_SIDECAR_SUFFIX = ".meta.json"
+
 try:
     from calendaritzacions.engine.variants.resource_solver import linkage as _linkage_helpers
 except Exception:  # pragma: no cover - linkage helpers may be absent in older checkouts.
@@ -932,12 +938,22 @@ def build_linkage_audit(
 
 
 def write_audit_payloads(payloads: dict[str, Any], output_dir: str | Path) -> dict[str, str]:
-    """Write audit payloads as pretty JSON and return paths by payload name."""
+    """Write audit payloads and return paths by payload name.
+
+    Row tables listed in ``TABULAR_AUDIT_PAYLOADS`` are written as gzip JSON
+    Lines (one row per line) next to a ``.meta.json`` sidecar with the row
+    count and columns, so readers can stream them row by row
+    (``audit_reader.iter_audit_rows`` on the Django side).
+    Every other payload is written as pretty JSON.
+    """
 
     directory = Path(output_dir)
     directory.mkdir(parents=True, exist_ok=True)
     paths: dict[str, str] = {}
     for name, payload in sorted(payloads.items()):
+        if name in TABULAR_AUDIT_PAYLOADS and isinstance(payload, (list, tuple)):
+            paths[name] = str(write_tabular_audit(name, payload, directory))
+            continue
         path = directory / f"{name}.json"
         path.write_text(
             json.dumps(json_ready(payload), ensure_ascii=False, indent=2, sort_keys=True),
@@ -947,6 +963,34 @@ def write_audit_payloads(payloads: dict[str, Any], output_dir: str | Path) -> di
     return paths
 
 
+def write_tabular_audit(name: str, rows: Iterable[Any], output_dir: str | Path) -> Path:
+    """Write ``rows`` as ``{name}.jsonl.gz`` plus its ``{name}.meta.json`` sidecar."""
+
+    directory = Path(output_dir)
+    path = directory / f"{name}{TABULAR_AUDIT_SUFFIX}"
+    columns: dict[str, None] = {}
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as handle:
+        for row in rows:
+            prepared = json_ready(row)
+            if isinstance(prepared, dict):
+                columns.update(dict.fromkeys(prepared))
+            handle.write(json.dumps(prepared, ensure_ascii=False, sort_keys=True, separators=(",", ":")))
+            handle.write("\n")
+            count += 1
+    sidecar = {
+        "artifact": name,
+        "format": "jsonl.gz",
+        "rows": count,
+        "columns": sorted(columns),
+    }
+    (directory / f"{name}{TABULAR_AUDIT_SIDECAR_SUFFIX}").write_text(
+        json.dumps(sidecar, ensure_ascii=False, indent=2, sort_keys=True),
+        encoding="utf-8",
+    )
+    return path
+
+
 def json_ready(value: Any) -> Any:
     """Convert dataclasses, tuples and non-string keys to JSON-ready values."""
 
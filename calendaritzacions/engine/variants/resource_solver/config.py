@@ -60,6 +60,9 @@ class ResourceSolverConfig:
     max_memory_mb: int = field(
         default_factory=lambda: _env_int("CALENDARITZACIONS_SOLVER_MAX_MEMORY_MB", 0)
     )
+    component_solve_workers: int = field(
+        default_factory=lambda: _env_int("CALENDARITZACIONS_SOLVER_COMPONENT_WORKERS", 0)
+    )
     capacity_mode: str = "soft"
     resource_excess_weight: int = 100_000
     entity_excess_weight: int = 10_000
@@ -221,6 +224,13 @@ def coerce_resource_solver_config(config: object | None = None) -> ResourceSolve
                 _env_int("CALENDARITZACIONS_SOLVER_MAX_MEMORY_MB", 0),
             )
         ),
+        component_solve_workers=int(
+            getattr(
+                config,
+                "component_solve_workers",
+                _env_int("CALENDARITZACIONS_SOLVER_COMPONENT_WORKERS", 0),
+            )
+        ),
         linkage_mode=linkage_mode,
         linkage_violation_weight=int(getattr(config, "linkage_violation_weight", 100_000)),
         calendar_mismatch_weight=int(getattr(config, "calendar_mismatch_weight", 1_000_000)),
@@ -105,6 +105,105 @@ class _UnionFind:
         self.parent[root_right] = root_left
 
 
+class _CutVertexIndex:
+    """Articulation points of a cut graph with the team partitions they leave.
+
+    One iterative DFS (Hopcroft-Tarjan lowpoints) numbers the nodes in preorder,
+    so every DFS subtree is a contiguous slice of ``order``. Removing ``v``
+    separates each child subtree whose lowpoint does not climb above ``v``;
+    the rest of ``v``'s connected component stays together. Team counts per
+    slice come from a prefix sum, so all cut sizes are known after the walk.
+    """
+
+    def __init__(self, graph: dict[str, set[str]]) -> None:
+        self.order: list[str] = []
+        self.disc: dict[str, int] = {}
+        self.size: dict[str, int] = {}
+        self.root_of: dict[str, str] = {}
+        self.separated: dict[str, list[str]] = defaultdict(list)
+        low: dict[str, int] = {}
+        for root in sorted(graph):
+            if root in self.disc:
+                continue
+            self._visit(root, root, graph, low)
+        self.team_prefix = [0]
+        for node_id in self.order:
+            self.team_prefix.append(self.team_prefix[-1] + (1 if node_id.startswith("team:") else 0))
+        self.roots = [node_id for node_id in self.order if self.root_of[node_id] == node_id]
+
+    def _visit(self, root: str, start: str, graph: dict[str, set[str]], low: dict[str, int]) -> None:
+        self.disc[start] = low[start] = len(self.order)
+        self.order.append(start)
+        self.root_of[start] = root
+        stack = [(start, "", iter(sorted(graph.get(start, ()))))]
+        while stack:
+            node_id, parent, neighbours = stack[-1]
+            for neighbour in neighbours:
+                if neighbour not in self.disc:
+                    self.disc[neighbour] = low[neighbour] = len(self.order)
+                    self.order.append(neighbour)
+                    self.root_of[neighbour] = root
+                    stack.append((neighbour, node_id, iter(sorted(graph.get(neighbour, ())))))
+                    break
+                if neighbour != parent:
+                    low[node_id] = min(low[node_id], self.disc[neighbour])
+            else:
+                stack.pop()
+                self.size[node_id] = len(self.order) - self.disc[node_id]
+                if stack:
+                    low[parent] = min(low[parent], low[node_id])
+                    if low[node_id] >= self.disc[parent]:
+                        self.separated[parent].append(node_id)
+
+    def _team_count(self, node_id: str) -> int:
+        first = self.disc[node_id]
+        return self.team_prefix[first + self.size[node_id]] - self.team_prefix[first]
+
+    def _teams_in(self, first: int, last: int) -> list[str]:
+        return [node_id.split(":", 1)[1] for node_id in self.order[first:last] if node_id.startswith("team:")]
+
+    def candidate_cuts(self) -> list[tuple[int, int, str]]:
+        """``(gain, smallest partition, node)`` of every non-team node whose removal adds team partitions."""
+
+        team_counts = sorted(count for count in (self._team_count(root) for root in self.roots) if count > 0)
+        cuts: list[tuple[int, int, str]] = []
+        for node_id, children in self.separated.items():
+            if node_id.startswith("team:"):
+                continue
+            component_teams = self._team_count(self.root_of[node_id])
+            pieces = [self._team_count(child) for child in children]
+            pieces.append(component_teams - sum(pieces))
+            pieces = [count for count in pieces if count > 0]
+            gain = len(pieces) - (1 if component_teams > 0 else 0)
+            if gain <= 0:
+                continue
+            # la particio mes petita pot ser un altre component connex sencer
+            others = team_counts[1:2] if team_counts[0] == component_teams else team_counts[:1]
+            cuts.append((gain, min(pieces + others), node_id))
+        return cuts
+
+    def team_partitions_after_removing(self, removed: str) -> tuple[tuple[str, ...], ...]:
+        partitions: list[list[str]] = []
+        component_root = self.root_of[removed]
+        for root in self.roots:
+            if root != component_root:
+                partitions.append(self._teams_in(self.disc[root], self.disc[root] + self.size[root]))
+        rest: list[str] = []
+        position = self.disc[component_root]
+        for child in sorted(self.separated.get(removed, ()), key=self.disc.__getitem__):
+            partitions.append(self._teams_in(self.disc[child], self.disc[child] + self.size[child]))
+            rest.extend(self._teams_in(position, self.disc[child]))
+            position = self.disc[child] + self.size[child]
+        rest.extend(self._teams_in(position, self.disc[component_root] + self.size[component_root]))
+        partitions.append([team_id for team_id in rest if f"team:{team_id}" != removed])
+        return tuple(
+            sorted(
+                (tuple(sorted(team_ids)) for team_ids in partitions if team_ids),
+                key=lambda ids: (-len(ids), ids),
+            )
+        )
+
+
 def build_initial_components(context: SolverContext) -> tuple[InitialComponent, ...]:
     """Split teams by hard domain, optionally leaving linkages repairable."""
 
@@ -669,26 +768,20 @@ def _split_component_by_best_cut(
     graph = _component_cut_graph(context, component)
     if not graph:
         return None
-    base_component_count = _component_count_after_removing(graph, removed="")
-    candidate_cuts: list[tuple[int, int, str, tuple[tuple[str, ...], ...]]] = []
-    for node_id in sorted(graph):
-        kind = node_id.split(":", 1)[0]
-        if kind == "team":
-            continue
-        partitions = _team_partitions_after_removing(graph, node_id)
-        if len(partitions) <= 1:
-            continue
-        cut_gain = _component_count_after_removing(graph, node_id) - base_component_count
-        if cut_gain <= 0:
-            continue
-        if not _partitions_have_disjoint_groups(context, partitions):
-            continue
-        smallest = min(len(partition) for partition in partitions)
-        candidate_cuts.append((cut_gain, smallest, node_id, partitions))
-    if not candidate_cuts:
+    cut_index = _CutVertexIndex(graph)
+    group_ids_by_team: dict[str, set[str]] = defaultdict(set)
+    for candidate in context.candidates:
+        group_ids_by_team[candidate.team_id].add(str(candidate.group_id))
+    # mateix criteri que abans (guany, particio mes petita, node): el primer tall segur guanya
+    partitions = None
+    for _gain, _smallest, node_id in sorted(cut_index.candidate_cuts(), reverse=True):
+        node_partitions = cut_index.team_partitions_after_removing(node_id)
+        if _partitions_have_disjoint_groups(group_ids_by_team, node_partitions):
+            partitions = node_partitions
+            break
+    if partitions is None:
         return None
 
-    _gain, _smallest, node_id, partitions = max(candidate_cuts, key=lambda item: (item[0], item[1], item[2]))
     domain_by_team = team_initial_domain_keys(context)
     candidate_count_by_team = Counter(candidate.team_id for candidate in context.candidates)
     linkage_keys_by_team = _linkage_keys_by_team(context)
@@ -746,48 +839,13 @@ def _component_cut_graph(context: SolverContext, component: InitialComponent) ->
     return {node_id: set(neighbours) for node_id, neighbours in graph.items()}
 
 
-def _team_partitions_after_removing(
-    graph: dict[str, set[str]],
-    removed: str,
-) -> tuple[tuple[str, ...], ...]:
-    seen: set[str] = set()
-    partitions: list[tuple[str, ...]] = []
-    nodes = sorted(node_id for node_id in graph if node_id != removed)
-    for start in nodes:
-        if start in seen:
-            continue
-        queue = deque([start])
-        seen.add(start)
-        team_ids: set[str] = set()
-        while queue:
-            current = queue.popleft()
-            if current.startswith("team:"):
-                team_ids.add(current.split(":", 1)[1])
-            for neighbour in graph.get(current, ()):
-                if neighbour == removed or neighbour in seen:
-                    continue
-                seen.add(neighbour)
-                queue.append(neighbour)
-        if team_ids:
-            partitions.append(tuple(sorted(team_ids)))
-    return tuple(sorted(partitions, key=lambda ids: (-len(ids), ids)))
-
-
-def _component_count_after_removing(graph: dict[str, set[str]], removed: str) -> int:
-    return len(_team_partitions_after_removing(graph, removed))
-
-
 def _partitions_have_disjoint_groups(
-    context: SolverContext,
+    group_ids_by_team: dict[str, set[str]],
     partitions: tuple[tuple[str, ...], ...],
 ) -> bool:
     owners: dict[str, int] = {}
     for index, team_ids in enumerate(partitions):
-        group_ids = {
-            str(candidate.group_id)
-            for candidate in context.candidates
-            if candidate.team_id in set(team_ids)
-        }
+        group_ids = set().union(*(group_ids_by_team.get(team_id, ()) for team_id in team_ids))
         if not group_ids:
             return False
         for group_id in group_ids:
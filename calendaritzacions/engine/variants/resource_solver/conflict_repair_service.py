@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import json
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from dataclasses import replace
 from itertools import combinations
 from pathlib import Path
 from time import perf_counter
 from types import SimpleNamespace
-from typing import Any
+from typing import Any, Callable
 
 from calendaritzacions.engine.base import EngineResult
 from calendaritzacions.engine.variants.resource_solver.audit import (
@@ -375,10 +379,25 @@ def _solve_initial_components(
     assignments: list[Assignment] = []
     records: list[dict[str, Any]] = []
     total = len(initial_components)
-    for index, component in enumerate(initial_components, start=1):
+    workers = _component_solve_workers(context.config, total)
+    initial_limit = _initial_solve_limit(context)
+    # pressupost global de l'etapa: el temps que un component no gasta el reben els seguents
+    budget_deadline_at = (
+        perf_counter() + initial_limit * math.ceil(total / workers)
+        if initial_limit > 0 and total > 0
+        else None
+    )
+
+    def prepare(position: int, component: Any) -> tuple[Any, tuple[Any, ...]]:
+        index = position + 1
         subcontext = _with_solve_time_limit(
             filter_context_by_team_ids(context, component.team_ids),
-            _initial_solve_limit(context),
+            _initial_component_solve_limit(
+                context=context,
+                budget_deadline_at=budget_deadline_at,
+                remaining_components=total - position,
+                workers=workers,
+            ),
         )
         solve_limit = getattr(subcontext.config, "time_limit_seconds", None)
         _report(
@@ -388,9 +407,11 @@ def _solve_initial_components(
             f"({len(component.team_ids)} equips, {len(subcontext.candidates)} candidats, timeout={solve_limit}s)",
             _stage_percent(35, 55, index - 1, total),
         )
-        built_model = build_solver_model(subcontext)
-        raw_result = solve_model(built_model, subcontext.config)
-        solution = build_solution(raw_result, subcontext)
+        return subcontext, (subcontext,)
+
+    def finish(position: int, component: Any, subcontext: SolverContext, outcome: Any) -> None:
+        index = position + 1
+        solution, backend, model_summary, _hint_added = outcome
         assignments.extend(solution.assignments)
         _report(
             progress,
@@ -408,8 +429,8 @@ def _solve_initial_components(
                 "status": solution.status,
                 "assignment_count": len(solution.assignments),
                 "resource_excess": _total_resource_excess(solution),
-                "backend": getattr(built_model, "backend", "unknown"),
-                "model_summary": getattr(built_model, "summary", {}) or {},
+                "backend": backend,
+                "model_summary": model_summary,
             }
         )
         if output_dir is not None:
@@ -418,9 +439,110 @@ def _solve_initial_components(
                 output_dir,
                 progress,
             )
+
+    _run_solve_jobs(initial_components, workers=workers, prepare=prepare, finish=finish)
     return tuple(assignments), tuple(records)
 
 
+def _solve_context_job(
+    context: SolverContext,
+    hint_assignments: tuple[Assignment, ...] | None = None,
+) -> tuple[ResourceSolverResult, str, dict[str, Any], bool]:
+    """Build and solve one sub-model (in a pool process: the CP-SAT model is not picklable)."""
+
+    built_model = build_solver_model(context)
+    hint_added = _add_assignment_hint(built_model, hint_assignments) if hint_assignments is not None else False
+    raw_result = solve_model(built_model, context.config)
+    return (
+        build_solution(raw_result, context),
+        getattr(built_model, "backend", "unknown"),
+        getattr(built_model, "summary", {}) or {},
+        hint_added,
+    )
+
+
+def _run_solve_jobs(
+    items: tuple[Any, ...],
+    *,
+    workers: int,
+    prepare: Callable[[int, Any], tuple[Any, tuple[Any, ...] | None]],
+    finish: Callable[[int, Any, Any, Any], None],
+    conflicts: Callable[[Any, Any], bool] | None = None,
+) -> None:
+    """
+    Run ``_solve_context_job`` for every item, at most ``workers`` at a time.
+
+    Items start in order: ``prepare(position, item)`` runs right before an item
+    is submitted (so its time limit sees the budget left by the items already
+    finished) and returns ``(state, job_args)``; ``job_args=None`` skips the
+    solve. ``finish(position, item, state, outcome)`` also runs in item order,
+    whatever the completion order, so progress and records stay ordered. An item
+    waits while ``conflicts(item, running_item)`` holds for a running item.
+    """
+
+    if workers > 1 and len(items) > 1 and not multiprocessing.current_process().daemon:
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, AssertionError, NotImplementedError):
+            # entorns sense processos fills: resolem en serie
+            pool = None
+        if pool is not None:
+            with pool:
+                _run_solve_jobs_in_pool(pool, items, workers, prepare, finish, conflicts)
+            return
+
+    for position, item in enumerate(items):
+        state, job_args = prepare(position, item)
+        finish(position, item, state, _solve_context_job(*job_args) if job_args is not None else None)
+
+
+def _run_solve_jobs_in_pool(
+    pool: ProcessPoolExecutor,
+    items: tuple[Any, ...],
+    workers: int,
+    prepare: Callable[[int, Any], tuple[Any, tuple[Any, ...] | None]],
+    finish: Callable[[int, Any, Any, Any], None],
+    conflicts: Callable[[Any, Any], bool] | None,
+) -> None:
+    running: dict[Any, int] = {}
+    states: dict[int, Any] = {}
+    outcomes: dict[int, Any] = {}
+    next_start = 0
+    next_finish = 0
+    while next_finish < len(items):
+        while (
+            next_start < len(items)
+            and len(running) < workers
+            and not (
+                conflicts is not None
+                and any(conflicts(items[next_start], items[position]) for position in running.values())
+            )
+        ):
+            state, job_args = prepare(next_start, items[next_start])
+            states[next_start] = state
+            if job_args is None:
+                outcomes[next_start] = None
+            else:
+                running[pool.submit(_solve_context_job, *job_args)] = next_start
+            next_start += 1
+        if running and next_finish not in outcomes:
+            done, _pending = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes[running.pop(future)] = future.result()
+        while next_finish in outcomes:
+            finish(next_finish, items[next_finish], states.pop(next_finish), outcomes.pop(next_finish))
+            next_finish += 1
+
+
+def _component_solve_workers(config: Any, pending: int) -> int:
+    configured = int(getattr(config, "component_solve_workers", 0) or 0)
+    if configured <= 0:
+        # cada model CP-SAT ja usa num_search_workers fils
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        configured = cores // max(1, int(getattr(config, "num_search_workers", 1) or 1))
+    return max(1, min(configured, pending))
+
+
 def _write_and_report_partial_audits(
     payloads: dict[str, Any],
     output_dir: Path,
@@ -871,13 +993,18 @@ def _repair_blocks(
     total = len(repair_blocks)
     if total == 0:
         _report(progress, "No hi ha blocs de reparacio per reoptimitzar.", 75)
-    for index, block in enumerate(repair_blocks, start=1):
+    workers = _component_solve_workers(context.config, total)
+    resource_ids_by_block = _block_resource_ids(context, repair_blocks) if workers > 1 else {}
+
+    def prepare(position: int, block: Any) -> tuple[dict[str, Any], tuple[Any, ...] | None]:
+        index = position + 1
         subcontext = filter_context_by_team_ids(context, block.team_ids)
         frozen_usage = frozen_usage_by_resource(initial_result, block.team_ids)
         block_solve_limit = _repair_block_solve_limit(
             context=context,
             repair_deadline_at=repair_deadline_at,
             remaining_blocks=total - index + 1,
+            concurrency=workers,
         )
         repair_context = _with_solve_time_limit(
             context_with_residual_capacities(subcontext, frozen_usage),
@@ -885,7 +1012,6 @@ def _repair_blocks(
         )
         fallback_assignments = _assignments_for_team_ids(initial_result.assignments, block.team_ids)
         fallback_solution = build_solution(_raw_result("FEASIBLE", fallback_assignments), repair_context)
-        fallback_resource_excess = _total_resource_excess(fallback_solution)
         skipped_due_deadline = block_solve_limit <= 0
         solve_limit = 0.0 if skipped_due_deadline else getattr(repair_context.config, "time_limit_seconds", None)
         _report(
@@ -896,8 +1022,24 @@ def _repair_blocks(
             f"recursos conflictius={len(block.conflict_resource_ids)}, timeout={solve_limit}s)",
             _stage_percent(65, 80, index - 1, total),
         )
-        if skipped_due_deadline:
-            built_model = None
+        state = {
+            "repair_context": repair_context,
+            "frozen_usage": frozen_usage,
+            "fallback_assignments": fallback_assignments,
+            "fallback_resource_excess": _total_resource_excess(fallback_solution),
+            "skipped_due_deadline": skipped_due_deadline,
+            "solve_limit": solve_limit,
+        }
+        return state, None if skipped_due_deadline else (repair_context, fallback_assignments)
+
+    def finish(position: int, block: Any, state: dict[str, Any], outcome: Any) -> None:
+        index = position + 1
+        repair_context = state["repair_context"]
+        fallback_assignments = state["fallback_assignments"]
+        fallback_resource_excess = state["fallback_resource_excess"]
+        if outcome is None:
+            backend = "skipped"
+            model_summary: dict[str, Any] = {}
             hint_added = False
             solution = build_solution(
                 _raw_result(
@@ -909,10 +1051,7 @@ def _repair_blocks(
             )
             solution_resource_excess = fallback_resource_excess
         else:
-            built_model = build_solver_model(repair_context)
-            hint_added = _add_assignment_hint(built_model, fallback_assignments)
-            raw_result = solve_model(built_model, repair_context.config)
-            solution = build_solution(raw_result, repair_context)
+            solution, backend, model_summary, hint_added = outcome
             solution_resource_excess = _total_resource_excess(solution)
         accepted = (
             solution.status in {"OPTIMAL", "FEASIBLE"}
@@ -946,7 +1085,7 @@ def _repair_blocks(
                 "initial_component_ids": block.initial_component_ids,
                 "team_count": len(block.team_ids),
                 "conflict_resource_ids": block.conflict_resource_ids,
-                "frozen_usage": frozen_usage,
+                "frozen_usage": state["frozen_usage"],
                 "status": solution.status,
                 "assignment_count": len(solution.assignments),
                 "resource_excess": solution_resource_excess,
@@ -957,15 +1096,41 @@ def _repair_blocks(
                 "selected_assignment_count": len(selected_assignments),
                 "selected_resource_excess": selected_resource_excess,
                 "hint_added": hint_added,
-                "skipped_due_deadline": skipped_due_deadline,
-                "solve_time_limit_seconds": solve_limit,
-                "backend": getattr(built_model, "backend", "skipped"),
-                "model_summary": getattr(built_model, "summary", {}) or {},
+                "skipped_due_deadline": state["skipped_due_deadline"],
+                "solve_time_limit_seconds": state["solve_limit"],
+                "backend": backend,
+                "model_summary": model_summary,
             }
         )
+
+    _run_solve_jobs(
+        repair_blocks,
+        workers=workers,
+        prepare=prepare,
+        finish=finish,
+        conflicts=lambda block, other: not resource_ids_by_block[block.block_id].isdisjoint(
+            resource_ids_by_block[other.block_id]
+        ),
+    )
     return repaired, tuple(records)
 
 
+def _block_resource_ids(context: SolverContext, blocks: tuple[Any, ...]) -> dict[str, frozenset[str]]:
+    """Resources each repair block can touch: two blocks sharing one are never solved at once."""
+
+    resources_by_team: dict[str, set[str]] = {}
+    for candidate in context.candidates:
+        resources_by_team.setdefault(str(candidate.team_id), set()).update(candidate.potential_resources)
+    return {
+        block.block_id: frozenset(
+            {str(resource_id) for resource_id in block.conflict_resource_ids}.union(
+                *(resources_by_team.get(str(team_id), ()) for team_id in block.team_ids)
+            )
+        )
+        for block in blocks
+    }
+
+
 def _assignments_for_team_ids(
     assignments: tuple[Assignment, ...],
     team_ids: tuple[str, ...],
@@ -1052,6 +1217,7 @@ def _repair_block_solve_limit(
     context: SolverContext,
     repair_deadline_at: float | None,
     remaining_blocks: int,
+    concurrency: int = 1,
 ) -> float:
     configured_limit = _repair_solve_limit(context)
     if repair_deadline_at is None:
@@ -1059,12 +1225,26 @@ def _repair_block_solve_limit(
     remaining_seconds = repair_deadline_at - perf_counter()
     if remaining_seconds <= 0 or remaining_blocks <= 0:
         return 0.0
-    fair_share = remaining_seconds / remaining_blocks
+    fair_share = remaining_seconds / math.ceil(remaining_blocks / max(1, concurrency))
     if configured_limit <= 0:
         return max(0.1, fair_share)
     return max(0.1, min(configured_limit, fair_share))
 
 
+def _initial_component_solve_limit(
+    *,
+    context: SolverContext,
+    budget_deadline_at: float | None,
+    remaining_components: int,
+    workers: int,
+) -> float:
+    configured_limit = _initial_solve_limit(context)
+    if budget_deadline_at is None or configured_limit <= 0 or remaining_components <= 0:
+        return configured_limit
+    remaining_seconds = budget_deadline_at - perf_counter()
+    return max(0.1, round(remaining_seconds / math.ceil(remaining_components / max(1, workers)), 1))
+
+
 def _stage_percent(start: int, end: int, completed: int, total: int) -> int:
     if total <= 0:
         return end
@@ -1,5 +1,5 @@
-import pandas as pd
-
-
 def read_excel(path):
+    # pandas es carrega aqui: la UI Django importa ingestion a l'arrencada
+    import pandas as pd
+
     return pd.read_excel(path)
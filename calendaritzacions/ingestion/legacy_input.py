@@ -1,9 +1,14 @@
-import pandas as pd
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from calendaritzacions.ingestion.ids import ensure_team_ids
 from calendaritzacions.ingestion.modalitat_map import load_modalitat_map
 from calendaritzacions.ingestion.validators import validate_required_columns
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 COLUMN_ALIASES = {
     "Id Equip": "Id",
@@ -70,6 +75,8 @@ def _derived_league_name(row: pd.Series) -> str:
 
 
 def _clean_text(value: object) -> str:
+    import pandas as pd
+
     if pd.isna(value):
         return ""
     return " ".join(str(value).strip().split())
@@ -1,5 +1,4 @@
-import pandas as pd
-
-
 def load_modalitat_map(path="map_modalitat_nom.csv"):
+    import pandas as pd
+
     return pd.read_csv(path, delimiter=";")
@@ -286,6 +286,28 @@ class DjangoCalendarizationServicesTests(unittest.TestCase):
         self.assertEqual(payload["payload"], {"ok": True})
         self.assertIn("candidate_catalog", discovered)
 
+    def test_audit_reader_prefers_and_streams_tabular_audits(self):
+        from calendaritzacions.django.services.audit_reader import discover_audit_paths, iter_audit_rows, read_json_file
+        from calendaritzacions.engine.variants.resource_solver.audit import write_audit_payloads
+
+        rows = [{"team_id": "T1", "group_id": "G1", "number": 1}, {"team_id": "T2", "group_id": "G1", "number": 2}]
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "candidate_catalog.json").write_text(json.dumps([{"team_id": "old"}]), encoding="utf-8")
+            write_audit_payloads({"candidate_catalog": rows}, root)
+
+            discovered = discover_audit_paths(str(root / "out.xlsx"))
+            streamed = iter_audit_rows(discovered["candidate_catalog"])
+            first = next(streamed)
+            streamed.close()
+            payload = read_json_file(discovered["candidate_catalog"])
+            legacy = list(iter_audit_rows(str(root / "candidate_catalog.json")))
+
+        self.assertTrue(discovered["candidate_catalog"].endswith("candidate_catalog.jsonl.gz"))
+        self.assertEqual(first, rows[0])
+        self.assertEqual(payload, rows)
+        self.assertEqual(legacy, [{"team_id": "old"}])
+
     def test_storage_rejects_download_before_success(self):
         from django.http import Http404
 
@@ -51,6 +51,7 @@ class DjangoCalendarizationUrlsTests(unittest.TestCase):
                 "resource_workspace",
                 "resource_workspace_incident",
                 "resource_workspace_team",
+                "resource_workspace_view_api",
             },
         )
 
@@ -83,6 +84,10 @@ class DjangoCalendarizationUrlsTests(unittest.TestCase):
             reverse("calendaritzacions:resource_workspace_team", kwargs={"pk": 7, "team_id": "ABC"}),
             "/runs/7/workspace/teams/ABC/",
         )
+        self.assertEqual(
+            reverse("calendaritzacions:resource_workspace_view_api", kwargs={"pk": 7, "view": "calendar"}),
+            "/runs/7/workspace/views/calendar/",
+        )
 
 
 if __name__ == "__main__":
@@ -989,6 +989,7 @@ class DjangoCalendarizationWorkspaceTests(TestCase):
             get_or_create_workspace_for_run,
             get_workspace_venue_round_sheets,
         )
+        from calendaritzacions.django.services.workspace_views import query_workspace_view
 
         with tempfile.TemporaryDirectory() as directory:
             root = Path(directory)
@@ -1090,7 +1091,12 @@ class DjangoCalendarizationWorkspaceTests(TestCase):
             workspace = get_or_create_workspace_for_run(run)
             payload = get_workspace_venue_round_sheets(workspace)
             calendar = get_workspace_calendar_view(workspace)
+            searches = {
+                needle: query_workspace_view(workspace, "venue_sheets", search=needle)["pagination"]["total"]
+                for needle in ("pavello", "VOLEI", "J1", "inexistent")
+            }
 
+        self.assertEqual(searches, {"pavello": 1, "VOLEI": 1, "J1": 1, "inexistent": 0})
         sheet = payload["sheets"][0]
         rows_by_hour = {row["hour_slot"]: row for row in sheet["rows"]}
         self.assertEqual(sheet["venue"], "Pavello")
@@ -1464,3 +1470,87 @@ class DjangoCalendarizationWorkspaceTests(TestCase):
         self.assertEqual(len(detail["team_calendars"]), 2)
         self.assertEqual(detail["team_calendars"][0]["team_name"], "Equip A")
         self.assertEqual(detail["team_calendars"][0]["calendar"][0]["side"], "Casa")
+
+    def test_workspace_views_are_materialized_per_revision_and_paginated(self):
+        if not HAS_DJANGO:
+            self.skipTest("django not installed")
+
+        from unittest.mock import patch
+
+        from calendaritzacions.django.models import (
+            CalendarizationRun,
+            WorkspaceChangeLog,
+            WorkspaceViewSnapshot,
+        )
+        from calendaritzacions.django.services import workspaces
+        from calendaritzacions.django.services.workspace_views import UnknownWorkspaceViewError, query_workspace_view
+
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            teams = [
+                {"team_id": "A", "name": "Equip A", "league_name": "Lliga 1", "level": "A", "venue": "Pavello"},
+                {"team_id": "B", "name": "Equip B", "league_name": "Lliga 1", "level": "A", "venue": "Pavello"},
+                {"team_id": "C", "name": "Equip C", "league_name": "Lliga 2", "level": "B", "venue": "Escola"},
+                {"team_id": "D", "name": "Equip D", "league_name": "Lliga 2", "level": "B", "venue": "Escola"},
+                {"team_id": "E", "name": "Equip E", "league_name": "Lliga 3", "level": "C", "venue": "Escola"},
+            ]
+            paths = {
+                "resource_solution": root / "resource_solution.json",
+                "team_catalog": root / "team_catalog.json",
+                "candidate_catalog": root / "candidate_catalog.json",
+                "resource_pressure": root / "resource_pressure.json",
+            }
+            paths["resource_solution"].write_text(
+                json.dumps(
+                    {
+                        "status": "FEASIBLE",
+                        "assignments": [
+                            {"team_id": team["team_id"], "group_id": f"G{index}", "number": 1}
+                            for index, team in enumerate(teams, start=1)
+                        ],
+                        "real_matches": [],
+                        "resource_usage": [],
+                    }
+                ),
+                encoding="utf-8",
+            )
+            paths["team_catalog"].write_text(json.dumps(teams), encoding="utf-8")
+            paths["candidate_catalog"].write_text("[]", encoding="utf-8")
+            paths["resource_pressure"].write_text("[]", encoding="utf-8")
+            run = CalendarizationRun.objects.create(
+                input_file="inputs/test.xlsx",
+                input_name="test.xlsx",
+                engine_name=CalendarizationRun.ENGINE_RESOURCE_SOLVER,
+                phase=CalendarizationRun.PHASE_FIRST,
+                status=CalendarizationRun.STATUS_SUCCESS,
+                audit_paths={name: str(path) for name, path in paths.items()},
+            )
+
+            workspace = workspaces.get_or_create_workspace_for_run(run)
+            first = workspaces.get_workspace_calendar_view(workspace)
+            with patch.object(workspaces, "build_workspace_calendar_view") as build:
+                second = workspaces.get_workspace_calendar_view(workspace)
+            self.assertFalse(build.called)
+            self.assertEqual(first, second)
+
+            snapshot = WorkspaceViewSnapshot.objects.get(workspace=workspace, view="calendar")
+            WorkspaceChangeLog.objects.create(workspace=workspace, run=run, action="move_team")
+            with patch.object(workspaces, "build_workspace_calendar_view", return_value={"groups": []}) as build:
+                rebuilt = workspaces.get_workspace_calendar_view(workspace)
+            self.assertTrue(build.called)
+            self.assertEqual(rebuilt, {"groups": []})
+            self.assertNotEqual(WorkspaceViewSnapshot.objects.get(pk=snapshot.pk).revision, snapshot.revision)
+
+            WorkspaceViewSnapshot.objects.all().delete()
+            page = query_workspace_view(workspace, "calendar", filters={"venue": ["escola"]}, page=2, page_size=2)
+
+        self.assertEqual(page["pagination"], {"page": 2, "page_size": 2, "total": 3, "num_pages": 2})
+        self.assertEqual([group["group_id"] for group in page["items"]], ["G5"])
+        self.assertEqual(page["filters"]["venue"], ["escola"])
+        venues = {facet["token"]: facet["count"] for facet in page["facets"]["venue"]}
+        self.assertEqual(venues, {"escola": 3, "pavello": 2})
+        leagues = {facet["token"]: facet["count"] for facet in page["facets"]["league"]}
+        self.assertEqual(leagues, {"lliga-2": 2, "lliga-3": 1})
+        self.assertIn("rounds", page["meta"])
+        with self.assertRaises(UnknownWorkspaceViewError):
+            query_workspace_view(workspace, "unknown")
@@ -1,6 +1,8 @@
+import gzip
 import json
 import tempfile
 import unittest
+from pathlib import Path
 from types import SimpleNamespace
 
 from calendaritzacions.domain.phases import PRIMERA_FASE
@@ -60,6 +62,25 @@ class ResourceSolverAuditTests(unittest.TestCase):
 
         self.assertIn("solver_explanations", paths)
         self.assertTrue(paths["solver_explanations"].endswith("solver_explanations.json"))
+        self.assertTrue(paths["team_catalog"].endswith("team_catalog.jsonl.gz"))
+
+    def test_tabular_payloads_are_written_as_compressed_rows_with_sidecar(self):
+        payloads = {
+            "team_catalog": [{"team_id": "T1", "name": "Equip 1"}, {"team_id": "T2", "level": "A"}],
+            "kpis": {"teams": 2},
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_audit_payloads(payloads, directory)
+            with gzip.open(paths["team_catalog"], "rt", encoding="utf-8") as handle:
+                rows = [json.loads(line) for line in handle]
+            sidecar = json.loads((Path(directory) / "team_catalog.meta.json").read_text(encoding="utf-8"))
+            kpis = json.loads(Path(paths["kpis"]).read_text(encoding="utf-8"))
+
+        self.assertEqual(rows, payloads["team_catalog"])
+        self.assertEqual(sidecar["rows"], 2)
+        self.assertEqual(sidecar["columns"], ["level", "name", "team_id"])
+        self.assertEqual(kpis, {"teams": 2})
 
     def test_local_explanations_skip_large_blocks(self):
         context = _context(
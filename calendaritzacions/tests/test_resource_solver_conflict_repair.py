@@ -9,6 +9,7 @@ from calendaritzacions.engine.variants.resource_solver.config import (
     coerce_resource_solver_config,
 )
 from calendaritzacions.engine.variants.resource_solver.conflict_repair import (
+    _CutVertexIndex,
     build_linkage_repair_blocks,
     build_initial_components,
     build_repair_blocks,
@@ -23,12 +24,15 @@ from calendaritzacions.engine.variants.resource_solver.conflict_repair import (
 )
 from calendaritzacions.engine.variants.resource_solver.conflict_repair_service import (
     _add_assignment_hint,
+    _block_resource_ids,
+    _initial_component_solve_limit,
     _local_linkage_repair_assignments,
     _repair_linkage_blocks,
     _repair_block_solve_limit,
     _repair_blocks,
     _repair_deadline_at,
     _result_from_assignments,
+    _solve_initial_components,
     _with_internal_solve_limit,
 )
 from calendaritzacions.engine.variants.resource_solver.solution import build_solution
@@ -123,6 +127,30 @@ class ResourceSolverConflictRepairTests(unittest.TestCase):
         self.assertEqual(len(refined), 2)
         self.assertEqual([component.team_ids for component in refined], [("T1", "T2"), ("T3", "T4", "T5")])
 
+    def test_cut_vertex_index_sizes_every_articulation_point_in_one_pass(self):
+        graph = {
+            "team:T1": {"competition:A", "resource:R"},
+            "team:T2": {"competition:A"},
+            "team:T3": {"resource:R", "competition:B"},
+            "team:T4": {"competition:B"},
+            "team:T5": {"competition:B"},
+            "competition:A": {"team:T1", "team:T2"},
+            "competition:B": {"team:T3", "team:T4", "team:T5"},
+            "resource:R": {"team:T1", "team:T3"},
+            "team:T9": set(),
+        }
+
+        index = _CutVertexIndex(graph)
+
+        self.assertEqual(
+            sorted(index.candidate_cuts()),
+            [(1, 1, "competition:A"), (1, 1, "resource:R"), (2, 1, "competition:B")],
+        )
+        self.assertEqual(
+            index.team_partitions_after_removing("resource:R"),
+            (("T3", "T4", "T5"), ("T1", "T2"), ("T9",)),
+        )
+
     def test_conflict_hub_builds_repair_block(self):
         context = _context(capacity=1)
         result = _result_with_two_locals(context)
@@ -386,6 +414,59 @@ class ResourceSolverConflictRepairTests(unittest.TestCase):
 
         self.assertEqual(limit, 1800.0)
 
+    def test_initial_components_solved_in_pool_report_in_component_order(self):
+        context = _context(
+            config=ResourceSolverConfig(
+                competition_grouping="league",
+                component_solve_workers=2,
+                num_search_workers=1,
+                initial_solve_time_limit_seconds=10,
+            )
+        )
+        components = build_initial_components(context)
+        messages = []
+        progress = SimpleNamespace(report=lambda message, percent: messages.append(message))
+
+        assignments, records = _solve_initial_components(context, components, progress)
+
+        self.assertEqual([record["component_id"] for record in records], [c.component_id for c in components])
+        self.assertEqual({assignment.team_id for assignment in assignments}, {"T1", "T2", "T3", "T4"})
+        solved = [message for message in messages if message.startswith("Component inicial resolt")]
+        self.assertEqual([message.split()[3] for message in solved], ["1/2:", "2/2:"])
+
+    def test_initial_component_limit_redistributes_unused_budget(self):
+        context = _context(
+            config=ResourceSolverConfig(competition_grouping="league", initial_solve_time_limit_seconds=100)
+        )
+
+        with patch(
+            "calendaritzacions.engine.variants.resource_solver.conflict_repair_service.perf_counter",
+            return_value=110.0,
+        ):
+            # 4 components amb 2 processos: pressupost de 200s; el primer lot n'ha gastat 10
+            limit = _initial_component_solve_limit(
+                context=context,
+                budget_deadline_at=300.0,
+                remaining_components=2,
+                workers=2,
+            )
+
+        self.assertEqual(limit, 190.0)
+
+    def test_repair_blocks_sharing_resources_are_not_solved_together(self):
+        context = _cut_context()
+        blocks = (
+            SimpleNamespace(block_id="R001", team_ids=("T1", "T2"), conflict_resource_ids=("RA|J1",)),
+            SimpleNamespace(block_id="R002", team_ids=("T3",), conflict_resource_ids=("RB|J1",)),
+            SimpleNamespace(block_id="R003", team_ids=("T4", "T5"), conflict_resource_ids=()),
+        )
+
+        resource_ids = _block_resource_ids(context, blocks)
+
+        self.assertEqual(resource_ids["R001"], frozenset({"RA|J1"}))
+        self.assertTrue(resource_ids["R001"].isdisjoint(resource_ids["R002"]))
+        self.assertFalse(resource_ids["R002"].isdisjoint(resource_ids["R003"]))
+
     def test_repair_deadline_reserves_finalization_margin(self):
         deadline = _repair_deadline_at(
             100.0,
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 from django.conf import settings
 from django.contrib.staticfiles import finders
@@ -150,6 +151,23 @@ def _configured_font_files(family):
     ]
 
 
+@lru_cache(maxsize=8)
+def _resolve_font_faces(family, folder, font_files):
+    # Els fitxers estatics no canvien mentre el proces viu: una sola cerca per configuracio.
+    faces = []
+    for weight, filename in font_files:
+        path = "fonts/{}/{}".format(folder, filename)
+        if not finders.find(path):
+            continue
+        faces.append({
+            "family": family,
+            "path": path,
+            "weight": weight,
+            "format": _font_format(filename),
+        })
+    return tuple(faces)
+
+
 def _build_competicions_font_config(is_competicions_app):
     configured_folder = _clean_font_folder(getattr(settings, "COMPETICIONS_APP_FONT_FOLDER", ""))
     configured_family = _clean_font_family(getattr(settings, "COMPETICIONS_APP_FONT_FAMILY", ""))
@@ -158,16 +176,7 @@ def _build_competicions_font_config(is_competicions_app):
 
     faces = []
     if is_competicions_app and configured_folder:
-        for weight, filename in _configured_font_files(family):
-            path = "fonts/{}/{}".format(configured_folder, filename)
-            if not finders.find(path):
-                continue
-            faces.append({
-                "family": family,
-                "path": path,
-                "weight": weight,
-                "format": _font_format(filename),
-            })
+        faces = [dict(face) for face in _resolve_font_faces(family, configured_folder, tuple(_configured_font_files(family)))]
 
     return {
         "competicio_font_family": family,
@@ -0,0 +1,156 @@
+"""
+Cold-start import budget for web workers.
+
+``measure_cold_import`` boots Django in a fresh interpreter with
+``python -X importtime``, imports the given URLconfs (what a gunicorn worker
+does before serving its first request) and parses the timing report.
+``budget_problems`` turns a report into the list of violations:
+
+- any ``HEAVY_MODULES`` package imported at boot (see ``lazy_imports``);
+- total import time above ``IMPORT_TIME_BUDGET_MS``.
+
+The ``check_import_budget`` management command and the test suite use it so a
+module-level ``import pandas`` in a view shows up as a failure instead of as
+slower worker boots.
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from django.conf import settings
+
+from .lazy_imports import HEAVY_MODULES
+
+
+_PROBE_SCRIPT = """
+import importlib, json, resource, sys
+import django
+django.setup()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+print(json.dumps({"maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass
+class ImportReport:
+    urlconfs: list[str]
+    timings: list[ImportTiming] = field(default_factory=list)
+    maxrss_kb: Optional[int] = None
+
+    @property
+    def total_ms(self) -> float:
+        return sum(t.cumulative_us for t in self.timings if t.depth == 0) / 1000.0
+
+    @property
+    def heavy_modules(self) -> list[str]:
+        loaded = {t.name.split(".", 1)[0] for t in self.timings}
+        return [name for name in HEAVY_MODULES if name in loaded]
+
+    def heavy_import_chain(self, package: str) -> list[str]:
+        """Chain of importers of ``package`` (itself first, the top-level import last)."""
+        for index, timing in enumerate(self.timings):
+            if timing.name != package:
+                continue
+            # -X importtime escriu els fills abans que el pare
+            chain, depth = [timing.name], timing.depth
+            for parent in self.timings[index + 1:]:
+                if parent.depth < depth:
+                    chain.append(parent.name)
+                    depth = parent.depth
+                    if depth == 0:
+                        break
+            return chain
+        return []
+
+    def slowest(self, limit: int = 15, *, top_level_only: bool = False) -> list[ImportTiming]:
+        timings = [t for t in self.timings if t.depth == 0] if top_level_only else self.timings
+        return sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:limit]
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # capcalera "self [us] | cumulative | imported package"
+        name = parts[2].rstrip()
+        # un espai separa la barra del nom; cada nivell n'afegeix dos
+        indent = len(name) - len(name.lstrip(" ")) - 1
+        timings.append(ImportTiming(name.strip(), max(0, indent // 2), self_us, cumulative_us))
+    return timings
+
+
+def default_urlconfs() -> list[str]:
+    return [settings.ROOT_URLCONF]
+
+
+def measure_cold_import(urlconfs: Optional[Iterable[str]] = None, *, timeout: float = 120) -> ImportReport:
+    urlconfs = list(urlconfs or default_urlconfs())
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", os.environ.get("DJANGO_SETTINGS_MODULE") or "ceeb_web.settings")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE_SCRIPT, *urlconfs],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(settings.BASE_DIR),
+        timeout=timeout,
+    )
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError("Cold import failed:\n" + "\n".join(errors[-20:]))
+
+    report = ImportReport(urlconfs=urlconfs, timings=parse_importtime(completed.stderr))
+    for line in reversed(completed.stdout.splitlines()):
+        try:
+            report.maxrss_kb = int(json.loads(line)["maxrss_kb"])
+            break
+        except (ValueError, KeyError, TypeError):
+            continue
+    return report
+
+
+def import_time_budget_ms() -> float:
+    return float(getattr(settings, "IMPORT_TIME_BUDGET_MS", 0) or 0)
+
+
+def budget_problems(report: ImportReport, *, budget_ms: Optional[float] = None) -> list[str]:
+    problems = [
+        "{} is imported at boot: {}".format(package, " <- ".join(report.heavy_import_chain(package)))
+        for package in report.heavy_modules
+    ]
+    budget_ms = import_time_budget_ms() if budget_ms is None else budget_ms
+    if budget_ms > 0 and report.total_ms > budget_ms:
+        problems.append(f"Cold import takes {report.total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+    return problems
+
+
+__all__ = [
+    "ImportReport",
+    "ImportTiming",
+    "budget_problems",
+    "default_urlconfs",
+    "import_time_budget_ms",
+    "measure_cold_import",
+    "parse_importtime",
+]
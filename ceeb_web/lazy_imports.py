@@ -0,0 +1,82 @@
+"""
+Lazy access to heavy third-party modules (pandas, scikit-learn, folium,
+matplotlib, OR-Tools, WeasyPrint...).
+
+Web workers import every URLconf module at boot, so a module-level
+``import pandas as pd`` in any view or service makes every worker pay the
+scientific stack even if it only serves judge tablets. ``lazy_import``
+returns a module proxy that performs the real import on first attribute
+access::
+
+    pd = lazy_import("pandas")
+    plt = lazy_import("matplotlib.pyplot")
+
+Names must not be touched at module level (type annotations need
+``from __future__ import annotations``). ``HEAVY_MODULES`` lists the top-level
+packages that must stay out of a cold URLconf import (numpy is not listed:
+openpyxl imports it when available); the ``check_import_budget`` command
+enforces it together with an import-time budget.
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from typing import Any, Optional
+
+
+HEAVY_MODULES = (
+    "folium",
+    "geopy",
+    "matplotlib",
+    "ortools",
+    "pandas",
+    "pdfminer",
+    "scipy",
+    "sklearn",
+    "weasyprint",
+)
+
+
+class LazyModule(types.ModuleType):
+    """Proxy that imports ``name`` the first time one of its attributes is used."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._load(), attr)
+        # els accessos seguents ja no passen per __getattr__
+        self.__dict__[attr] = value
+        return value
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> Any:
+    """Module ``name`` if already imported, otherwise a ``LazyModule`` proxy."""
+    module: Optional[types.ModuleType] = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def loaded_heavy_modules() -> list[str]:
+    """Entries of ``HEAVY_MODULES`` already imported in this process."""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+__all__ = ["HEAVY_MODULES", "LazyModule", "lazy_import", "loaded_heavy_modules"]
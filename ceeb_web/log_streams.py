@@ -0,0 +1,240 @@
+"""
+Server-Sent Events streams for background job logs.
+
+Every log line is appended to the ``job:{task_id}:logs`` Redis list and then
+announced on a pub/sub channel. The list is the source of truth: each SSE
+event carries the list index as its ``id``, so a reconnecting ``EventSource``
+(``Last-Event-ID``) resumes exactly where it stopped. Pub/sub messages only
+wake the subscribed streams up.
+
+Under ASGI (``ceeb_web.asgi``) streams are async iterators: one shared
+pattern subscription per process (``LogStreamHub``) fans notifications out
+to every open stream, and a waiting client does not hold a worker thread.
+Under WSGI (``runserver``/gunicorn) the same protocol is served by a blocking
+generator with its own pub/sub connection.
+
+Streams send a comment line every ``LOG_STREAM_HEARTBEAT_SECONDS`` so
+proxies keep idle connections open, and end after ``LOG_STREAM_MAX_SECONDS``
+(Django 4.2 does not notice ASGI clients that went away); the browser
+reconnects and resumes from ``Last-Event-ID``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Set
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+try:
+    import redis
+    import redis.asyncio as redis_async
+except ImportError:  # pragma: no cover - optional dependency in local/test envs
+    redis = None
+    redis_async = None
+
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+LOG_STREAM_CHANNEL_PATTERNS = ("job:*:channel", "logs:*")
+LOG_STREAM_RETRY_MS = 3000
+LOG_STREAM_RECONNECT_SECONDS = 2.0
+LOG_STREAM_BATCH_SIZE = 500
+
+
+def job_logs_key(task_id: str) -> str:
+    return f"job:{task_id}:logs"
+
+
+def _heartbeat_seconds() -> float:
+    return max(1.0, float(getattr(settings, "LOG_STREAM_HEARTBEAT_SECONDS", 15) or 15))
+
+
+def _max_seconds() -> float:
+    return max(1.0, float(getattr(settings, "LOG_STREAM_MAX_SECONDS", 600) or 600))
+
+
+def parse_last_event_id(request) -> int:
+    """Index of the last log the client already has (-1 if none)."""
+    raw = request.META.get("HTTP_LAST_EVENT_ID") or request.GET.get("last_event_id") or ""
+    try:
+        return max(-1, int(str(raw).strip()))
+    except (TypeError, ValueError):
+        return -1
+
+
+def _sse_event(index: int, data: str) -> str:
+    lines = str(data).splitlines() or [""]
+    return f"id: {index}\n" + "".join(f"data: {line}\n" for line in lines) + "\n"
+
+
+# ---------- Async (ASGI) ----------
+
+class LogStreamHub:
+    """One pattern subscription per event loop, shared by every open stream."""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.client = redis_async.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str) -> asyncio.Event:
+        event = asyncio.Event()
+        self._waiters.setdefault(channel, set()).add(event)
+        if self._reader is None or self._reader.done():
+            self._reader = self.loop.create_task(self._read_forever())
+        return event
+
+    def unsubscribe(self, channel: str, event: asyncio.Event) -> None:
+        waiters = self._waiters.get(channel)
+        if waiters is None:
+            return
+        waiters.discard(event)
+        if not waiters:
+            self._waiters.pop(channel, None)
+
+    def _wake(self, channel: str) -> None:
+        for event in self._waiters.get(channel, ()):
+            event.set()
+
+    def _wake_all(self) -> None:
+        for channel in list(self._waiters):
+            self._wake(channel)
+
+    async def _read_forever(self) -> None:
+        while self._waiters:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(*LOG_STREAM_CHANNEL_PATTERNS)
+                # messages published while we were (re)connecting are in the lists
+                self._wake_all()
+                while self._waiters:
+                    message = await pubsub.get_message(timeout=_heartbeat_seconds())
+                    if message and message.get("type") == "pmessage":
+                        self._wake(str(message.get("channel") or ""))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Log streams: Redis pub/sub unavailable, retrying", exc_info=True)
+                await asyncio.sleep(LOG_STREAM_RECONNECT_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+_hub: Optional[LogStreamHub] = None
+
+
+def get_log_stream_hub() -> LogStreamHub:
+    global _hub
+    if _hub is None or _hub.loop is not asyncio.get_running_loop():
+        _hub = LogStreamHub()
+    return _hub
+
+
+async def astream_job_logs(task_id: str, channel: str, *, last_event_id: int = -1) -> AsyncIterator[str]:
+    hub = get_log_stream_hub()
+    logs_key = job_logs_key(task_id)
+    next_index = last_event_id + 1
+    deadline = time.monotonic() + _max_seconds()
+    wake = hub.subscribe(channel)
+    try:
+        yield f"retry: {LOG_STREAM_RETRY_MS}\n\n"
+        while time.monotonic() < deadline:
+            wake.clear()
+            try:
+                items = await hub.client.lrange(logs_key, next_index, next_index + LOG_STREAM_BATCH_SIZE - 1)
+            except Exception:
+                logger.warning("Log streams: cannot read %s", logs_key, exc_info=True)
+                items = []
+            for raw in items:
+                yield _sse_event(next_index, raw)
+                next_index += 1
+            if len(items) >= LOG_STREAM_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=_heartbeat_seconds())
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+    finally:
+        hub.unsubscribe(channel, wake)
+
+
+# ---------- Sync (WSGI) ----------
+
+def stream_job_logs(task_id: str, channel: str, *, last_event_id: int = -1) -> Iterator[str]:
+    client = redis.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    logs_key = job_logs_key(task_id)
+    next_index = last_event_id + 1
+    deadline = time.monotonic() + _max_seconds()
+    try:
+        pubsub.subscribe(channel)
+        yield f"retry: {LOG_STREAM_RETRY_MS}\n\n"
+        while time.monotonic() < deadline:
+            items = client.lrange(logs_key, next_index, next_index + LOG_STREAM_BATCH_SIZE - 1)
+            for raw in items:
+                yield _sse_event(next_index, raw)
+                next_index += 1
+            if len(items) >= LOG_STREAM_BATCH_SIZE:
+                continue
+            if pubsub.get_message(timeout=_heartbeat_seconds()) is None:
+                yield ": heartbeat\n\n"
+    finally:
+        try:
+            pubsub.close()
+        finally:
+            client.close()
+
+
+def job_logs_sse_response(
+    request,
+    task_id: str,
+    channel: str,
+    *,
+    fallback: Optional[Callable[[], Iterator[str]]] = None,
+) -> StreamingHttpResponse:
+    """
+    SSE response for ``task_id``. ``fallback`` yields preamble events (e.g.
+    Celery meta for jobs that predate the log list) on a fresh connection.
+    """
+    last_event_id = parse_last_event_id(request)
+    preamble = list(fallback()) if fallback is not None and last_event_id < 0 else []
+    if isinstance(request, ASGIRequest):
+        async def _content():
+            for chunk in preamble:
+                yield chunk
+            async for chunk in astream_job_logs(task_id, channel, last_event_id=last_event_id):
+                yield chunk
+
+        content = _content()
+    else:
+        def _content():
+            yield from preamble
+            yield from stream_job_logs(task_id, channel, last_event_id=last_event_id)
+
+        content = _content()
+
+    response = StreamingHttpResponse(content, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+__all__ = [
+    "LogStreamHub",
+    "astream_job_logs",
+    "get_log_stream_hub",
+    "job_logs_key",
+    "job_logs_sse_response",
+    "parse_last_event_id",
+    "stream_job_logs",
+]
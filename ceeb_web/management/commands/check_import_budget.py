@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ceeb_web.import_budget import budget_problems, default_urlconfs, import_time_budget_ms, measure_cold_import
+
+
+class Command(BaseCommand):
+    help = "Measure the cold import of the URLconf (python -X importtime) and fail if it exceeds the budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--urlconf",
+            action="append",
+            dest="urlconfs",
+            help="URLconf module to import (repeatable). Defaults to ROOT_URLCONF.",
+        )
+        parser.add_argument(
+            "--budget-ms",
+            type=float,
+            default=None,
+            help="Import time budget in ms. Defaults to IMPORT_TIME_BUDGET_MS (0 disables it).",
+        )
+        parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list.")
+
+    def handle(self, *args, **options):
+        urlconfs = options["urlconfs"] or default_urlconfs()
+        budget_ms = options["budget_ms"] if options["budget_ms"] is not None else import_time_budget_ms()
+        try:
+            report = measure_cold_import(urlconfs)
+        except RuntimeError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(f"URLconfs: {', '.join(report.urlconfs)}")
+        self.stdout.write(f"Cold import: {report.total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+        if report.maxrss_kb is not None:
+            self.stdout.write(f"Max RSS after import: {report.maxrss_kb / 1024:.1f} MB")
+        self.stdout.write("Slowest imports (cumulative):")
+        for timing in report.slowest(max(0, int(options["top"] or 0))):
+            self.stdout.write(f"  {timing.cumulative_us / 1000:8.1f} ms  {'  ' * timing.depth}{timing.name}")
+
+        problems = budget_problems(report, budget_ms=budget_ms)
+        if problems:
+            raise CommandError("Import budget exceeded:\n" + "\n".join(f"- {problem}" for problem in problems))
+        self.stdout.write(self.style.SUCCESS("Import budget OK."))
@@ -0,0 +1,277 @@
+"""
+Per-request profiling emitted as a standard ``Server-Timing`` header.
+
+``ServerTimingMiddleware`` activates a ``RequestProfiler`` for opted-in
+requests (``SERVER_TIMING_ENABLED``, or the ``X-Server-Timing: 1`` header /
+``?_timings=1`` from staff users or under DEBUG) and for a sampled fraction
+of all requests (``SERVER_TIMING_LOG_SAMPLE_RATE``), which are only written
+as one JSON log line to the ``ceeb_web.profiling`` logger. The middleware
+must run after ``AuthenticationMiddleware`` and is sync-only.
+
+Code marks named sections with ``profile_section("name")`` or the
+``@profiled("name")`` decorator. Each section records wall time, SQL query
+count/duration and Redis call count/duration. Sections nest, and their
+counters include everything executed inside them. Without an active
+profiler, both helpers only do a context-variable lookup.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import random
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+SERVER_TIMING_MAX_SECTIONS = 40
+
+_active_profiler: ContextVar[Optional["RequestProfiler"]] = ContextVar("ceeb_active_profiler", default=None)
+
+
+def _normalize_flag(value: Any) -> bool:
+    token = str(value or "").strip().lower()
+    return token in {"1", "true", "yes", "on"}
+
+
+@dataclass
+class _Counters:
+    sql_count: int = 0
+    sql_ms: float = 0.0
+    redis_count: int = 0
+    redis_ms: float = 0.0
+
+    def snapshot(self) -> tuple[int, float, int, float]:
+        return (self.sql_count, self.sql_ms, self.redis_count, self.redis_ms)
+
+
+@dataclass
+class RequestProfiler:
+    label: str = ""
+    counters: _Counters = field(default_factory=_Counters)
+    sections: list[dict[str, Any]] = field(default_factory=list)
+    started_at: float = field(default_factory=perf_counter)
+
+    def record_sql(self, elapsed_ms: float) -> None:
+        self.counters.sql_count += 1
+        self.counters.sql_ms += elapsed_ms
+
+    def record_redis(self, elapsed_ms: float) -> None:
+        self.counters.redis_count += 1
+        self.counters.redis_ms += elapsed_ms
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        sql_count, sql_ms, redis_count, redis_ms = self.counters.snapshot()
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            self.sections.append(
+                {
+                    "name": str(name or "").strip() or "section",
+                    "elapsed_ms": round((perf_counter() - started_at) * 1000.0, 3),
+                    "sql_count": self.counters.sql_count - sql_count,
+                    "sql_ms": round(self.counters.sql_ms - sql_ms, 3),
+                    "redis_count": self.counters.redis_count - redis_count,
+                    "redis_ms": round(self.counters.redis_ms - redis_ms, 3),
+                }
+            )
+
+    def as_payload(self) -> dict[str, Any]:
+        return {
+            "label": self.label,
+            "total_ms": round((perf_counter() - self.started_at) * 1000.0, 3),
+            "sql_count": self.counters.sql_count,
+            "sql_ms": round(self.counters.sql_ms, 3),
+            "redis_count": self.counters.redis_count,
+            "redis_ms": round(self.counters.redis_ms, 3),
+            "sections": list(self.sections),
+        }
+
+    def as_header_value(self) -> str:
+        payload = self.as_payload()
+        metrics = [
+            _server_timing_metric("total", payload["total_ms"], payload["label"]),
+            _server_timing_metric("sql", payload["sql_ms"], f"{payload['sql_count']} queries"),
+            _server_timing_metric("redis", payload["redis_ms"], f"{payload['redis_count']} calls"),
+        ]
+        for item in payload["sections"][:SERVER_TIMING_MAX_SECTIONS]:
+            metrics.append(
+                _server_timing_metric(
+                    item["name"],
+                    item["elapsed_ms"],
+                    "sql={}/{}ms redis={}/{}ms".format(
+                        item["sql_count"], item["sql_ms"], item["redis_count"], item["redis_ms"]
+                    ),
+                )
+            )
+        return ", ".join(metrics)
+
+
+def _server_timing_token(name: str) -> str:
+    cleaned = "".join(ch if (ch.isalnum() or ch in "-_.") else "-" for ch in str(name or ""))
+    return cleaned.strip("-") or "section"
+
+
+def _server_timing_metric(name: str, elapsed_ms: float, desc: str = "") -> str:
+    metric = f"{_server_timing_token(name)};dur={float(elapsed_ms):.3f}"
+    if desc:
+        metric += ';desc="{}"'.format(str(desc).replace("\\", "").replace('"', "'"))
+    return metric
+
+
+def get_active_profiler() -> Optional[RequestProfiler]:
+    return _active_profiler.get()
+
+
+@contextmanager
+def profile_section(name: str) -> Iterator[None]:
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.section(name):
+        yield
+
+
+def profiled(name: str):
+    """Decorator form of ``profile_section``."""
+
+    def decorator(func):
+        @wraps(func)
+        def _wrapped(*args, **kwargs):
+            if _active_profiler.get() is None:
+                return func(*args, **kwargs)
+            with profile_section(name):
+                return func(*args, **kwargs)
+
+        return _wrapped
+
+    return decorator
+
+
+# ---------- Instrumentation ----------
+
+def _sql_execute_wrapper(execute, sql, params, many, context):
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return execute(sql, params, many, context)
+    started_at = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profiler.record_sql((perf_counter() - started_at) * 1000.0)
+
+
+_redis_instrumented = False
+
+
+def install_redis_instrumentation() -> None:
+    global _redis_instrumented
+    if _redis_instrumented:
+        return
+    try:
+        import redis.client
+    except ImportError:  # pragma: no cover - optional dependency in local/test envs
+        return
+
+    def _timed(method):
+        @wraps(method)
+        def _wrapped(*args, **kwargs):
+            profiler = _active_profiler.get()
+            if profiler is None:
+                return method(*args, **kwargs)
+            started_at = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                profiler.record_redis((perf_counter() - started_at) * 1000.0)
+
+        return _wrapped
+
+    redis.client.Redis.execute_command = _timed(redis.client.Redis.execute_command)
+    redis.client.Pipeline.execute = _timed(redis.client.Pipeline.execute)
+    _redis_instrumented = True
+
+
+@contextmanager
+def activate_profiler(profiler: RequestProfiler) -> Iterator[RequestProfiler]:
+    token = _active_profiler.set(profiler)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_sql_execute_wrapper))
+            yield profiler
+    finally:
+        _active_profiler.reset(token)
+
+
+# ---------- Middleware ----------
+
+def _may_request_timings(request) -> bool:
+    if bool(getattr(settings, "DEBUG", False)):
+        return True
+    user = getattr(request, "user", None)
+    return bool(getattr(user, "is_staff", False))
+
+
+def is_server_timing_requested(request) -> bool:
+    if bool(getattr(settings, "SERVER_TIMING_ENABLED", False)):
+        return True
+    meta = getattr(request, "META", {}) or {}
+    requested = _normalize_flag(meta.get("HTTP_X_SERVER_TIMING")) or _normalize_flag(
+        getattr(request, "GET", {}).get("_timings")
+    )
+    return requested and _may_request_timings(request)
+
+
+def _log_sample_rate() -> float:
+    try:
+        return max(0.0, min(1.0, float(getattr(settings, "SERVER_TIMING_LOG_SAMPLE_RATE", 0.0) or 0.0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ServerTimingMiddleware:
+    # El profiler viu en un ContextVar i envolta get_response de forma sincrona.
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_redis_instrumentation()
+
+    def __call__(self, request):
+        emit_header = is_server_timing_requested(request)
+        sample_rate = _log_sample_rate()
+        emit_log = sample_rate > 0 and random.random() < sample_rate
+        if not (emit_header or emit_log):
+            return self.get_response(request)
+
+        profiler = RequestProfiler(label=f"{request.method} {request.path}")
+        request.server_timing = profiler
+        with activate_profiler(profiler):
+            response = self.get_response(request)
+
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is not None and resolver_match.view_name:
+            profiler.label = resolver_match.view_name
+
+        if emit_header:
+            response[SERVER_TIMING_HEADER] = profiler.as_header_value()
+        if emit_log:
+            payload = profiler.as_payload()
+            payload["status"] = getattr(response, "status_code", None)
+            payload["path"] = request.path
+            logger.info("server_timing %s", json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+        return response
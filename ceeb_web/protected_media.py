@@ -0,0 +1,250 @@
+"""
+Responses for media files behind a permission check (judge videos,
+inscripcio media).
+
+Views check access as usual and then call ``protected_media_response``.
+With ``PROTECTED_MEDIA_OFFLOAD`` set, Django only answers with an internal
+redirect header and the front proxy streams the file itself (ranges and
+conditional requests included):
+
+- ``x-accel-redirect``: nginx, ``PROTECTED_MEDIA_ACCEL_PREFIX`` + the path
+  relative to ``MEDIA_ROOT`` (an ``internal`` location aliased to it);
+- ``x-sendfile``: Apache/lighttpd, absolute filesystem path.
+
+Without offload (runserver, storages without a local path) the file is served
+from Python with ``ETag``/``Last-Modified`` validators, ``If-None-Match``/
+``If-Modified-Since``/``If-Range`` and RFC 7233 byte ranges: one range is a
+``206`` with ``Content-Range``, several are a ``multipart/byteranges`` body.
+A video player scrubbing a clip only downloads the bytes it asks for.
+"""
+from __future__ import annotations
+
+import mimetypes
+import os
+import secrets
+from typing import Iterator, Optional
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+
+OFFLOAD_ACCEL_REDIRECT = "x-accel-redirect"
+OFFLOAD_SENDFILE = "x-sendfile"
+PROTECTED_MEDIA_CACHE_CONTROL = "private, max-age=60"
+RANGE_CHUNK_SIZE = 64 * 1024
+# mes rangs que aixo (o rangs mal formats) es serveixen com el fitxer sencer
+MAX_BYTE_RANGES = 16
+
+ByteRange = tuple[int, int]
+
+
+def protected_media_response(
+    request,
+    file_field,
+    *,
+    original_filename: str = "",
+    mime_type: str = "",
+    missing_message: str = "Fitxer no disponible",
+) -> HttpResponse:
+    """Serve ``file_field`` (a ``FieldFile``) once the caller has checked permissions."""
+    name = getattr(file_field, "name", "") if file_field else ""
+    if not name:
+        raise Http404(missing_message)
+    storage = file_field.storage
+    filename = (original_filename or "").strip() or os.path.basename(name)
+    content_type = mime_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    offloaded = _offload_response(storage, name, content_type=content_type, filename=filename)
+    if offloaded is not None:
+        return offloaded
+
+    try:
+        size = int(storage.size(name))
+    except Exception as exc:
+        raise Http404(missing_message) from exc
+    last_modified = _modified_timestamp(storage, name)
+    etag = quote_etag(f"{size:x}-{int(last_modified or 0):x}")
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        return _with_validators(conditional, etag, last_modified)
+
+    ranges = None
+    if request.method in ("GET", "HEAD") and _if_range_matches(request, etag, last_modified):
+        ranges = parse_byte_ranges(request.META.get("HTTP_RANGE", ""), size)
+    if ranges is not None and not ranges:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return _with_validators(response, etag, last_modified)
+
+    try:
+        file_handle = storage.open(name, "rb")
+    except Exception as exc:
+        raise Http404(missing_message) from exc
+
+    if ranges is None:
+        response = FileResponse(file_handle, as_attachment=False, filename=filename, content_type=content_type)
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        response = StreamingHttpResponse(_iter_ranges(file_handle, ranges), status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+    else:
+        boundary = secrets.token_hex(16)
+        parts = [
+            (
+                start,
+                end,
+                (
+                    f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                ).encode("latin-1"),
+            )
+            for start, end in ranges
+        ]
+        closing = f"--{boundary}--\r\n".encode("latin-1")
+        response = StreamingHttpResponse(
+            _iter_multipart(file_handle, parts, closing),
+            status=206,
+            content_type=f"multipart/byteranges; boundary={boundary}",
+        )
+        length = sum(len(header) + (end - start + 1) + 2 for start, end, header in parts) + len(closing)
+        response["Content-Length"] = str(length)
+    if ranges is not None:
+        response["Content-Disposition"] = content_disposition_header(False, filename)
+    return _with_validators(response, etag, last_modified)
+
+
+def parse_byte_ranges(header: str, size: int) -> Optional[list[ByteRange]]:
+    """
+    Parse a ``Range: bytes=...`` header into sorted, coalesced inclusive ranges.
+
+    ``None`` means "ignore the header and send the whole file" (no header,
+    other units, syntax errors, too many ranges); an empty list means none of
+    the ranges is satisfiable (``416``).
+    """
+    units, sep, spec = str(header or "").partition("=")
+    if not sep or units.strip().lower() != "bytes":
+        return None
+    specs = [part.strip() for part in spec.split(",") if part.strip()]
+    if not specs or len(specs) > MAX_BYTE_RANGES:
+        return None
+
+    ranges: list[ByteRange] = []
+    for part in specs:
+        first, dash, last = (value.strip() for value in part.partition("-"))
+        if not dash or (first and not first.isdigit()) or (last and not last.isdigit()) or not (first or last):
+            return None
+        if not first:
+            # sufix: els ultims N bytes
+            if int(last) == 0:
+                continue
+            start, end = max(0, size - int(last)), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return None
+        if start >= size:
+            continue
+        ranges.append((start, end))
+
+    ranges.sort()
+    merged: list[ByteRange] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _offload_response(storage, name: str, *, content_type: str, filename: str) -> Optional[HttpResponse]:
+    mode = str(getattr(settings, "PROTECTED_MEDIA_OFFLOAD", "") or "").strip().lower()
+    if mode not in {OFFLOAD_ACCEL_REDIRECT, OFFLOAD_SENDFILE}:
+        return None
+    try:
+        path = os.path.realpath(storage.path(name))
+    except NotImplementedError:
+        return None  # storage remot: el servim des de Python
+    if not os.path.isfile(path):
+        return None
+
+    response = HttpResponse(content_type=content_type)
+    if mode == OFFLOAD_SENDFILE:
+        response["X-Sendfile"] = path
+    else:
+        relative = os.path.relpath(path, os.path.realpath(settings.MEDIA_ROOT))
+        if relative.startswith(os.pardir):
+            return None
+        prefix = str(getattr(settings, "PROTECTED_MEDIA_ACCEL_PREFIX", "") or "/_protected_media/")
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(relative.replace(os.sep, "/"))
+    response["Content-Disposition"] = content_disposition_header(False, filename)
+    response["Cache-Control"] = PROTECTED_MEDIA_CACHE_CONTROL
+    return response
+
+
+def _modified_timestamp(storage, name: str) -> Optional[int]:
+    try:
+        return int(storage.get_modified_time(name).timestamp())
+    except (NotImplementedError, OSError, AttributeError):
+        return None
+
+
+def _if_range_matches(request, etag: str, last_modified: Optional[int]) -> bool:
+    if_range = str(request.META.get("HTTP_IF_RANGE", "") or "").strip()
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return last_modified is not None and parse_http_date_safe(if_range) == last_modified
+
+
+def _with_validators(response: HttpResponse, etag: str, last_modified: Optional[int]) -> HttpResponse:
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    response["Cache-Control"] = PROTECTED_MEDIA_CACHE_CONTROL
+    return response
+
+
+def _iter_ranges(file_handle, ranges: list[ByteRange]) -> Iterator[bytes]:
+    try:
+        for start, end in ranges:
+            yield from _read_range(file_handle, start, end)
+    finally:
+        file_handle.close()
+
+
+def _iter_multipart(file_handle, parts: list[tuple[int, int, bytes]], closing: bytes) -> Iterator[bytes]:
+    try:
+        for start, end, header in parts:
+            yield header
+            yield from _read_range(file_handle, start, end)
+            yield b"\r\n"
+        yield closing
+    finally:
+        file_handle.close()
+
+
+def _read_range(file_handle, start: int, end: int) -> Iterator[bytes]:
+    file_handle.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        chunk = file_handle.read(min(RANGE_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
+__all__ = [
+    "OFFLOAD_ACCEL_REDIRECT",
+    "OFFLOAD_SENDFILE",
+    "parse_byte_ranges",
+    "protected_media_response",
+]
@@ -84,6 +84,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Despres d'AuthenticationMiddleware: la capçalera a demanda nomes val per a staff.
+    'ceeb_web.profiling.ServerTimingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -160,6 +162,12 @@ USE_TZ = True
 MEDIA_URL = os.getenv('MEDIA_URL', '/media/')
 MEDIA_ROOT = os.getenv('MEDIA_ROOT', '/data/media')
 
+# Media protegit (videos de jutges, media d'inscripcions): amb "x-accel-redirect" (nginx) o
+# "x-sendfile" Django nomes comprova permisos i el proxy serveix el fitxer; buit, el serveix
+# Django amb rangs i ETag (ceeb_web.protected_media).
+PROTECTED_MEDIA_OFFLOAD = _env_str("PROTECTED_MEDIA_OFFLOAD", "").lower()
+PROTECTED_MEDIA_ACCEL_PREFIX = _env_str("PROTECTED_MEDIA_ACCEL_PREFIX", "/_protected_media/")
+
 X_FRAME_OPTIONS = "SAMEORIGIN"
 
 STATIC_VERSION = "dev-1"
@@ -176,6 +184,48 @@ COMPETICIONS_APP_FONT_FAMILY = _env_str("COMPETICIONS_APP_FONT_FAMILY", "")
 COMPETICIONS_APP_FONT_FOLDER = _env_str("COMPETICIONS_APP_FONT_FOLDER", "")
 COMPETICIONS_APP_FONT_FILES = None
 
+# Cache curta (per proces, versionada a Redis) de les capacitats resoltes per usuari i competicio.
+COMPETICIO_CAPABILITY_CACHE_TTL_SECONDS = int(os.getenv("COMPETICIO_CAPABILITY_CACHE_TTL_SECONDS", "15"))
+
+# Cache (per proces, versionada a Redis) dels subjectes d'equip per comp_aparell (0 = desactivada).
+TEAM_SUBJECTS_CACHE_TTL_SECONDS = int(os.getenv("TEAM_SUBJECTS_CACHE_TTL_SECONDS", "30"))
+
+# Cache (per proces, versionada a Redis) de la validacio i el pla compilat de cada
+# ClassificacioConfig (0 = desactivada).
+CLASSIFICACIO_PLAN_CACHE_TTL_SECONDS = int(os.getenv("CLASSIFICACIO_PLAN_CACHE_TTL_SECONDS", "300"))
+
+# Cache (per proces, versionada a Redis) dels resultats per franja de la validacio del
+# programa de rotacions (0 = desactivada).
+ROTACIONS_VALIDATION_CACHE_TTL_SECONDS = int(os.getenv("ROTACIONS_VALIDATION_CACHE_TTL_SECONDS", "300"))
+
+# Cache (per proces, per revisio del run) del context d'assignacio manual de designacions
+# (0 = desactivada).
+DESIGNACIONS_MANUAL_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("DESIGNACIONS_MANUAL_CONTEXT_CACHE_TTL_SECONDS", "600"))
+
+# Resum precalculat del tauler de fases: espera del debounce abans de reconstruir-lo i
+# antiguitat maxima d'un resum brut abans de tornar a calcular el tauler en linia.
+FASE_DASHBOARD_REFRESH_DELAY_SECONDS = int(os.getenv("FASE_DASHBOARD_REFRESH_DELAY_SECONDS", "5"))
+FASE_DASHBOARD_STALE_GRACE_SECONDS = int(os.getenv("FASE_DASHBOARD_STALE_GRACE_SECONDS", "60"))
+
+# Exportacions Excel (rotacions/classificacions): per sobre d'aquest nombre estimat de
+# files es generen en segon pla (heavy_queue) i se serveix l'artefacte cachejat (0 = sempre en linia).
+EXCEL_EXPORT_ASYNC_THRESHOLD_ROWS = int(os.getenv("EXCEL_EXPORT_ASYNC_THRESHOLD_ROWS", "5000"))
+EXCEL_EXPORT_ARTIFACT_TTL_SECONDS = int(os.getenv("EXCEL_EXPORT_ARTIFACT_TTL_SECONDS", "600"))
+# Intents d'una exportacio en segon pla que ha mort sense marcador d'error abans de retornar un 500.
+EXCEL_EXPORT_MAX_ATTEMPTS = int(os.getenv("EXCEL_EXPORT_MAX_ATTEMPTS", "2"))
+# Directori dels artefactes (dades de participants): fora de MEDIA_ROOT.
+# Buit = directori germa de MEDIA_ROOT ("excel_exports").
+EXCEL_EXPORT_DIR = _env_str("EXCEL_EXPORT_DIR", "")
+
+# Streams SSE de logs de tasques: comentari de heartbeat cada N segons (proxies amb timeout)
+# i durada maxima d'una connexio (el navegador reconnecta i continua amb Last-Event-ID).
+LOG_STREAM_HEARTBEAT_SECONDS = int(os.getenv("LOG_STREAM_HEARTBEAT_SECONDS", "15"))
+LOG_STREAM_MAX_SECONDS = int(os.getenv("LOG_STREAM_MAX_SECONDS", "600"))
+
+# Pressupost de temps d'importacio en fred de la URLconf (check_import_budget). Les
+# dependencies pesades (pandas, scikit-learn, matplotlib...) no s'han de carregar a l'arrencada.
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "2000"))
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -188,8 +238,19 @@ DATA_UPLOAD_MAX_NUMBER_FILES = 500
 DATA_UPLOAD_MAX_NUMBER_FILES = int(os.getenv("DATA_UPLOAD_MAX_NUMBER_FILES", str(DATA_UPLOAD_MAX_NUMBER_FILES)))
 DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("DATA_UPLOAD_MAX_MEMORY_SIZE", str(150 * 1024 * 1024)))
 FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", str(10 * 1024 * 1024)))
+# Server-Timing: sempre actiu, o a demanda (staff o DEBUG) amb la capçalera X-Server-Timing: 1 / ?_timings=1.
+# Una fraccio de requests (0..1) s'escriu com a JSON al logger ceeb_web.profiling.
+SERVER_TIMING_ENABLED = _env_bool("SERVER_TIMING_ENABLED", False)
+SERVER_TIMING_LOG_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_LOG_SAMPLE_RATE", "0"))
 JUDGE_VIDEO_FFPROBE_BIN = os.getenv("JUDGE_VIDEO_FFPROBE_BIN", "ffprobe")
 JUDGE_VIDEO_FFPROBE_TIMEOUT_SECONDS = int(os.getenv("JUDGE_VIDEO_FFPROBE_TIMEOUT_SECONDS", "15"))
+# ingesta a heavy_queue: portada i remux faststart (MP4/MOV) amb ffmpeg
+JUDGE_VIDEO_FFMPEG_BIN = os.getenv("JUDGE_VIDEO_FFMPEG_BIN", "ffmpeg")
+JUDGE_VIDEO_FFMPEG_TIMEOUT_SECONDS = int(os.getenv("JUDGE_VIDEO_FFMPEG_TIMEOUT_SECONDS", "120"))
+JUDGE_VIDEO_POSTER = _env_bool("JUDGE_VIDEO_POSTER", True)
+JUDGE_VIDEO_FASTSTART = _env_bool("JUDGE_VIDEO_FASTSTART", False)
+# fitxers parcials de les pujades reprenibles (buit = MEDIA_ROOT/trampoli/video_uploads)
+JUDGE_VIDEO_UPLOAD_DIR = _env_str("JUDGE_VIDEO_UPLOAD_DIR", "")
 
 CSRF_TRUSTED_ORIGINS = _env_csv("CSRF_TRUSTED_ORIGINS", "")
 if _env_bool("USE_X_FORWARDED_PROTO", False):
@@ -212,11 +273,22 @@ CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "django-db")
 CELERY_TASK_ROUTES = {
     'ceeb_web.tasks.process_certificats_task': {'queue': 'heavy_queue'},  # pesades
     'calendaritzacions.django.tasks.execute_calendarization_run_task': {'queue': 'heavy_queue'},
+    'competicions_trampoli.tasks.build_excel_export_task': {'queue': 'heavy_queue'},
+    'competicions_trampoli.tasks.ingest_judge_video_task': {'queue': 'heavy_queue'},
+    'competicions_trampoli.tasks.refresh_fase_dashboard_task': {'queue': 'heavy_queue'},
     # altres tasques -> 'default'
 }
 
 CALENDARITZACIONS_ASYNC_BACKEND = os.getenv("CALENDARITZACIONS_ASYNC_BACKEND", "celery")
 
+# Processos per renderitzar els plots de l'anàlisi de Marbella (0 = un per CPU, 1 = en sèrie)
+MARBELLA_PLOT_WORKERS = int(os.getenv("MARBELLA_PLOT_WORKERS", "0"))
+# Cache de datasets parsejats i PNG de Marbella (dades d'alumnes): fora de MEDIA_ROOT.
+# Buit = directori germà de MEDIA_ROOT ("marbella_cache"). Expulsió per antiguitat i mida.
+MARBELLA_CACHE_DIR = _env_str("MARBELLA_CACHE_DIR", "")
+MARBELLA_CACHE_MAX_AGE_DAYS = int(os.getenv("MARBELLA_CACHE_MAX_AGE_DAYS", "30"))
+MARBELLA_CACHE_MAX_MB = int(os.getenv("MARBELLA_CACHE_MAX_MB", "1024"))
+
 # Evita acaparament de tasques llargues
 CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_WORKER_PREFETCH_MULTIPLIER", "1"))
 CELERY_TASK_ACKS_LATE = _env_bool("CELERY_TASK_ACKS_LATE", True)
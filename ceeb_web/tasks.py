@@ -3,7 +3,6 @@ from celery import shared_task
 import requests
 import os
 import uuid
-import httpx
 import aiofiles
 import asyncio
 import shutil
@@ -12,6 +11,10 @@ from tempfile import TemporaryDirectory
 from django.conf import settings
 import redis
 import json
+from .lazy_imports import lazy_import
+from .log_streams import job_logs_key
+
+httpx = lazy_import("httpx")
 
 CALENDARITZACIONS_API = os.getenv("CALENDARITZACIONS_API", "http://calendaritzacions:8000/process_async")
 CALENDARITZACIONS_API_SEGONA_FASE = os.getenv("CALENDARITZACIONS_API_SEGONA_FASE", "http://calendaritzacions:8000/process_async_segona_fase/")
@@ -111,10 +114,10 @@ def _store_certificats_result(task_id: str, result: str, zip_path: str | Path) -
             if key:
                 r.set(f"job:{key}", job_meta)
                 r.expire(f"job:{key}", 60 * 60 * 24 * 7)
-        r.publish(
-            f"logs:{task_id}",
-            json.dumps({'message': 'Proces complet. Preparant enllac de descarrega...', 'progress': 100}),
-        )
+        payload = json.dumps({'message': 'Proces complet. Preparant enllac de descarrega...', 'progress': 100})
+        r.rpush(job_logs_key(task_id), payload)
+        r.expire(job_logs_key(task_id), 60 * 60 * 24 * 7)
+        r.publish(f"logs:{task_id}", payload)
     except Exception:
         pass
 
@@ -184,6 +187,9 @@ def _push(self_task):
                 if progress is not None:
                     payload['progress'] = progress
                 payload = json.dumps(payload)
+                # La llista es la font de l'SSE (Last-Event-ID); el canal nomes avisa
+                r.rpush(job_logs_key(task_id_local), payload)
+                r.expire(job_logs_key(task_id_local), 60 * 60 * 24 * 7)
                 r.publish(f"logs:{task_id_local}", payload)
             except Exception:
                 # No brownzeu la tasca per fallades en pub/sub
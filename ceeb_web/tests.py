@@ -1,8 +1,12 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.template.loader import render_to_string
-from django.test import RequestFactory, TestCase, override_settings
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 
 
@@ -98,3 +102,318 @@ class ProdCompetitionShellTests(TestCase):
         self.assertNotContains(response, 'class="navbar-brand"')
         self.assertNotContains(response, 'class="footer_section"')
         self.assertContains(response, "<strong>Nova competició</strong>", html=True)
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    def _view(self, request):
+        from django.http import HttpResponse
+
+        from .profiling import profile_section
+
+        with profile_section("outer"):
+            get_user_model().objects.count()
+            with profile_section("inner"):
+                get_user_model().objects.exists()
+        return HttpResponse("ok")
+
+    def _call(self, request):
+        from .profiling import ServerTimingMiddleware
+
+        return ServerTimingMiddleware(self._view)(request)
+
+    def test_header_is_only_emitted_on_request(self):
+        response = self._call(RequestFactory().get("/"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_opt_in_header_is_ignored_for_non_staff_users(self):
+        request = RequestFactory().get("/", HTTP_X_SERVER_TIMING="1")
+        request.user = AnonymousUser()
+        self.assertNotIn("Server-Timing", self._call(request))
+
+        request = RequestFactory().get("/?_timings=1")
+        request.user = SimpleNamespace(is_staff=False)
+        self.assertNotIn("Server-Timing", self._call(request))
+
+    @override_settings(DEBUG=True)
+    def test_opt_in_header_is_allowed_under_debug(self):
+        request = RequestFactory().get("/?_timings=1")
+        request.user = AnonymousUser()
+        self.assertIn("Server-Timing", self._call(request))
+
+    def test_middleware_is_sync_only(self):
+        from .profiling import ServerTimingMiddleware
+
+        self.assertTrue(ServerTimingMiddleware.sync_capable)
+        self.assertFalse(ServerTimingMiddleware.async_capable)
+
+    def test_sections_record_sql_counts(self):
+        request = RequestFactory().get("/", HTTP_X_SERVER_TIMING="1")
+        request.user = SimpleNamespace(is_staff=True)
+        response = self._call(request)
+
+        header = response["Server-Timing"]
+        metrics = {part.split(";")[0]: part for part in header.split(", ")}
+        self.assertIn('desc="2 queries"', metrics["sql"])
+        self.assertIn('desc="sql=2/', metrics["outer"])
+        self.assertIn('desc="sql=1/', metrics["inner"])
+        self.assertIn("redis", metrics)
+
+    @override_settings(SERVER_TIMING_LOG_SAMPLE_RATE=1.0)
+    def test_sampled_requests_are_logged_as_json(self):
+        with self.assertLogs("ceeb_web.profiling", level="INFO") as logs:
+            response = self._call(RequestFactory().get("/sampled/"))
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertIn('"path":"/sampled/"', logs.output[0])
+        self.assertIn('"sql_count":2', logs.output[0])
+
+
+class _FakeLogsRedis:
+    def __init__(self, items):
+        self.items = items
+
+    def lrange(self, key, start, end):
+        return self.items[start:end + 1]
+
+
+class _FakeSyncPubSub:
+    def subscribe(self, channel):
+        self.channel = channel
+
+    def get_message(self, timeout=None):
+        return None
+
+    def close(self):
+        pass
+
+
+class LogStreamsTests(SimpleTestCase):
+    def test_sync_stream_resumes_after_last_event_id_and_sends_heartbeats(self):
+        from . import log_streams
+
+        client = _FakeLogsRedis(['{"message": "a"}', '{"message": "b"}', '{"message": "c"}'])
+        client.pubsub = lambda **kwargs: _FakeSyncPubSub()
+        client.close = lambda: None
+        with patch.object(log_streams.redis, "from_url", return_value=client):
+            stream = log_streams.stream_job_logs("task-1", "job:task-1:channel", last_event_id=0)
+            chunks = [next(stream) for _ in range(4)]
+            stream.close()
+
+        self.assertEqual(chunks[0], "retry: 3000\n\n")
+        self.assertEqual(chunks[1], 'id: 1\ndata: {"message": "b"}\n\n')
+        self.assertEqual(chunks[2], 'id: 2\ndata: {"message": "c"}\n\n')
+        self.assertEqual(chunks[3], ": heartbeat\n\n")
+
+    def test_async_stream_reads_new_logs_when_woken(self):
+        from . import log_streams
+
+        class _AsyncLogsRedis(_FakeLogsRedis):
+            async def lrange(self, key, start, end):
+                return self.items[start:end + 1]
+
+        class _Hub:
+            def __init__(self):
+                self.client = _AsyncLogsRedis(['{"message": "a"}'])
+                self.waiters = {}
+
+            def subscribe(self, channel):
+                self.waiters[channel] = asyncio.Event()
+                return self.waiters[channel]
+
+            def unsubscribe(self, channel, event):
+                self.waiters.pop(channel, None)
+
+        hub = _Hub()
+
+        async def _run():
+            stream = log_streams.astream_job_logs("task-1", "job:task-1:channel")
+            chunks = [await stream.__anext__(), await stream.__anext__()]
+            hub.client.items.append('{"message": "b"}')
+            hub.waiters["job:task-1:channel"].set()
+            chunks.append(await stream.__anext__())
+            await stream.aclose()
+            return chunks
+
+        with patch.object(log_streams, "get_log_stream_hub", return_value=hub):
+            chunks = asyncio.run(_run())
+
+        self.assertEqual(chunks[1], 'id: 0\ndata: {"message": "a"}\n\n')
+        self.assertEqual(chunks[2], 'id: 1\ndata: {"message": "b"}\n\n')
+        self.assertEqual(hub.waiters, {})
+
+    def test_hub_wakes_every_stream_on_the_published_channel(self):
+        from .log_streams import LogStreamHub
+
+        async def _run():
+            hub = LogStreamHub()
+            first, second, other = asyncio.Event(), asyncio.Event(), asyncio.Event()
+            hub._waiters = {"job:1:channel": {first, second}, "job:2:channel": {other}}
+            hub._wake("job:1:channel")
+            return first.is_set(), second.is_set(), other.is_set()
+
+        self.assertEqual(asyncio.run(_run()), (True, True, False))
+
+    def test_last_event_id_header_and_query_param(self):
+        from .log_streams import parse_last_event_id
+
+        factory = RequestFactory()
+        self.assertEqual(parse_last_event_id(factory.get("/", HTTP_LAST_EVENT_ID="7")), 7)
+        self.assertEqual(parse_last_event_id(factory.get("/?last_event_id=3")), 3)
+        self.assertEqual(parse_last_event_id(factory.get("/", HTTP_LAST_EVENT_ID="x")), -1)
+
+
+class ProtectedMediaTests(SimpleTestCase):
+    def setUp(self):
+        import tempfile
+
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import FileSystemStorage
+        from django.db.models.fields.files import FieldFile
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media_root = tmp.name
+        storage = FileSystemStorage(location=tmp.name)
+        self.content = bytes(range(256)) * 4
+        name = storage.save("trampoli/score_videos/clip.mp4", ContentFile(self.content))
+        field = SimpleNamespace(storage=storage)
+        self.file_field = FieldFile(None, field, name)
+        self.factory = RequestFactory()
+
+    def _get(self, **headers):
+        from .protected_media import protected_media_response
+
+        request = self.factory.get("/video", **headers)
+        return protected_media_response(request, self.file_field, original_filename="rutina.mp4", mime_type="video/mp4")
+
+    def test_full_response_has_validators_and_conditional_get(self):
+        response = self._get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        response.close()
+
+    def test_single_and_suffix_ranges(self):
+        response = self._get(HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/1024")
+        self.assertEqual(b"".join(response.streaming_content), self.content[10:20])
+
+        response = self._get(HTTP_RANGE="bytes=-5")
+        self.assertEqual(response["Content-Range"], "bytes 1019-1023/1024")
+        self.assertEqual(b"".join(response.streaming_content), self.content[-5:])
+
+    def test_multiple_ranges_are_multipart(self):
+        response = self._get(HTTP_RANGE="bytes=0-1, 4-5, 5-7")
+        body = b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response["Content-Type"].startswith("multipart/byteranges; boundary="))
+        self.assertEqual(int(response["Content-Length"]), len(body))
+        self.assertIn(b"Content-Range: bytes 0-1/1024\r\n\r\n" + self.content[0:2], body)
+        self.assertIn(b"Content-Range: bytes 4-7/1024\r\n\r\n" + self.content[4:8], body)
+
+    def test_unsatisfiable_and_stale_if_range(self):
+        response = self._get(HTTP_RANGE="bytes=5000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+
+        response = self._get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_parse_byte_ranges_ignores_invalid_headers(self):
+        from .protected_media import parse_byte_ranges
+
+        self.assertIsNone(parse_byte_ranges("", 100))
+        self.assertIsNone(parse_byte_ranges("items=0-1", 100))
+        self.assertIsNone(parse_byte_ranges("bytes=9-2", 100))
+        self.assertEqual(parse_byte_ranges("bytes=90-", 100), [(90, 99)])
+        self.assertEqual(parse_byte_ranges("bytes=0-0,1-2", 100), [(0, 2)])
+
+    def test_accel_redirect_offload_skips_python_transfer(self):
+        with override_settings(
+            MEDIA_ROOT=self.media_root,
+            PROTECTED_MEDIA_OFFLOAD="x-accel-redirect",
+            PROTECTED_MEDIA_ACCEL_PREFIX="/_protected_media/",
+        ):
+            response = self._get(HTTP_RANGE="bytes=0-9")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/_protected_media/trampoli/score_videos/clip.mp4")
+        self.assertEqual(response.content, b"")
+        self.assertIn("rutina.mp4", response["Content-Disposition"])
+
+
+class LazyImportsTests(SimpleTestCase):
+    def test_lazy_module_imports_on_first_attribute_access(self):
+        import sys
+
+        from .lazy_imports import LazyModule, lazy_import
+
+        sys.modules.pop("tabnanny", None)
+        module = lazy_import("tabnanny")
+
+        self.assertIsInstance(module, LazyModule)
+        self.assertNotIn("tabnanny", sys.modules)
+        self.assertTrue(callable(module.check))
+        self.assertIn("tabnanny", sys.modules)
+        self.assertIs(lazy_import("tabnanny"), sys.modules["tabnanny"])
+
+    def test_parse_importtime_report(self):
+        from .import_budget import ImportReport, parse_importtime
+
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     sklearn.cluster",
+            "import time:       300 |        420 |   sklearn",
+            "import time:       500 |       1000 | designacions.geolocate",
+            "import time:       200 |        200 | json",
+        ])
+        report = ImportReport(urlconfs=["x"], timings=parse_importtime(output))
+
+        self.assertEqual([t.depth for t in report.timings], [2, 1, 0, 0])
+        self.assertEqual(report.total_ms, 1.2)
+        self.assertEqual(report.heavy_modules, ["sklearn"])
+        self.assertEqual(report.heavy_import_chain("sklearn"), ["sklearn", "designacions.geolocate"])
+
+
+class ColdImportBudgetTests(SimpleTestCase):
+    def test_urlconfs_do_not_import_heavy_dependencies_at_boot(self):
+        from .import_budget import budget_problems, measure_cold_import
+
+        report = measure_cold_import(["ceeb_web.urls", "ceeb_web.urls_intern", "ceeb_web.urls_prod"])
+
+        self.assertTrue(report.timings)
+        # el temps depen de la maquina: aqui nomes es comproven els moduls;
+        # check_import_budget aplica tambe IMPORT_TIME_BUDGET_MS
+        self.assertEqual(budget_problems(report, budget_ms=0), [])
+
+    def test_django_setup_does_not_import_openpyxl_or_numpy(self):
+        import os
+        import subprocess
+        import sys
+
+        from django.conf import settings
+
+        # els senyals es carreguen a django.setup() de tots els workers web
+        code = (
+            "import sys, django; django.setup(); "
+            "print('loaded=' + ','.join(m for m in ('openpyxl', 'numpy') if m in sys.modules))"
+        )
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", "ceeb_web.settings")
+        completed = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=str(settings.BASE_DIR),
+            timeout=120,
+        )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr[-2000:])
+        self.assertEqual(completed.stdout.strip().splitlines()[-1], "loaded=")
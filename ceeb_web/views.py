@@ -4,7 +4,7 @@ from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import render
 from django.conf import settings
 from django.core.files.storage import FileSystemStorage
-from django.http import JsonResponse, StreamingHttpResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 try:
     from celery.result import AsyncResult
@@ -34,6 +34,7 @@ from django.views.generic import TemplateView
 from django.contrib import messages
 from django.views.generic.edit import FormView
 from .forms import CertificatsUploadForm
+from .log_streams import job_logs_key, job_logs_sse_response
 
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
@@ -330,51 +331,26 @@ class CalendarEventDeleteView(LoginRequiredMixin, View):
 # LOGS I ESTAT TASQUES CELERY
 # ---------------------------------------------------------------------------------------------------
 def sse_logs(request, task_id):
-    r = redis.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
-    pubsub = r.pubsub()
-    pubsub.subscribe(f"logs:{task_id}")
-
-    def event_stream():
-        # 1) Primer, envia qualsevol log ja guardat al result-backend (fallback)
+    def legacy_meta_events():
+        # Tasques sense llista de logs a Redis: reenviem el que hi hagi al result-backend
         try:
-            task = AsyncResult(task_id)
-            info = task.info
-            if info:
-                # Si hi ha logs en el meta, els reenviem en ordre
-                if isinstance(info, dict):
-                    logs = info.get('logs') or []
-                    progress = info.get('progress') if isinstance(info.get('progress'), (int, float)) else None
-                    for entry in logs:
-                        payload = json.dumps({'message': entry, 'progress': progress})
-                        yield f"data: {payload}\n\n"
-                else:
-                    # Informació no-dict: envia-la tal qual
-                    payload = json.dumps({'message': str(info)})
-                    yield f"data: {payload}\n\n"
-
-            # 2) Ara subscriu al canal pub/sub i transmet missatges nous en temps real
-            for message in pubsub.listen():
-                print(f"Missatge rebut de Redis: {message}")  # Depuració
-                if message.get("type") == "message":
-                    data = message.get("data")  # esperem JSON: {"message":"...", "progress": 15}
-                    # Si el payload és ja una cadena JSON, l'enviem tal qual
-                    try:
-                        # Assegurem que és una cadena
-                        if isinstance(data, str):
-                            yield f"data: {data}\n\n"
-                        else:
-                            yield f"data: {json.dumps(data)}\n\n"
-                    except Exception:
-                        yield f"data: {json.dumps({'message': str(data)})}\n\n"
-        finally:
-            try:
-                pubsub.unsubscribe(f"logs:{task_id}")
-            finally:
-                pubsub.close()
-
-    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
-    response["Cache-Control"] = "no-cache"
-    return response
+            r = redis.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
+            if r.llen(job_logs_key(task_id)):
+                return
+        except Exception:
+            pass
+        info = AsyncResult(task_id).info if AsyncResult is not None else None
+        if not info:
+            return
+        if isinstance(info, dict):
+            logs = info.get('logs') or []
+            progress = info.get('progress') if isinstance(info.get('progress'), (int, float)) else None
+            for entry in logs:
+                yield f"data: {json.dumps({'message': entry, 'progress': progress})}\n\n"
+        else:
+            yield f"data: {json.dumps({'message': str(info)})}\n\n"
+
+    return job_logs_sse_response(request, task_id, f"logs:{task_id}", fallback=legacy_meta_events)
 
 @csrf_exempt
 def task_status_view(request, task_id):
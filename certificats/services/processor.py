@@ -4,6 +4,7 @@ import logging
 import re
 import shutil
 from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
 
 from .progress import noop_progress
@@ -14,17 +15,23 @@ ProgressCallback = Callable[[str, int | None], None]
 
 PDF_EXTS = {".pdf"}
 
-try:
-    from pdfminer.high_level import extract_text as pdfminer_extract_text
-    from pdfminer.layout import LAParams
-except Exception:  # pragma: no cover - depends on optional runtime dependency
-    pdfminer_extract_text = None
-    LAParams = None
 
-try:
-    import PyPDF2
-except Exception:  # pragma: no cover - depends on optional runtime dependency
-    PyPDF2 = None
+@lru_cache(maxsize=1)
+def _pdf_readers():
+    """(extract_text, LAParams, PyPDF2) disponibles; es carreguen al primer PDF."""
+    try:
+        from pdfminer.high_level import extract_text as pdfminer_extract_text
+        from pdfminer.layout import LAParams
+    except Exception:  # pragma: no cover - depends on optional runtime dependency
+        pdfminer_extract_text = None
+        LAParams = None
+
+    try:
+        import PyPDF2
+    except Exception:  # pragma: no cover - depends on optional runtime dependency
+        PyPDF2 = None
+
+    return pdfminer_extract_text, LAParams, PyPDF2
 
 
 def processar_certificats(
@@ -90,6 +97,7 @@ def _is_relative_to(path: Path, parent: Path | None) -> bool:
 
 def llegir_pdf(ruta_pdf: str | Path) -> str:
     ruta_pdf = Path(ruta_pdf)
+    pdfminer_extract_text, LAParams, PyPDF2 = _pdf_readers()
 
     if pdfminer_extract_text is not None and LAParams is not None:
         laparams = LAParams(
@@ -1,5 +1,7 @@
+import time
 from functools import wraps
 
+from django.conf import settings
 from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404
@@ -7,6 +9,7 @@ from django.shortcuts import get_object_or_404
 from ceeb_web.access import GlobalGroupRequiredMixin, require_global_groups, user_has_any_global_group
 
 from .models import Competicio, CompeticioMembership
+from .services.shared.competicio_versions import CompeticioVersions
 
 
 GLOBAL_COMPETICIONS_GROUPS = ("platform_admin", "competicions_manager")
@@ -65,6 +68,34 @@ COMPETICIO_ROLE_CAPABILITIES = {
     },
 }
 
+# Capacitats resoltes: un cop per request (cache a l'objecte user, com el
+# _perm_cache de Django) i, entre requests, una cache curta en memoria del
+# proces. Qualsevol canvi de membership/grups/usuari incrementa la versio
+# ``competicio_capabilities`` (local a l'instant i a Redis en fer commit, veure
+# ``competicio_versions``), aixi la revocacio arriba a tots els workers; el TTL
+# nomes limita l'antiguitat si Redis no respon.
+_CAPABILITY_CACHE_MAX_ENTRIES = 4096
+# Versio unica: un canvi d'acces (p. ex. un grup global) pot afectar qualsevol competicio.
+_CAPABILITY_VERSION_SCOPE = 1
+capability_versions = CompeticioVersions("competicio_capabilities")
+_capability_cache = {}
+
+
+def _clear_capability_cache(_scope=None) -> None:
+    _capability_cache.clear()
+
+
+capability_versions.on_invalidate(_clear_capability_cache)
+
+
+def _capability_cache_ttl() -> float:
+    return float(getattr(settings, "COMPETICIO_CAPABILITY_CACHE_TTL_SECONDS", 0) or 0)
+
+
+def invalidate_competicio_capabilities() -> None:
+    capability_versions.invalidate(_CAPABILITY_VERSION_SCOPE)
+
+
 def user_has_global_competicions_access(user) -> bool:
     # Bypass global de permisos per competicio: nomes platform_admin.
     return user_has_any_global_group(user, GLOBAL_COMPETICIO_BYPASS_GROUPS)
@@ -81,17 +112,57 @@ def get_active_competicio_membership(user, competicio):
     )
 
 
-def user_has_competicio_capability(user, competicio, capability: str) -> bool:
-    if not getattr(user, "is_authenticated", False):
-        return False
+def _load_competicio_capabilities(user, competicio) -> frozenset:
     if user_has_global_competicions_access(user):
-        return True
-
+        return frozenset({"*"})
     membership = get_active_competicio_membership(user, competicio)
     if not membership:
-        return False
+        return frozenset()
+    return frozenset(COMPETICIO_ROLE_CAPABILITIES.get(membership.role, set()))
+
 
-    allowed = COMPETICIO_ROLE_CAPABILITIES.get(membership.role, set())
+def resolve_competicio_capabilities(user, competicio) -> frozenset:
+    """
+    Conjunt immutable de capacitats de l'usuari a la competicio ("*" = totes).
+    """
+    if not getattr(user, "is_authenticated", False):
+        return frozenset()
+    if getattr(user, "is_superuser", False):
+        return frozenset({"*"})
+
+    competicio_id = getattr(competicio, "pk", competicio)
+    # Dins la request n'hi ha prou amb la versio local (els canvis d'aquest proces).
+    local_version = capability_versions.local(_CAPABILITY_VERSION_SCOPE)
+    request_cache = getattr(user, "_competicio_capabilities_cache", None)
+    if request_cache is None or request_cache.get("generation") != local_version:
+        request_cache = {"generation": local_version}
+        try:
+            user._competicio_capabilities_cache = request_cache
+        except AttributeError:
+            pass
+    if competicio_id in request_cache:
+        return request_cache[competicio_id]
+
+    ttl = _capability_cache_ttl()
+    key = (user.pk, competicio_id)
+    now = time.monotonic()
+    version = capability_versions.current(_CAPABILITY_VERSION_SCOPE) if ttl > 0 else None
+    cached = _capability_cache.get(key) if ttl > 0 else None
+    if cached and cached[0] > now and cached[1] == version:
+        capabilities = cached[2]
+    else:
+        capabilities = _load_competicio_capabilities(user, competicio)
+        if ttl > 0 and version[0] == capability_versions.local(_CAPABILITY_VERSION_SCOPE):
+            if len(_capability_cache) >= _CAPABILITY_CACHE_MAX_ENTRIES:
+                _capability_cache.clear()
+            _capability_cache[key] = (now + ttl, version, capabilities)
+
+    request_cache[competicio_id] = capabilities
+    return capabilities
+
+
+def user_has_competicio_capability(user, competicio, capability: str) -> bool:
+    allowed = resolve_competicio_capabilities(user, competicio)
     return "*" in allowed or capability in allowed
 
 def require_competicio_capability(capability: str, competicio_kwarg: str = "pk"):
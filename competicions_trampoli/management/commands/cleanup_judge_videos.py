@@ -5,12 +5,14 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 
+from ...models.judging import JudgeVideoUpload
 from ...models.scoring import (
     ScoreEntryVideo,
     ScoreEntryVideoEvent,
     TeamScoreEntryVideo,
     TeamScoreEntryVideoEvent,
 )
+from ...services.scoring.video_ingest import delete_files_on_commit, discard_upload, version_file_names
 
 
 class Command(BaseCommand):
@@ -25,10 +27,16 @@ class Command(BaseCommand):
         )
         parser.add_argument(
             "--status",
-            choices=["all", "ready", "failed", "pending"],
+            choices=["all", "ready", "failed", "pending", "processing"],
             default="all",
             help="Optional status filter before deletion.",
         )
+        parser.add_argument(
+            "--stale-upload-hours",
+            type=int,
+            default=24,
+            help="Delete resumable upload sessions not touched for this many hours (0 keeps them).",
+        )
         parser.add_argument(
             "--dry-run",
             action="store_true",
@@ -51,6 +59,8 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("Cleanup disabled: older-than-days <= 0"))
             return
 
+        self._cleanup_stale_uploads(int(options["stale_upload_hours"]), dry_run=dry_run)
+
         cutoff = timezone.now() - timedelta(days=older_than_days)
         deleted = 0
         total = 0
@@ -108,8 +118,11 @@ class Command(BaseCommand):
                         judge_token=video.judge_token,
                     )
 
+                if video.poster_file:
+                    video.poster_file.delete(save=False)
                 if video.video_file:
                     video.video_file.delete(save=False)
+                delete_files_on_commit(video.video_file.storage, version_file_names(video.previous_version))
                 video.delete()
                 deleted += 1
 
@@ -144,8 +157,11 @@ class Command(BaseCommand):
                         judge_token=video.judge_token,
                     )
 
+                if video.poster_file:
+                    video.poster_file.delete(save=False)
                 if video.video_file:
                     video.video_file.delete(save=False)
+                delete_files_on_commit(video.video_file.storage, version_file_names(video.previous_version))
                 video.delete()
                 deleted += 1
 
@@ -153,3 +169,18 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS("Dry-run finished. No rows deleted."))
         else:
             self.stdout.write(self.style.SUCCESS(f"Deleted videos: {deleted}/{total}"))
+
+    def _cleanup_stale_uploads(self, stale_hours: int, *, dry_run: bool):
+        if stale_hours <= 0:
+            return
+        stale_qs = JudgeVideoUpload.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=stale_hours))
+        if dry_run:
+            for upload in stale_qs:
+                self.stdout.write(f"[DRY] upload={upload.id} offset={upload.upload_offset}/{upload.upload_length}")
+            return
+        removed = 0
+        for upload in stale_qs:
+            discard_upload(upload)
+            removed += 1
+        if removed:
+            self.stdout.write(f"Stale upload sessions deleted: {removed}")
@@ -0,0 +1,60 @@
+# Generated by Django 4.2 on 2026-10-19 09:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competicions_trampoli', '0075_judgescoresubmission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoreentryvideo',
+            name='poster_file',
+            field=models.FileField(blank=True, default='', upload_to='trampoli/score_videos/posters/%Y/%m/%d/'),
+        ),
+        migrations.AddField(
+            model_name='teamscoreentryvideo',
+            name='poster_file',
+            field=models.FileField(blank=True, default='', upload_to='trampoli/team_score_videos/posters/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='scoreentryvideo',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendent'), ('processing', 'Processant'), ('ready', 'Disponible'), ('failed', 'Error')], default='pending', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='teamscoreentryvideo',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendent'), ('processing', 'Processant'), ('ready', 'Disponible'), ('failed', 'Error')], default='pending', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='JudgeVideoUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('assignment_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('subject_kind', models.CharField(default='inscripcio', max_length=30)),
+                ('subject_id', models.PositiveIntegerField()),
+                ('exercici', models.PositiveSmallIntegerField(default=1)),
+                ('original_filename', models.CharField(blank=True, default='', max_length=255)),
+                ('content_type', models.CharField(blank=True, default='', max_length=100)),
+                ('upload_length', models.PositiveBigIntegerField()),
+                ('upload_offset', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('judge_token', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_uploads', to='competicions_trampoli.judgedevicetoken')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='judgevideoupload',
+            index=models.Index(fields=['judge_token', 'updated_at'], name='judgevidup_token_upd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='judgevideoupload',
+            index=models.Index(fields=['updated_at'], name='judgevidup_updated_idx'),
+        ),
+    ]
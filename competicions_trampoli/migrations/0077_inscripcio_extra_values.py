@@ -0,0 +1,64 @@
+# Generated by Django 4.2 on 2026-10-19 10:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_inscripcio_extra_values(apps, schema_editor):
+    Inscripcio = apps.get_model("competicions_trampoli", "Inscripcio")
+    InscripcioExtraValue = apps.get_model("competicions_trampoli", "InscripcioExtraValue")
+
+    # Mateixa normalitzacio que services.inscripcions.extra_values (els valors venen de JSON).
+    rows = []
+    for inscripcio in Inscripcio.objects.only("id", "competicio_id", "extra").order_by("id").iterator(chunk_size=500):
+        extra = inscripcio.extra if isinstance(inscripcio.extra, dict) else {}
+        for code, value in extra.items():
+            if not isinstance(code, str) or not code or len(code) > 255:
+                continue
+            token = "" if value in (None, "") else str(value).strip()
+            rows.append(
+                InscripcioExtraValue(
+                    competicio_id=inscripcio.competicio_id,
+                    inscripcio_id=inscripcio.id,
+                    code=code,
+                    token=token,
+                    label=str(value) if token else "",
+                    sort_number=float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None,
+                )
+            )
+        if len(rows) >= 2000:
+            InscripcioExtraValue.objects.bulk_create(rows, batch_size=500)
+            rows = []
+    if rows:
+        InscripcioExtraValue.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competicions_trampoli', '0076_judge_video_ingest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InscripcioExtraValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=255)),
+                ('token', models.TextField(blank=True, default='')),
+                ('label', models.TextField(blank=True, default='')),
+                ('sort_number', models.FloatField(blank=True, null=True)),
+                ('competicio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inscripcio_extra_values', to='competicions_trampoli.competicio')),
+                ('inscripcio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='extra_values', to='competicions_trampoli.inscripcio')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='inscripcioextravalue',
+            index=models.Index(fields=['competicio', 'code'], name='ins_extra_value_code_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='inscripcioextravalue',
+            constraint=models.UniqueConstraint(fields=('inscripcio', 'code'), name='uniq_inscripcio_extra_value_code'),
+        ),
+        migrations.RunPython(backfill_inscripcio_extra_values, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-19 10:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competicions_trampoli', '0077_inscripcio_extra_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FaseDashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.PositiveIntegerField(default=0)),
+                ('payload_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('built_at', models.DateTimeField(blank=True, null=True)),
+                ('dirty_since', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('competicio', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fase_dashboard_snapshot', to='competicions_trampoli.competicio')),
+            ],
+        ),
+    ]
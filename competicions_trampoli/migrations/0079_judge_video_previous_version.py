@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competicions_trampoli', '0078_fase_dashboard_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoreentryvideo',
+            name='previous_version',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='teamscoreentryvideo',
+            name='previous_version',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -500,6 +500,26 @@ class FasePartitionState(models.Model):
         return f"{self.fase} / {self.partition_key} / {self.status}"
 
 
+class FaseDashboardSnapshot(models.Model):
+    """Resum precalculat del tauler de fases d'una competicio (targetes per aparell i fase)."""
+
+    competicio = models.OneToOneField(
+        Competicio,
+        on_delete=models.CASCADE,
+        related_name="fase_dashboard_snapshot",
+    )
+    # Només puja quan el contingut canvia: la pàgina la consulta per saber si cal recarregar.
+    revision = models.PositiveIntegerField(default=0)
+    payload_hash = models.CharField(max_length=64, blank=True, default="")
+    payload = models.JSONField(default=dict, blank=True)
+    built_at = models.DateTimeField(null=True, blank=True)
+    dirty_since = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Tauler fases {self.competicio_id} (r{self.revision})"
+
+
 class CompeticioAparellEquipContextSource(models.Model):
     competicio = models.ForeignKey(
         Competicio,
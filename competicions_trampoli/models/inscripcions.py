@@ -229,6 +229,37 @@ class Inscripcio(models.Model):
         super().save(*args, **kwargs)
 
 
+class InscripcioExtraValue(models.Model):
+    """
+    Projeccio indexada d'una clau de ``Inscripcio.extra``.
+
+    Guarda el token normalitzat (el mateix que fan servir els filtres de
+    columna) perque filtres i recomptes es puguin resoldre a la BD. Es
+    mante des de ``services.inscripcions.extra_values``.
+    """
+
+    competicio = models.ForeignKey(Competicio, on_delete=models.CASCADE, related_name="inscripcio_extra_values")
+    inscripcio = models.ForeignKey(Inscripcio, on_delete=models.CASCADE, related_name="extra_values")
+    code = models.CharField(max_length=255)
+    token = models.TextField(blank=True, default="")
+    label = models.TextField(blank=True, default="")
+    # Valor numeric quan la clau es un nombre JSON (ordre numeric dels valors).
+    sort_number = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["inscripcio", "code"], name="uniq_inscripcio_extra_value_code"),
+        ]
+        # El token (text sense limit) no s'indexa: un btree falla amb valors
+        # llargs, i la cerca per inscripcio ja passa per la restriccio unica.
+        indexes = [
+            models.Index(fields=["competicio", "code"], name="ins_extra_value_code_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.inscripcio_id} {self.code}={self.token}"
+
+
 class InscripcioEquipAssignacio(models.Model):
     class Origen(models.TextChoices):
         MANUAL = "manual", "Manual"
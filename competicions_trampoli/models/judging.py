@@ -275,6 +275,47 @@ class JudgeScoreSubmission(models.Model):
         )
 
 
+class JudgeVideoUpload(models.Model):
+    """
+    Pujada reprenible (estil tus) d'un video de jutge.
+
+    Els trossos s'afegeixen a un fitxer parcial a ``JUDGE_VIDEO_UPLOAD_DIR`` i
+    ``upload_offset`` diu fins on ha arribat; si la wifi cau, el client demana
+    l'offset i continua. En arribar a ``upload_length`` el fitxer passa al
+    video del subjecte i la sessio s'esborra.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    judge_token = models.ForeignKey(
+        JudgeDeviceToken,
+        on_delete=models.CASCADE,
+        related_name="video_uploads",
+    )
+    assignment_id = models.PositiveIntegerField(null=True, blank=True)
+    subject_kind = models.CharField(max_length=30, default="inscripcio")
+    subject_id = models.PositiveIntegerField()
+    exercici = models.PositiveSmallIntegerField(default=1)
+    original_filename = models.CharField(max_length=255, blank=True, default="")
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    upload_length = models.PositiveBigIntegerField()
+    upload_offset = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["judge_token", "updated_at"], name="judgevidup_token_upd_idx"),
+            models.Index(fields=["updated_at"], name="judgevidup_updated_idx"),
+        ]
+
+    @property
+    def is_complete(self) -> bool:
+        return self.upload_offset >= self.upload_length
+
+    def __str__(self):
+        return f"JudgeVideoUpload {self.subject_kind}:{self.subject_id} ex={self.exercici} {self.upload_offset}/{self.upload_length}"
+
+
 class PublicLiveToken(models.Model):
     """
     Token per compartir Classificacions Live amb el públic (sense autenticació).
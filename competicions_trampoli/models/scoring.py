@@ -390,6 +390,7 @@ class ScoreWarningAcknowledgement(models.Model):
 class ScoreEntryVideo(models.Model):
     class Status(models.TextChoices):
         PENDING = "pending", "Pendent"
+        PROCESSING = "processing", "Processant"
         READY = "ready", "Disponible"
         FAILED = "failed", "Error"
 
@@ -407,6 +408,7 @@ class ScoreEntryVideo(models.Model):
         related_name="video_capture",
     )
     video_file = models.FileField(upload_to="trampoli/score_videos/%Y/%m/%d/")
+    poster_file = models.FileField(upload_to="trampoli/score_videos/posters/%Y/%m/%d/", blank=True, default="")
     judge_token = models.ForeignKey(
         "competicions_trampoli.JudgeDeviceToken",
         on_delete=models.SET_NULL,
@@ -420,6 +422,9 @@ class ScoreEntryVideo(models.Model):
     mime_type = models.CharField(max_length=100, blank=True, default="")
     original_filename = models.CharField(max_length=255, blank=True, default="")
     error_message = models.CharField(max_length=300, blank=True, default="")
+    # Ultima versio ``ready`` mentre se n'ingereix una de nova (fitxers i metadades);
+    # es restaura si la ingesta falla i s'esborra quan la nova queda ``ready``.
+    previous_version = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -502,6 +507,7 @@ class ScoreEntryVideoEvent(models.Model):
 class TeamScoreEntryVideo(models.Model):
     class Status(models.TextChoices):
         PENDING = "pending", "Pendent"
+        PROCESSING = "processing", "Processant"
         READY = "ready", "Disponible"
         FAILED = "failed", "Error"
 
@@ -515,6 +521,7 @@ class TeamScoreEntryVideo(models.Model):
         related_name="video_capture",
     )
     video_file = models.FileField(upload_to="trampoli/team_score_videos/%Y/%m/%d/")
+    poster_file = models.FileField(upload_to="trampoli/team_score_videos/posters/%Y/%m/%d/", blank=True, default="")
     judge_token = models.ForeignKey(
         "competicions_trampoli.JudgeDeviceToken",
         on_delete=models.SET_NULL,
@@ -528,6 +535,9 @@ class TeamScoreEntryVideo(models.Model):
     mime_type = models.CharField(max_length=100, blank=True, default="")
     original_filename = models.CharField(max_length=255, blank=True, default="")
     error_message = models.CharField(max_length=300, blank=True, default="")
+    # Ultima versio ``ready`` mentre se n'ingereix una de nova (fitxers i metadades);
+    # es restaura si la ingesta falla i s'esborra quan la nova queda ``ready``.
+    previous_version = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import ast
+import threading
 from dataclasses import dataclass
 from typing import Any, Dict, List, Tuple, Callable, Set
 
@@ -388,6 +389,8 @@ class ScoringEngine:
             raise ScoringError("Schema invàlid (no és dict).")
         runtime_schema = runtime_schema_for_comp_aparell(schema, None)
         self.schema = runtime_schema
+        # context de l'ultim compute per fil: l'engine es comparteix entre peticions
+        self._local = threading.local()
         self.params = runtime_schema.get("params", {}) if isinstance(runtime_schema.get("params", {}), dict) else {}
 
         self.fields = runtime_schema.get("fields", []) if isinstance(runtime_schema.get("fields", []), list) else []
@@ -401,6 +404,14 @@ class ScoringEngine:
         # >>> nou: ordre topo dels computed
         self._computed_order = self._build_computed_order()
 
+    @property
+    def _latest_context(self) -> Dict[str, Any] | None:
+        return getattr(self._local, "context", None)
+
+    @_latest_context.setter
+    def _latest_context(self, value: Dict[str, Any]) -> None:
+        self._local.context = value
+
     def _build_aliases(self) -> Dict[str, str]:
         aliases: Dict[str, str] = {}
         if isinstance(self.params.get("aliases"), dict):
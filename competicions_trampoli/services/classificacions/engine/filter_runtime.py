@@ -1,5 +1,9 @@
 """Runtime helpers for classificacio filter matching."""
 
+import re
+
+from django.db.models import Q
+
 from ....models import Inscripcio
 from .._filters_impl import normalize_positive_int, normalized_text_token
 from ..filters import normalize_classificacio_filters
@@ -66,6 +70,60 @@ def _inscripcio_matches_classificacio_filters(inscripcio, filtres) -> bool:
     return True
 
 
+def _text_value_q(field_name: str, raw) -> Q | None:
+    # normalized_text_token: espais col.lapsats + casefold -> regex sense majuscules
+    words = str(raw or "").split()
+    if not words:
+        return None
+    pattern = r"^\s*" + r"\s+".join(re.escape(word) for word in words) + r"\s*$"
+    return Q(**{f"{field_name}__iregex": pattern})
+
+
+def _filter_field_q(field_name: str, allowed_values) -> Q:
+    # display_value d'una relacio (nom o __str__) no es traduible a SQL
+    if not allowed_values or is_relational_field(Inscripcio, field_name):
+        return Q()
+    out = Q(pk__in=[])
+    for raw in allowed_values:
+        text_q = _text_value_q(field_name, raw)
+        if text_q is not None:
+            out |= text_q
+    return out
+
+
+def _group_filter_q(group_filters) -> Q:
+    if not group_filters:
+        return Q()
+    # _normalized_group_filter_value nomes produeix enters positius en forma canonica
+    nums = []
+    for raw in group_filters:
+        token = normalized_text_token(raw)
+        value = normalize_positive_int(token)
+        if value is not None and str(value) == token:
+            nums.append(value)
+    if not nums:
+        return Q(pk__in=[])
+    return Q(grup_competicio__display_num__in=nums) | Q(grup__in=nums)
+
+
+def classificacio_filters_q(filtres) -> Q:
+    """
+    Prefiltre SQL equivalent a ``_inscripcio_matches_classificacio_filters``.
+
+    Es un superconjunt: el matching en Python s'ha de seguir aplicant sobre
+    el resultat (p. ex. casefold no coincideix del tot amb ``iregex``).
+    """
+    filters = normalize_classificacio_filters(filtres)
+    if not filters:
+        return Q()
+    return (
+        _filter_field_q("entitat", filters.get("entitats_in") or [])
+        & _filter_field_q("categoria", filters.get("categories_in") or [])
+        & _filter_field_q("subcategoria", filters.get("subcategories_in") or [])
+        & _group_filter_q(filters.get("grups_in") or [])
+    )
+
+
 def _native_team_members_match_classificacio_filters(member_rows, filtres) -> bool:
     resolved_members = []
     seen_ids = set()
@@ -89,6 +147,7 @@ def _native_team_members_match_classificacio_filters(member_rows, filtres) -> bo
 
 
 __all__ = [
+    "classificacio_filters_q",
     "_normalized_group_filter_value",
     "_inscripcio_matches_filter_field",
     "_inscripcio_matches_classificacio_filters",
@@ -6,12 +6,18 @@ from collections import defaultdict
 from dataclasses import dataclass
 from typing import Callable
 
+from django.db.models import Q
+
 from ....models import Inscripcio
 from ....models.competicio import CompeticioAparell, ProgramUnitSlot
 from ....models.scoring import ScoreEntry, TeamScoreEntry
 from ..phase_scope import PHASE_SCOPE_PER_APP, normalize_phase_scope_payload
 from ...scoring.team_scoring import is_team_context_app
-from ...inscripcions.admission import load_excluded_app_ids_by_inscripcio as load_admission_excluded_app_ids_by_inscripcio
+from ...inscripcions.admission import (
+    admitted_inscripcio_q,
+    filter_score_entries_admeses,
+    load_excluded_app_ids_by_inscripcio as load_admission_excluded_app_ids_by_inscripcio,
+)
 from ...teams.equip_contexts import normalize_equip_context_code
 from .common import (
     get_effective_team_context_code,
@@ -19,7 +25,7 @@ from .common import (
     normalize_positive_int,
     normalize_team_mode,
 )
-from .filter_runtime import _inscripcio_matches_classificacio_filters
+from .filter_runtime import _inscripcio_matches_classificacio_filters, classificacio_filters_q
 from .model_utils import is_relational_field
 
 
@@ -104,7 +110,15 @@ def load_inscripcions(
     *,
     filtres=None,
     matches_filter: InscripcioMatcher | None = None,
+    scope: Q | None = None,
+    include_all: bool = True,
 ) -> tuple[list[Inscripcio], dict[int, Inscripcio], list[Inscripcio], dict[int, Inscripcio]]:
+    """
+    ``filtres`` i ``scope`` (admissio, fase...) es resolen a SQL; el matching en
+    Python nomes repassa les files que ja han passat el prefiltre. Sense
+    ``include_all`` no es carrega la resta de la competicio i ``all_ins_*``
+    son les mateixes files filtrades.
+    """
     all_ins_qs = Inscripcio.objects.filter(competicio=competicio)
 
     select_related_fields = []
@@ -114,11 +128,22 @@ def load_inscripcions(
     if select_related_fields:
         all_ins_qs = all_ins_qs.select_related(*select_related_fields)
 
-    all_ins_list = list(all_ins_qs)
-    all_ins_by_id = {int(ins.id): ins for ins in all_ins_list}
-
+    sql_filter = Q(scope) if scope is not None else Q()
+    if matches_filter is None:
+        sql_filter &= classificacio_filters_q(filtres)
     predicate = matches_filter or (lambda ins: _inscripcio_matches_classificacio_filters(ins, filtres))
-    ins_list = [ins for ins in all_ins_list if predicate(ins)]
+
+    if include_all:
+        all_ins_list = list(all_ins_qs)
+        scoped_ids = set(all_ins_qs.filter(sql_filter).values_list("id", flat=True)) if sql_filter else None
+        ins_list = [
+            ins for ins in all_ins_list
+            if (scoped_ids is None or int(ins.id) in scoped_ids) and predicate(ins)
+        ]
+    else:
+        ins_list = [ins for ins in all_ins_qs.filter(sql_filter) if predicate(ins)]
+        all_ins_list = ins_list
+    all_ins_by_id = {int(ins.id): ins for ins in all_ins_list}
     ins_by_id = {int(ins.id): ins for ins in ins_list}
     return all_ins_list, all_ins_by_id, ins_list, ins_by_id
 
@@ -130,6 +155,8 @@ def load_score_entries(
     aparells=None,
     phase_id=None,
     include_all_phases: bool = False,
+    only_admeses: bool = False,
+    scope: Q | None = None,
 ) -> list[ScoreEntry]:
     qs = (
         ScoreEntry.objects
@@ -145,6 +172,10 @@ def load_score_entries(
             qs = qs.filter(fase_id=phase_id)
         else:
             qs = qs.filter(fase__isnull=True)
+    if scope is not None:
+        qs = qs.filter(scope)
+    if only_admeses:
+        qs = filter_score_entries_admeses(qs)
     return list(qs)
 
 
@@ -156,6 +187,7 @@ def load_team_score_entries(
     team_mode="",
     phase_id=None,
     include_all_phases: bool = False,
+    scope: Q | None = None,
 ) -> tuple[list[CompeticioAparell], list[TeamScoreEntry]]:
     team_apps = [comp_aparell for comp_aparell in (aparells or []) if is_team_context_app(comp_aparell)]
     if tipus != "equips" or team_mode != "native_team" or not team_apps:
@@ -171,6 +203,8 @@ def load_team_score_entries(
             qs = qs.filter(fase_id=phase_id)
         else:
             qs = qs.filter(fase__isnull=True)
+    if scope is not None:
+        qs = qs.filter(scope)
     return team_apps, list(qs)
 
 
@@ -182,6 +216,46 @@ def phase_slot_subject_ids(competicio, phase_scope=None) -> tuple[set[int] | Non
     return phase_slot_subject_ids_for_phase(competicio, phase_id)
 
 
+def phase_slot_subjects_qs(competicio, phase_id, subject_kind: str):
+    """Subquery (``subject_id``) dels slots ocupats d'una fase per tipus de subjecte."""
+    return (
+        ProgramUnitSlot.objects
+        .filter(
+            unit__fase__competicio=competicio,
+            unit__fase_id=phase_id,
+            subject_id__isnull=False,
+            subject_kind__iexact=subject_kind,
+            status__in=[ProgramUnitSlot.Status.FILLED, ProgramUnitSlot.Status.MANUAL],
+        )
+        .values("subject_id")
+    )
+
+
+def phase_scope_entries_q(
+    competicio,
+    phase_ids_by_app: dict[int, int],
+    app_ids,
+    *,
+    subject_field: str,
+    subject_kind: str,
+) -> Q:
+    """
+    Notes d'un abast per aparell: a cada aparell amb fase, les de la fase i
+    dels subjectes amb slot; a la resta, les que no tenen fase.
+    """
+    out = Q(fase__isnull=True) & ~Q(comp_aparell_id__in=list(phase_ids_by_app))
+    for app_id in app_ids or []:
+        phase_id = phase_ids_by_app.get(int(app_id))
+        if phase_id is None:
+            continue
+        out |= Q(
+            comp_aparell_id=app_id,
+            fase_id=phase_id,
+            **{f"{subject_field}__in": phase_slot_subjects_qs(competicio, phase_id, subject_kind)},
+        )
+    return out
+
+
 def phase_slot_subject_ids_for_phase(competicio, phase_id) -> tuple[set[int], set[int]]:
     inscripcio_ids = set()
     team_subject_ids = set()
@@ -320,111 +394,74 @@ def load_engine_orm_data(
 
     if aparells:
         normalized_phase_scope = normalize_phase_scope_payload(phase_scope or {})
-        phase_id = (
-            normalize_positive_int(normalized_phase_scope.get("fase_id"))
-            if normalized_phase_scope.get("mode") != PHASE_SCOPE_PER_APP
-            else None
-        )
+        per_app_scope = normalized_phase_scope.get("mode") == PHASE_SCOPE_PER_APP
+        phase_id = None if per_app_scope else normalize_positive_int(normalized_phase_scope.get("fase_id"))
         phase_ids_by_app = {}
-        if normalized_phase_scope.get("mode") == PHASE_SCOPE_PER_APP:
+        if per_app_scope:
             for raw_app_id, app_scope in (normalized_phase_scope.get("apps") or {}).items():
                 app_id = normalize_positive_int(raw_app_id)
                 app_phase_id = normalize_positive_int((app_scope or {}).get("fase_id"))
                 if app_id is not None and app_phase_id is not None:
                     phase_ids_by_app[app_id] = app_phase_id
-        phase_inscripcio_ids, phase_team_subject_ids = (
-            (None, None)
-            if normalized_phase_scope.get("mode") == PHASE_SCOPE_PER_APP
-            else phase_slot_subject_ids(competicio, normalized_phase_scope)
-        )
         app_ids = [int(comp_aparell.id) for comp_aparell in aparells]
-        excluded_by_inscripcio = load_excluded_app_ids_by_inscripcio(competicio, app_ids)
-        phase_ins_filters_by_app, phase_team_filters_by_app, phase_explicit_app_ids = phase_scope_subject_filters_by_app(
-            competicio,
-            normalized_phase_scope,
-            app_ids=app_ids,
-        )
+        phase_explicit_app_ids = [app_id for app_id in app_ids if app_id in phase_ids_by_app]
+
+        ins_scope = admitted_inscripcio_q(app_ids)
+        if phase_id is not None:
+            ins_scope &= Q(id__in=phase_slot_subjects_qs(competicio, phase_id, "inscripcio"))
+        elif phase_explicit_app_ids and len(phase_explicit_app_ids) == len(app_ids):
+            phase_ins_q = Q(pk__in=[])
+            for app_id in phase_explicit_app_ids:
+                phase_ins_q |= Q(id__in=phase_slot_subjects_qs(competicio, phase_ids_by_app[app_id], "inscripcio"))
+            ins_scope &= phase_ins_q
+        # els equips necessiten tots els membres (tambe els que no passen el filtre)
         all_ins_list, all_ins_by_id, ins_list, ins_by_id = load_inscripcions(
             competicio,
             filtres=filtres,
             matches_filter=matches_filter,
+            scope=ins_scope,
+            include_all=tipus == "equips",
         )
-        ins_list = filter_inscripcions_by_app_admission(
-            ins_list,
-            app_ids,
-            excluded_by_inscripcio,
-        )
-        ins_by_id = {int(ins.id): ins for ins in ins_list}
-        if phase_inscripcio_ids is not None:
-            ins_list = [ins for ins in ins_list if int(ins.id) in phase_inscripcio_ids]
-            ins_by_id = {int(ins.id): ins for ins in ins_list}
-        elif phase_explicit_app_ids and set(app_ids).issubset(phase_explicit_app_ids):
-            scoped_ins_ids = set()
-            for ids in phase_ins_filters_by_app.values():
-                scoped_ins_ids.update(ids)
-            ins_list = [ins for ins in ins_list if int(ins.id) in scoped_ins_ids]
-            ins_by_id = {int(ins.id): ins for ins in ins_list}
         notes = load_score_entries(
             competicio,
             inscripcions=ins_list,
             aparells=aparells,
             phase_id=phase_id,
-            include_all_phases=normalized_phase_scope.get("mode") == PHASE_SCOPE_PER_APP,
-        )
-        notes = filter_score_entries_by_app_admission(notes, excluded_by_inscripcio)
-        if normalized_phase_scope.get("mode") == PHASE_SCOPE_PER_APP:
-            notes = [
-                note for note in notes
-                if (
-                    int(note.comp_aparell_id) in phase_ids_by_app
-                    and int(note.fase_id or 0) == phase_ids_by_app[int(note.comp_aparell_id)]
-                )
-                or (
-                    int(note.comp_aparell_id) not in phase_ids_by_app
-                    and note.fase_id is None
+            include_all_phases=per_app_scope,
+            only_admeses=True,
+            scope=(
+                phase_scope_entries_q(
+                    competicio,
+                    phase_ids_by_app,
+                    app_ids,
+                    subject_field="inscripcio_id",
+                    subject_kind="inscripcio",
                 )
-            ]
-        if phase_ins_filters_by_app:
-            notes = [
-                note for note in notes
-                if int(note.comp_aparell_id) not in phase_explicit_app_ids
-                or int(note.inscripcio_id) in phase_ins_filters_by_app.get(int(note.comp_aparell_id), set())
-            ]
+                if per_app_scope
+                else None
+            ),
+        )
         notes_by_app, notes_by_key, ins_ids_by_app = build_score_indexes(notes)
+        team_scope = None
+        if per_app_scope:
+            team_scope = phase_scope_entries_q(
+                competicio,
+                phase_ids_by_app,
+                app_ids,
+                subject_field="team_subject_id",
+                subject_kind="team_unit",
+            )
+        elif phase_id is not None:
+            team_scope = Q(team_subject_id__in=phase_slot_subjects_qs(competicio, phase_id, "team_unit"))
         team_apps, team_notes = load_team_score_entries(
             competicio,
             aparells=aparells,
             tipus=tipus,
             team_mode=team_mode,
             phase_id=phase_id,
-            include_all_phases=normalized_phase_scope.get("mode") == PHASE_SCOPE_PER_APP,
+            include_all_phases=per_app_scope,
+            scope=team_scope,
         )
-        if normalized_phase_scope.get("mode") == PHASE_SCOPE_PER_APP:
-            team_notes = [
-                note for note in team_notes
-                if (
-                    int(note.comp_aparell_id) in phase_ids_by_app
-                    and int(note.fase_id or 0) == phase_ids_by_app[int(note.comp_aparell_id)]
-                )
-                or (
-                    int(note.comp_aparell_id) not in phase_ids_by_app
-                    and note.fase_id is None
-                )
-            ]
-        if phase_team_subject_ids is not None:
-            team_notes = [
-                note for note in team_notes
-                if int(getattr(note, "team_subject_id", 0) or 0) in phase_team_subject_ids
-            ]
-        elif phase_team_filters_by_app:
-            team_notes = [
-                note for note in team_notes
-                if int(note.comp_aparell_id) not in phase_explicit_app_ids
-                or int(getattr(note, "team_subject_id", 0) or 0) in phase_team_filters_by_app.get(
-                    int(note.comp_aparell_id),
-                    set(),
-                )
-            ]
         team_notes_by_app, team_notes_by_key, team_ids_by_app = build_team_score_indexes(
             team_notes,
             team_context_code=team_context_code,
@@ -463,7 +500,9 @@ __all__ = [
     "load_inscripcions",
     "load_score_entries",
     "load_team_score_entries",
+    "phase_scope_entries_q",
     "phase_scope_subject_filters_by_app",
     "phase_slot_subject_ids",
     "phase_slot_subject_ids_for_phase",
+    "phase_slot_subjects_qs",
 ]
@@ -2,32 +2,29 @@
 
 import logging
 from collections import defaultdict
+
+from ceeb_web.profiling import profiled
+
 from ...scoring.team_scoring import is_team_context_app
 from ...teams.equip_contexts import get_contextual_assignment_map
-from ..partitions import normalize_particions_config, normalize_particions_v2_entries
 from .common import (
     EXERCISE_SELECTION_SCOPE_PER_MEMBER,
-    get_effective_team_context_code as _get_effective_team_context_code,
-    normalize_classificacio_equips_cfg as _normalize_classificacio_equips_cfg,
-    normalize_classificacio_filters as _normalize_classificacio_filters,
-    normalize_equip_assignment_source as _normalize_equip_assignment_source,
     normalize_exercise_selection_scope as _normalize_exercise_selection_scope,
     normalized_text_token as _normalized_text_token,
 )
 from .detail_payload import (
     build_detail_runtime,
     get_detail_display_config as engine_get_detail_display_config,
-    get_display_columns as engine_get_display_columns,
 )
 from .loaders import load_engine_orm_data
 from .metrics_runtime import (
-    _sanitize_desempat_for_tipus as engine_sanitize_desempat_for_tipus,
     build_metrics_runtime,
     build_metrics_runtime_adapters,
     calc_criterion_value as engine_calc_criterion_value,
 )
 from .model_utils import display_value as _display_value
-from .partition_runtime import _build_particions_custom_index, _partition_key_from_entries
+from .partition_runtime import _partition_key_from_entries
+from .plan import plan_for_cfg
 from .ranking import (
     _is_pipeline_tie,
     _normalize_tie_camps,
@@ -40,9 +37,6 @@ from .score_values import (
     _to_float,
 )
 from .selection import (
-    _normalize_candidate_source_cfg,
-    _normalize_candidate_source_mode,
-    _normalize_exercicis_cfg,
     _normalize_field_mode,
     _normalize_optional_agg,
     _normalize_participants_cfg,
@@ -51,12 +45,9 @@ from .selection import (
     _pick_participants,
 )
 from .selection_runtime import build_selection_runtime
-from .schema import normalize_schema as engine_normalize_schema
 from .teams import _build_resolved_team_by_ins_id, _build_team_grouped, _build_team_rows
 from .victories import (
     build_victories_adapters,
-    _normalize_mode_resultat_aparells as engine_normalize_mode_resultat_aparells,
-    _normalize_victories_cfg as engine_normalize_victories_cfg,
 )
 
 logger = logging.getLogger(__name__)
@@ -79,6 +70,7 @@ def _unique_nonempty_strings(raw_values):
     return out
 
 
+@profiled("classificacions.compute")
 def compute_classificacio(competicio, cfg_obj):
     """
     Retorna:
@@ -88,95 +80,41 @@ def compute_classificacio(competicio, cfg_obj):
       - inscripcio_id, nom, entitat_nom, score, tie{...}
       - posicio/punts els posa _rank()
     """
-    tipus = (getattr(cfg_obj, "tipus", "individual") or "individual").lower().strip()
-    schema, _legacy_info = engine_normalize_schema(
-        competicio,
-        getattr(cfg_obj, "schema", {}) or {},
-        tipus=tipus,
-        persist=False,
-    )
-    part_entries = schema.get("particions_v2") or normalize_particions_v2_entries(
-        schema.get("particions") or []
-    )
-    part_custom_idx = _build_particions_custom_index(schema.get("particions_custom") or {})
-    particions_config = normalize_particions_config(schema.get("particions_config") or {})
-    filtres = _normalize_classificacio_filters(schema.get("filtres") or {})
-    punt = schema["puntuacio"] or {}
-    desempat = schema["desempat"] or []
-    presentacio = schema["presentacio"] or {}
-    display_columns = engine_get_display_columns(schema)
-    equips_cfg = _normalize_classificacio_equips_cfg(schema.get("equips") or {})
-    assignment_source = equips_cfg.get("assignment_source") or _normalize_equip_assignment_source({})
-    team_context_code = _get_effective_team_context_code(equips_cfg)
-    desempat = engine_sanitize_desempat_for_tipus(desempat, tipus)
-    mode_resultat_aparells = engine_normalize_mode_resultat_aparells(punt.get("mode_resultat_aparells"))
-    victories_cfg = engine_normalize_victories_cfg((punt.get("victories") or {}))
-    if tipus != "individual" and mode_resultat_aparells == "victories":
-        mode_resultat_aparells = "score"
-
-    # 1) PRETRACTAMENT
-    ordre_principal = (punt.get("ordre") or "desc").lower().strip()
-    if ordre_principal not in ("asc", "desc"):
-        ordre_principal = "desc"
-
-    ex_cfg = punt.get("exercicis") or {}
-    base_ex_cfg = _normalize_exercicis_cfg(
-        {
-            **(ex_cfg if isinstance(ex_cfg, dict) else {}),
-            "best_n": (
-                (ex_cfg.get("best_n") if isinstance(ex_cfg, dict) else None)
-                or punt.get("exercicis_best_n")
-                or 1
-            ),
-        },
-        fallback={"mode": "tots", "best_n": 1, "index": 1, "ids": []},
-    )
-    exerc_mode = base_ex_cfg["mode"]
-    ex_best_n = base_ex_cfg["best_n"]
-    ex_index = base_ex_cfg["index"]
-    ex_ids = base_ex_cfg["ids"]
-    mode_seleccio_exercicis = str(punt.get("mode_seleccio_exercicis") or "per_aparell_global").lower().strip()
-    if mode_seleccio_exercicis not in ("per_aparell_global", "per_aparell_override", "global_pool"):
-        mode_seleccio_exercicis = "per_aparell_global"
-    exercicis_per_aparell = punt.get("exercicis_per_aparell") or {}
-    if not isinstance(exercicis_per_aparell, dict):
-        exercicis_per_aparell = {}
-    camps_mode_per_aparell = punt.get("camps_mode_per_aparell") or {}
-    if not isinstance(camps_mode_per_aparell, dict):
-        camps_mode_per_aparell = {}
-    camps_per_exercici_per_aparell = punt.get("camps_per_exercici_per_aparell") or {}
-    if not isinstance(camps_per_exercici_per_aparell, dict):
-        camps_per_exercici_per_aparell = {}
-    agregacio_camps_per_aparell = punt.get("agregacio_camps_per_aparell") or {}
-    if not isinstance(agregacio_camps_per_aparell, dict):
-        agregacio_camps_per_aparell = {}
-    agregacio_camps_per_exercici_per_aparell = punt.get("agregacio_camps_per_exercici_per_aparell") or {}
-    if not isinstance(agregacio_camps_per_exercici_per_aparell, dict):
-        agregacio_camps_per_exercici_per_aparell = {}
-    candidate_source_per_aparell = punt.get("candidate_source_per_aparell") or {}
-    if not isinstance(candidate_source_per_aparell, dict):
-        candidate_source_per_aparell = {}
-    agregacio_exercicis_per_aparell = punt.get("agregacio_exercicis_per_aparell") or {}
-    if not isinstance(agregacio_exercicis_per_aparell, dict):
-        agregacio_exercicis_per_aparell = {}
-    team_pool_mode_per_aparell = punt.get("team_pool_mode_per_aparell") or {}
-    if not isinstance(team_pool_mode_per_aparell, dict):
-        team_pool_mode_per_aparell = {}
-    team_pool_participants_per_exercici_per_aparell = punt.get("team_pool_participants_per_exercici_per_aparell") or {}
-    if not isinstance(team_pool_participants_per_exercici_per_aparell, dict):
-        team_pool_participants_per_exercici_per_aparell = {}
-    team_pool_agregacio_participants_per_exercici_per_aparell = punt.get("team_pool_agregacio_participants_per_exercici_per_aparell") or {}
-    if not isinstance(team_pool_agregacio_participants_per_exercici_per_aparell, dict):
-        team_pool_agregacio_participants_per_exercici_per_aparell = {}
-
-    agg_camps = (punt.get("agregacio_camps") or "sum").lower().strip()
-    candidate_source_mode = _normalize_candidate_source_mode(punt.get("candidate_source_mode"))
-    candidate_source_cfg = _normalize_candidate_source_cfg(
-        punt.get("candidate_source_cfg"),
-        fallback={"mode": "tots", "best_n": 1, "index": 1, "ids": [], "agregacio_exercicis": "sum"},
-    )
-    agg_exercicis = (punt.get("agregacio_exercicis") or "sum").lower().strip()
-    agg_aparells = (punt.get("agregacio_aparells") or "sum").lower().strip()
+    plan = plan_for_cfg(competicio, cfg_obj)
+    tipus = plan.tipus
+    plan_values = plan.values()
+    schema = plan_values["schema"]
+    part_entries = plan_values["part_entries"]
+    part_custom_idx = plan_values["part_custom_idx"]
+    particions_config = plan_values["particions_config"]
+    filtres = plan_values["filtres"]
+    punt = plan_values["punt"]
+    desempat = plan_values["desempat"]
+    presentacio = plan_values["presentacio"]
+    display_columns = plan_values["display_columns"]
+    equips_cfg = plan_values["equips_cfg"]
+    assignment_source = plan_values["assignment_source"]
+    team_context_code = plan_values["team_context_code"]
+    mode_resultat_aparells = plan_values["mode_resultat_aparells"]
+    victories_cfg = plan_values["victories_cfg"]
+    ordre_principal = plan_values["ordre_principal"]
+    base_ex_cfg = plan_values["base_ex_cfg"]
+    mode_seleccio_exercicis = plan_values["mode_seleccio_exercicis"]
+    exercicis_per_aparell = plan_values["exercicis_per_aparell"]
+    camps_mode_per_aparell = plan_values["camps_mode_per_aparell"]
+    camps_per_exercici_per_aparell = plan_values["camps_per_exercici_per_aparell"]
+    agregacio_camps_per_aparell = plan_values["agregacio_camps_per_aparell"]
+    agregacio_camps_per_exercici_per_aparell = plan_values["agregacio_camps_per_exercici_per_aparell"]
+    candidate_source_per_aparell = plan_values["candidate_source_per_aparell"]
+    agregacio_exercicis_per_aparell = plan_values["agregacio_exercicis_per_aparell"]
+    team_pool_mode_per_aparell = plan_values["team_pool_mode_per_aparell"]
+    team_pool_participants_per_exercici_per_aparell = plan_values["team_pool_participants_per_exercici_per_aparell"]
+    team_pool_agregacio_participants_per_exercici_per_aparell = plan_values["team_pool_agregacio_participants_per_exercici_per_aparell"]
+    agg_camps = plan_values["agg_camps"]
+    candidate_source_mode = plan_values["candidate_source_mode"]
+    candidate_source_cfg = plan_values["candidate_source_cfg"]
+    agg_exercicis = plan_values["agg_exercicis"]
+    agg_aparells = plan_values["agg_aparells"]
 
     orm_data = load_engine_orm_data(
         competicio,
@@ -0,0 +1,193 @@
+"""
+Pla compilat d'una classificacio.
+
+``compile_classificacio_plan`` fa un sol cop tota la normalitzacio que nomes
+depen de la config (schema, particions, filtres, equips, victories i les
+coercions de ``puntuacio``). ``compute_classificacio`` parteix del pla i
+nomes fa la feina que depen de les dades.
+
+El pla guarda l'estat serialitzat: ``values()`` en retorna una copia nova
+(amb les mateixes referencies compartides entre claus), de manera que el
+calcul la pot modificar sense tocar el pla cachejat.
+"""
+
+import pickle
+from dataclasses import dataclass
+
+from ..partitions import normalize_particions_config, normalize_particions_v2_entries
+from .common import (
+    get_effective_team_context_code as _get_effective_team_context_code,
+    normalize_classificacio_equips_cfg as _normalize_classificacio_equips_cfg,
+    normalize_classificacio_filters as _normalize_classificacio_filters,
+    normalize_equip_assignment_source as _normalize_equip_assignment_source,
+)
+from .detail_payload import get_display_columns as engine_get_display_columns
+from .metrics_runtime import _sanitize_desempat_for_tipus as engine_sanitize_desempat_for_tipus
+from .partition_runtime import _build_particions_custom_index
+from .schema import normalize_schema as engine_normalize_schema
+from .selection import (
+    _normalize_candidate_source_cfg,
+    _normalize_candidate_source_mode,
+    _normalize_exercicis_cfg,
+)
+from .victories import (
+    _normalize_mode_resultat_aparells as engine_normalize_mode_resultat_aparells,
+    _normalize_victories_cfg as engine_normalize_victories_cfg,
+)
+
+
+@dataclass(frozen=True)
+class ClassificacioPlan:
+    tipus: str
+    state: bytes
+
+    def values(self):
+        return pickle.loads(self.state)
+
+
+def normalize_plan_tipus(raw_tipus):
+    return (raw_tipus or "individual").lower().strip()
+
+
+def _compile_plan_values(competicio, raw_schema, *, tipus):
+    schema, _legacy_info = engine_normalize_schema(
+        competicio,
+        raw_schema or {},
+        tipus=tipus,
+        persist=False,
+    )
+    part_entries = schema.get("particions_v2") or normalize_particions_v2_entries(
+        schema.get("particions") or []
+    )
+    part_custom_idx = _build_particions_custom_index(schema.get("particions_custom") or {})
+    particions_config = normalize_particions_config(schema.get("particions_config") or {})
+    filtres = _normalize_classificacio_filters(schema.get("filtres") or {})
+    punt = schema["puntuacio"] or {}
+    desempat = schema["desempat"] or []
+    presentacio = schema["presentacio"] or {}
+    display_columns = engine_get_display_columns(schema)
+    equips_cfg = _normalize_classificacio_equips_cfg(schema.get("equips") or {})
+    assignment_source = equips_cfg.get("assignment_source") or _normalize_equip_assignment_source({})
+    team_context_code = _get_effective_team_context_code(equips_cfg)
+    desempat = engine_sanitize_desempat_for_tipus(desempat, tipus)
+    mode_resultat_aparells = engine_normalize_mode_resultat_aparells(punt.get("mode_resultat_aparells"))
+    victories_cfg = engine_normalize_victories_cfg((punt.get("victories") or {}))
+    if tipus != "individual" and mode_resultat_aparells == "victories":
+        mode_resultat_aparells = "score"
+
+    ordre_principal = (punt.get("ordre") or "desc").lower().strip()
+    if ordre_principal not in ("asc", "desc"):
+        ordre_principal = "desc"
+
+    ex_cfg = punt.get("exercicis") or {}
+    base_ex_cfg = _normalize_exercicis_cfg(
+        {
+            **(ex_cfg if isinstance(ex_cfg, dict) else {}),
+            "best_n": (
+                (ex_cfg.get("best_n") if isinstance(ex_cfg, dict) else None)
+                or punt.get("exercicis_best_n")
+                or 1
+            ),
+        },
+        fallback={"mode": "tots", "best_n": 1, "index": 1, "ids": []},
+    )
+    mode_seleccio_exercicis = str(punt.get("mode_seleccio_exercicis") or "per_aparell_global").lower().strip()
+    if mode_seleccio_exercicis not in ("per_aparell_global", "per_aparell_override", "global_pool"):
+        mode_seleccio_exercicis = "per_aparell_global"
+    exercicis_per_aparell = punt.get("exercicis_per_aparell") or {}
+    if not isinstance(exercicis_per_aparell, dict):
+        exercicis_per_aparell = {}
+    camps_mode_per_aparell = punt.get("camps_mode_per_aparell") or {}
+    if not isinstance(camps_mode_per_aparell, dict):
+        camps_mode_per_aparell = {}
+    camps_per_exercici_per_aparell = punt.get("camps_per_exercici_per_aparell") or {}
+    if not isinstance(camps_per_exercici_per_aparell, dict):
+        camps_per_exercici_per_aparell = {}
+    agregacio_camps_per_aparell = punt.get("agregacio_camps_per_aparell") or {}
+    if not isinstance(agregacio_camps_per_aparell, dict):
+        agregacio_camps_per_aparell = {}
+    agregacio_camps_per_exercici_per_aparell = punt.get("agregacio_camps_per_exercici_per_aparell") or {}
+    if not isinstance(agregacio_camps_per_exercici_per_aparell, dict):
+        agregacio_camps_per_exercici_per_aparell = {}
+    candidate_source_per_aparell = punt.get("candidate_source_per_aparell") or {}
+    if not isinstance(candidate_source_per_aparell, dict):
+        candidate_source_per_aparell = {}
+    agregacio_exercicis_per_aparell = punt.get("agregacio_exercicis_per_aparell") or {}
+    if not isinstance(agregacio_exercicis_per_aparell, dict):
+        agregacio_exercicis_per_aparell = {}
+    team_pool_mode_per_aparell = punt.get("team_pool_mode_per_aparell") or {}
+    if not isinstance(team_pool_mode_per_aparell, dict):
+        team_pool_mode_per_aparell = {}
+    team_pool_participants_per_exercici_per_aparell = punt.get("team_pool_participants_per_exercici_per_aparell") or {}
+    if not isinstance(team_pool_participants_per_exercici_per_aparell, dict):
+        team_pool_participants_per_exercici_per_aparell = {}
+    team_pool_agregacio_participants_per_exercici_per_aparell = punt.get("team_pool_agregacio_participants_per_exercici_per_aparell") or {}
+    if not isinstance(team_pool_agregacio_participants_per_exercici_per_aparell, dict):
+        team_pool_agregacio_participants_per_exercici_per_aparell = {}
+
+    agg_camps = (punt.get("agregacio_camps") or "sum").lower().strip()
+    candidate_source_mode = _normalize_candidate_source_mode(punt.get("candidate_source_mode"))
+    candidate_source_cfg = _normalize_candidate_source_cfg(
+        punt.get("candidate_source_cfg"),
+        fallback={"mode": "tots", "best_n": 1, "index": 1, "ids": [], "agregacio_exercicis": "sum"},
+    )
+    agg_exercicis = (punt.get("agregacio_exercicis") or "sum").lower().strip()
+    agg_aparells = (punt.get("agregacio_aparells") or "sum").lower().strip()
+
+    return {
+        "schema": schema,
+        "part_entries": part_entries,
+        "part_custom_idx": part_custom_idx,
+        "particions_config": particions_config,
+        "filtres": filtres,
+        "punt": punt,
+        "desempat": desempat,
+        "presentacio": presentacio,
+        "display_columns": display_columns,
+        "equips_cfg": equips_cfg,
+        "assignment_source": assignment_source,
+        "team_context_code": team_context_code,
+        "mode_resultat_aparells": mode_resultat_aparells,
+        "victories_cfg": victories_cfg,
+        "ordre_principal": ordre_principal,
+        "base_ex_cfg": base_ex_cfg,
+        "mode_seleccio_exercicis": mode_seleccio_exercicis,
+        "exercicis_per_aparell": exercicis_per_aparell,
+        "camps_mode_per_aparell": camps_mode_per_aparell,
+        "camps_per_exercici_per_aparell": camps_per_exercici_per_aparell,
+        "agregacio_camps_per_aparell": agregacio_camps_per_aparell,
+        "agregacio_camps_per_exercici_per_aparell": agregacio_camps_per_exercici_per_aparell,
+        "candidate_source_per_aparell": candidate_source_per_aparell,
+        "agregacio_exercicis_per_aparell": agregacio_exercicis_per_aparell,
+        "team_pool_mode_per_aparell": team_pool_mode_per_aparell,
+        "team_pool_participants_per_exercici_per_aparell": team_pool_participants_per_exercici_per_aparell,
+        "team_pool_agregacio_participants_per_exercici_per_aparell": team_pool_agregacio_participants_per_exercici_per_aparell,
+        "agg_camps": agg_camps,
+        "candidate_source_mode": candidate_source_mode,
+        "candidate_source_cfg": candidate_source_cfg,
+        "agg_exercicis": agg_exercicis,
+        "agg_aparells": agg_aparells,
+    }
+
+
+def compile_classificacio_plan(competicio, raw_schema, *, tipus="individual"):
+    tipus = normalize_plan_tipus(tipus)
+    values = _compile_plan_values(competicio, raw_schema, tipus=tipus)
+    return ClassificacioPlan(tipus=tipus, state=pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def plan_for_cfg(competicio, cfg_obj):
+    """Pla adjuntat a ``cfg_obj`` (``classificacio_plan``) o compilat ara."""
+    tipus = normalize_plan_tipus(getattr(cfg_obj, "tipus", "individual"))
+    plan = getattr(cfg_obj, "classificacio_plan", None)
+    if isinstance(plan, ClassificacioPlan) and plan.tipus == tipus:
+        return plan
+    return compile_classificacio_plan(competicio, getattr(cfg_obj, "schema", {}) or {}, tipus=tipus)
+
+
+__all__ = [
+    "ClassificacioPlan",
+    "compile_classificacio_plan",
+    "normalize_plan_tipus",
+    "plan_for_cfg",
+]
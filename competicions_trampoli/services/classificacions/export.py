@@ -1,5 +1,7 @@
 import json
 import re
+from collections import defaultdict
+from types import SimpleNamespace
 
 from django.utils import timezone
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
@@ -466,10 +468,46 @@ def sanitize_filename_component(raw):
     return cleaned or "classificacions"
 
 
+class _MeasureSheet:
+    """Full buit per a la passada que mesura amplades abans d'escriure en streaming."""
+
+    def __init__(self):
+        self.row_dimensions = defaultdict(SimpleNamespace)
+
+    def cell(self, row, column, value=None):
+        return SimpleNamespace(value=value)
+
+    def merge_cells(self, **kwargs):
+        pass
+
+
 def write_cfg_excel_sheet(ws, competicio, cfg_nom, columns, parts, *, tipus="individual", schema=None):
     cols = columns if isinstance(columns, list) and columns else default_live_columns()
     layout = _build_layout(cols, parts, tipus=tipus, schema=schema)
+    if hasattr(ws, "flush"):
+        # Full en streaming: amplades i freeze_panes han d'anar abans de la
+        # primera fila, aixi que les mesurem amb una passada sense escriure.
+        col_widths, first_data_row = _write_cfg_sheet_rows(
+            _MeasureSheet(), competicio, cfg_nom, cols, parts, layout
+        )
+        _apply_cfg_sheet_layout(ws, col_widths, first_data_row)
+        _write_cfg_sheet_rows(ws, competicio, cfg_nom, cols, parts, layout)
+        ws.flush()
+        return
+    col_widths, first_data_row = _write_cfg_sheet_rows(ws, competicio, cfg_nom, cols, parts, layout)
+    _apply_cfg_sheet_layout(ws, col_widths, first_data_row)
+
+
+def _apply_cfg_sheet_layout(ws, col_widths, first_data_row):
+    if first_data_row:
+        ws.freeze_panes = f"A{first_data_row}"
+    for idx, width in enumerate(col_widths, start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = max(10, width)
+
+
+def _write_cfg_sheet_rows(ws, competicio, cfg_nom, cols, parts, layout):
     total_cols = layout["total_columns"] if layout["advanced"] else max(1, len(cols))
+    flush = getattr(ws, "flush", None) or (lambda before_row=None: None)
 
     fill_title = PatternFill("solid", fgColor="1F4E79")
     fill_subtitle = PatternFill("solid", fgColor="D9E1F2")
@@ -562,9 +600,10 @@ def write_cfg_excel_sheet(ws, competicio, cfg_nom, columns, parts, *, tipus="ind
         empty = ws.cell(row=row_idx, column=1, value="Sense resultats.")
         empty.alignment = align_left
         empty.font = Font(italic=True)
-        return
+        return col_widths, first_data_row
 
     for part in parts_list:
+        flush(before_row=row_idx)
         part_rows = (part or {}).get("rows") or []
         part_name = format_partition_title((part or {}).get("particio"))
 
@@ -673,6 +712,7 @@ def write_cfg_excel_sheet(ws, competicio, cfg_nom, columns, parts, *, tipus="ind
 
         if not layout["advanced"]:
             for data_pos, row in enumerate(part_rows):
+                flush(before_row=row_idx)
                 try:
                     posicio = int((row or {}).get("posicio"))
                 except Exception:
@@ -689,6 +729,7 @@ def write_cfg_excel_sheet(ws, competicio, cfg_nom, columns, parts, *, tipus="ind
             continue
 
         for data_pos, row in enumerate(part_rows):
+            flush(before_row=row_idx)
             try:
                 posicio = int((row or {}).get("posicio"))
             except Exception:
@@ -730,10 +771,7 @@ def write_cfg_excel_sheet(ws, competicio, cfg_nom, columns, parts, *, tipus="ind
             row_idx = block_end + 1
         row_idx += 1
 
-    if first_data_row:
-        ws.freeze_panes = ws[f"A{first_data_row}"]
-    for idx, width in enumerate(col_widths, start=1):
-        ws.column_dimensions[get_column_letter(idx)].width = max(10, width)
+    return col_widths, first_data_row
 
 
 _normalize_excel_cell = normalize_excel_cell
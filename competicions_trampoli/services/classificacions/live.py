@@ -1,5 +1,7 @@
 from django.utils import timezone
 
+from ceeb_web.profiling import profiled
+
 from ...models.classificacions import ClassificacioConfig
 from .compute import compute_classificacio
 from .display import get_display_columns
@@ -119,6 +121,7 @@ def build_live_cfg_payload_row(competicio, cfg, *, compute_fn=compute_classifica
         competicio,
         schema_local=cfg.schema or {},
         tipus=cfg.tipus,
+        cfg=cfg,
         compute_fn=compute_fn,
         invalid_message="Configuracio de classificacio invalida.",
         runtime_message="No s'ha pogut renderitzar la classificacio.",
@@ -136,6 +139,7 @@ def build_live_cfg_payload_row(competicio, cfg, *, compute_fn=compute_classifica
     }
 
 
+@profiled("classificacions.live_payload")
 def live_data_payload(competicio, since_raw=None, *, build_row_fn=build_live_cfg_payload_row):
     del since_raw
     cfgs = (
@@ -0,0 +1,100 @@
+"""
+Cache de la validacio i el pla compilat de cada ClassificacioConfig.
+
+El live reconstrueix totes les configs actives cada pocs segons, pero el
+schema gairebe mai canvia. ``validate_schema_for_competicio_detailed`` (que
+munta el pipeline de puntuacio) i ``compile_classificacio_plan`` nomes depenen
+del schema i de l'estructura de la competicio (aparells, fases, contextos
+d'equip, schemas de puntuacio, columnes d'inscripcions), aixi que els guardem
+per (competicio, config, ``updated_at``, tipus) amb la versio
+``classificacions_structure`` de la competicio (veure ``competicio_versions``).
+
+Cada entrada desa tambe el schema serialitzat: si el JSON de la config ha
+canviat sense tocar ``updated_at`` (``queryset.update``), l'entrada no val.
+``CLASSIFICACIO_PLAN_CACHE_TTL_SECONDS`` limita l'antiguitat en qualsevol cas.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from ..shared.competicio_versions import CompeticioVersions
+
+
+_PLAN_CACHE_MAX_ENTRIES = 256
+
+classificacions_structure_versions = CompeticioVersions("classificacions_structure")
+_cache: Dict[Tuple[Any, ...], Tuple[float, Tuple[int, Optional[str]], str, Dict[str, Any]]] = {}
+
+
+def _cache_ttl() -> float:
+    return float(getattr(settings, "CLASSIFICACIO_PLAN_CACHE_TTL_SECONDS", 0) or 0)
+
+
+def _schema_fingerprint(schema_local) -> Optional[str]:
+    try:
+        return json.dumps(schema_local, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _drop_competicio_entries(competicio_id: int) -> None:
+    for key in [key for key in _cache if key[0] == competicio_id]:
+        _cache.pop(key, None)
+
+
+classificacions_structure_versions.on_invalidate(_drop_competicio_entries)
+
+
+def invalidate_classificacions_structure(competicio_id) -> None:
+    """Descarta els plans cachejats d'una competicio (ara i en fer commit)."""
+    classificacions_structure_versions.invalidate(competicio_id)
+
+
+def clear_classificacio_plan_cache() -> None:
+    _cache.clear()
+
+
+def get_cached_classificacio_plan(
+    competicio,
+    cfg,
+    *,
+    schema_local,
+    tipus: str,
+    build: Callable[[], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Retorna ``build()`` (validacio + pla) per aquesta revisio de ``cfg``.
+    Sense ``cfg`` (schemas en edicio) no es cacheja.
+    """
+    ttl = _cache_ttl()
+    fingerprint = _schema_fingerprint(schema_local) if cfg is not None else None
+    if ttl <= 0 or fingerprint is None or not getattr(cfg, "pk", None):
+        return build()
+
+    competicio_id = int(competicio.id)
+    key = (competicio_id, int(cfg.pk), getattr(cfg, "updated_at", None), str(tipus or ""))
+    version = classificacions_structure_versions.current(competicio_id)
+    now = time.monotonic()
+    cached = _cache.get(key)
+    if cached is not None and cached[0] > now and cached[1] == version and cached[2] == fingerprint:
+        return copy.deepcopy(cached[3])
+
+    value = build()
+    if classificacions_structure_versions.local(competicio_id) == version[0]:
+        if len(_cache) >= _PLAN_CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[key] = (now + ttl, version, fingerprint, copy.deepcopy(value))
+    return value
+
+
+__all__ = [
+    "classificacions_structure_versions",
+    "clear_classificacio_plan_cache",
+    "get_cached_classificacio_plan",
+    "invalidate_classificacions_structure",
+]
@@ -3,6 +3,7 @@ from types import SimpleNamespace
 from .builder import with_mode_resolution
 from .compute import compute_classificacio
 from .display import get_display_columns
+from .engine.plan import compile_classificacio_plan
 from .partitions import normalize_schema_legacy_team_birth_partition
 from .pipeline_runtime import (
     build_main_scoring_pipeline_from_schema,
@@ -10,6 +11,7 @@ from .pipeline_runtime import (
 from .ties.serializer_save import canonicalize_desempat_items_for_persistence
 from .ties.pipeline_builder import strip_unsupported_per_exercise_field_pipeline_keys
 from .phase_scope import normalize_schema_phase_scope
+from .plan_cache import get_cached_classificacio_plan
 from .validation import (
     build_validation_error_details,
     validate_schema_for_competicio_detailed,
@@ -233,6 +235,29 @@ def prepare_schema_for_persistence(competicio, schema_local, *, tipus="individua
     }
 
 
+def _validate_and_compile(competicio, schema_local, *, tipus):
+    schema_local, validation_errors, validation_details = validate_schema_for_competicio_detailed(
+        competicio,
+        schema_local,
+        tipus=tipus,
+    )
+    columns = get_display_columns(schema_local if isinstance(schema_local, dict) else (schema_local or {}))
+    plan = None
+    if not validation_errors:
+        try:
+            plan = compile_classificacio_plan(competicio, schema_local, tipus=tipus)
+        except Exception:
+            # l'error es reprodueix (i es reporta) a compute_fn
+            plan = None
+    return {
+        "schema": schema_local,
+        "columns": columns,
+        "errors": validation_errors,
+        "details": validation_details,
+        "plan": plan,
+    }
+
+
 def execute_classificacio_runtime(
     competicio,
     *,
@@ -241,13 +266,24 @@ def execute_classificacio_runtime(
     compute_fn=compute_classificacio,
     invalid_message="Configuracio de classificacio invalida.",
     runtime_message="No s'ha pogut renderitzar la classificacio.",
+    cfg=None,
 ):
-    schema_local, validation_errors, validation_details = validate_schema_for_competicio_detailed(
+    """
+    Valida i calcula una classificacio. Amb ``cfg`` (la ClassificacioConfig
+    d'on surt ``schema_local``) la validacio i el pla compilat es reutilitzen
+    mentre no canviin la config ni l'estructura de la competicio.
+    """
+    compiled = get_cached_classificacio_plan(
         competicio,
-        schema_local,
+        cfg,
+        schema_local=schema_local,
         tipus=tipus,
+        build=lambda: _validate_and_compile(competicio, schema_local, tipus=tipus),
     )
-    columns = get_display_columns(schema_local if isinstance(schema_local, dict) else (schema_local or {}))
+    schema_local = compiled["schema"]
+    columns = compiled["columns"]
+    validation_errors = compiled["errors"]
+    validation_details = compiled["details"]
     if validation_errors:
         return {
             "schema": schema_local,
@@ -263,7 +299,7 @@ def execute_classificacio_runtime(
     try:
         data = compute_fn(
             competicio,
-            SimpleNamespace(schema=schema_local, tipus=tipus),
+            SimpleNamespace(schema=schema_local, tipus=tipus, classificacio_plan=compiled["plan"]),
         )
     except Exception as exc:
         errors = [str(exc or "").strip() or runtime_message]
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from collections import defaultdict
 
 from django.db.models import Count, Prefetch
+from django.utils import timezone
 
 from ...models.competicio import (
     CompeticioAparell,
@@ -15,6 +18,11 @@ from ...models.competicio import (
 from ...models.scoring import TeamCompetitiveSubject
 from ...models.rotacions import RotacioAssignacioProgramUnit
 from ..inscripcions.aparell_participation import participation_preview
+from .dashboard_snapshot import (
+    schedule_fase_dashboard_refresh_on_commit,
+    store_fase_dashboard_payload,
+    usable_fase_dashboard_snapshot,
+)
 from .group_plan import structural_cut_signature
 from .logos import available_app_logos_for_competicio, selected_logo_path_for_app
 from .labels import format_partition_label, program_unit_display_name
@@ -252,7 +260,60 @@ def _phases_for_comp_aparell(comp_aparell: CompeticioAparell) -> list[Competicio
     )
 
 
-def _decorate_phase_units(phases: list[CompeticioAparellFase], programming_by_unit: dict[int, list[str]]) -> None:
+def phase_qualification_key(phase: CompeticioAparellFase, partition_states: list[FasePartitionState]) -> str:
+    """Empremta de l'estat desat que determina els avisos de classificacio d'una fase."""
+    raw = json.dumps(
+        {
+            "config": phase.config if isinstance(phase.config, dict) else {},
+            "states": sorted(
+                [
+                    _partition_key(state.partition_key),
+                    str(state.status or ""),
+                    state.qualification_run_id,
+                    str(state.source_snapshot_hash or ""),
+                ]
+                for state in partition_states
+            ),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _phase_qualification_flags(phase: CompeticioAparellFase, partition_states: list[FasePartitionState]) -> dict:
+    phase_config = phase.config if isinstance(phase.config, dict) else {}
+    qualification_config = phase_config.get("qualification") if isinstance(phase_config.get("qualification"), dict) else {}
+    flags = {
+        "stale": False,
+        "source_changed": False,
+        "partition_stale": {},
+    }
+    if qualification_config.get("snapshot_hash"):
+        try:
+            flags["stale"] = qualification_is_stale(phase)
+            flags["source_changed"] = qualification_source_changed(phase)
+        except QualificationError:
+            flags["stale"] = True
+            flags["source_changed"] = True
+    if partition_states:
+        try:
+            flags["partition_stale"] = qualification_stale_partitions(phase)
+        except QualificationError:
+            flags["partition_stale"] = {
+                _partition_key(state.partition_key): True
+                for state in partition_states
+            }
+    return flags
+
+
+def _decorate_phase_units(
+    phases: list[CompeticioAparellFase],
+    programming_by_unit: dict[int, list[str]],
+    qualification_flags: dict[int, dict] | None = None,
+) -> None:
+    qualification_flags = qualification_flags or {}
     child_counts: dict[int, int] = defaultdict(int)
     for phase in phases:
         if phase.parent_id:
@@ -351,36 +412,25 @@ def _decorate_phase_units(phases: list[CompeticioAparellFase], programming_by_un
         phase.ui_unit_capacity_label = f"màxim {unit_capacity} places/unitat" if unit_capacity else "Sense mida d'unitat"
         phase.ui_qualification_run_id = qualification_config.get("run_id")
         phase.ui_qualification_snapshot_hash = qualification_config.get("snapshot_hash") or ""
-        phase.ui_qualification_stale = False
-        phase.ui_qualification_source_changed = False
-        phase.ui_qualification_manual_pending = False
-        if phase.ui_qualification_snapshot_hash:
-            try:
-                phase.ui_qualification_stale = qualification_is_stale(phase)
-                phase.ui_qualification_source_changed = qualification_source_changed(phase)
-                phase.ui_qualification_manual_pending = bool(
-                    phase.ui_qualification_stale
-                    and not phase.ui_qualification_source_changed
-                )
-            except QualificationError:
-                phase.ui_qualification_stale = True
-                phase.ui_qualification_source_changed = True
         partition_states = list(phase.partition_states.all())
         partition_states_by_key = {
             _partition_key(state.partition_key): state
             for state in partition_states
         }
+        phase.ui_qualification_key = phase_qualification_key(phase, partition_states)
+        flags = qualification_flags.get(int(phase.id))
+        if flags is None or flags.get("key") != phase.ui_qualification_key:
+            flags = {**_phase_qualification_flags(phase, partition_states), "key": phase.ui_qualification_key}
+        phase.ui_qualification_flags = flags
+        phase.ui_qualification_stale = bool(flags["stale"])
+        phase.ui_qualification_source_changed = bool(flags["source_changed"])
+        phase.ui_qualification_manual_pending = bool(
+            phase.ui_qualification_stale
+            and not phase.ui_qualification_source_changed
+        )
         phase.ui_partition_states = partition_states
         phase.ui_has_partition_state_scope = bool(partition_states)
-        partition_stale_by_key = {}
-        if partition_states:
-            try:
-                partition_stale_by_key = qualification_stale_partitions(phase)
-            except QualificationError:
-                partition_stale_by_key = {
-                    _partition_key(state.partition_key): True
-                    for state in partition_states
-                }
+        partition_stale_by_key = dict(flags["partition_stale"])
         phase.ui_partition_qualification_run_ids = sorted({
             int(state.qualification_run_id)
             for state in partition_states
@@ -613,12 +663,23 @@ def _decorate_phase_units(phases: list[CompeticioAparellFase], programming_by_un
         ]
 
 
-def _app_summary(comp_aparell: CompeticioAparell, phases: list[CompeticioAparellFase], logo_choices: list[dict]) -> dict:
+def _app_counts(phases: list[CompeticioAparellFase]) -> dict:
     units = [unit for phase in phases for unit in getattr(phase, "ui_units", [])]
-    phase_count = len(phases)
     unit_count = len(units)
     programmed_unit_count = sum(1 for unit in units if getattr(unit, "ui_is_programmed", False))
-    pending_unit_count = max(0, unit_count - programmed_unit_count)
+    return {
+        "phase_count": len(phases),
+        "unit_count": unit_count,
+        "programmed_unit_count": programmed_unit_count,
+        "pending_unit_count": max(0, unit_count - programmed_unit_count),
+    }
+
+
+def _app_summary(comp_aparell: CompeticioAparell, counts: dict, logo_choices: list[dict]) -> dict:
+    phase_count = int(counts.get("phase_count") or 0)
+    unit_count = int(counts.get("unit_count") or 0)
+    programmed_unit_count = int(counts.get("programmed_unit_count") or 0)
+    pending_unit_count = int(counts.get("pending_unit_count") or 0)
     if phase_count == 0:
         state = "simple"
         state_label = "Mode simple"
@@ -694,27 +755,107 @@ def _is_base_phase_token(value) -> bool:
     return str(value or "").strip().lower() == "base"
 
 
-def phase_dashboard_context(competicio, *, selected_app_id=None, selected_phase_id=None) -> dict:
-    comp_aparells = list(
+def _active_comp_aparells(competicio) -> list[CompeticioAparell]:
+    return list(
         CompeticioAparell.objects
         .filter(competicio=competicio, actiu=True)
         .select_related("aparell", "competicio")
         .order_by("ordre", "id")
     )
-    selected_id = _positive_int_or_none(selected_app_id)
-    selected = None
-    if comp_aparells:
-        selected = next((app for app in comp_aparells if selected_id and int(app.id) == selected_id), None) or comp_aparells[0]
-    app_logo_choices = available_app_logos_for_competicio(competicio)
 
-    programming_by_unit = _programming_by_unit(competicio)
+
+def _snapshot_qualification_flags(payload: dict) -> dict[int, dict]:
+    phases = payload.get("phases") if isinstance(payload.get("phases"), dict) else {}
+    return {
+        int(phase_id): entry["qualification"]
+        for phase_id, entry in phases.items()
+        if isinstance(entry, dict) and isinstance(entry.get("qualification"), dict)
+    }
+
+
+def _load_app_phases(comp_aparell, programming_by_unit, qualification_flags) -> list[CompeticioAparellFase]:
+    phases = _phases_for_comp_aparell(comp_aparell)
+    _decorate_phase_units(phases, programming_by_unit, qualification_flags)
+    return phases
+
+
+def _dashboard_apps(competicio, comp_aparells, *, selected=None, snapshot=None):
+    """
+    Decora en viu l'aparell seleccionat; la resta surten del resum precalculat
+    si n'hi ha. Si l'aparell seleccionat no quadra amb el resum, en demana un de nou.
+    """
+    payload = snapshot.payload if snapshot is not None else {}
+    snapshot_apps = payload.get("apps") if isinstance(payload.get("apps"), dict) else {}
+    qualification_flags = _snapshot_qualification_flags(payload)
+    app_logo_choices = available_app_logos_for_competicio(competicio)
+    programming_by_unit = None
     phases_by_app: dict[int, list[CompeticioAparellFase]] = {}
     app_summaries = []
+    snapshot_mismatch = snapshot is None
     for comp_aparell in comp_aparells:
-        phases = _phases_for_comp_aparell(comp_aparell)
-        _decorate_phase_units(phases, programming_by_unit)
-        phases_by_app[int(comp_aparell.id)] = phases
-        app_summaries.append(_app_summary(comp_aparell, phases, app_logo_choices))
+        counts = snapshot_apps.get(str(comp_aparell.id))
+        is_selected = selected is not None and int(comp_aparell.id) == int(selected.id)
+        if counts is None or is_selected:
+            if programming_by_unit is None:
+                programming_by_unit = _programming_by_unit(competicio)
+            phases = _load_app_phases(comp_aparell, programming_by_unit, qualification_flags)
+            phases_by_app[int(comp_aparell.id)] = phases
+            live_counts = _app_counts(phases)
+            snapshot_mismatch = snapshot_mismatch or live_counts != counts
+            counts = live_counts
+        app_summaries.append(_app_summary(comp_aparell, counts, app_logo_choices))
+    if snapshot_mismatch and comp_aparells:
+        schedule_fase_dashboard_refresh_on_commit(competicio.id, create=True)
+    return app_summaries, phases_by_app, app_logo_choices
+
+
+def phase_app_summaries(competicio) -> list[dict]:
+    """Resum per aparell actiu (fases, unitats, programacio) per a pantalles que no mostren el detall."""
+    comp_aparells = _active_comp_aparells(competicio)
+    app_summaries, _phases_by_app, _logos = _dashboard_apps(
+        competicio,
+        comp_aparells,
+        snapshot=usable_fase_dashboard_snapshot(competicio),
+    )
+    return app_summaries
+
+
+def build_phase_dashboard_payload(competicio) -> dict:
+    programming_by_unit = _programming_by_unit(competicio)
+    apps = {}
+    phases_payload = {}
+    for comp_aparell in _active_comp_aparells(competicio):
+        phases = _load_app_phases(comp_aparell, programming_by_unit, {})
+        apps[str(comp_aparell.id)] = _app_counts(phases)
+        for phase in phases:
+            phases_payload[str(phase.id)] = {
+                "app_id": int(comp_aparell.id),
+                "qualification": phase.ui_qualification_flags,
+                "unit_count": phase.ui_unit_count,
+                "programmed_unit_count": phase.ui_programmed_unit_count,
+                "alerts": list(phase.ui_phase_alerts),
+            }
+    return {"apps": apps, "phases": phases_payload}
+
+
+def refresh_phase_dashboard_snapshot(competicio):
+    started_at = timezone.now()
+    return store_fase_dashboard_payload(competicio, build_phase_dashboard_payload(competicio), started_at=started_at)
+
+
+def phase_dashboard_context(competicio, *, selected_app_id=None, selected_phase_id=None) -> dict:
+    comp_aparells = _active_comp_aparells(competicio)
+    selected_id = _positive_int_or_none(selected_app_id)
+    selected = None
+    if comp_aparells:
+        selected = next((app for app in comp_aparells if selected_id and int(app.id) == selected_id), None) or comp_aparells[0]
+    snapshot = usable_fase_dashboard_snapshot(competicio)
+    app_summaries, phases_by_app, app_logo_choices = _dashboard_apps(
+        competicio,
+        comp_aparells,
+        selected=selected,
+        snapshot=snapshot,
+    )
 
     selected_phases = phases_by_app.get(int(selected.id), []) if selected else []
     selected_base_phase = _is_base_phase_token(selected_phase_id)
@@ -758,7 +899,14 @@ def phase_dashboard_context(competicio, *, selected_app_id=None, selected_phase_
         "total_phase_count": sum(item["phase_count"] for item in app_summaries),
         "total_unit_count": sum(item["unit_count"] for item in app_summaries),
         "total_pending_unit_count": sum(item["pending_unit_count"] for item in app_summaries),
+        "dashboard_revision": snapshot.revision if snapshot is not None else None,
     }
 
 
-__all__ = ["phase_dashboard_context"]
+__all__ = [
+    "build_phase_dashboard_payload",
+    "phase_app_summaries",
+    "phase_dashboard_context",
+    "phase_qualification_key",
+    "refresh_phase_dashboard_snapshot",
+]
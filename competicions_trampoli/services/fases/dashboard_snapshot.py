@@ -0,0 +1,155 @@
+"""
+Model de lectura precalculat del tauler de fases (``FaseDashboardSnapshot``).
+
+Muntar el tauler recorre totes les fases de tots els aparells i, per a cada
+fase amb snapshot de classificacio, torna a calcular la previsualitzacio per
+saber si ha quedat obsoleta. Durant una competicio en directe aixo competeix
+amb el desat de notes. Els mateixos senyals que marquen el live brut
+programen (amb debounce) una tasca que reconstrueix el resum; la vista el
+llegeix i nomes decora en viu l'aparell seleccionat.
+
+Si el resum porta brut mes de ``FASE_DASHBOARD_STALE_GRACE_SECONDS`` (no hi ha
+worker o va endarrerit) es descarta i el tauler es calcula en linia.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ...models.competicio import FaseDashboardSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+FASE_DASHBOARD_PAYLOAD_VERSION = 1
+_SCHEDULED_MAX_ENTRIES = 1024
+
+# competicio_id -> instant (monotonic) fins al qual ja hi ha una reconstruccio encuada
+_scheduled_refreshes: dict[int, float] = {}
+
+
+def _refresh_delay() -> float:
+    return float(getattr(settings, "FASE_DASHBOARD_REFRESH_DELAY_SECONDS", 5) or 0)
+
+
+def _stale_grace() -> float:
+    return float(getattr(settings, "FASE_DASHBOARD_STALE_GRACE_SECONDS", 60) or 0)
+
+
+def _payload_hash(payload: dict) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def usable_fase_dashboard_snapshot(competicio) -> FaseDashboardSnapshot | None:
+    snapshot = FaseDashboardSnapshot.objects.filter(competicio=competicio).first()
+    if snapshot is None or snapshot.built_at is None:
+        return None
+    payload = snapshot.payload if isinstance(snapshot.payload, dict) else {}
+    if payload.get("version") != FASE_DASHBOARD_PAYLOAD_VERSION:
+        return None
+    if snapshot.dirty_since and timezone.now() - snapshot.dirty_since > timedelta(seconds=_stale_grace()):
+        return None
+    return snapshot
+
+
+def fase_dashboard_revision(competicio) -> dict:
+    row = (
+        FaseDashboardSnapshot.objects
+        .filter(competicio=competicio)
+        .values("revision", "built_at", "dirty_since")
+        .first()
+    )
+    if row is None:
+        return {"revision": None, "built_at": None, "dirty": True}
+    return {
+        "revision": row["revision"],
+        "built_at": row["built_at"].isoformat() if row["built_at"] else None,
+        "dirty": row["dirty_since"] is not None,
+    }
+
+
+def store_fase_dashboard_payload(competicio, payload: dict, *, started_at) -> FaseDashboardSnapshot:
+    """Desa el payload i puja la revisio nomes si el contingut ha canviat."""
+    payload = {**payload, "version": FASE_DASHBOARD_PAYLOAD_VERSION}
+    payload_hash = _payload_hash(payload)
+    now = timezone.now()
+    with transaction.atomic():
+        snapshot, _created = FaseDashboardSnapshot.objects.select_for_update().get_or_create(competicio=competicio)
+        if snapshot.payload_hash != payload_hash:
+            snapshot.revision = F("revision") + 1
+            snapshot.payload = payload
+            snapshot.payload_hash = payload_hash
+        snapshot.built_at = now
+        # un canvi arribat mentre es calculava queda pendent de la seguent tasca
+        if snapshot.dirty_since is not None and snapshot.dirty_since <= started_at:
+            snapshot.dirty_since = None
+        snapshot.save()
+    snapshot.refresh_from_db(fields=["revision"])
+    return snapshot
+
+
+def _enqueue_refresh(competicio_id: int) -> None:
+    from ...tasks import refresh_fase_dashboard_task
+
+    try:
+        refresh_fase_dashboard_task.apply_async(args=[competicio_id], countdown=_refresh_delay(), retry=False)
+    except Exception:
+        # sense worker el resum caduca pel marge i el tauler es calcula en linia
+        logger.warning("No s'ha pogut encuar el resum del tauler de fases %s.", competicio_id, exc_info=True)
+        _scheduled_refreshes.pop(competicio_id, None)
+
+
+def schedule_fase_dashboard_refresh(competicio_id, *, create=False) -> bool:
+    """
+    Marca el resum brut i encua una reconstruccio si no n'hi ha cap de pendent
+    en aquest proces. Sense ``create`` nomes es mantenen els resums que ja
+    existeixen (competicions on algu ha obert el tauler).
+    """
+    if not competicio_id:
+        return False
+    competicio_id = int(competicio_id)
+    now = time.monotonic()
+    if _scheduled_refreshes.get(competicio_id, 0) > now:
+        return False
+    marked = FaseDashboardSnapshot.objects.filter(competicio_id=competicio_id, dirty_since__isnull=True).update(
+        dirty_since=timezone.now(),
+    )
+    if not marked and not create and not FaseDashboardSnapshot.objects.filter(competicio_id=competicio_id).exists():
+        return False
+    if len(_scheduled_refreshes) >= _SCHEDULED_MAX_ENTRIES:
+        _scheduled_refreshes.clear()
+    _scheduled_refreshes[competicio_id] = now + _refresh_delay()
+    _enqueue_refresh(competicio_id)
+    return True
+
+
+def schedule_fase_dashboard_refresh_on_commit(competicio_id, *, create=False) -> None:
+    if not competicio_id:
+        return
+    transaction.on_commit(
+        lambda cid=int(competicio_id): schedule_fase_dashboard_refresh(cid, create=create)
+    )
+
+
+def clear_fase_dashboard_schedule() -> None:
+    _scheduled_refreshes.clear()
+
+
+__all__ = [
+    "FASE_DASHBOARD_PAYLOAD_VERSION",
+    "clear_fase_dashboard_schedule",
+    "fase_dashboard_revision",
+    "schedule_fase_dashboard_refresh",
+    "schedule_fase_dashboard_refresh_on_commit",
+    "store_fase_dashboard_payload",
+    "usable_fase_dashboard_snapshot",
+]
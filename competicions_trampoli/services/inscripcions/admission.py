@@ -123,6 +123,40 @@ def filter_score_entries_admeses(qs):
     ).filter(_admission_excluded=False, _admission_baixa=False)
 
 
+def admitted_inscripcio_q(app_ids=None) -> Q:
+    """
+    Versio SQL de ``load_excluded_app_ids_by_inscripcio``: inscripcions admeses
+    a algun dels ``app_ids`` (sense exclusio ni baixa en aquell aparell i sense
+    baixa global).
+    """
+    clean_app_ids = _clean_ints(app_ids)
+    if not clean_app_ids:
+        return Q()
+    baixa_global_qs = InscripcioBaixa.objects.filter(
+        competicio_id=OuterRef("competicio_id"),
+        inscripcio_id=OuterRef("pk"),
+        anul_lada_at__isnull=True,
+        comp_aparell_id__isnull=True,
+    )
+    exclusio_qs = InscripcioAparellExclusio.objects.filter(
+        inscripcio_id=OuterRef(OuterRef("pk")),
+        comp_aparell_id=OuterRef("pk"),
+    )
+    baixa_app_qs = InscripcioBaixa.objects.filter(
+        competicio_id=OuterRef(OuterRef("competicio_id")),
+        inscripcio_id=OuterRef(OuterRef("pk")),
+        anul_lada_at__isnull=True,
+        comp_aparell_id=OuterRef("pk"),
+    )
+    admitted_app_qs = (
+        CompeticioAparell.objects
+        .filter(id__in=clean_app_ids)
+        .exclude(Exists(exclusio_qs))
+        .exclude(Exists(baixa_app_qs))
+    )
+    return Q(Exists(admitted_app_qs)) & ~Q(Exists(baixa_global_qs))
+
+
 def baixa_summary_by_inscripcio(competicio, app_ids=None, inscripcio_ids=None) -> dict[str, dict]:
     clean_app_ids = _clean_ints(app_ids)
     clean_ins_ids = _clean_ints(inscripcio_ids)
@@ -218,6 +252,7 @@ def clear_inscripcio_baixa(competicio, inscripcio, *, user=None):
 __all__ = [
     "active_baixes_qs",
     "active_individual_app_ids",
+    "admitted_inscripcio_q",
     "baixa_summary_by_inscripcio",
     "clear_inscripcio_baixa",
     "filter_score_entries_admeses",
@@ -9,6 +9,7 @@ from django.utils import timezone
 
 from ...models import Inscripcio
 from ...models.competicio import CompeticioAparell, InscripcioAparellExclusio
+from ..scoring.team_subject_cache import invalidate_team_subjects
 from .queries import COLUMN_FILTER_EMPTY_TOKEN, get_available_column_filter_fields, get_inscripcio_value
 
 
@@ -233,6 +234,7 @@ def apply_participation_config(competicio, comp_aparell: CompeticioAparell, conf
                     for inscripcio_id in excluded_ids
                 ]
             )
+        invalidate_team_subjects(competicio.id)
         comp_aparell.participation_config = stored_config
         comp_aparell.save(update_fields=["participation_config"])
     preview["config"] = stored_config
@@ -31,8 +31,10 @@ from ...models import (
     InscripcioAparellExclusio,
     InscripcioEquipAssignacio,
 )
+from ..scoring.team_subject_cache import invalidate_team_subjects
 from ..shared.competition_groups import ensure_group_for_display_num
 from ..teams.equip_contexts import NATIVE_EQUIP_CONTEXT_CODE, ensure_base_equip_context
+from .extra_values import sync_inscripcions_extra_values
 from .timing import INSCRIPCIONS_TIMINGS_HEADER
 
 
@@ -316,6 +318,7 @@ def create_or_replace_benchmark_dataset(dataset: str, *, replace: bool = False,
         inscripcions = _build_benchmark_inscripcions(size, dataset, competicio, groups_by_num)
         Inscripcio.objects.bulk_create(inscripcions, batch_size=500)
         created_rows = list(Inscripcio.objects.filter(competicio=competicio).order_by("ordre_sortida", "id"))
+        sync_inscripcions_extra_values(created_rows, replace=False)
 
         native_ctx = ensure_base_equip_context(competicio)
         team_keys = []
@@ -392,6 +395,7 @@ def create_or_replace_benchmark_dataset(dataset: str, *, replace: bool = False,
                 )
         if exclusions:
             InscripcioAparellExclusio.objects.bulk_create(exclusions, batch_size=500)
+        invalidate_team_subjects(competicio.id)
 
     return Competicio.objects.get(pk=competicio.pk)
 
@@ -668,6 +672,7 @@ def clone_competicio_for_work(source_competicio, *, benchmark_user, scenario: st
         )
     Inscripcio.objects.bulk_create(clone_rows, batch_size=500)
     created_rows = list(Inscripcio.objects.filter(competicio=clone).order_by("ordre_sortida", "id"))
+    sync_inscripcions_extra_values(created_rows, replace=False)
     for source_row, target_row in zip(source_rows, created_rows):
         inscripcio_map[source_row.id] = target_row
 
@@ -0,0 +1,78 @@
+"""
+Manteniment de la projeccio ``InscripcioExtraValue``.
+
+Cada clau de ``Inscripcio.extra`` es guarda com una fila amb el token
+normalitzat (el mateix de ``_resolve_sort_field_runtime``), l'etiqueta i el
+valor numeric, de manera que filtres de columna i recomptes de valors es
+resolen a la BD sense materialitzar les inscripcions.
+
+``save()`` la mante via senyal; les escriptures massives (``bulk_create``,
+``queryset.update(extra=...)``) han de cridar ``sync_inscripcions_extra_values``
+o ``rebuild_competicio_extra_values``.
+"""
+from django.db import transaction
+
+from ...models import Inscripcio, InscripcioExtraValue
+from .queries import EXTRA_VALUE_CODE_MAX_LENGTH, _normalize_custom_sort_token
+from .shared import json_clone
+
+
+def build_extra_value_rows(inscripcio):
+    extra = json_clone(getattr(inscripcio, "extra", None) or {})
+    if not isinstance(extra, dict):
+        return []
+    rows = []
+    for code, value in extra.items():
+        if not isinstance(code, str) or not code or len(code) > EXTRA_VALUE_CODE_MAX_LENGTH:
+            continue
+        token = _normalize_custom_sort_token(value)
+        rows.append(
+            InscripcioExtraValue(
+                competicio_id=inscripcio.competicio_id,
+                inscripcio_id=inscripcio.id,
+                code=code,
+                token=token,
+                label=str(value) if token else "",
+                # bool es subclasse d'int: true/false no son valors numerics.
+                sort_number=float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None,
+            )
+        )
+    return rows
+
+
+def sync_inscripcions_extra_values(inscripcions, *, replace=True):
+    """Reescriu la projeccio de les inscripcions donades (amb ``extra`` carregat)."""
+    inscripcions = [obj for obj in (inscripcions or []) if getattr(obj, "id", None)]
+    if not inscripcions:
+        return 0
+    rows = []
+    for inscripcio in inscripcions:
+        rows.extend(build_extra_value_rows(inscripcio))
+    with transaction.atomic():
+        if replace:
+            InscripcioExtraValue.objects.filter(inscripcio_id__in=[obj.id for obj in inscripcions]).delete()
+        InscripcioExtraValue.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def rebuild_competicio_extra_values(competicio, *, chunk_size=500):
+    """Reconstrueix la projeccio de totes les inscripcions d'una competicio."""
+    total = 0
+    with transaction.atomic():
+        InscripcioExtraValue.objects.filter(competicio=competicio).delete()
+        chunk = []
+        qs = Inscripcio.objects.filter(competicio=competicio).only("id", "competicio_id", "extra").order_by("id")
+        for inscripcio in qs.iterator(chunk_size=chunk_size):
+            chunk.append(inscripcio)
+            if len(chunk) >= chunk_size:
+                total += sync_inscripcions_extra_values(chunk, replace=False)
+                chunk = []
+        total += sync_inscripcions_extra_values(chunk, replace=False)
+    return total
+
+
+__all__ = [
+    "build_extra_value_rows",
+    "rebuild_competicio_extra_values",
+    "sync_inscripcions_extra_values",
+]
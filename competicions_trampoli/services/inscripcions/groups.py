@@ -10,6 +10,7 @@ from collections import defaultdict
 from django.db import transaction
 
 from ...models import GrupCompeticio, Inscripcio
+from ..scoring.team_subject_cache import invalidate_team_subjects
 from ..shared.competition_groups import (
     ensure_group_for_display_num,
     get_group_maps,
@@ -155,6 +156,7 @@ def sync_stable_groups_from_legacy(competicio):
                 updates.append(inscripcio)
         if updates:
             Inscripcio.objects.bulk_update(updates, ["grup_competicio", "ordre_competicio"], batch_size=500)
+            invalidate_team_subjects(competicio.id)
 
     sync_competicio_group_names_view(competicio)
 
@@ -5,6 +5,7 @@ from django.utils.dateparse import parse_datetime
 
 from ...models import Equip, EquipContext, GrupCompeticio, Inscripcio, InscripcioEquipAssignacio
 from ...models.competicio import InscripcioAparellExclusio, InscripcioBaixa
+from ..scoring.team_subject_cache import invalidate_team_subjects
 from ..shared.birth_year_ranges import clear_inscripcions_derived_group_config_cache
 from ..shared.competition_groups import sync_competicio_group_names_view
 from ..teams.equip_contexts import NATIVE_EQUIP_CONTEXT_CODE, get_equip_context
@@ -516,6 +517,8 @@ def apply_inscripcions_history_snapshot(request, competicio, snapshot):
         _apply_aparells_exclusions_snapshot(competicio, snap.get("aparells_exclusions"))
         _apply_baixes_snapshot(competicio, snap.get("baixes"))
         _apply_competicio_fields_snapshot(competicio, snap.get("competicio_fields"))
+        # bulk_create no emet senyals
+        invalidate_team_subjects(competicio.id)
 
     sync_competicio_group_names_view(competicio)
     _restore_sort_stack_state_for_competicio(request, competicio.id, snap.get("sort_stack_state"))
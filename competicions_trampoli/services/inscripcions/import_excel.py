@@ -8,6 +8,7 @@ from typing import Optional, Dict, Any, Set, Tuple, List
 from openpyxl import load_workbook
 
 from ...models import Inscripcio, Competicio
+from .extra_values import rebuild_competicio_extra_values
 
 
 def _reserved_inscripcio_codes() -> Set[str]:
@@ -852,6 +853,9 @@ def importar_inscripcions_excel(fitxer, competicio: Competicio, sheet: str = "")
             
             print(f"[IMPORT] fila {r} error: {e}")
 
+    # Les actualitzacions per queryset no passen per save(): refem la projeccio d'extra.
+    rebuild_competicio_extra_values(competicio)
+
     return {
         "full": ws.title,
         "creats": creats,
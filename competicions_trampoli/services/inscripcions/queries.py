@@ -3,9 +3,12 @@ import json
 from collections import OrderedDict
 from datetime import date, datetime
 
-from django.db.models import Q
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Count, Exists, Min, OuterRef, Q
+from django.db.models.functions import Trim
 
-from ...models import Inscripcio
+from ...models import Inscripcio, InscripcioExtraValue
 from ...models.rotacions import RotacioAssignacio
 from ..shared.birth_year_ranges import (
     BIRTH_YEAR_RANGE_PARTITION_CODE,
@@ -473,7 +476,7 @@ def get_competicio_custom_sort_codes(competicio, allowed_sort_codes=None):
 
 
 def _sort_scalar(value):
-    if isinstance(value, (int, float)):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
         return (0, float(value))
     if isinstance(value, (date, datetime)):
         return (1, value.isoformat())
@@ -769,6 +772,208 @@ def reconcile_inscripcions_sort_context_state(request, context_key, current_ids,
     }
 
 
+# Codis amb valor derivat (grup numeric, equip base, forquilla): es resolen a Python.
+PYTHON_COLUMN_FILTER_CODES = {"grup", "equip", BIRTH_YEAR_RANGE_PARTITION_CODE}
+EXTRA_VALUE_CODE_MAX_LENGTH = 255
+
+
+def _native_column_field(code):
+    if code in PYTHON_COLUMN_FILTER_CODES:
+        return None
+    try:
+        field = Inscripcio._meta.get_field(code)
+    except FieldDoesNotExist:
+        return None
+    if not getattr(field, "concrete", False) or field.is_relation or isinstance(field, models.DateTimeField):
+        return None
+    if isinstance(field, (models.CharField, models.TextField, models.DateField, models.IntegerField)):
+        return field
+    return None
+
+
+def _column_source(code):
+    """("native", field) | ("extra", (code, legacy_code)) | None si el codi s'ha de resoldre a Python."""
+    code = str(code or "").strip()
+    if not code or code in PYTHON_COLUMN_FILTER_CODES:
+        return None
+    field = _native_column_field(code)
+    if field is not None:
+        return ("native", field)
+    if hasattr(Inscripcio, code) or len(code) > EXTRA_VALUE_CODE_MAX_LENGTH:
+        return None
+    legacy_code = ""
+    if code.startswith("excel__"):
+        legacy_code = code[len("excel__") :]
+        if not legacy_code:
+            return None
+    return ("extra", (code, legacy_code))
+
+
+def _parse_native_tokens(field, tokens):
+    values = []
+    for token in tokens:
+        if isinstance(field, models.DateField):
+            try:
+                values.append(date.fromisoformat(token))
+            except ValueError:
+                continue
+        elif isinstance(field, models.IntegerField):
+            try:
+                number = int(token)
+            except ValueError:
+                continue
+            if str(number) == token:
+                values.append(number)
+        else:
+            values.append(token)
+    return values
+
+
+def _extra_value_exists(code, *, non_empty=False, tokens=None):
+    rows = InscripcioExtraValue.objects.filter(
+        competicio_id=OuterRef("competicio_id"),
+        inscripcio_id=OuterRef("pk"),
+        code=code,
+    )
+    if tokens is not None:
+        rows = rows.filter(token__in=tokens)
+    if non_empty:
+        rows = rows.exclude(token="")
+    return Exists(rows)
+
+
+def _apply_column_filter_db(qs, code, tokens):
+    """
+    Aplica el filtre de columna ``code`` a la BD, amb la mateixa semantica que
+    ``_resolve_sort_field_runtime`` (token normalitzat; ``__EMPTY__`` per als
+    buits). Retorna None si el codi s'ha de filtrar a Python.
+    """
+    source = _column_source(code)
+    if source is None:
+        return None
+    include_empty = COLUMN_FILTER_EMPTY_TOKEN in tokens
+    kind, target = source
+    if kind == "native":
+        field = target
+        alias = f"_cf_{field.name}"
+        values = _parse_native_tokens(field, tokens)
+        if isinstance(field, (models.CharField, models.TextField)):
+            qs = qs.alias(**{alias: Trim(field.name)})
+            condition = Q(**{f"{alias}__in": values})
+            if include_empty:
+                condition |= Q(**{f"{field.name}__isnull": True}) | Q(**{alias: ""})
+        else:
+            condition = Q(**{f"{field.name}__in": values})
+            if include_empty:
+                condition |= Q(**{f"{field.name}__isnull": True})
+        return qs.filter(condition)
+
+    extra_code, legacy_code = target
+    values = list(tokens)
+    if not legacy_code:
+        condition = Q(_extra_value_exists(extra_code, tokens=values))
+        if include_empty:
+            condition |= ~Q(_extra_value_exists(extra_code, non_empty=True))
+        return qs.filter(condition)
+
+    # ``excel__X`` cau a la clau antiga ``X`` quan la nova no existeix (get_inscripcio_value).
+    has_code = Q(_extra_value_exists(extra_code))
+    condition = Q(_extra_value_exists(extra_code, tokens=values)) | (
+        ~has_code & Q(_extra_value_exists(legacy_code, tokens=values))
+    )
+    if include_empty:
+        condition |= ~Q(_extra_value_exists(extra_code, non_empty=True)) & (
+            has_code | ~Q(_extra_value_exists(legacy_code, non_empty=True))
+        )
+    return qs.filter(condition)
+
+
+def _merge_value_stat_rows(rows):
+    """Agrupa files (token, label, sort_scalar, count, first_ordre, first_id) per clau de token."""
+    ordered = sorted(
+        rows,
+        key=lambda row: (row["first_ordre"] is None, row["first_ordre"] or 0, row["first_id"] or 0),
+    )
+    out = OrderedDict()
+    for row in ordered:
+        key = _custom_sort_token_key(row["token"])
+        if not key:
+            continue
+        stat = out.get(key)
+        if stat is None:
+            stat = {"token": row["token"], "label": row["label"], "count": 0, "sort_scalar": row["sort_scalar"]}
+            out[key] = stat
+        stat["count"] += int(row["count"] or 0)
+    return out
+
+
+def column_value_stats_from_db(qs, code):
+    """
+    Recompte de valors de la columna ``code`` sobre ``qs`` fet a la BD.
+
+    Retorna ``(stats, empty_count)`` amb ``stats`` en el format de
+    ``_collect_sort_field_value_stats`` (clau -> token/label/count/sort_scalar),
+    o None si el codi s'ha de resoldre a Python.
+    """
+    source = _column_source(code)
+    if source is None:
+        return None
+    kind, target = source
+    rows = []
+    if kind == "native":
+        field = target
+        grouped = (
+            qs.order_by()
+            .values(field.name)
+            .annotate(total=Count("id"), first_ordre=Min("ordre_sortida"), first_id=Min("id"))
+        )
+        for row in grouped:
+            raw_value = row[field.name]
+            token = _normalize_custom_sort_token(raw_value)
+            if not token:
+                continue
+            rows.append(
+                {
+                    "token": token,
+                    "label": _s(raw_value),
+                    "sort_scalar": _sort_scalar(raw_value),
+                    "count": row["total"],
+                    "first_ordre": row["first_ordre"],
+                    "first_id": row["first_id"],
+                }
+            )
+    else:
+        extra_code, legacy_code = target
+        if legacy_code:
+            return None
+        grouped = (
+            InscripcioExtraValue.objects
+            .filter(code=extra_code, inscripcio_id__in=qs.order_by().values("pk"))
+            .exclude(token="")
+            .values("token", "label", "sort_number")
+            .annotate(
+                total=Count("id"),
+                first_ordre=Min("inscripcio__ordre_sortida"),
+                first_id=Min("inscripcio_id"),
+            )
+        )
+        for row in grouped:
+            sort_number = row["sort_number"]
+            rows.append(
+                {
+                    "token": row["token"],
+                    "label": row["label"],
+                    "sort_scalar": (0, float(sort_number)) if sort_number is not None else (2, row["label"].casefold()),
+                    "count": row["total"],
+                    "first_ordre": row["first_ordre"],
+                    "first_id": row["first_id"],
+                }
+            )
+    stats = _merge_value_stat_rows(rows)
+    empty_count = qs.count() - sum(stat["count"] for stat in stats.values())
+    return stats, empty_count
+
+
 def _build_inscripcions_filtered_qs(competicio, filters):
     clean_filters = _normalize_sort_filters(filters)
     allowed_filter_codes = {field["code"] for field in get_available_column_filter_fields(competicio)}
@@ -794,7 +999,16 @@ def _build_inscripcions_filtered_qs(competicio, filters):
         qs = qs.filter(categoria__iexact=clean_filters["categoria"])
     if not column_filters:
         return qs
-    filter_codes = list(column_filters.keys())
+    python_filters = {}
+    for code, tokens in column_filters.items():
+        filtered_qs = _apply_column_filter_db(qs, code, tokens)
+        if filtered_qs is None:
+            python_filters[code] = tokens
+        else:
+            qs = filtered_qs
+    if not python_filters:
+        return qs
+    filter_codes = list(python_filters.keys())
     records = list(_build_sort_records_queryset(qs, filter_codes))
     if not records:
         return qs.none()
@@ -802,7 +1016,7 @@ def _build_inscripcions_filtered_qs(competicio, filters):
     matching_ids = []
     for obj in records:
         matches_all = True
-        for code, tokens in column_filters.items():
+        for code, tokens in python_filters.items():
             runtime = _resolve_sort_field_runtime(obj, code, context=runtime_contexts.get(code))
             token = runtime.get("token") or ""
             if token:
@@ -8,6 +8,8 @@ from typing import Any, Iterator
 
 from django.conf import settings
 
+from ceeb_web.profiling import profile_section
+
 
 INSCRIPCIONS_TIMINGS_HEADER = "X-Inscripcions-Timings"
 
@@ -36,16 +38,18 @@ class InscripcionsTimingCollector:
 
     @contextmanager
     def section(self, name: str) -> Iterator[None]:
-        if not self.enabled:
-            yield
-            return
-
-        started_at = perf_counter()
-        try:
-            yield
-        finally:
-            elapsed_ms = round((perf_counter() - started_at) * 1000.0, 3)
-            self.sections.append({"name": str(name or "").strip(), "elapsed_ms": elapsed_ms})
+        # Les seccions també arriben al Server-Timing global si la request s'està perfilant.
+        with profile_section(f"inscripcions.{str(name or '').strip()}"):
+            if not self.enabled:
+                yield
+                return
+
+            started_at = perf_counter()
+            try:
+                yield
+            finally:
+                elapsed_ms = round((perf_counter() - started_at) * 1000.0, 3)
+                self.sections.append({"name": str(name or "").strip(), "elapsed_ms": elapsed_ms})
 
     def as_payload(self) -> dict[str, Any]:
         elapsed_ms = [float(item.get("elapsed_ms") or 0.0) for item in self.sections]
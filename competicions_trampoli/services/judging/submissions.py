@@ -8,7 +8,6 @@ from django.db import transaction
 from ...models.inscripcions import Inscripcio
 from ...models.judging import JudgeScoreSubmission
 from ...models.scoring import TeamCompetitiveSubject
-from ...scoring_engine import ScoringEngine
 from ...services.scoring.judge_presence import (
     build_runtime_inputs_from_canonical,
     is_strict_presence_field,
@@ -22,6 +21,7 @@ from ...services.scoring.team_scoring import (
     is_team_context_app,
     logical_team_inputs_to_runtime_inputs,
     runtime_inputs_to_logical_team_inputs,
+    runtime_engine_for_comp_aparell,
     runtime_schema_for_comp_aparell,
 )
 from .supervision import mark_submission_approved, token_is_supervisor_for_field
@@ -196,7 +196,7 @@ def persist_subject_score_patch(
     clean_inputs = {key: value for key, value in merged_inputs.items() if key in allowed}
     runtime_inputs = build_runtime_inputs_from_canonical(clean_inputs, schema)
 
-    engine = ScoringEngine(schema)
+    engine = runtime_engine_for_comp_aparell(base_schema, comp_aparell, member_count=team_member_count)
     result = engine.compute(runtime_inputs)
     persisted_inputs = persist_inputs_after_compute(clean_inputs, result.inputs, schema)
     entry.inputs = (
@@ -1,12 +1,59 @@
+"""
+Validacio del programa de rotacions.
+
+Cada restriccio es un checker separat sobre un index pla del programa
+(franja -> cel.les (estacio, programables) -> subjectes). Les restriccions de
+franja (estacio compatible, subjecte simultani) nomes depenen de les cel.les de
+la franja i de les dades dels seus programables i estacions, aixi que el
+resultat de cada franja es guarda per competicio (cache de proces) i la
+seguent validacio nomes torna a llegir i comprovar:
+
+- les franges escrites des de l'ultima validacio, que marquen
+  ``mark_rotacions_franges_dirty`` (senyals de ``RotacioAssignacio`` i dels seus
+  enllacos, i els helpers ``_sync_assignacio_*`` per a les escriptures massives);
+- les franges que depenen d'un programable, d'un subjecte o d'una estacio que ha
+  canviat. Aquestes dades (i la llista de franges) es rellegeixen a cada crida
+  amb consultes planes, de manera que no cal marcar-les.
+
+Duplicats i pendents es mantenen a l'index per programable. Una escriptura
+d'un altre proces mou la versio compartida (``rotacions_validation``) i obliga a
+reconstruir-ho tot; ``ROTACIONS_VALIDATION_CACHE_TTL_SECONDS`` limita
+l'antiguitat per a escriptures que no passin per cap d'aquests camins (o si
+Redis no respon).
+"""
+from __future__ import annotations
+
+import heapq
+import time
 from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from ceeb_web.profiling import profiled
 
 from ...models import Inscripcio
 from ...models.competicio import ProgramUnit, ProgramUnitSlot
 from ...models.inscripcions import GrupCompeticio
-from ...models.rotacions import RotacioAssignacio, RotacioFranja
+from ...models.rotacions import (
+    RotacioAssignacio,
+    RotacioAssignacioGrup,
+    RotacioAssignacioProgramUnit,
+    RotacioAssignacioSerieEquip,
+    RotacioEstacio,
+    RotacioFranja,
+)
 from ...models.scoring import SerieEquip, SerieEquipItem, TeamCompetitiveSubject
 from ..fases.labels import program_unit_display_name
-from .rotacions_ordering import assignacio_grups, assignacio_program_units, assignacio_series
+from ..shared.competicio_versions import CompeticioVersions
+from .rotacions_ordering import assignacio_grups_from_values
+
+
+_VALIDATION_CACHE_MAX_ENTRIES = 64
+
+rotacions_validation_versions = CompeticioVersions("rotacions_validation")
 
 
 def _item(severity, code, message, *, franja_id=None, estacio_id=None, program_key=""):
@@ -20,6 +67,96 @@ def _item(severity, code, message, *, franja_id=None, estacio_id=None, program_k
     }
 
 
+@dataclass(frozen=True)
+class _Cell:
+    assignacio_id: int
+    franja_id: int
+    estacio_id: int
+    keys: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class _ProgramIndex:
+    labels: Dict[str, str]
+    subjects_by_key: Dict[str, FrozenSet[str]]
+    # estacio_id -> (mode, comp_aparell_id); mode: "group" | "series" | "none"
+    station_modes: Dict[int, Tuple[str, int]]
+    unit_aparells: Dict[int, int]
+    franges: List[RotacioFranja]
+    # Cel.les amb algun programable, en ordre d'assignacio.
+    cells_by_franja: Dict[int, Tuple[_Cell, ...]]
+    cells_by_key: Dict[str, Tuple[_Cell, ...]]
+    duplicate_keys: Set[str]
+
+
+@dataclass(frozen=True)
+class _ValidationState:
+    expires_at: float
+    shared_version: Optional[str]
+    index: _ProgramIndex
+    # franja_id -> ((assignacio_id, item), ...) dels checkers de franja
+    franja_errors: Dict[int, Tuple[Tuple[int, dict], ...]]
+
+
+_validation_cache: Dict[int, _ValidationState] = {}
+# competicio_id -> franges escrites des de l'ultima validacio (None: tot el programa)
+_written_franges: Dict[int, Optional[Set[int]]] = {}
+
+
+def _cache_ttl() -> float:
+    return float(getattr(settings, "ROTACIONS_VALIDATION_CACHE_TTL_SECONDS", 0) or 0)
+
+
+def clear_rotacions_validation_cache() -> None:
+    _validation_cache.clear()
+    _written_franges.clear()
+
+
+def _add_written_franges(competicio_id: int, franja_ids) -> None:
+    if franja_ids is None:
+        _written_franges[competicio_id] = None
+        return
+    written = _written_franges.setdefault(competicio_id, set())
+    if written is not None:
+        written.update(int(franja_id) for franja_id in franja_ids if franja_id)
+
+
+def mark_rotacions_franges_dirty(competicio_id, franja_ids=None) -> None:
+    """Marca les franges escrites (``None``: tot el programa) perque es tornin a validar.
+
+    Es marca a l'instant (la mateixa peticio ja valida les dades noves) i un
+    altre cop en fer commit, per si una validacio concurrent del mateix proces
+    ha llegit les dades abans del commit.
+    """
+    try:
+        competicio_id = int(competicio_id or 0)
+    except (TypeError, ValueError):
+        return
+    if competicio_id <= 0:
+        return
+    franja_ids = None if franja_ids is None else {int(franja_id) for franja_id in franja_ids if franja_id}
+    _add_written_franges(competicio_id, franja_ids)
+    rotacions_validation_versions.invalidate(competicio_id)
+
+    def _after_commit():
+        _add_written_franges(competicio_id, franja_ids)
+        # el commit de ``invalidate`` ja ha incrementat la versio compartida; si nomes
+        # ha pujat en u, l'unic canvi es aquest i la cache local el pot seguir aplicant
+        state = _validation_cache.get(competicio_id)
+        if state is None or state.shared_version is None:
+            return
+        shared = rotacions_validation_versions.shared(competicio_id)
+        if shared is not None and int(shared) == int(state.shared_version) + 1:
+            _validation_cache[competicio_id] = _ValidationState(
+                expires_at=state.expires_at,
+                shared_version=shared,
+                index=state.index,
+                franja_errors=state.franja_errors,
+            )
+
+    transaction.on_commit(_after_commit)
+
+
 def _station_mode(estacio):
     if getattr(estacio, "tipus", "") != "aparell" or not getattr(estacio, "comp_aparell_id", None):
         return "none"
@@ -29,15 +166,7 @@ def _station_mode(estacio):
     return "group"
 
 
-def _assignacio_keys(assignacio):
-    return (
-        [f"g:{group_id}" for group_id in assignacio_grups(assignacio)]
-        + [f"s:{serie_id}" for serie_id in assignacio_series(assignacio)]
-        + [f"pu:{unit_id}" for unit_id in assignacio_program_units(assignacio)]
-    )
-
-
-def _labels(competicio):
+def _labels_and_unit_aparells(competicio):
     group_labels = {
         f"g:{group.id}": (group.nom.strip() or f"Grup {group.display_num}")
         for group in GrupCompeticio.objects.filter(competicio=competicio)
@@ -46,11 +175,12 @@ def _labels(competicio):
         f"s:{serie.id}": (serie.nom.strip() or f"Serie {serie.display_num}")
         for serie in SerieEquip.objects.filter(competicio=competicio)
     }
-    unit_labels = {
-        f"pu:{unit.id}": program_unit_display_name(unit)
-        for unit in ProgramUnit.objects.filter(fase__competicio=competicio)
-    }
-    return {**group_labels, **series_labels, **unit_labels}
+    unit_labels = {}
+    unit_aparells = {}
+    for unit in ProgramUnit.objects.filter(fase__competicio=competicio).select_related("fase"):
+        unit_labels[f"pu:{unit.id}"] = program_unit_display_name(unit)
+        unit_aparells[int(unit.id)] = int(unit.fase.comp_aparell_id or 0)
+    return {**group_labels, **series_labels, **unit_labels}, unit_aparells
 
 
 def _program_key_subjects(competicio):
@@ -91,120 +221,288 @@ def _program_key_subjects(competicio):
         else:
             subjects_by_key[key].add(f"{kind or 'subject'}:{subject_id}")
 
-    return subjects_by_key
+    return {key: frozenset(subjects) for key, subjects in subjects_by_key.items()}
+
+
+def _unique_positive(values):
+    out = []
+    seen = set()
+    for value in values:
+        value = int(value or 0)
+        if value <= 0 or value in seen:
+            continue
+        seen.add(value)
+        out.append(value)
+    return out
+
+
+def _program_cells(competicio, competitive_ids):
+    """Cel.les competitives amb les claus ``g:``/``s:``/``pu:`` de ``assignacio_grups`` i companyia."""
+    links = {}
+    for model, field in (
+        (RotacioAssignacioGrup, "grup_id"),
+        (RotacioAssignacioSerieEquip, "serie_id"),
+        (RotacioAssignacioProgramUnit, "program_unit_id"),
+    ):
+        by_assignacio = defaultdict(list)
+        rows = (
+            model.objects
+            .filter(assignacio__competicio=competicio, assignacio__franja_id__in=competitive_ids)
+            .order_by("assignacio_id", "ordre", "id")
+            .values_list("assignacio_id", field)
+        )
+        for assignacio_id, value in rows:
+            by_assignacio[int(assignacio_id)].append(value)
+        links[field] = by_assignacio
+
+    cells = []
+    rows = (
+        RotacioAssignacio.objects
+        .filter(competicio=competicio, franja_id__in=competitive_ids)
+        .order_by("id")
+        .values_list("id", "franja_id", "estacio_id", "grups", "grup")
+    )
+    for assignacio_id, franja_id, estacio_id, grups, grup in rows:
+        group_ids = _unique_positive(links["grup_id"].get(assignacio_id, [])) or assignacio_grups_from_values(grups, grup)
+        keys = (
+            [f"g:{group_id}" for group_id in group_ids]
+            + [f"s:{serie_id}" for serie_id in _unique_positive(links["serie_id"].get(assignacio_id, []))]
+            + [f"pu:{unit_id}" for unit_id in _unique_positive(links["program_unit_id"].get(assignacio_id, []))]
+        )
+        if keys:
+            cells.append(_Cell(int(assignacio_id), int(franja_id), int(estacio_id), tuple(keys)))
+    return cells
+
+
+def _changed(previous: dict, current: dict):
+    return {key for key in previous.keys() | current.keys() if previous.get(key) != current.get(key)}
 
 
-def _is_allowed_in_station(program_key, estacio):
-    mode = _station_mode(estacio)
+def _build_program_index(competicio, previous: Optional[_ProgramIndex] = None, written: FrozenSet[int] = frozenset()):
+    """
+    Index del programa i franges a recomprovar.
+
+    Sense ``previous`` es llegeixen totes les cel.les. Amb ``previous`` nomes es
+    rellegeixen les de ``written`` i les de les franges que tornen a ser
+    competitives, i l'index anterior s'actualitza in situ (la cache ja no el te).
+    """
+    labels, unit_aparells = _labels_and_unit_aparells(competicio)
+    station_modes = {
+        int(estacio.id): (_station_mode(estacio), int(estacio.comp_aparell_id or 0))
+        for estacio in RotacioEstacio.objects.filter(competicio=competicio).select_related("comp_aparell__aparell")
+    }
+    franges = list(RotacioFranja.objects.filter(competicio=competicio).order_by("ordre", "id"))
+    subjects_by_key = _program_key_subjects(competicio)
+    competitive_ids = {int(franja.id) for franja in franges if franja.is_competitive}
+
+    if previous is None:
+        cells_by_franja: Dict[int, Tuple[_Cell, ...]] = {}
+        cells_by_key: Dict[str, Tuple[_Cell, ...]] = {}
+        duplicate_keys: Set[str] = set()
+        reread = set(competitive_ids)
+    else:
+        cells_by_franja = previous.cells_by_franja
+        cells_by_key = previous.cells_by_key
+        duplicate_keys = previous.duplicate_keys
+        previous_competitive = {int(franja.id) for franja in previous.franges if franja.is_competitive}
+        reread = (set(written) | (competitive_ids - previous_competitive)) & competitive_ids
+    changed = reread | {franja_id for franja_id in cells_by_franja if franja_id not in competitive_ids}
+
+    read_by_franja = defaultdict(list)
+    for cell in _program_cells(competicio, reread) if reread else ():
+        read_by_franja[cell.franja_id].append(cell)
+    removed = [cell for franja_id in changed for cell in cells_by_franja.pop(franja_id, ())]
+    added_by_key = defaultdict(list)
+    for franja_id, cells in read_by_franja.items():
+        cells_by_franja[franja_id] = tuple(cells)
+        for cell in cells:
+            for key in cell.keys:
+                added_by_key[key].append(cell)
+    for key in {key for cell in removed for key in cell.keys} | added_by_key.keys():
+        cells = [cell for cell in cells_by_key.get(key, ()) if cell.franja_id not in changed]
+        cells.extend(added_by_key.get(key, ()))
+        if cells:
+            cells_by_key[key] = tuple(sorted(cells, key=lambda cell: cell.assignacio_id))
+        else:
+            cells_by_key.pop(key, None)
+        if len(cells) > 1:
+            duplicate_keys.add(key)
+        else:
+            duplicate_keys.discard(key)
+
+    recheck = set(changed)
+    if previous is not None:
+        changed_keys = _changed(previous.labels, labels) | _changed(previous.subjects_by_key, subjects_by_key)
+        changed_keys.update(f"pu:{unit_id}" for unit_id in _changed(previous.unit_aparells, unit_aparells))
+        for key in changed_keys:
+            recheck.update(cell.franja_id for cell in cells_by_key.get(key, ()))
+        changed_stations = _changed(previous.station_modes, station_modes)
+        if changed_stations:
+            recheck.update(
+                cell.franja_id
+                for cells in cells_by_franja.values()
+                for cell in cells
+                if cell.estacio_id in changed_stations
+            )
+
+    index = _ProgramIndex(
+        labels=labels,
+        subjects_by_key=subjects_by_key,
+        station_modes=station_modes,
+        unit_aparells=unit_aparells,
+        franges=franges,
+        cells_by_franja=cells_by_franja,
+        cells_by_key=cells_by_key,
+        duplicate_keys=duplicate_keys,
+    )
+    return index, recheck
+
+
+def _is_allowed_in_station(program_key, estacio_id, index: _ProgramIndex):
+    mode, comp_aparell_id = index.station_modes.get(int(estacio_id), ("none", 0))
     if program_key.startswith("g:"):
         return mode == "group"
     if program_key.startswith("s:"):
         return mode == "series"
     if program_key.startswith("pu:"):
-        unit_id = int(program_key.split(":", 1)[1])
-        try:
-            unit = ProgramUnit.objects.select_related("fase").get(pk=unit_id, fase__competicio=estacio.competicio)
-        except ProgramUnit.DoesNotExist:
+        unit_aparell_id = index.unit_aparells.get(int(program_key.split(":", 1)[1]))
+        if unit_aparell_id is None:
             return False
-        return mode in {"group", "series"} and int(unit.fase.comp_aparell_id or 0) == int(estacio.comp_aparell_id or 0)
+        return mode in {"group", "series"} and unit_aparell_id == comp_aparell_id
     return False
 
 
-def validate_rotacions_program(competicio):
-    labels = _labels(competicio)
-    subjects_by_key = _program_key_subjects(competicio)
-    result = {"errors": [], "warnings": [], "info": []}
-
-    franges = list(RotacioFranja.objects.filter(competicio=competicio).order_by("ordre", "id"))
-    competitive_ids = {int(franja.id) for franja in franges if franja.is_competitive}
-    assignacions = list(
-        RotacioAssignacio.objects
-        .filter(competicio=competicio, franja_id__in=competitive_ids)
-        .select_related("franja", "estacio", "estacio__comp_aparell__aparell")
-        .prefetch_related("grup_links", "serie_links", "program_unit_links")
-    )
-
-    appearances = defaultdict(list)
-    keys_by_franja = defaultdict(list)
-    subjects_by_franja = defaultdict(dict)
-    assigned_keys = set()
-
-    for assignacio in assignacions:
-        keys = _assignacio_keys(assignacio)
-        if not keys:
-            continue
-        for key in keys:
-            assigned_keys.add(key)
-            keys_by_franja[int(assignacio.franja_id)].append(key)
-            appearances[key].append(assignacio)
-            if not _is_allowed_in_station(key, assignacio.estacio):
-                label = labels.get(key, key)
-                result["errors"].append(
+def _check_franja_cells(cells, index: _ProgramIndex):
+    """Checkers de franja: estacio incompatible i subjecte en dues estacions alhora."""
+    errors = []
+    owner_station_by_subject = {}
+    for cell in cells:
+        for key in cell.keys:
+            if not _is_allowed_in_station(key, cell.estacio_id, index):
+                label = index.labels.get(key, key)
+                errors.append((
+                    cell.assignacio_id,
                     _item(
                         "error",
                         "incompatible_station",
                         f"{label} no es compatible amb aquesta estacio.",
-                        franja_id=assignacio.franja_id,
-                        estacio_id=assignacio.estacio_id,
+                        franja_id=cell.franja_id,
+                        estacio_id=cell.estacio_id,
                         program_key=key,
-                    )
-                )
-            for subject_key in subjects_by_key.get(key, {key}):
-                owner = subjects_by_franja[int(assignacio.franja_id)].setdefault(subject_key, assignacio)
-                if int(owner.estacio_id) != int(assignacio.estacio_id):
-                    label = labels.get(key, key)
-                    result["errors"].append(
+                    ),
+                ))
+            for subject_key in index.subjects_by_key.get(key, (key,)):
+                owner_station = owner_station_by_subject.setdefault(subject_key, cell.estacio_id)
+                if owner_station != cell.estacio_id:
+                    label = index.labels.get(key, key)
+                    errors.append((
+                        cell.assignacio_id,
                         _item(
                             "error",
                             "simultaneous_subject",
                             f"{label} coincideix amb un altre element de la mateixa franja.",
-                            franja_id=assignacio.franja_id,
-                            estacio_id=assignacio.estacio_id,
+                            franja_id=cell.franja_id,
+                            estacio_id=cell.estacio_id,
                             program_key=key,
-                        )
-                    )
+                        ),
+                    ))
+    return tuple(errors)
 
-    for key, rows in appearances.items():
-        if len(rows) <= 1:
-            continue
-        label = labels.get(key, key)
-        franja_ids = {int(row.franja_id) for row in rows}
+
+def _check_duplicates(index: _ProgramIndex):
+    # en l'ordre en que cada programable apareix per primer cop al programa
+    def first_appearance(key):
+        cell = index.cells_by_key[key][0]
+        return cell.assignacio_id, cell.keys.index(key)
+
+    errors = []
+    for key in sorted(index.duplicate_keys, key=first_appearance):
+        cells = index.cells_by_key[key]
+        label = index.labels.get(key, key)
+        franja_ids = {cell.franja_id for cell in cells}
         code = "duplicate_program_item_same_franja" if len(franja_ids) == 1 else "duplicate_program_item"
-        result["errors"].append(
+        errors.append(
             _item(
                 "error",
                 code,
                 f"{label} apareix en mes d'una cel.la del programa.",
-                franja_id=rows[0].franja_id,
-                estacio_id=rows[0].estacio_id,
+                franja_id=cells[0].franja_id,
+                estacio_id=cells[0].estacio_id,
                 program_key=key,
             )
         )
+    return errors
+
+
+def _check_empty_franges(index: _ProgramIndex):
+    return [
+        _item(
+            "warning",
+            "empty_franja",
+            f"{franja.display_label} no te cap programable assignat.",
+            franja_id=franja.id,
+        )
+        for franja in index.franges
+        if franja.is_competitive and not index.cells_by_franja.get(int(franja.id))
+    ]
 
-    for franja in franges:
-        if franja.is_competitive and not keys_by_franja.get(int(franja.id)):
-            result["warnings"].append(
-                _item(
-                    "warning",
-                    "empty_franja",
-                    f"{franja.display_label} no te cap programable assignat.",
-                    franja_id=franja.id,
-                )
-            )
 
-    all_program_keys = set(labels.keys())
-    pending_count = len(all_program_keys - assigned_keys)
+def _check_pending(index: _ProgramIndex):
+    pending_count = sum(1 for key in index.labels if key not in index.cells_by_key)
     if pending_count:
-        result["warnings"].append(
+        return [
             _item(
                 "warning",
                 "pending_program_items",
                 f"Queden {pending_count} programables pendents de situar al programa.",
             )
-        )
-    else:
-        result["info"].append(
-            _item("info", "all_program_items_assigned", "Tots els programables estan situats al programa.")
+        ], []
+    return [], [_item("info", "all_program_items_assigned", "Tots els programables estan situats al programa.")]
+
+
+@profiled("rotacions.validate_program")
+def validate_rotacions_program(competicio):
+    competicio_id = int(competicio.pk)
+    ttl = _cache_ttl()
+    shared_version = rotacions_validation_versions.shared(competicio_id) if ttl > 0 else None
+    written = _written_franges.pop(competicio_id, set())
+    previous = _validation_cache.pop(competicio_id, None)
+    if previous is not None and (
+        written is None or previous.expires_at <= time.monotonic() or previous.shared_version != shared_version
+    ):
+        previous = None
+
+    index, recheck = _build_program_index(
+        competicio,
+        previous.index if previous is not None else None,
+        frozenset(written or ()),
+    )
+    franja_errors = {
+        franja_id: errors
+        for franja_id, errors in (previous.franja_errors.items() if previous is not None else ())
+        if franja_id not in recheck
+    }
+    for franja_id in recheck:
+        franja_errors.pop(franja_id, None)
+        cells = index.cells_by_franja.get(franja_id)
+        if cells:
+            franja_errors[franja_id] = _check_franja_cells(cells, index)
+
+    if ttl > 0:
+        if len(_validation_cache) >= _VALIDATION_CACHE_MAX_ENTRIES:
+            _validation_cache.clear()
+        _validation_cache[competicio_id] = _ValidationState(
+            expires_at=time.monotonic() + ttl,
+            shared_version=shared_version,
+            index=index,
+            franja_errors=franja_errors,
         )
 
-    return result
+    # Els errors de franja surten en ordre d'assignacio, com si es recorregues tot el programa.
+    merged = heapq.merge(*franja_errors.values(), key=lambda pair: pair[0])
+    pending_warnings, info = _check_pending(index)
+    return {
+        "errors": [dict(item) for _assignacio_id, item in merged] + _check_duplicates(index),
+        "warnings": _check_empty_franges(index) + pending_warnings,
+        "info": info,
+    }
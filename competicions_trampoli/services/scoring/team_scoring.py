@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import ast
 import copy
+import json
 import re
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
 from django.apps import apps
 from django.db import transaction
 
+from ceeb_web.profiling import profiled
+
 from ...models import Equip, Inscripcio, InscripcioEquipAssignacio
 from ...models.competicio import (
     Aparell,
@@ -16,6 +20,7 @@ from ...models.competicio import (
 )
 from ...services.inscripcions.admission import load_excluded_app_ids_by_inscripcio
 from .judge_presence import is_strict_presence_field, presence_key
+from .team_subject_cache import get_cached_team_subjects
 from ..teams.team_series import enrich_team_subjects_with_series
 
 
@@ -294,9 +299,7 @@ def _expand_member_aggregate_calls(
     return cloned
 
 
-def expand_team_schema_for_member_count(schema: dict, member_count: int) -> dict:
-    if not isinstance(schema, dict):
-        return {}
+def _expand_team_schema_for_member_count(schema: dict, member_count: int) -> dict:
     expanded = copy.deepcopy(schema)
     fields = expanded.get("fields") if isinstance(expanded.get("fields"), list) else []
     computed = expanded.get("computed") if isinstance(expanded.get("computed"), list) else []
@@ -432,17 +435,75 @@ def expand_team_schema_for_member_count(schema: dict, member_count: int) -> dict
     return expanded
 
 
+def _individual_runtime_schema(schema: dict) -> dict:
+    out = copy.deepcopy(schema)
+    meta = out.get("meta") if isinstance(out.get("meta"), dict) else {}
+    meta["subject_mode"] = "individual"
+    out["meta"] = meta
+    for field in out.get("fields") or []:
+        if isinstance(field, dict):
+            field["scope"] = "member"
+    return out
+
+
+# L'expansio (deepcopy + reescriptura AST de cada formula) es repeteix per cada
+# fila d'equip del feed i per cada desat. La memoitzem pel contingut del schema
+# (JSON canonic) i el nombre de membres; la cache guarda el resultat serialitzat,
+# de manera que ningu el pot mutar, i cada crida en rep una copia nova.
+TEAM_SCHEMA_EXPANSION_CACHE_SIZE = 256
+
+
+def _schema_cache_key(schema: dict) -> Optional[str]:
+    try:
+        return json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=TEAM_SCHEMA_EXPANSION_CACHE_SIZE)
+def _cached_runtime_schema_json(schema_key: str, is_team: bool, member_count: int) -> str:
+    schema = json.loads(schema_key)
+    if is_team:
+        runtime_schema = _expand_team_schema_for_member_count(schema, member_count)
+    else:
+        runtime_schema = _individual_runtime_schema(schema)
+    return json.dumps(runtime_schema)
+
+
+@lru_cache(maxsize=TEAM_SCHEMA_EXPANSION_CACHE_SIZE)
+def _cached_runtime_engine(schema_key: str, is_team: bool, member_count: int):
+    from ...scoring_engine import ScoringEngine
+
+    return ScoringEngine(json.loads(_cached_runtime_schema_json(schema_key, is_team, member_count)))
+
+
+def clear_runtime_schema_cache() -> None:
+    _cached_runtime_schema_json.cache_clear()
+    _cached_runtime_engine.cache_clear()
+
+
+def _runtime_schema(schema: dict, *, is_team: bool, member_count: int) -> dict:
+    member_count = max(0, int(member_count or 0)) if is_team else 0
+    schema_key = _schema_cache_key(schema)
+    if schema_key is None:
+        if is_team:
+            return _expand_team_schema_for_member_count(schema, member_count)
+        return _individual_runtime_schema(schema)
+    return json.loads(_cached_runtime_schema_json(schema_key, is_team, member_count))
+
+
+def expand_team_schema_for_member_count(schema: dict, member_count: int) -> dict:
+    if not isinstance(schema, dict):
+        return {}
+    return _runtime_schema(schema, is_team=True, member_count=member_count)
+
+
 def runtime_schema_for_subject(schema: dict, *, aparell: Optional[Aparell] = None, member_count: int = 0) -> dict:
-    if not is_team_competition_unit(aparell):
-        out = copy.deepcopy(schema or {})
-        meta = out.get("meta") if isinstance(out.get("meta"), dict) else {}
-        meta["subject_mode"] = "individual"
-        out["meta"] = meta
-        for field in out.get("fields") or []:
-            if isinstance(field, dict):
-                field["scope"] = "member"
-        return out
-    return expand_team_schema_for_member_count(schema or {}, member_count)
+    return _runtime_schema(
+        schema or {},
+        is_team=is_team_competition_unit(aparell),
+        member_count=member_count,
+    )
 
 
 def runtime_schema_for_comp_aparell(
@@ -458,6 +519,28 @@ def runtime_schema_for_comp_aparell(
     )
 
 
+def runtime_engine_for_comp_aparell(
+    schema: dict,
+    comp_aparell: Optional[CompeticioAparell],
+    *,
+    member_count: int = 0,
+):
+    """
+    ``ScoringEngine`` ja compilat per al schema runtime de ``comp_aparell``.
+
+    Es comparteix entre peticions (una instancia per schema i nombre de
+    membres); ``compute`` no en modifica l'estat.
+    """
+    is_team = is_team_competition_unit(getattr(comp_aparell, "aparell", None))
+    schema_key = _schema_cache_key(schema or {})
+    if schema_key is None:
+        from ...scoring_engine import ScoringEngine
+
+        return ScoringEngine(runtime_schema_for_comp_aparell(schema, comp_aparell, member_count=member_count))
+    member_count = max(0, int(member_count or 0)) if is_team else 0
+    return _cached_runtime_engine(schema_key, is_team, member_count)
+
+
 def _team_member_rows_for_context(competicio, context) -> Dict[int, List[Inscripcio]]:
     grouped: Dict[int, List[Inscripcio]] = {}
     rows = (
@@ -563,6 +646,18 @@ def _expected_team_size_for_comp_aparell(comp_aparell: Optional[CompeticioAparel
     return _infer_from_context_sources()
 
 
+def _team_subject_values(context, equip: Equip, members: List[Inscripcio]) -> Dict[str, Any]:
+    return {
+        "member_ids": [int(member.id) for member in members if member is not None],
+        "member_names": [str(getattr(member, "nom_i_cognoms", "") or "").strip() for member in members if member is not None],
+        "label": _subject_label(equip, str(getattr(context, "nom", "") or getattr(context, "code", "")), members),
+    }
+
+
+def _team_subject_is_current(subject: Optional[TeamCompetitiveSubject], values: Dict[str, Any]) -> bool:
+    return subject is not None and all(getattr(subject, field) == value for field, value in values.items())
+
+
 def sync_team_subject_for_members(
     competicio,
     comp_aparell: CompeticioAparell,
@@ -571,24 +666,28 @@ def sync_team_subject_for_members(
     members: List[Inscripcio],
 ) -> TeamCompetitiveSubject:
     team_subject_model = _team_subject_model()
-    member_ids = [int(member.id) for member in members if member is not None]
-    member_names = [str(getattr(member, "nom_i_cognoms", "") or "").strip() for member in members if member is not None]
-    label = _subject_label(equip, str(getattr(context, "nom", "") or getattr(context, "code", "")), members)
     subject, _created = team_subject_model.objects.update_or_create(
         competicio=competicio,
         comp_aparell=comp_aparell,
         context=context,
         equip=equip,
-        defaults={
-            "member_ids": member_ids,
-            "member_names": member_names,
-            "label": label,
-        },
+        defaults=_team_subject_values(context, equip, members),
     )
     return subject
 
 
 def build_team_subjects_for_comp_aparell(competicio, comp_aparell: CompeticioAparell) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Lectura cachejada de ``sync_team_subjects_for_comp_aparell`` (veure team_subject_cache)."""
+    if not is_team_context_app(comp_aparell):
+        return [], []
+    return get_cached_team_subjects(
+        competicio.id,
+        comp_aparell.id,
+        lambda: sync_team_subjects_for_comp_aparell(competicio, comp_aparell),
+    )
+
+
+def sync_team_subjects_for_comp_aparell(competicio, comp_aparell: CompeticioAparell) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     if not is_team_context_app(comp_aparell):
         return [], []
 
@@ -610,86 +709,116 @@ def build_team_subjects_for_comp_aparell(competicio, comp_aparell: CompeticioApa
     issues: List[Dict[str, Any]] = []
     expected_team_size = _expected_team_size_for_comp_aparell(comp_aparell)
 
-    with transaction.atomic():
-        for source in source_rows:
-            context = source.context
-            members_by_team = _team_member_rows_for_context(competicio, context)
-            if not members_by_team:
-                issues.append({
-                    "context_code": str(getattr(context, "code", "") or ""),
-                    "team_label": str(getattr(context, "nom", "") or getattr(context, "code", "Context")),
-                    "reasons": ["Aquest context no te cap equip amb membres per aquest aparell."],
-                })
+    existing_subjects = {
+        (int(obj.context_id), int(obj.equip_id)): obj
+        for obj in _team_subject_model().objects.filter(competicio=competicio, comp_aparell=comp_aparell)
+    }
+    # Primer planifiquem (nomes lectures) i despres sincronitzem nomes els
+    # subjectes que han canviat: una lectura sense canvis no obre cap transaccio.
+    planned: List[Any] = []
+    for source in source_rows:
+        context = source.context
+        members_by_team = _team_member_rows_for_context(competicio, context)
+        if not members_by_team:
+            planned.append({
+                "context_code": str(getattr(context, "code", "") or ""),
+                "team_label": str(getattr(context, "nom", "") or getattr(context, "code", "Context")),
+                "reasons": ["Aquest context no te cap equip amb membres per aquest aparell."],
+            })
+            continue
+        equips = list(
+            Equip.objects
+            .filter(competicio=competicio, context=context, id__in=list(members_by_team.keys()))
+            .order_by("nom", "id")
+        )
+        equip_map = {equip.id: equip for equip in equips}
+        for team_id, members in members_by_team.items():
+            equip = equip_map.get(team_id)
+            if equip is None:
                 continue
-            equips = list(
-                Equip.objects
-                .filter(competicio=competicio, context=context, id__in=list(members_by_team.keys()))
-                .order_by("nom", "id")
+            planned.append((context, equip, members))
+
+    stale = []
+    for item in planned:
+        if not isinstance(item, tuple):
+            continue
+        context, equip, members = item
+        if not _team_subject_is_current(
+            existing_subjects.get((int(context.id), int(equip.id))),
+            _team_subject_values(context, equip, members),
+        ):
+            stale.append(item)
+    if stale:
+        with transaction.atomic():
+            for context, equip, members in stale:
+                existing_subjects[(int(context.id), int(equip.id))] = sync_team_subject_for_members(
+                    competicio, comp_aparell, context, equip, members
+                )
+
+    for item in planned:
+        if not isinstance(item, tuple):
+            issues.append(item)
+            continue
+        context, equip, members = item
+        subject_obj = existing_subjects[(int(context.id), int(equip.id))]
+        invalid_reasons: List[str] = []
+        member_ids = [int(member.id) for member in members]
+        if not members:
+            invalid_reasons.append("L'equip no te membres assignats dins d'aquest context.")
+        if expected_team_size and len(member_ids) != expected_team_size:
+            invalid_reasons.append(
+                f"L'equip ha de tenir {expected_team_size} membres per aquest aparell."
             )
-            equip_map = {equip.id: equip for equip in equips}
-            for team_id, members in members_by_team.items():
-                equip = equip_map.get(team_id)
-                if equip is None:
-                    continue
-                invalid_reasons: List[str] = []
-                member_ids = [int(member.id) for member in members]
-                if not members:
-                    invalid_reasons.append("L'equip no te membres assignats dins d'aquest context.")
-                if expected_team_size and len(member_ids) != expected_team_size:
-                    invalid_reasons.append(
-                        f"L'equip ha de tenir {expected_team_size} membres per aquest aparell."
-                    )
-                if len(set(member_ids)) != len(member_ids):
-                    invalid_reasons.append("Hi ha membres duplicats dins del mateix equip.")
-                if any(member_id in excluded_ids for member_id in member_ids):
-                    invalid_reasons.append("Hi ha membres exclosos d'aquest aparell.")
-
-                group_candidates = [int(getattr(member, "grup_competicio_id", 0) or 0) for member in members]
-                group_id = next((gid for gid in group_candidates if gid), 0)
-                meta_parts = []
-                shared_entitats = sorted({
-                    str(getattr(member, "entitat", "") or "").strip()
-                    for member in members
-                    if getattr(member, "entitat", None)
-                })
-                if shared_entitats:
-                    meta_parts.append(", ".join(shared_entitats))
-
-                subject_obj = sync_team_subject_for_members(competicio, comp_aparell, context, equip, members)
-                subject = {
-                    "id": f"team_unit:{subject_obj.id}",
-                    "subject_id": int(subject_obj.id),
-                    "subject_kind": "team_unit",
-                    "equip_id": int(equip.id),
-                    "context_id": int(context.id),
-                    "context_code": str(getattr(context, "code", "") or ""),
-                    "context_name": str(getattr(context, "nom", "") or getattr(context, "code", "")).strip(),
-                    "name": str(getattr(equip, "nom", "") or f"Equip {equip.id}").strip(),
-                    "label": str(getattr(subject_obj, "label", "") or "").strip(),
-                    "members": [
-                        {"id": int(member.id), "name": str(getattr(member, "nom_i_cognoms", "") or "").strip()}
-                        for member in members
-                    ],
-                    "members_text": " + ".join(
-                        str(getattr(member, "nom_i_cognoms", "") or "").strip() for member in members
-                    ),
-                    "order": min(
-                        [int(getattr(member, "ordre_competicio", 10**9) or 10**9) for member in members] or [10**9]
-                    ),
-                    "group": group_id,
-                    "group_display_num": getattr(next((m for m in members if getattr(m, "grup_competicio_id", None)), None), "grup", "") or "",
-                    "allowed_app_ids": [] if invalid_reasons else [int(comp_aparell.id)],
-                    "meta": " · ".join(meta_parts) if meta_parts else "",
-                    "invalid_reasons": invalid_reasons,
+        if len(set(member_ids)) != len(member_ids):
+            invalid_reasons.append("Hi ha membres duplicats dins del mateix equip.")
+        if any(member_id in excluded_ids for member_id in member_ids):
+            invalid_reasons.append("Hi ha membres exclosos d'aquest aparell.")
+
+        group_candidates = [int(getattr(member, "grup_competicio_id", 0) or 0) for member in members]
+        group_id = next((gid for gid in group_candidates if gid), 0)
+        meta_parts = []
+        shared_entitats = sorted({
+            str(getattr(member, "entitat", "") or "").strip()
+            for member in members
+            if getattr(member, "entitat", None)
+        })
+        if shared_entitats:
+            meta_parts.append(", ".join(shared_entitats))
+
+        subject = {
+            "id": f"team_unit:{subject_obj.id}",
+            "subject_id": int(subject_obj.id),
+            "subject_kind": "team_unit",
+            "equip_id": int(equip.id),
+            "context_id": int(context.id),
+            "context_code": str(getattr(context, "code", "") or ""),
+            "context_name": str(getattr(context, "nom", "") or getattr(context, "code", "")).strip(),
+            "name": str(getattr(equip, "nom", "") or f"Equip {equip.id}").strip(),
+            "label": str(getattr(subject_obj, "label", "") or "").strip(),
+            "members": [
+                {"id": int(member.id), "name": str(getattr(member, "nom_i_cognoms", "") or "").strip()}
+                for member in members
+            ],
+            "members_text": " + ".join(
+                str(getattr(member, "nom_i_cognoms", "") or "").strip() for member in members
+            ),
+            "order": min(
+                [int(getattr(member, "ordre_competicio", 10**9) or 10**9) for member in members] or [10**9]
+            ),
+            "group": group_id,
+            "group_display_num": getattr(next((m for m in members if getattr(m, "grup_competicio_id", None)), None), "grup", "") or "",
+            "allowed_app_ids": [] if invalid_reasons else [int(comp_aparell.id)],
+            "meta": " · ".join(meta_parts) if meta_parts else "",
+            "invalid_reasons": invalid_reasons,
+        }
+        if invalid_reasons:
+            issues.append(
+                {
+                    "team_label": f"{subject['context_name']} · {subject['name']} ({subject.get('members_text') or 'sense membres'})",
+                    "reasons": invalid_reasons,
                 }
-                if invalid_reasons:
-                    issues.append(
-                        {
-                            "team_label": f"{subject['context_name']} · {subject['name']} ({subject.get('members_text') or 'sense membres'})",
-                            "reasons": invalid_reasons,
-                        }
-                    )
-                subjects.append(subject)
+            )
+        subjects.append(subject)
 
     subjects = enrich_team_subjects_with_series(competicio, comp_aparell, subjects)
     subjects.sort(
@@ -706,6 +835,7 @@ def build_team_subjects_for_comp_aparell(competicio, comp_aparell: CompeticioApa
     return subjects, issues
 
 
+@profiled("scoring.team_subject_registry")
 def build_team_subject_registry(competicio, comp_aparell: CompeticioAparell) -> Dict[str, Any]:
     subjects, issues = build_team_subjects_for_comp_aparell(competicio, comp_aparell)
     all_by_id: Dict[int, Dict[str, Any]] = {}
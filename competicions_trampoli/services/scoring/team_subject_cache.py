@@ -0,0 +1,84 @@
+"""
+Cache de lectura dels subjectes d'equip per comp_aparell.
+
+``sync_team_subjects_for_comp_aparell`` recorre fonts de context, equips i
+membres i materialitza ``TeamCompetitiveSubject``. El resultat nomes canvia
+quan canvien membres, equips, exclusions o series, pero els jutges el
+demanen a cada polling. El guardem per (competicio, comp_aparell) amb la
+versio de ``team_subjects`` de la competicio (veure ``competicio_versions``).
+
+``TEAM_SUBJECTS_CACHE_TTL_SECONDS`` limita l'antiguitat d'una entrada per a
+les escriptures que no passen per ``invalidate_team_subjects`` (o si Redis no
+respon).
+"""
+from __future__ import annotations
+
+import copy
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from ..shared.competicio_versions import CompeticioVersions
+
+
+_TEAM_SUBJECTS_CACHE_MAX_ENTRIES = 512
+
+team_subjects_versions = CompeticioVersions("team_subjects")
+_cache: Dict[Tuple[int, int], Tuple[float, Tuple[int, Optional[str]], Any]] = {}
+
+
+def team_subjects_version_key(competicio_id: int) -> str:
+    return team_subjects_versions.key(competicio_id)
+
+
+def _cache_ttl() -> float:
+    return float(getattr(settings, "TEAM_SUBJECTS_CACHE_TTL_SECONDS", 0) or 0)
+
+
+def _drop_competicio_entries(competicio_id: int) -> None:
+    for key in [key for key in _cache if key[0] == competicio_id]:
+        _cache.pop(key, None)
+
+
+team_subjects_versions.on_invalidate(_drop_competicio_entries)
+
+
+def invalidate_team_subjects(competicio_id) -> None:
+    """Descarta els subjectes cachejats d'una competicio (ara i en fer commit)."""
+    team_subjects_versions.invalidate(competicio_id)
+
+
+def clear_team_subjects_cache() -> None:
+    _cache.clear()
+
+
+def get_cached_team_subjects(competicio_id: int, comp_aparell_id: int, build: Callable[[], Any]) -> Any:
+    """Retorna una copia del resultat de ``build`` per aquesta versio."""
+    ttl = _cache_ttl()
+    if ttl <= 0:
+        return build()
+
+    competicio_id = int(competicio_id)
+    key = (competicio_id, int(comp_aparell_id))
+    version = team_subjects_versions.current(competicio_id)
+    now = time.monotonic()
+    cached = _cache.get(key)
+    if cached is not None and cached[0] > now and cached[1] == version:
+        return copy.deepcopy(cached[2])
+
+    value = build()
+    if team_subjects_versions.local(competicio_id) == version[0]:
+        if len(_cache) >= _TEAM_SUBJECTS_CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[key] = (now + ttl, version, copy.deepcopy(value))
+    return value
+
+
+__all__ = [
+    "clear_team_subjects_cache",
+    "get_cached_team_subjects",
+    "invalidate_team_subjects",
+    "team_subjects_version_key",
+    "team_subjects_versions",
+]
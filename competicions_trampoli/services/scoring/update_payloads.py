@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import copy
 
+from ceeb_web.profiling import profiled
+
 from .scoring_subjects import serialize_subject_payload
 from .team_subject_contract import team_subject_meta
 
@@ -16,6 +18,7 @@ def filter_inputs_for_allowed_codes(inputs: dict, allowed_codes: set) -> dict:
     }
 
 
+@profiled("scoring.update_payload")
 def build_score_update_payload(
     *,
     subject_kind: str,
@@ -0,0 +1,453 @@
+"""
+Ingesta en segon pla dels videos gravats pels jutges.
+
+La vista de pujada nomes desa el fitxer (el multipart de Django ja el bolca a
+disc a trossos, i les pujades reprenibles ``JudgeVideoUpload`` l'acumulen en
+un fitxer parcial), deixa el video en estat ``processing`` i encua
+``ingest_judge_video_task`` a ``heavy_queue``. El worker:
+
+1. passa ``ffprobe`` pel fitxer (durada, format, pista de video) i aplica els
+   limits del model; si no passa, el video queda ``failed`` amb el motiu;
+2. extreu un fotograma de portada (``poster_file``) amb ``ffmpeg``;
+3. si ``JUDGE_VIDEO_FASTSTART`` esta actiu, remuxa MP4/MOV amb
+   ``-movflags +faststart`` perque el reproductor comenci sense baixar-ho tot;
+4. deixa el video ``ready``.
+
+Una nova pujada no esborra la versio ``ready`` anterior: els seus fitxers i
+metadades queden a ``previous_version`` fins que la ingesta accepta la nova
+(llavors s'esborren en fer commit) o la rebutja (llavors es restaura, amb el
+motiu del rebuig a ``error_message``).
+
+``judge_video_status`` exposa l'estat al portal. Els binaris es configuren amb
+``JUDGE_VIDEO_FFPROBE_BIN``/``JUDGE_VIDEO_FFMPEG_BIN`` (els tests hi posen
+scripts stub).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import mimetypes
+import os
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from ...models.scoring import ScoreEntryVideo
+
+
+logger = logging.getLogger(__name__)
+
+FASTSTART_MIME_TYPES = {"video/mp4", "video/quicktime"}
+
+
+class VideoValidationError(Exception):
+    def __init__(self, message: str, reason: str = "video_validation_failed", payload=None):
+        super().__init__(message)
+        self.message = message
+        self.reason = reason
+        self.payload = payload or {}
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, os.getenv(name, default))
+
+
+def mime_from_probe(format_name: str, original_filename: str = "") -> str:
+    fmt = (format_name or "").strip().lower()
+    tokens = {x.strip() for x in fmt.split(",") if x.strip()}
+    ext = os.path.splitext((original_filename or "").lower())[1]
+
+    if "webm" in tokens or ext == ".webm":
+        return "video/webm"
+
+    has_mp4_family = bool(tokens.intersection({"mp4", "m4a", "3gp", "3g2", "mj2"}))
+    has_mov = "mov" in tokens
+    if ext == ".mov":
+        return "video/quicktime"
+    if has_mp4_family:
+        return "video/mp4"
+    if has_mov:
+        return "video/quicktime"
+
+    guessed, _ = mimetypes.guess_type(original_filename or "")
+    return (guessed or "").strip().lower()
+
+
+def declared_video_mime(original_filename: str = "", content_type: str = "") -> str:
+    """Tipus MIME permes segons el que declara el client (sense obrir el fitxer)."""
+    declared = str(content_type or "").split(";", 1)[0].strip().lower()
+    if declared in ScoreEntryVideo.ALLOWED_MIME_TYPES:
+        return declared
+    guessed, _ = mimetypes.guess_type(original_filename or "")
+    guessed = (guessed or "").strip().lower()
+    return guessed if guessed in ScoreEntryVideo.ALLOWED_MIME_TYPES else ""
+
+
+def probe_video_file(path: str, *, original_filename: str = "") -> dict:
+    ffprobe_bin = _setting("JUDGE_VIDEO_FFPROBE_BIN", "ffprobe")
+    ffprobe_timeout = int(_setting("JUDGE_VIDEO_FFPROBE_TIMEOUT_SECONDS", "15"))
+    cmd = [
+        ffprobe_bin,
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration,format_name:stream=codec_type,codec_name",
+        "-of",
+        "json",
+        path,
+    ]
+
+    try:
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=max(1, ffprobe_timeout),
+            check=False,
+        )
+    except FileNotFoundError as exc:
+        raise VideoValidationError(
+            "La validacio de video no esta disponible al servidor (ffprobe).",
+            reason="ffprobe_missing",
+        ) from exc
+    except subprocess.TimeoutExpired as exc:
+        raise VideoValidationError(
+            "No s'ha pogut validar el video dins del temps limit.",
+            reason="ffprobe_timeout",
+        ) from exc
+
+    if proc.returncode != 0:
+        stderr = (proc.stderr or "").strip()
+        raise VideoValidationError(
+            "El fitxer no sembla un video valid.",
+            reason="ffprobe_failed",
+            payload={"stderr": stderr[:300]},
+        )
+
+    try:
+        parsed = json.loads(proc.stdout or "{}")
+    except Exception as exc:
+        raise VideoValidationError(
+            "No s'han pogut llegir metadades del video.",
+            reason="ffprobe_json_parse_failed",
+        ) from exc
+
+    streams = parsed.get("streams") or []
+    video_stream = next(
+        (s for s in streams if str((s or {}).get("codec_type", "")).lower() == "video"),
+        None,
+    )
+    if not video_stream:
+        raise VideoValidationError(
+            "El fitxer no conte cap pista de video valida.",
+            reason="no_video_stream",
+        )
+
+    fmt = parsed.get("format") or {}
+    duration_raw = fmt.get("duration")
+    try:
+        duration_float = float(duration_raw)
+    except Exception as exc:
+        raise VideoValidationError(
+            "No s'ha pogut calcular la durada real del video.",
+            reason="duration_missing",
+        ) from exc
+
+    if not math.isfinite(duration_float) or duration_float <= 0:
+        raise VideoValidationError(
+            "Durada de video invalida.",
+            reason="invalid_duration",
+            payload={"duration": duration_raw},
+        )
+
+    duration_seconds = int(math.ceil(duration_float))
+    if duration_seconds > ScoreEntryVideo.VIDEO_MAX_DURATION_SECONDS:
+        raise VideoValidationError(
+            (
+                "La durada supera el limit "
+                f"de {ScoreEntryVideo.VIDEO_MAX_DURATION_SECONDS} segons."
+            ),
+            reason="duration_too_long",
+            payload={"duration_seconds": duration_seconds},
+        )
+
+    format_name = str(fmt.get("format_name") or "").strip().lower()
+    mime_type = mime_from_probe(format_name, original_filename)
+    if not mime_type:
+        raise VideoValidationError(
+            "No s'ha pogut identificar el tipus MIME real del video.",
+            reason="missing_mime_from_probe",
+            payload={"format_name": format_name},
+        )
+    if mime_type not in ScoreEntryVideo.ALLOWED_MIME_TYPES:
+        raise VideoValidationError(
+            f"Tipus MIME no permes: {mime_type}",
+            reason="mime_not_allowed",
+            payload={"mime_type": mime_type, "format_name": format_name},
+        )
+
+    return {
+        "duration_seconds": duration_seconds,
+        "duration_float": duration_float,
+        "mime_type": mime_type,
+        "format_name": format_name,
+        "video_codec": str((video_stream or {}).get("codec_name") or "").strip().lower(),
+    }
+
+
+def upload_staging_dir() -> str:
+    configured = str(getattr(settings, "JUDGE_VIDEO_UPLOAD_DIR", "") or "").strip()
+    return configured or os.path.join(settings.MEDIA_ROOT, "trampoli", "video_uploads")
+
+
+def upload_part_path(upload) -> str:
+    return os.path.join(upload_staging_dir(), f"{upload.id}.part")
+
+
+def remove_upload_part(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def discard_upload(upload) -> None:
+    """Esborra una sessio de pujada reprenible i el seu fitxer parcial."""
+    remove_upload_part(upload_part_path(upload))
+    upload.delete()
+
+
+_VERSION_FIELDS = ("duration_seconds", "file_size_bytes", "mime_type", "original_filename")
+
+
+def video_version_snapshot(video) -> dict:
+    """Fitxers i metadades d'un video ``ready`` per poder-lo restaurar."""
+    snapshot = {field: getattr(video, field) for field in _VERSION_FIELDS}
+    snapshot["video_file"] = video.video_file.name if video.video_file else ""
+    snapshot["poster_file"] = video.poster_file.name if video.poster_file else ""
+    return snapshot
+
+
+def version_file_names(version) -> list:
+    version = version if isinstance(version, dict) else {}
+    return [name for name in (version.get("video_file"), version.get("poster_file")) if name]
+
+
+def delete_files_on_commit(storage, names, *, keep=()) -> None:
+    """Esborra fitxers del storage quan la transaccio fa commit (mai abans)."""
+    names = [name for name in dict.fromkeys(names) if name and name not in set(keep)]
+    if not names:
+        return
+
+    def _delete():
+        for name in names:
+            try:
+                storage.delete(name)
+            except Exception:
+                logger.warning("No s'ha pogut esborrar el fitxer de video %s", name, exc_info=True)
+
+    transaction.on_commit(_delete)
+
+
+def enqueue_video_ingest(video) -> None:
+    """Encua la ingesta quan la transaccio que ha desat el video fa commit."""
+    args = [video._meta.label_lower, video.pk, video.video_file.name]
+    transaction.on_commit(lambda: _send_ingest_task(args))
+
+
+def _send_ingest_task(args: list) -> None:
+    from ...tasks import ingest_judge_video_task
+
+    try:
+        ingest_judge_video_task.apply_async(args=args, retry=False)
+    except Exception:
+        logger.warning("No s'ha pogut encuar la ingesta del video %s; es processa en linia.", args[1], exc_info=True)
+        ingest_judge_video(*args)
+
+
+def ingest_judge_video(model_label: str, video_id: int, file_name: str = "") -> str:
+    """Proba, valida i prepara un video ``processing``. Retorna l'estat final."""
+    model = apps.get_model(model_label)
+    video = model.objects.filter(pk=video_id).first()
+    if video is None or not video.video_file:
+        return ""
+    if video.status != model.Status.PROCESSING or (file_name and video.video_file.name != file_name):
+        # ja processat, o substituit per una pujada posterior amb la seva propia tasca
+        return video.status
+
+    updates: dict = {}
+    new_files: list = []
+    try:
+        with _local_copy(video.video_file) as path:
+            meta = probe_video_file(path, original_filename=video.original_filename or video.video_file.name)
+            updates.update(
+                status=model.Status.READY,
+                duration_seconds=meta["duration_seconds"],
+                mime_type=meta["mime_type"],
+                error_message="",
+            )
+            if _bool_setting("JUDGE_VIDEO_POSTER", True):
+                poster = _extract_poster(path, meta["duration_float"])
+                if poster:
+                    new_files.append(("poster_file", poster, _derived_name(video.video_file.name, "poster", ".jpg")))
+            if _bool_setting("JUDGE_VIDEO_FASTSTART", False) and meta["mime_type"] in FASTSTART_MIME_TYPES:
+                remuxed = _faststart_remux(path)
+                if remuxed:
+                    ext = os.path.splitext(video.video_file.name)[1] or ".mp4"
+                    new_files.append(("video_file", remuxed, _derived_name(video.video_file.name, "faststart", ext)))
+    except VideoValidationError as exc:
+        updates = {"status": model.Status.FAILED, "error_message": exc.message[:300]}
+        logger.info("video %s %s rebutjat a la ingesta: %s", model_label, video_id, exc.reason)
+    except Exception:
+        logger.exception("Error inesperat ingerint el video %s %s", model_label, video_id)
+        updates = {"status": model.Status.FAILED, "error_message": "Error inesperat processant el video."}
+
+    try:
+        return _apply_ingest_result(model, video_id, file_name or video.video_file.name, updates, new_files)
+    finally:
+        for _field, temp_path, _name in new_files:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def _apply_ingest_result(model, video_id: int, file_name: str, updates: dict, new_files: list) -> str:
+    with transaction.atomic():
+        video = model.objects.select_for_update().filter(pk=video_id).first()
+        if video is None or video.video_file.name != file_name or video.status != model.Status.PROCESSING:
+            return getattr(video, "status", "")
+        storage = video.video_file.storage
+        stale_names = []
+        previous = video.previous_version if isinstance(video.previous_version, dict) else {}
+        if updates.get("status") == model.Status.FAILED and previous.get("video_file"):
+            # Pujada rebutjada: es torna a la darrera versio bona i es descarta la nova.
+            stale_names.extend([video.video_file.name, video.poster_file.name if video.poster_file else ""])
+            video.video_file.name = previous["video_file"]
+            video.poster_file.name = previous.get("poster_file") or ""
+            for field in _VERSION_FIELDS:
+                if field in previous:
+                    setattr(video, field, previous[field])
+            updates["status"] = model.Status.READY
+        else:
+            for field_name, temp_path, target_name in new_files:
+                field_file = getattr(video, field_name)
+                if field_file and field_file.name:
+                    stale_names.append(field_file.name)
+                with open(temp_path, "rb") as handle:
+                    field_file.save(target_name, File(handle), save=False)
+                if field_name == "video_file":
+                    updates["file_size_bytes"] = os.path.getsize(temp_path)
+            if updates.get("status") == model.Status.READY:
+                stale_names.extend(version_file_names(previous))
+        for key, value in updates.items():
+            setattr(video, key, value)
+        if updates.get("status") == model.Status.READY:
+            video.previous_version = {}
+        video.save()
+        delete_files_on_commit(
+            storage,
+            stale_names,
+            keep=[video.video_file.name, video.poster_file.name if video.poster_file else ""],
+        )
+    return video.status
+
+
+@contextmanager
+def _local_copy(field_file) -> Iterator[str]:
+    try:
+        path = field_file.storage.path(field_file.name)
+    except NotImplementedError:
+        path = ""
+    if path and os.path.exists(path):
+        yield path
+        return
+
+    suffix = os.path.splitext(field_file.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        temp_path = tmp.name
+        with field_file.storage.open(field_file.name, "rb") as source:
+            shutil.copyfileobj(source, tmp, length=1024 * 1024)
+    try:
+        yield temp_path
+    finally:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _bool_setting(name: str, default: bool) -> bool:
+    value = _setting(name, default)
+    if isinstance(value, str):
+        return value.strip().lower() in {"1", "true", "yes", "on"}
+    return bool(value)
+
+
+def _derived_name(video_name: str, kind: str, ext: str) -> str:
+    stem = os.path.splitext(os.path.basename(video_name))[0]
+    return f"{stem}_{kind}{ext}"
+
+
+def _run_ffmpeg(args: list[str]) -> bool:
+    ffmpeg_bin = _setting("JUDGE_VIDEO_FFMPEG_BIN", "ffmpeg")
+    timeout = int(_setting("JUDGE_VIDEO_FFMPEG_TIMEOUT_SECONDS", "120"))
+    try:
+        proc = subprocess.run(
+            [ffmpeg_bin, "-y", "-v", "error", *args],
+            capture_output=True,
+            text=True,
+            timeout=max(1, timeout),
+            check=False,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired) as exc:
+        logger.info("ffmpeg no disponible o massa lent (%s)", exc.__class__.__name__)
+        return False
+    if proc.returncode != 0:
+        logger.info("ffmpeg ha fallat: %s", (proc.stderr or "").strip()[:300])
+        return False
+    return True
+
+
+def _extract_poster(path: str, duration: float) -> str:
+    fd, out_path = tempfile.mkstemp(suffix=".jpg")
+    os.close(fd)
+    offset = f"{min(1.0, max(0.0, duration / 2)):.2f}"
+    if _run_ffmpeg(["-ss", offset, "-i", path, "-frames:v", "1", "-vf", "scale=480:-2", out_path]) and os.path.getsize(out_path) > 0:
+        return out_path
+    os.remove(out_path)
+    return ""
+
+
+def _faststart_remux(path: str) -> str:
+    fd, out_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1] or ".mp4")
+    os.close(fd)
+    if _run_ffmpeg(["-i", path, "-c", "copy", "-map", "0", "-movflags", "+faststart", out_path]) and os.path.getsize(out_path) > 0:
+        return out_path
+    os.remove(out_path)
+    return ""
+
+
+__all__ = [
+    "VideoValidationError",
+    "declared_video_mime",
+    "delete_files_on_commit",
+    "discard_upload",
+    "enqueue_video_ingest",
+    "ingest_judge_video",
+    "mime_from_probe",
+    "probe_video_file",
+    "remove_upload_part",
+    "upload_part_path",
+    "upload_staging_dir",
+    "version_file_names",
+    "video_version_snapshot",
+]
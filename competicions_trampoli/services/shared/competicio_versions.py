@@ -0,0 +1,122 @@
+"""
+Versions per competicio per invalidar caches de proces entre workers.
+
+Cada espai (``namespace``) guarda:
+
+- una versio local per proces, que s'incrementa a l'instant en invalidar
+  (la mateixa peticio ja no veu dades velles);
+- una versio compartida a Redis (``version:<namespace>:<competicio_id>``), que
+  s'incrementa al commit perque la resta de processos descartin la seva copia.
+
+Si Redis no respon, ``current`` retorna nomes la versio local i es torna a
+provar al cap de ``COMPETICIO_VERSIONS_REDIS_RETRY_SECONDS``; els TTL de cada
+cache limiten l'antiguitat mentrestant.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.db import transaction
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency in local/test envs
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+REDIS_URL = os.getenv("REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+COMPETICIO_VERSIONS_REDIS_RETRY_SECONDS = 30
+
+_redis_client = None
+_redis_retry_at = 0.0
+
+
+def _shared_redis():
+    global _redis_client
+    if redis is None or time.monotonic() < _redis_retry_at:
+        return None
+    if _redis_client is None:
+        _redis_client = redis.from_url(
+            REDIS_URL,
+            encoding="utf-8",
+            decode_responses=True,
+            socket_connect_timeout=0.5,
+            socket_timeout=0.5,
+        )
+    return _redis_client
+
+
+def _redis_unavailable() -> None:
+    global _redis_retry_at
+    _redis_retry_at = time.monotonic() + COMPETICIO_VERSIONS_REDIS_RETRY_SECONDS
+    logger.warning("Competicio versions: Redis unavailable, using local versions only", exc_info=True)
+
+
+def _clean_competicio_id(competicio_id) -> int:
+    try:
+        return int(competicio_id or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class CompeticioVersions:
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._local: Dict[int, int] = {}
+        self._listeners: List[Callable[[int], None]] = []
+
+    def key(self, competicio_id) -> str:
+        return f"version:{self.namespace}:{_clean_competicio_id(competicio_id)}"
+
+    def on_invalidate(self, listener: Callable[[int], None]) -> None:
+        """``listener(competicio_id)`` es crida cada cop que canvia la versio local."""
+        self._listeners.append(listener)
+
+    def local(self, competicio_id) -> int:
+        return self._local.get(_clean_competicio_id(competicio_id), 0)
+
+    def shared(self, competicio_id) -> Optional[str]:
+        client = _shared_redis()
+        if client is None:
+            return None
+        try:
+            return client.get(self.key(competicio_id)) or "0"
+        except Exception:
+            _redis_unavailable()
+            return None
+
+    def current(self, competicio_id) -> Tuple[int, Optional[str]]:
+        return (self.local(competicio_id), self.shared(competicio_id))
+
+    def _bump_local(self, competicio_id: int) -> None:
+        self._local[competicio_id] = self._local.get(competicio_id, 0) + 1
+        for listener in self._listeners:
+            listener(competicio_id)
+
+    def _bump_shared(self, competicio_id: int) -> None:
+        client = _shared_redis()
+        if client is None:
+            return
+        try:
+            client.incr(self.key(competicio_id))
+        except Exception:
+            _redis_unavailable()
+
+    def invalidate(self, competicio_id) -> None:
+        competicio_id = _clean_competicio_id(competicio_id)
+        if competicio_id <= 0:
+            return
+        self._bump_local(competicio_id)
+
+        def _after_commit():
+            self._bump_local(competicio_id)
+            self._bump_shared(competicio_id)
+
+        transaction.on_commit(_after_commit)
+
+
+__all__ = ["CompeticioVersions"]
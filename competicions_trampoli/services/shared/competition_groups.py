@@ -4,6 +4,7 @@ from django.db import transaction
 from django.db.models import Count, Max
 
 from ...models import GrupCompeticio, Inscripcio
+from ..scoring.team_subject_cache import invalidate_team_subjects
 
 
 UNASSIGNED_GROUP_KEY = 0
@@ -358,6 +359,7 @@ def append_competition_order_for_group(group, inscripcio_id):
         grup=group.display_num,
         ordre_competicio=max_order + 1,
     )
+    invalidate_team_subjects(group.competicio_id)
 
 
 def compact_competition_order_for_group(group):
@@ -375,6 +377,7 @@ def compact_competition_order_for_group(group):
     ]
     if updates:
         Inscripcio.objects.bulk_update(updates, ["ordre_competicio"], batch_size=500)
+        invalidate_team_subjects(group.competicio_id)
     return len(updates)
 
 
@@ -413,6 +416,7 @@ def save_group_competition_order(group, ordered_ids):
     ]
     if updates:
         Inscripcio.objects.bulk_update(updates, ["ordre_competicio"], batch_size=500)
+        invalidate_team_subjects(group.competicio_id)
     return len(updates)
 
 
@@ -568,6 +572,7 @@ def assign_groups_by_display_num(competicio, display_num_to_inscripcio_ids, clea
                     grup=group.display_num,
                     ordre_competicio=idx,
                 )
+        invalidate_team_subjects(competicio.id)
     return ids_seen
 
 
@@ -863,6 +868,7 @@ def move_inscripcions_to_group(group, inscripcio_ids):
                 ["grup_competicio", "grup", "ordre_competicio"],
                 batch_size=500,
             )
+            invalidate_team_subjects(group.competicio_id)
         for group_id in old_group_ids:
             compact_competition_order_for_group(groups_by_id.get(group_id))
 
@@ -906,6 +912,7 @@ def clear_inscripcions_group(competicio, inscripcio_ids):
                 ["grup_competicio", "grup", "ordre_competicio"],
                 batch_size=500,
             )
+            invalidate_team_subjects(competicio.id)
         for group_id in old_group_ids:
             compact_competition_order_for_group(groups_by_id.get(group_id))
 
@@ -0,0 +1,375 @@
+"""
+Motor d'exportacions Excel en streaming (rotacions i classificacions).
+
+- Els fulls s'escriuen amb un ``Workbook(write_only=True)``: les files es
+  bolquen al fitxer temporal d'openpyxl a mesura que es tanquen, de manera que
+  la memoria no creix amb la mida de l'exportacio.
+- ``StreamingSheet`` ofereix la mateixa API basica que un full normal
+  (``cell``/``merge_cells``/``row_dimensions``...) sobre les files encara no
+  bolcades; ``flush(before_row)`` escriu tot el que queda per sobre.
+- El fitxer es desa a disc i es serveix amb ``FileResponse`` (streaming per
+  blocs). Per sobre de ``EXCEL_EXPORT_ASYNC_THRESHOLD_ROWS`` files estimades,
+  l'exportacio es genera en segon pla (``heavy_queue``) i les peticions
+  seguents serveixen l'artefacte cachejat mentre sigui vigent.
+- La clau de l'artefacte inclou la revisio de dades de la competicio
+  (``export_data_revision``); els senyals que modifiquen notes, inscripcions
+  o rotacions la renoven amb ``invalidate_export_artifacts`` i l'artefacte
+  anterior deixa de servir-se encara que el TTL no hagi vencut.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import time
+from copy import copy
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseBadRequest
+from django.utils.module_loading import import_string
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.worksheet.cell_range import CellRange
+
+from .export_artifacts import (
+    export_artifact_path,
+    export_data_revision,
+    invalidate_export_artifacts,
+    remove_legacy_export_artifacts,
+)
+
+
+logger = logging.getLogger(__name__)
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# kind -> builder(competicio, params, wb). Els builders viuen amb la vista
+# corresponent; els importem per ruta perque el worker no carregui les vistes.
+EXCEL_EXPORT_BUILDERS = {
+    "rotacions": "competicions_trampoli.views.rotacions.export.build_rotacions_workbook",
+    "classificacions": "competicions_trampoli.views.classificacions.export.build_classificacions_workbook",
+}
+
+PENDING_RETRY_AFTER_SECONDS = 3
+EXPORT_FAILED_MESSAGE = "No s'ha pogut generar l'exportacio. Torna-ho a provar mes tard."
+
+
+class ExcelExportError(Exception):
+    """Error de dades que s'ha de retornar a l'usuari com a 400."""
+
+
+# ---------- Fulls en streaming ----------
+
+class StreamingSheet:
+    """
+    Full write-only amb acces aleatori a les files encara no bolcades.
+
+    Les files s'acumulen en un buffer fins que es crida ``flush``; llavors
+    s'escriuen en ordre i ja no es poden modificar. L'amplada de columnes i
+    ``freeze_panes`` s'han de fixar abans del primer ``flush``.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self._rows: Dict[int, Dict[int, Any]] = {}
+        self._merged: list[tuple[CellRange, Any]] = []
+        self._next_row = 1
+
+    @property
+    def title(self):
+        return self.ws.title
+
+    @title.setter
+    def title(self, value):
+        self.ws.title = value
+
+    @property
+    def freeze_panes(self):
+        return self.ws.freeze_panes
+
+    @freeze_panes.setter
+    def freeze_panes(self, value):
+        self.ws.freeze_panes = value
+
+    @property
+    def row_dimensions(self):
+        return self.ws.row_dimensions
+
+    @property
+    def column_dimensions(self):
+        return self.ws.column_dimensions
+
+    @property
+    def max_row(self):
+        return max([self._next_row - 1, *self._rows.keys()])
+
+    def add_image(self, img):
+        self.ws.add_image(img)
+
+    def cell(self, row: int, column: int, value=None):
+        if row < self._next_row:
+            raise ValueError(f"La fila {row} ja s'ha escrit al fitxer.")
+        cells = self._rows.setdefault(row, {})
+        cell = cells.get(column)
+        if cell is None:
+            cell = WriteOnlyCell(self.ws)
+            cells[column] = cell
+        if value is not None:
+            cell.value = value
+        return cell
+
+    def merge_cells(self, start_row: int, start_column: int, end_row: int, end_column: int):
+        cell_range = CellRange(min_col=start_column, min_row=start_row, max_col=end_column, max_row=end_row)
+        self.ws.merged_cells.add(cell_range)
+        self._merged.append((cell_range, self.cell(start_row, start_column)))
+
+    def _emit_row(self, row_idx: int) -> None:
+        cells = self._rows.pop(row_idx, {})
+        for cell_range, anchor in self._merged:
+            if not (cell_range.min_row <= row_idx <= cell_range.max_row):
+                continue
+            # com MergedCellRange.format(): la vora de l'ancora a tota la zona
+            for col in range(cell_range.min_col, cell_range.max_col + 1):
+                if col not in cells:
+                    filler = WriteOnlyCell(self.ws)
+                    filler.border = copy(anchor.border)
+                    cells[col] = filler
+        width = max(cells.keys(), default=0)
+        self.ws.append([cells.get(col) for col in range(1, width + 1)])
+        self.ws.row_dimensions.pop(row_idx, None)
+
+    def flush(self, before_row: Optional[int] = None) -> None:
+        last = self.max_row if before_row is None else before_row - 1
+        while self._next_row <= last:
+            self._emit_row(self._next_row)
+            self._next_row += 1
+        self._merged = [(r, anchor) for r, anchor in self._merged if r.max_row >= self._next_row]
+
+
+class StreamingWorkbook:
+    """Workbook write-only que crea ``StreamingSheet`` i els tanca en ordre."""
+
+    def __init__(self):
+        self.wb = Workbook(write_only=True)
+        self._sheets: list[StreamingSheet] = []
+
+    def create_sheet(self, title: Optional[str] = None) -> StreamingSheet:
+        if self._sheets:
+            self._sheets[-1].flush()
+        sheet = StreamingSheet(self.wb.create_sheet(title=title))
+        self._sheets.append(sheet)
+        return sheet
+
+    def save(self, target) -> None:
+        for sheet in self._sheets:
+            sheet.flush()
+        if not self._sheets:
+            self.create_sheet()
+        self.wb.save(target)
+
+
+def build_excel_export(kind: str, competicio, params: Dict[str, Any], target) -> None:
+    builder = import_string(EXCEL_EXPORT_BUILDERS[kind])
+    workbook = StreamingWorkbook()
+    builder(competicio, dict(params or {}), workbook)
+    workbook.save(target)
+
+
+def xlsx_file_response(fileobj, filename: str) -> FileResponse:
+    fileobj.seek(0)
+    return FileResponse(fileobj, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+# ---------- Artefactes en segon pla ----------
+# Rutes, revisio i invalidacio viuen a ``export_artifacts`` (sense openpyxl),
+# perque els senyals les puguin importar sense carregar-lo a l'arrencada.
+
+def _artifact_ttl() -> int:
+    return max(0, int(getattr(settings, "EXCEL_EXPORT_ARTIFACT_TTL_SECONDS", 600) or 0))
+
+
+def _is_fresh(path: str, ttl: int) -> bool:
+    try:
+        return (time.time() - os.path.getmtime(path)) <= ttl
+    except OSError:
+        return False
+
+
+def _write_error_marker(error_path: str, status: int, message: str) -> None:
+    try:
+        with open(error_path, "w", encoding="utf-8") as f:
+            json.dump({"status": status, "message": message}, f)
+    except OSError:
+        logger.warning("No s'ha pogut desar l'error de l'exportacio %s.", error_path, exc_info=True)
+
+
+def _pop_error_marker(error_path: str) -> Optional[tuple[int, str]]:
+    try:
+        with open(error_path, encoding="utf-8") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    try:
+        os.remove(error_path)
+    except OSError:
+        pass
+    try:
+        data = json.loads(raw)
+        return int(data.get("status") or 500), str(data.get("message") or EXPORT_FAILED_MESSAGE)
+    except (ValueError, TypeError, AttributeError):
+        return 400, raw
+
+
+def _error_response(status: int, message: str) -> HttpResponse:
+    if status == 400:
+        return HttpResponseBadRequest(message)
+    return HttpResponse(message, status=status, content_type="text/plain; charset=utf-8")
+
+
+def write_export_artifact(kind: str, competicio, params: Dict[str, Any]) -> str:
+    """
+    Genera l'exportacio a l'artefacte (escriptura atomica). Retorna la ruta.
+
+    La revisio es llegeix abans de consultar les dades: si canvien durant el
+    calcul, l'artefacte queda amb la revisio antiga i ja no se serveix.
+    Qualsevol error deixa un marcador ``.error`` perque la vista el retorni
+    en lloc de tornar a encuar la mateixa feina.
+    """
+    remove_legacy_export_artifacts()
+    path = export_artifact_path(kind, competicio.id, params)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    error_path = f"{path}.error"
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        build_excel_export(kind, competicio, params, tmp)
+        os.replace(tmp, path)
+    except ExcelExportError as exc:
+        _write_error_marker(error_path, 400, str(exc))
+        raise
+    except Exception:
+        # BD, limit de temps suau del worker...: l'usuari ha de veure l'error
+        _write_error_marker(error_path, 500, EXPORT_FAILED_MESSAGE)
+        raise
+    finally:
+        for leftover in (tmp, f"{path}.pending"):
+            try:
+                os.remove(leftover)
+            except OSError:
+                pass
+    return path
+
+
+def _pending_attempts(pending_path: str) -> int:
+    try:
+        with open(pending_path, encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _enqueue_export(kind: str, competicio, params: Dict[str, Any], path: str, *, attempt: int = 1) -> bool:
+    from ...tasks import build_excel_export_task
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.pending", "w", encoding="utf-8") as f:
+        f.write(str(attempt))
+    try:
+        build_excel_export_task.apply_async(args=[kind, competicio.id, params], retry=False)
+    except Exception:
+        logger.warning("No s'ha pogut encuar l'exportacio %s; es genera en linia.", kind, exc_info=True)
+        try:
+            os.remove(f"{path}.pending")
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def _pending_response() -> HttpResponse:
+    response = HttpResponse(
+        "L'exportacio s'esta generant. La descarrega comencara automaticament quan estigui llesta.",
+        status=202,
+        content_type="text/plain; charset=utf-8",
+    )
+    response["Refresh"] = str(PENDING_RETRY_AFTER_SECONDS)
+    response["Retry-After"] = str(PENDING_RETRY_AFTER_SECONDS)
+    return response
+
+
+def respond_with_excel_export(
+    kind: str,
+    competicio,
+    params: Dict[str, Any],
+    *,
+    filename: str,
+    estimate_rows: Callable[[], int],
+):
+    """
+    Resposta d'una exportacio: en linia (streaming des d'un temporal) si es
+    petita; si no, des de l'artefacte cachejat o encuant-ne la generacio.
+    """
+    threshold = int(getattr(settings, "EXCEL_EXPORT_ASYNC_THRESHOLD_ROWS", 5000) or 0)
+    if threshold <= 0 or estimate_rows() <= threshold:
+        tmp = tempfile.TemporaryFile()
+        try:
+            build_excel_export(kind, competicio, params, tmp)
+        except ExcelExportError as exc:
+            tmp.close()
+            return HttpResponseBadRequest(str(exc))
+        return xlsx_file_response(tmp, filename)
+
+    path = export_artifact_path(kind, competicio.id, params)
+    if _is_fresh(path, _artifact_ttl()):
+        return xlsx_file_response(open(path, "rb"), filename)
+
+    error_path = f"{path}.error"
+    error = _pop_error_marker(error_path)
+    if error is not None:
+        return _error_response(*error)
+
+    pending_path = f"{path}.pending"
+    pending_timeout = int(getattr(settings, "CELERY_TASK_TIME_LIMIT", 3900) or 3900)
+    if _is_fresh(pending_path, pending_timeout):
+        return _pending_response()
+
+    # un .pending caducat vol dir que el worker ha mort sense deixar marcador
+    attempts = _pending_attempts(pending_path) if os.path.exists(pending_path) else 0
+    max_attempts = max(1, int(getattr(settings, "EXCEL_EXPORT_MAX_ATTEMPTS", 2) or 1))
+    if attempts >= max_attempts:
+        try:
+            os.remove(pending_path)
+        except OSError:
+            pass
+        return _error_response(500, EXPORT_FAILED_MESSAGE)
+
+    if _enqueue_export(kind, competicio, params, path, attempt=attempts + 1):
+        return _pending_response()
+
+    try:
+        path = write_export_artifact(kind, competicio, params)
+    except ExcelExportError as exc:
+        _pop_error_marker(error_path)
+        return HttpResponseBadRequest(str(exc))
+    except Exception:
+        # en linia l'error ja arriba com a 500; el marcador no ha de quedar
+        _pop_error_marker(error_path)
+        raise
+    return xlsx_file_response(open(path, "rb"), filename)
+
+
+__all__ = [
+    "EXCEL_EXPORT_BUILDERS",
+    "ExcelExportError",
+    "StreamingSheet",
+    "StreamingWorkbook",
+    "XLSX_CONTENT_TYPE",
+    "build_excel_export",
+    "export_artifact_path",
+    "export_data_revision",
+    "invalidate_export_artifacts",
+    "respond_with_excel_export",
+    "write_export_artifact",
+    "xlsx_file_response",
+]
@@ -0,0 +1,107 @@
+"""
+Rutes i revisio de dades dels artefactes d'exportacio Excel.
+
+Separat d'``excel_export`` perque no importa openpyxl: els senyals criden
+``invalidate_export_artifacts`` a cada escriptura i es carreguen durant
+``django.setup()`` de tots els workers web.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def export_artifact_dir() -> str:
+    # Els artefactes contenen dades de participants: fora de MEDIA_ROOT (nginx el
+    # serveix a /media/); nomes es baixen per la vista amb permisos. Per defecte,
+    # al costat de MEDIA_ROOT.
+    configured = str(getattr(settings, "EXCEL_EXPORT_DIR", "") or "").strip()
+    if configured:
+        return configured
+    media_root = str(getattr(settings, "MEDIA_ROOT", "") or "")
+    if not media_root:
+        return os.path.join(tempfile.gettempdir(), "excel_exports")
+    return os.path.join(os.path.dirname(os.path.abspath(media_root)), "excel_exports")
+
+
+def _legacy_artifact_dir() -> str:
+    return os.path.join(str(getattr(settings, "MEDIA_ROOT", "") or tempfile.gettempdir()), "_exports")
+
+
+def remove_legacy_export_artifacts() -> None:
+    """Esborra els artefactes que versions anteriors deixaven dins de MEDIA_ROOT."""
+    legacy = _legacy_artifact_dir()
+    if os.path.isdir(legacy) and os.path.abspath(legacy) != os.path.abspath(export_artifact_dir()):
+        shutil.rmtree(legacy, ignore_errors=True)
+
+
+def _competicio_artifact_dir(competicio_id: int) -> str:
+    return os.path.join(export_artifact_dir(), f"competicio_{int(competicio_id)}")
+
+
+def _revision_path(competicio_id: int) -> str:
+    return os.path.join(_competicio_artifact_dir(competicio_id), "revision")
+
+
+def export_data_revision(competicio_id: int) -> str:
+    """Revisio de dades vigent; viu al disc compartit amb el worker."""
+    try:
+        with open(_revision_path(competicio_id), encoding="utf-8") as f:
+            return f.read().strip() or "0"
+    except OSError:
+        return "0"
+
+
+def invalidate_export_artifacts(competicio_id) -> None:
+    """Renova la revisio i esborra els artefactes (i errors) de la competicio."""
+    if not competicio_id:
+        return
+    directory = _competicio_artifact_dir(competicio_id)
+    if not os.path.isdir(directory):
+        # cap exportacio en segon pla encara: res a invalidar
+        return
+    revision_path = _revision_path(competicio_id)
+    tmp = f"{revision_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp, revision_path)
+    except OSError:
+        logger.warning("No s'ha pogut renovar la revisio d'exportacions %s.", competicio_id, exc_info=True)
+        return
+    for name in os.listdir(directory):
+        if name.endswith((".xlsx", ".xlsx.error")):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def export_artifact_path(kind: str, competicio_id: int, params: Dict[str, Any], revision: Optional[str] = None) -> str:
+    # Nom no endevinable, per si el directori acaba compartit amb altres serveis.
+    if revision is None:
+        revision = export_data_revision(competicio_id)
+    payload = json.dumps([kind, int(competicio_id), params, revision], sort_keys=True, default=str)
+    digest = hmac.new(str(settings.SECRET_KEY).encode(), payload.encode(), hashlib.sha256).hexdigest()
+    return os.path.join(_competicio_artifact_dir(competicio_id), f"{kind}_{digest}.xlsx")
+
+
+__all__ = [
+    "export_artifact_dir",
+    "export_artifact_path",
+    "export_data_revision",
+    "invalidate_export_artifacts",
+    "remove_legacy_export_artifacts",
+]
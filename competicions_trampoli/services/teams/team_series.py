@@ -12,6 +12,7 @@ from django.db.models import Max
 from ...models import Competicio, Inscripcio
 from ...models.competicio import CompeticioAparell
 from ...models.rotacions import RotacioAssignacioSerieEquip
+from ..scoring.team_subject_cache import invalidate_team_subjects
 
 if TYPE_CHECKING:
     from ...models.scoring import SerieEquip, SerieEquipItem, TeamCompetitiveSubject
@@ -434,6 +435,7 @@ def assign_subjects_to_serie(
     for serie_id in touched_series_ids:
         rows = list(serie_item_model.objects.filter(serie_id=serie_id).order_by("ordre", "id"))
         _bulk_resequence_items(rows)
+    invalidate_team_subjects(serie.competicio_id)
 
     return {"updated_ids": updated_ids, "skipped_ids": skipped_ids}
 
@@ -457,6 +459,7 @@ def unassign_subjects_from_series(competicio: Competicio, comp_aparell: Competic
     for serie_id in serie_ids:
         rows = list(serie_item_model.objects.filter(serie_id=serie_id).order_by("ordre", "id"))
         _bulk_resequence_items(rows)
+    invalidate_team_subjects(competicio.id)
     return {"updated_ids": updated_ids}
 
 
@@ -469,6 +472,7 @@ def reorder_serie_subjects(serie: SerieEquip, subject_ids: Iterable[int]) -> Lis
     desired.extend([int(row.team_subject_id) for row in rows if int(row.team_subject_id) not in desired])
     ordered_rows = [by_subject_id[subject_id] for subject_id in desired]
     _bulk_resequence_items(ordered_rows)
+    invalidate_team_subjects(serie.competicio_id)
     return desired
 
 
@@ -1,26 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.db import transaction
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from .models import EquipContext, InscripcioEquipAssignacio, InscripcioMedia
+from .access import invalidate_competicio_capabilities
+from .models import (
+    Competicio,
+    CompeticioMembership,
+    Equip,
+    EquipContext,
+    Inscripcio,
+    InscripcioEquipAssignacio,
+    InscripcioMedia,
+)
 from .live_cache import mark_live_dirty
 from .models.classificacions import ClassificacioConfig
-from .models.competicio import CompeticioAparell
+from .models.competicio import (
+    CompeticioAparell,
+    CompeticioAparellEquipContextSource,
+    CompeticioAparellFase,
+    FasePartitionState,
+    InscripcioAparellExclusio,
+    ProgramUnit,
+)
+from .models.rotacions import (
+    RotacioAssignacio,
+    RotacioAssignacioGrup,
+    RotacioAssignacioProgramUnit,
+    RotacioAssignacioSerieEquip,
+    RotacioEstacio,
+    RotacioFranja,
+)
 from .models.scoring import (
     ScoreEntry,
     ScoreEntryVideo,
+    ScoringSchema,
     SerieEquip,
     SerieEquipItem,
+    TeamCompetitiveSubject,
     TeamScoreEntry,
     TeamScoreEntryVideo,
 )
+from .services.classificacions.plan_cache import (
+    clear_classificacio_plan_cache,
+    invalidate_classificacions_structure,
+)
+from .services.fases.dashboard_snapshot import schedule_fase_dashboard_refresh_on_commit
+from .services.inscripcions.extra_values import sync_inscripcions_extra_values
+from .services.rotacions.validation import mark_rotacions_franges_dirty
 from .services.scoring.schema_resolution import copy_global_scoring_schema_to_comp_aparell_if_missing
+from .services.scoring.team_subject_cache import clear_team_subjects_cache, invalidate_team_subjects
+from .services.shared.export_artifacts import invalidate_export_artifacts
 
 
 def _mark_live_dirty_on_commit(competicio_id):
     if not competicio_id:
         return
     transaction.on_commit(lambda cid=int(competicio_id): mark_live_dirty(cid))
+    # els avisos de classificacio del tauler de fases depenen de les mateixes dades
+    schedule_fase_dashboard_refresh_on_commit(competicio_id)
+    _invalidate_exports_on_commit(competicio_id)
+
+
+def _invalidate_exports_on_commit(competicio_id):
+    if not competicio_id:
+        return
+    transaction.on_commit(lambda cid=int(competicio_id): invalidate_export_artifacts(cid))
 
 
 def _delete_file_on_commit(file_field):
@@ -33,6 +79,24 @@ def _delete_file_on_commit(file_field):
     transaction.on_commit(lambda s=storage, n=name: s.delete(n))
 
 
+@receiver(post_save, sender=CompeticioMembership)
+@receiver(post_delete, sender=CompeticioMembership)
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+@receiver(post_delete, sender=Group)
+def _access_changed_invalidate_capabilities(sender, update_fields=None, **kwargs):
+    # Cada login desa last_login: no canvia l'acces i no ha de buidar la cache.
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_competicio_capabilities()
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def _user_groups_changed_invalidate_capabilities(sender, action, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"}:
+        invalidate_competicio_capabilities()
+
+
 @receiver(post_save, sender=CompeticioAparell)
 def _competicio_aparell_saved_copy_global_schema(sender, instance, created, **kwargs):
     if created:
@@ -111,6 +175,157 @@ def _serie_equip_item_deleted_mark_live_dirty(sender, instance, **kwargs):
     _mark_live_dirty_on_commit(competicio_id)
 
 
+@receiver(post_save, sender=Inscripcio)
+def _inscripcio_saved_sync_extra_values(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and "extra" not in update_fields:
+        return
+    sync_inscripcions_extra_values([instance], replace=not created)
+
+
+@receiver(post_save, sender=Inscripcio)
+@receiver(post_delete, sender=Inscripcio)
+@receiver(post_save, sender=InscripcioEquipAssignacio)
+@receiver(post_delete, sender=InscripcioEquipAssignacio)
+@receiver(post_save, sender=Equip)
+@receiver(post_delete, sender=Equip)
+@receiver(post_save, sender=EquipContext)
+@receiver(post_delete, sender=EquipContext)
+@receiver(post_save, sender=CompeticioAparellEquipContextSource)
+@receiver(post_delete, sender=CompeticioAparellEquipContextSource)
+@receiver(post_save, sender=SerieEquip)
+@receiver(post_delete, sender=SerieEquip)
+@receiver(post_delete, sender=TeamCompetitiveSubject)
+def _team_inputs_changed_invalidate_subjects(sender, instance, **kwargs):
+    invalidate_team_subjects(getattr(instance, "competicio_id", None))
+
+
+@receiver(post_save, sender=SerieEquipItem)
+@receiver(post_delete, sender=SerieEquipItem)
+def _serie_equip_item_changed_invalidate_subjects(sender, instance, **kwargs):
+    invalidate_team_subjects(getattr(getattr(instance, "serie", None), "competicio_id", None))
+
+
+@receiver(post_save, sender=InscripcioAparellExclusio)
+@receiver(post_delete, sender=InscripcioAparellExclusio)
+def _exclusio_changed_invalidate_subjects(sender, instance, **kwargs):
+    invalidate_team_subjects(getattr(getattr(instance, "inscripcio", None), "competicio_id", None))
+
+
+@receiver(post_save, sender=ScoringSchema)
+@receiver(post_delete, sender=ScoringSchema)
+def _scoring_schema_changed_invalidate_subjects(sender, instance, **kwargs):
+    # expected_team_size viu al schema. Un schema global (per aparell) no
+    # te competicio: buidem la cache d'aquest proces i la resta cauen pel TTL.
+    if getattr(instance, "comp_aparell_id", None):
+        invalidate_team_subjects(getattr(getattr(instance, "comp_aparell", None), "competicio_id", None))
+    else:
+        clear_team_subjects_cache()
+
+
+@receiver(post_save, sender=CompeticioAparell)
+@receiver(post_delete, sender=CompeticioAparell)
+@receiver(post_save, sender=CompeticioAparellFase)
+@receiver(post_delete, sender=CompeticioAparellFase)
+@receiver(post_save, sender=EquipContext)
+@receiver(post_delete, sender=EquipContext)
+@receiver(post_save, sender=CompeticioAparellEquipContextSource)
+@receiver(post_delete, sender=CompeticioAparellEquipContextSource)
+def _structure_changed_invalidate_classificacio_plans(sender, instance, **kwargs):
+    invalidate_classificacions_structure(getattr(instance, "competicio_id", None))
+
+
+@receiver(post_save, sender=CompeticioAparell)
+@receiver(post_delete, sender=CompeticioAparell)
+@receiver(post_save, sender=CompeticioAparellFase)
+@receiver(post_delete, sender=CompeticioAparellFase)
+def _phase_structure_changed_refresh_dashboard(sender, instance, **kwargs):
+    schedule_fase_dashboard_refresh_on_commit(getattr(instance, "competicio_id", None))
+
+
+@receiver(post_save, sender=ProgramUnit)
+@receiver(post_delete, sender=ProgramUnit)
+@receiver(post_save, sender=FasePartitionState)
+@receiver(post_delete, sender=FasePartitionState)
+def _phase_units_changed_refresh_dashboard(sender, instance, **kwargs):
+    # en un esborrat en cascada la fase ja no hi es: el senyal de la fase ja ho cobreix
+    schedule_fase_dashboard_refresh_on_commit(
+        CompeticioAparellFase.objects.filter(pk=instance.fase_id).values_list("competicio_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=RotacioAssignacioProgramUnit)
+@receiver(post_delete, sender=RotacioAssignacioProgramUnit)
+def _unit_programming_changed_refresh_dashboard(sender, instance, **kwargs):
+    schedule_fase_dashboard_refresh_on_commit(
+        RotacioAssignacio.objects.filter(pk=instance.assignacio_id).values_list("competicio_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Inscripcio)
+@receiver(post_delete, sender=Inscripcio)
+@receiver(post_save, sender=CompeticioAparell)
+@receiver(post_delete, sender=CompeticioAparell)
+@receiver(post_save, sender=CompeticioAparellFase)
+@receiver(post_delete, sender=CompeticioAparellFase)
+@receiver(post_save, sender=RotacioEstacio)
+@receiver(post_delete, sender=RotacioEstacio)
+@receiver(post_save, sender=RotacioFranja)
+@receiver(post_delete, sender=RotacioFranja)
+@receiver(post_save, sender=RotacioAssignacio)
+@receiver(post_delete, sender=RotacioAssignacio)
+def _export_inputs_changed_invalidate_artifacts(sender, instance, **kwargs):
+    _invalidate_exports_on_commit(getattr(instance, "competicio_id", None))
+
+
+@receiver(post_save, sender=RotacioAssignacioGrup)
+@receiver(post_delete, sender=RotacioAssignacioGrup)
+@receiver(post_save, sender=RotacioAssignacioSerieEquip)
+@receiver(post_delete, sender=RotacioAssignacioSerieEquip)
+@receiver(post_save, sender=RotacioAssignacioProgramUnit)
+@receiver(post_delete, sender=RotacioAssignacioProgramUnit)
+def _rotacio_links_changed_invalidate_artifacts(sender, instance, **kwargs):
+    _invalidate_exports_on_commit(
+        RotacioAssignacio.objects.filter(pk=instance.assignacio_id).values_list("competicio_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=RotacioAssignacio)
+@receiver(post_delete, sender=RotacioAssignacio)
+def _rotacio_cell_changed_mark_validation(sender, instance, **kwargs):
+    mark_rotacions_franges_dirty(instance.competicio_id, [instance.franja_id])
+
+
+@receiver(post_save, sender=RotacioAssignacioGrup)
+@receiver(post_delete, sender=RotacioAssignacioGrup)
+@receiver(post_save, sender=RotacioAssignacioSerieEquip)
+@receiver(post_delete, sender=RotacioAssignacioSerieEquip)
+@receiver(post_save, sender=RotacioAssignacioProgramUnit)
+@receiver(post_delete, sender=RotacioAssignacioProgramUnit)
+def _rotacio_links_changed_mark_validation(sender, instance, **kwargs):
+    # en un esborrat en cascada de la cel.la, el senyal de RotacioAssignacio ja ho cobreix
+    row = RotacioAssignacio.objects.filter(pk=instance.assignacio_id).values_list("competicio_id", "franja_id").first()
+    if row is not None:
+        mark_rotacions_franges_dirty(row[0], [row[1]])
+
+
+@receiver(post_save, sender=Competicio)
+def _competicio_saved_invalidate_classificacio_plans(sender, instance, **kwargs):
+    # columnes d'inscripcions (camps de particio/filtre) i dades de la competicio
+    invalidate_classificacions_structure(instance.pk)
+    _invalidate_exports_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=ScoringSchema)
+@receiver(post_delete, sender=ScoringSchema)
+def _scoring_schema_changed_invalidate_classificacio_plans(sender, instance, **kwargs):
+    if getattr(instance, "comp_aparell_id", None):
+        invalidate_classificacions_structure(getattr(getattr(instance, "comp_aparell", None), "competicio_id", None))
+    else:
+        clear_classificacio_plan_cache()
+
+
 @receiver(post_delete, sender=InscripcioMedia)
 def _inscripcio_media_deleted_cleanup_file(sender, instance, **kwargs):
     _delete_file_on_commit(getattr(instance, "fitxer", None))
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task
+
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, queue="heavy_queue")
+def build_excel_export_task(self, kind: str, competicio_id: int, params: dict) -> str:
+    from .models import Competicio
+    from .services.shared.excel_export import ExcelExportError, write_export_artifact
+
+    competicio = Competicio.objects.get(pk=competicio_id)
+    try:
+        return write_export_artifact(kind, competicio, params)
+    except ExcelExportError as exc:
+        # l'error queda desat al costat de l'artefacte i la vista el retorna
+        logger.info("exportacio %s de la competicio %s no generada: %s", kind, competicio_id, exc)
+        return ""
+
+
+@shared_task(bind=True, queue="heavy_queue")
+def ingest_judge_video_task(self, model_label: str, video_id: int, file_name: str) -> str:
+    from .services.scoring.video_ingest import ingest_judge_video
+
+    return ingest_judge_video(model_label, video_id, file_name)
+
+
+@shared_task(bind=True, queue="heavy_queue")
+def refresh_fase_dashboard_task(self, competicio_id: int) -> int | None:
+    from .models import Competicio
+    from .services.fases.dashboard import refresh_phase_dashboard_snapshot
+
+    competicio = Competicio.objects.filter(pk=competicio_id).first()
+    if competicio is None:
+        return None
+    return refresh_phase_dashboard_snapshot(competicio).revision
@@ -20,7 +20,12 @@ from openpyxl import load_workbook
 from ceeb_web.auth_groups import GLOBAL_AUTH_GROUPS
 
 from ... import live_cache
-from ...access import user_has_competicio_capability
+from ...access import (
+    COMPETICIO_ROLE_CAPABILITIES,
+    capability_versions,
+    resolve_competicio_capabilities,
+    user_has_competicio_capability,
+)
 from ...forms import CompeticioAparellForm
 from ...models import (
     Competicio,
@@ -202,6 +207,70 @@ class CompetitionAccessControlTests(_BaseTrampoliDataMixin, TestCase):
             )
         )
 
+    def test_capability_checks_resolve_membership_once_per_request(self):
+        User = get_user_model()
+        user = User.objects.get(pk=self.readonly_user.pk)
+
+        with self.assertNumQueries(2):
+            for capability in ("competition.view", "scoring.view", "scoring.edit", "rotacions.view"):
+                user_has_competicio_capability(user, self.comp, capability)
+
+        self.assertEqual(
+            resolve_competicio_capabilities(user, self.comp),
+            frozenset(COMPETICIO_ROLE_CAPABILITIES[CompeticioMembership.Role.READONLY]),
+        )
+
+    def test_capability_cache_is_invalidated_when_membership_changes(self):
+        User = get_user_model()
+        self.assertFalse(user_has_competicio_capability(self.readonly_user, self.comp, "scoring.edit"))
+
+        membership = CompeticioMembership.objects.get(user=self.readonly_user, competicio=self.comp)
+        membership.role = CompeticioMembership.Role.SCORING
+        membership.save(update_fields=["role"])
+        self.assertTrue(user_has_competicio_capability(self.readonly_user, self.comp, "scoring.edit"))
+        self.assertTrue(
+            user_has_competicio_capability(User.objects.get(pk=self.readonly_user.pk), self.comp, "scoring.edit")
+        )
+
+        membership.delete()
+        self.assertFalse(user_has_competicio_capability(self.readonly_user, self.comp, "competition.view"))
+
+        self.readonly_user.groups.add(Group.objects.get(name="platform_admin"))
+        self.assertTrue(user_has_competicio_capability(self.readonly_user, self.comp, "scoring.edit"))
+
+    def test_capability_revocation_from_another_worker_reaches_the_process_cache(self):
+        User = get_user_model()
+        shared = {}
+        fake_redis = SimpleNamespace(
+            get=lambda key: shared.get(key),
+            incr=lambda key: shared.__setitem__(key, str(int(shared.get(key) or 0) + 1)),
+        )
+        with patch(
+            "competicions_trampoli.services.shared.competicio_versions._shared_redis",
+            return_value=fake_redis,
+        ):
+            self.assertTrue(
+                user_has_competicio_capability(User.objects.get(pk=self.readonly_user.pk), self.comp, "competition.view")
+            )
+            # Un altre worker revoca l'acces: aquest proces nomes ho veu per la versio compartida.
+            CompeticioMembership.objects.filter(user=self.readonly_user, competicio=self.comp).update(is_active=False)
+            self.assertTrue(
+                user_has_competicio_capability(User.objects.get(pk=self.readonly_user.pk), self.comp, "competition.view")
+            )
+            fake_redis.incr(capability_versions.key(1))
+            self.assertFalse(
+                user_has_competicio_capability(User.objects.get(pk=self.readonly_user.pk), self.comp, "competition.view")
+            )
+
+    def test_last_login_saves_do_not_invalidate_capabilities(self):
+        version = capability_versions.local(1)
+        self.readonly_user.last_login = timezone.now()
+        self.readonly_user.save(update_fields=["last_login"])
+        self.assertEqual(capability_versions.local(1), version)
+
+        self.readonly_user.save(update_fields=["last_login", "is_active"])
+        self.assertGreater(capability_versions.local(1), version)
+
     def test_global_competitions_manager_can_access_global_competitions_pages(self):
         url = reverse("competicions_home")
         self.client.force_login(self.manager_user)
@@ -2,7 +2,7 @@ from decimal import Decimal
 
 from django.test import TestCase
 
-from ...models.competicio import Aparell, EquipContext
+from ...models.competicio import Aparell, EquipContext, InscripcioAparellExclusio, InscripcioBaixa
 from ...models.scoring import ScoreEntry, TeamCompetitiveSubject, TeamScoreEntry
 from ...services.classificacions.engine.loaders import load_engine_orm_data
 from ..base import _BaseTrampoliDataMixin
@@ -76,7 +76,7 @@ class EngineLoadersTests(_BaseTrampoliDataMixin, TestCase):
         )
 
         self.assertEqual([app.id for app in data.aparells], [comp_app_a.id, comp_app_b.id])
-        self.assertEqual(set(data.all_ins_by_id), {ins_a.id, ins_b.id})
+        self.assertEqual(set(data.all_ins_by_id), {ins_a.id})
         self.assertEqual(set(data.ins_by_id), {ins_a.id})
         self.assertEqual(len(data.notes), 3)
         self.assertEqual(sorted(data.notes_by_app), [comp_app_a.id, comp_app_b.id])
@@ -89,6 +89,58 @@ class EngineLoadersTests(_BaseTrampoliDataMixin, TestCase):
         self.assertEqual(data.team_notes_by_key, {})
         self.assertEqual(dict(data.team_ids_by_app), {})
 
+    def test_load_engine_orm_data_pushes_filters_and_admission_to_sql(self):
+        app_a = self._create_aparell("PUSH_A", "Push A")
+        app_b = self._create_aparell("PUSH_B", "Push B")
+        comp_app_a = self._create_comp_aparell(self.comp, app_a, ordre=1, actiu=True)
+        comp_app_b = self._create_comp_aparell(self.comp, app_b, ordre=2, actiu=True)
+
+        ins_spaced = self._create_inscripcio(self.comp, "Senior espais", ordre=1)
+        ins_baixa = self._create_inscripcio(self.comp, "Senior baixa", ordre=2)
+        ins_excluded = self._create_inscripcio(self.comp, "Senior exclos", ordre=3)
+        ins_partial = self._create_inscripcio(self.comp, "Senior parcial", ordre=4)
+        ins_other = self._create_inscripcio(self.comp, "Junior", ordre=5)
+        for ins, categoria in (
+            (ins_spaced, "  SENIOR   Elit "),
+            (ins_baixa, "Senior Elit"),
+            (ins_excluded, "senior elit"),
+            (ins_partial, "Senior Elit"),
+            (ins_other, "Junior"),
+        ):
+            ins.categoria = categoria
+            ins.save(update_fields=["categoria"])
+        InscripcioBaixa.objects.create(competicio=self.comp, inscripcio=ins_baixa, motiu="Lesio")
+        InscripcioAparellExclusio.objects.create(inscripcio=ins_excluded, comp_aparell=comp_app_a)
+        InscripcioAparellExclusio.objects.create(inscripcio=ins_excluded, comp_aparell=comp_app_b)
+        InscripcioAparellExclusio.objects.create(inscripcio=ins_partial, comp_aparell=comp_app_b)
+        for ins in (ins_spaced, ins_partial):
+            for comp_app in (comp_app_a, comp_app_b):
+                ScoreEntry.objects.create(
+                    competicio=self.comp,
+                    inscripcio=ins,
+                    comp_aparell=comp_app,
+                    exercici=1,
+                    total=Decimal("10.000"),
+                )
+
+        data = load_engine_orm_data(
+            self.comp,
+            punt={"aparells": {"mode": "tots"}},
+            tipus="individual",
+            filtres={"categories_in": ["senior elit"]},
+        )
+
+        self.assertEqual([ins.id for ins in data.ins_list], [ins_spaced.id, ins_partial.id])
+        self.assertEqual(set(data.all_ins_by_id), {ins_spaced.id, ins_partial.id})
+        self.assertEqual(
+            set(data.notes_by_key),
+            {
+                (ins_spaced.id, comp_app_a.id, 1),
+                (ins_spaced.id, comp_app_b.id, 1),
+                (ins_partial.id, comp_app_a.id, 1),
+            },
+        )
+
     def test_load_engine_orm_data_builds_native_team_indexes_filtered_by_context(self):
         team_app = self._create_aparell("TEAM_LOAD", "Team Load")
         team_app.competition_unit = Aparell.CompetitionUnit.TEAM
@@ -1,5 +1,7 @@
 import json
+import os
 import re
+import tempfile
 from io import BytesIO, StringIO
 from datetime import date, timedelta
 from types import SimpleNamespace
@@ -12,7 +14,7 @@ from django.core.management import call_command
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.models import Max
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import Resolver404, resolve, reverse
 from django.utils import timezone
 from openpyxl import load_workbook
@@ -91,6 +93,7 @@ from ...services.classificacions.builder import (
 )
 from ...services.classificacions.compute import DEFAULT_SCHEMA, compute_classificacio
 from ...services.classificacions.export import _normalize_excel_cell
+from ...services.shared.excel_export import export_artifact_path, write_export_artifact
 from ...services.classificacions.partitions import normalize_schema_legacy_team_birth_partition
 from ...services.classificacions.validation import (
     build_metric_meta_for_comp_aparell as _build_metric_meta_for_comp_aparell,
@@ -264,7 +267,7 @@ class ClassificacionsExportExcelTests(_BaseTrampoliDataMixin, TestCase):
             res["Content-Type"],
         )
 
-        wb = load_workbook(filename=BytesIO(res.content))
+        wb = load_workbook(filename=BytesIO(res.getvalue()))
         self.assertEqual(len(wb.sheetnames), 2)
 
         ws_general = wb[wb.sheetnames[0]]
@@ -290,7 +293,7 @@ class ClassificacionsExportExcelTests(_BaseTrampoliDataMixin, TestCase):
         res = self.client.get(url, {"cfg_id": self.cfg_particions.id})
 
         self.assertEqual(res.status_code, 200)
-        wb = load_workbook(filename=BytesIO(res.content))
+        wb = load_workbook(filename=BytesIO(res.getvalue()))
         self.assertEqual(len(wb.sheetnames), 1)
         ws = wb[wb.sheetnames[0]]
         self.assertIn("Per categories", str(ws["A1"].value))
@@ -301,6 +304,101 @@ class ClassificacionsExportExcelTests(_BaseTrampoliDataMixin, TestCase):
         res = self.client.get(url, {"cfg_id": "abc"})
         self.assertEqual(res.status_code, 400)
 
+    def test_export_excel_is_streamed_from_write_only_workbook(self):
+        self.client.force_login(self.user)
+        url = reverse("classificacions_live_export_excel", kwargs={"pk": self.comp.id})
+        res = self.client.get(url, {"cfg_id": self.cfg_general.id})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        self.assertIn("attachment;", res["Content-Disposition"])
+        ws = load_workbook(filename=BytesIO(res.getvalue())).active
+        self.assertEqual(ws.freeze_panes, "A6")
+        self.assertIn("A1:", " ".join(str(r) for r in ws.merged_cells.ranges))
+
+    def test_large_export_is_built_in_background_and_served_from_artifact(self):
+        self.client.force_login(self.user)
+        url = reverse("classificacions_live_export_excel", kwargs={"pk": self.comp.id})
+        with tempfile.TemporaryDirectory() as tmp, override_settings(
+            MEDIA_ROOT=os.path.join(tmp, "media"),
+            EXCEL_EXPORT_ASYNC_THRESHOLD_ROWS=1,
+        ):
+            with patch("competicions_trampoli.tasks.build_excel_export_task.apply_async") as enqueue:
+                pending = self.client.get(url)
+                again = self.client.get(url)
+
+            self.assertEqual(pending.status_code, 202)
+            self.assertEqual(again.status_code, 202)
+            self.assertEqual(enqueue.call_count, 1)
+            kind, comp_id, params = enqueue.call_args.kwargs["args"]
+            self.assertEqual((kind, comp_id, params), ("classificacions", self.comp.id, {"cfg_id": None}))
+
+            legacy_dir = os.path.join(tmp, "media", "_exports")
+            os.makedirs(legacy_dir)
+            path = write_export_artifact(kind, self.comp, params)
+            # dades de participants: fora de MEDIA_ROOT, i les antigues s'esborren
+            self.assertTrue(path.startswith(os.path.join(tmp, "excel_exports") + os.sep))
+            self.assertFalse(os.path.exists(legacy_dir))
+            with patch("competicions_trampoli.views.classificacions.export.execute_classificacio_runtime") as runtime:
+                res = self.client.get(url)
+            runtime.assert_not_called()
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(len(load_workbook(filename=BytesIO(res.getvalue())).sheetnames), 2)
+            res.close()
+
+    def test_background_artifact_is_not_served_after_the_data_changes(self):
+        self.client.force_login(self.user)
+        url = reverse("classificacions_live_export_excel", kwargs={"pk": self.comp.id})
+        params = {"cfg_id": None}
+        with tempfile.TemporaryDirectory() as tmp, override_settings(
+            MEDIA_ROOT=os.path.join(tmp, "media"),
+            EXCEL_EXPORT_ASYNC_THRESHOLD_ROWS=1,
+        ):
+            old_path = write_export_artifact("classificacions", self.comp, params)
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.ins_a.nom_i_cognoms = "Participant A2"
+                self.ins_a.save()
+
+            self.assertNotEqual(export_artifact_path("classificacions", self.comp.id, params), old_path)
+            self.assertFalse(os.path.exists(old_path))
+            with patch("competicions_trampoli.tasks.build_excel_export_task.apply_async") as enqueue:
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, 202)
+            enqueue.assert_called_once()
+
+    def test_background_failure_is_reported_instead_of_requeued(self):
+        self.client.force_login(self.user)
+        url = reverse("classificacions_live_export_excel", kwargs={"pk": self.comp.id})
+        params = {"cfg_id": None}
+        with tempfile.TemporaryDirectory() as tmp, override_settings(
+            MEDIA_ROOT=os.path.join(tmp, "media"),
+            EXCEL_EXPORT_ASYNC_THRESHOLD_ROWS=1,
+        ):
+            with patch(
+                "competicions_trampoli.services.shared.excel_export.build_excel_export",
+                side_effect=RuntimeError("bd caiguda"),
+            ):
+                with self.assertRaises(RuntimeError):
+                    write_export_artifact("classificacions", self.comp, params)
+
+            with patch("competicions_trampoli.tasks.build_excel_export_task.apply_async") as enqueue:
+                res = self.client.get(url)
+            enqueue.assert_not_called()
+            self.assertEqual(res.status_code, 500)
+            self.assertIn("No s'ha pogut generar l'exportacio", res.content.decode("utf-8"))
+
+            # un worker mort (sense marcador) tambe s'acaba reportant
+            pending_path = export_artifact_path("classificacions", self.comp.id, params) + ".pending"
+            with open(pending_path, "w", encoding="utf-8") as f:
+                f.write("2")
+            os.utime(pending_path, (0, 0))
+            with patch("competicions_trampoli.tasks.build_excel_export_task.apply_async") as enqueue:
+                res = self.client.get(url)
+            enqueue.assert_not_called()
+            self.assertEqual(res.status_code, 500)
+
     def test_export_excel_returns_consistent_error_when_compute_fails(self):
         self.client.force_login(self.user)
         url = reverse("classificacions_live_export_excel", kwargs={"pk": self.comp.id})
@@ -380,7 +478,7 @@ class ClassificacionsExportExcelTests(_BaseTrampoliDataMixin, TestCase):
         res = self._export_with_runtime(self.cfg_general, runtime)
         self.assertEqual(res.status_code, 200)
 
-        wb = load_workbook(filename=BytesIO(res.content))
+        wb = load_workbook(filename=BytesIO(res.getvalue()))
         ws = wb[wb.sheetnames[0]]
 
         self.assertEqual(ws.freeze_panes, "A8")
@@ -462,7 +560,7 @@ class ClassificacionsExportExcelTests(_BaseTrampoliDataMixin, TestCase):
         res = self._export_with_runtime(cfg, runtime)
         self.assertEqual(res.status_code, 200)
 
-        wb = load_workbook(filename=BytesIO(res.content))
+        wb = load_workbook(filename=BytesIO(res.getvalue()))
         ws = wb[wb.sheetnames[0]]
         merged = {str(rng) for rng in ws.merged_cells.ranges}
 
@@ -556,7 +654,7 @@ class ClassificacionsExportExcelTests(_BaseTrampoliDataMixin, TestCase):
         res = self._export_with_runtime(cfg, runtime)
         self.assertEqual(res.status_code, 200)
 
-        wb = load_workbook(filename=BytesIO(res.content))
+        wb = load_workbook(filename=BytesIO(res.getvalue()))
         ws = wb[wb.sheetnames[0]]
         merged = {str(rng) for rng in ws.merged_cells.ranges}
 
@@ -678,7 +776,7 @@ class ClassificacionsExportExcelTests(_BaseTrampoliDataMixin, TestCase):
         res = self._export_with_runtime(cfg, runtime)
         self.assertEqual(res.status_code, 200)
 
-        wb = load_workbook(filename=BytesIO(res.content))
+        wb = load_workbook(filename=BytesIO(res.getvalue()))
         ws = wb[wb.sheetnames[0]]
 
         self.assertEqual(ws["C5"].value, "Metriques 1")
@@ -758,7 +856,7 @@ class ClassificacionsExportExcelTests(_BaseTrampoliDataMixin, TestCase):
         res = self._export_with_runtime(cfg, runtime)
         self.assertEqual(res.status_code, 200)
 
-        wb = load_workbook(filename=BytesIO(res.content))
+        wb = load_workbook(filename=BytesIO(res.getvalue()))
         ws = wb[wb.sheetnames[0]]
         merged = {str(rng) for rng in ws.merged_cells.ranges}
 
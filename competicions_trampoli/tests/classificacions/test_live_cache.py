@@ -91,13 +91,16 @@ from ...services.classificacions.builder import (
 )
 from ...services.classificacions.compute import DEFAULT_SCHEMA, compute_classificacio
 from ...services.classificacions.export import _normalize_excel_cell
+from ...services.classificacions.live import build_live_cfg_payload_row
 from ...services.classificacions.live_menu import normalize_live_menu_items
+from ...services.classificacions.plan_cache import clear_classificacio_plan_cache
 from ...services.classificacions.partitions import normalize_schema_legacy_team_birth_partition
 from ...services.classificacions.validation import (
     build_metric_meta_for_comp_aparell as _build_metric_meta_for_comp_aparell,
     build_scoreable_meta_for_schema as _build_scoreable_meta_for_schema,
     validate_particions_schema as _validate_particions_schema,
     validate_schema_for_competicio as _validate_schema_for_competicio,
+    validate_schema_for_competicio_detailed as _validate_schema_for_competicio_detailed,
 )
 from ...views.classificacions.builder import ClassificacionsHome
 from ...services.shared.competition_groups import (
@@ -776,3 +779,39 @@ class LiveClassificacionsRedisCacheTests(_BaseTrampoliDataMixin, TestCase):
                 {"type": "classificacio", "cfg_id": self.cfg.id},
             ],
         )
+
+    def _count_live_validations(self, steps):
+        clear_classificacio_plan_cache()
+        self.addCleanup(clear_classificacio_plan_cache)
+        counts = []
+        with patch(
+            "competicions_trampoli.services.classificacions.runtime.validate_schema_for_competicio_detailed",
+            wraps=_validate_schema_for_competicio_detailed,
+        ) as mocked_validate:
+            for step in steps:
+                step()
+                payload = build_live_cfg_payload_row(self.comp, ClassificacioConfig.objects.get(pk=self.cfg.pk))
+                self.assertNotIn("error", payload)
+                counts.append(mocked_validate.call_count)
+        return counts, payload
+
+    def test_live_rebuild_reuses_compiled_plan_until_config_changes(self):
+        def _edit_schema():
+            schema = self._schema()
+            schema["puntuacio"]["ordre"] = "asc"
+            self.cfg.schema = schema
+            self.cfg.save()
+
+        counts, payload = self._count_live_validations([lambda: None, lambda: None, _edit_schema])
+
+        self.assertEqual(counts, [1, 1, 2])
+        self.assertEqual(payload["parts"][0]["rows"][0]["inscripcio_id"], self.ins.id)
+
+    def test_live_rebuild_recompiles_plan_after_structure_change(self):
+        def _edit_comp_app():
+            self.comp_app.nom_local = "Llit"
+            self.comp_app.save()
+
+        counts, _payload = self._count_live_validations([lambda: None, _edit_comp_app, lambda: None])
+
+        self.assertEqual(counts, [1, 2, 2])
@@ -0,0 +1,174 @@
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ...models import CompeticioMembership, Inscripcio
+from ...models.competicio import CompeticioAparellFase, FaseDashboardSnapshot
+from ...models.scoring import ScoreEntry
+from ...services.fases import dashboard
+from ...services.fases.dashboard import phase_dashboard_context, refresh_phase_dashboard_snapshot
+from ...services.fases.dashboard_snapshot import (
+    clear_fase_dashboard_schedule,
+    schedule_fase_dashboard_refresh,
+    store_fase_dashboard_payload,
+)
+from ...services.fases.program_units import create_program_unit_with_empty_slots
+from ..base import _BaseTrampoliDataMixin
+
+
+ENQUEUE = "competicions_trampoli.tasks.refresh_fase_dashboard_task.apply_async"
+
+
+class FaseDashboardSnapshotTests(_BaseTrampoliDataMixin, TestCase):
+    def setUp(self):
+        clear_fase_dashboard_schedule()
+        self.competicio = self._create_competicio("Tauler fases")
+        self.user = self._login_competicio_user(
+            self.competicio,
+            role=CompeticioMembership.Role.OWNER,
+            username_prefix="fases_snapshot_owner",
+        )
+        self.app_a = self._create_comp_aparell(self.competicio, self._create_aparell("SNAP_A", "Trampoli"), ordre=1)
+        self.app_b = self._create_comp_aparell(self.competicio, self._create_aparell("SNAP_B", "Doble"), ordre=2)
+        self.phase_a = self._create_phase(self.app_a, "Final A")
+        self.phase_b = self._create_phase(self.app_b, "Final B")
+        create_program_unit_with_empty_slots(fase=self.phase_a, nom="Grup A1", capacity=3)
+        create_program_unit_with_empty_slots(fase=self.phase_b, nom="Grup B1", capacity=3)
+        create_program_unit_with_empty_slots(fase=self.phase_b, nom="Grup B2", capacity=3)
+
+    def tearDown(self):
+        clear_fase_dashboard_schedule()
+
+    def _create_phase(self, comp_aparell, nom, config=None):
+        return CompeticioAparellFase.objects.create(
+            competicio=self.competicio,
+            comp_aparell=comp_aparell,
+            nom=nom,
+            codi=nom.upper().replace(" ", "_"),
+            ordre=2,
+            config=config or {},
+        )
+
+    def _summaries(self, context):
+        return {
+            int(item["app"].id): {key: value for key, value in item.items() if key != "app"}
+            for item in context["app_summaries"]
+        }
+
+    def test_refresh_bumps_the_revision_only_when_the_content_changes(self):
+        snapshot = refresh_phase_dashboard_snapshot(self.competicio)
+        self.assertEqual(snapshot.revision, 1)
+        self.assertEqual(snapshot.payload["apps"][str(self.app_b.id)]["unit_count"], 2)
+        self.assertEqual(snapshot.payload["phases"][str(self.phase_a.id)]["alerts"], ["Snapshot pendent", "Programacio pendent"])
+
+        self.assertEqual(refresh_phase_dashboard_snapshot(self.competicio).revision, 1)
+
+        create_program_unit_with_empty_slots(fase=self.phase_a, nom="Grup A2", capacity=3)
+        snapshot = refresh_phase_dashboard_snapshot(self.competicio)
+        self.assertEqual(snapshot.revision, 2)
+        self.assertEqual(snapshot.payload["apps"][str(self.app_a.id)]["unit_count"], 2)
+
+    def test_other_apps_are_served_from_the_snapshot(self):
+        live = phase_dashboard_context(self.competicio, selected_app_id=self.app_a.id)
+        self.assertIsNone(live["dashboard_revision"])
+        snapshot = refresh_phase_dashboard_snapshot(self.competicio)
+
+        with patch.object(dashboard, "_phases_for_comp_aparell", wraps=dashboard._phases_for_comp_aparell) as load_mock:
+            context = phase_dashboard_context(self.competicio, selected_app_id=self.app_a.id)
+
+        self.assertEqual(load_mock.call_count, 1)
+        self.assertEqual(load_mock.call_args.args[0], self.app_a)
+        self.assertEqual(self._summaries(context), self._summaries(live))
+        self.assertEqual(context["total_unit_count"], 3)
+        self.assertEqual(context["dashboard_revision"], snapshot.revision)
+        self.assertEqual([phase.id for phase in context["phases"]], [self.phase_a.id])
+
+    def test_qualification_flags_are_reused_until_the_phase_state_changes(self):
+        self.phase_a.config = {"qualification": {"snapshot_hash": "abc", "run_id": 7}}
+        self.phase_a.save(update_fields=["config"])
+        with patch.object(dashboard, "qualification_is_stale", Mock(return_value=True)), patch.object(
+            dashboard, "qualification_source_changed", Mock(return_value=False)
+        ):
+            refresh_phase_dashboard_snapshot(self.competicio)
+
+        failing = Mock(side_effect=AssertionError("no s'ha de recalcular"))
+        with patch.object(dashboard, "qualification_is_stale", failing):
+            context = phase_dashboard_context(self.competicio, selected_app_id=self.app_a.id)
+        phase = context["phases"][0]
+        self.assertTrue(phase.ui_qualification_stale)
+        self.assertTrue(phase.ui_qualification_manual_pending)
+        self.assertIn("Snapshot pendent de validar", phase.ui_phase_alerts)
+
+        self.phase_a.config = {"qualification": {"snapshot_hash": "def", "run_id": 8}}
+        self.phase_a.save(update_fields=["config"])
+        live_check = Mock(return_value=False)
+        with patch.object(dashboard, "qualification_is_stale", live_check), patch.object(
+            dashboard, "qualification_source_changed", Mock(return_value=False)
+        ):
+            context = phase_dashboard_context(self.competicio, selected_app_id=self.app_a.id)
+        live_check.assert_called_once()
+        self.assertFalse(context["phases"][0].ui_qualification_stale)
+
+    def test_snapshot_dirty_beyond_the_grace_period_is_ignored(self):
+        refresh_phase_dashboard_snapshot(self.competicio)
+        FaseDashboardSnapshot.objects.filter(competicio=self.competicio).update(
+            dirty_since=timezone.now() - timedelta(minutes=5),
+        )
+        with patch.object(dashboard, "_phases_for_comp_aparell", wraps=dashboard._phases_for_comp_aparell) as load_mock:
+            context = phase_dashboard_context(self.competicio, selected_app_id=self.app_a.id)
+        self.assertEqual(load_mock.call_count, 2)
+        self.assertIsNone(context["dashboard_revision"])
+
+    def test_refresh_scheduling_is_debounced_and_keeps_only_opened_dashboards(self):
+        with patch(ENQUEUE) as enqueue:
+            self.assertFalse(schedule_fase_dashboard_refresh(self.competicio.id))
+            self.assertTrue(schedule_fase_dashboard_refresh(self.competicio.id, create=True))
+            self.assertFalse(schedule_fase_dashboard_refresh(self.competicio.id, create=True))
+        enqueue.assert_called_once()
+        self.assertEqual(enqueue.call_args.kwargs["args"], [self.competicio.id])
+
+        started_at = timezone.now()
+        snapshot = refresh_phase_dashboard_snapshot(self.competicio)
+        clear_fase_dashboard_schedule()
+        with patch(ENQUEUE) as enqueue:
+            self.assertTrue(schedule_fase_dashboard_refresh(self.competicio.id))
+        enqueue.assert_called_once()
+        snapshot.refresh_from_db()
+        self.assertIsNotNone(snapshot.dirty_since)
+
+        # un canvi posterior a l'inici del calcul no es perd
+        snapshot = store_fase_dashboard_payload(self.competicio, snapshot.payload, started_at=started_at)
+        self.assertIsNotNone(snapshot.dirty_since)
+        snapshot = store_fase_dashboard_payload(self.competicio, snapshot.payload, started_at=timezone.now())
+        self.assertIsNone(snapshot.dirty_since)
+
+    def test_score_save_schedules_a_refresh_after_commit(self):
+        refresh_phase_dashboard_snapshot(self.competicio)
+        inscripcio = Inscripcio.objects.create(competicio=self.competicio, nom_i_cognoms="Anna")
+        with patch("competicions_trampoli.signals.mark_live_dirty"), patch(ENQUEUE) as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                ScoreEntry.objects.create(
+                    competicio=self.competicio,
+                    inscripcio=inscripcio,
+                    exercici=1,
+                    comp_aparell=self.app_a,
+                    inputs={},
+                    outputs={},
+                    total=8.2,
+                )
+        enqueue.assert_called_once()
+        self.assertTrue(
+            FaseDashboardSnapshot.objects.filter(competicio=self.competicio, dirty_since__isnull=False).exists()
+        )
+
+    def test_revision_endpoint_reports_the_current_revision(self):
+        url = reverse("trampoli_fases_revision", kwargs={"pk": self.competicio.id})
+        self.assertEqual(self.client.get(url).json()["revision"], None)
+
+        refresh_phase_dashboard_snapshot(self.competicio)
+        data = self.client.get(url).json()
+        self.assertEqual(data["revision"], 1)
+        self.assertFalse(data["dirty"])
@@ -0,0 +1,122 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from ..base import _BaseTrampoliDataMixin
+from ...models import Inscripcio, InscripcioExtraValue
+from ...services.inscripcions import queries
+from ...services.inscripcions.extra_values import rebuild_competicio_extra_values
+from ...services.inscripcions.queries import (
+    COLUMN_FILTER_EMPTY_TOKEN,
+    _build_inscripcions_filtered_qs,
+    _build_sort_records_queryset,
+    column_value_stats_from_db,
+)
+from ...views.inscripcions.sorting import _collect_sort_field_value_stats
+
+
+class InscripcioExtraValueFilterTests(_BaseTrampoliDataMixin, TestCase):
+    def setUp(self):
+        self.competicio = self._create_competicio("Filtres extra")
+        self.competicio.inscripcions_schema = {
+            "columns": [
+                {"code": "nivell", "label": "Nivell", "kind": "extra"},
+                {"code": "dorsal", "label": "Dorsal", "kind": "extra"},
+                {"code": "categoria", "label": "Categoria Excel", "kind": "extra"},
+            ]
+        }
+        self.competicio.save(update_fields=["inscripcions_schema"])
+        rows = [
+            ("Anna", "Club A", date(2012, 3, 1), {"nivell": "Alt", "dorsal": 7, "excel__categoria": "Nova"}),
+            ("Bernat", " Club A ", None, {"nivell": " alt ", "dorsal": 12.5, "categoria": "Antiga"}),
+            ("Carla", "Club B", date(2011, 5, 9), {"nivell": "", "dorsal": True}),
+            ("David", None, None, {"nivell": None, "excel__categoria": "", "categoria": "Antiga"}),
+            ("Emma", "", date(2012, 3, 1), {"dorsal": "7"}),
+            ("Ferran", "Club B", None, {"nivell": "Mig", "categoria": "Nova"}),
+        ]
+        self.inscripcions = [
+            Inscripcio.objects.create(
+                competicio=self.competicio,
+                nom_i_cognoms=nom,
+                entitat=entitat,
+                data_naixement=data_naixement,
+                ordre_sortida=idx,
+                extra=extra,
+            )
+            for idx, (nom, entitat, data_naixement, extra) in enumerate(rows, start=1)
+        ]
+
+    def _filtered_ids(self, column_filters):
+        qs = _build_inscripcions_filtered_qs(self.competicio, {"column_filters": column_filters})
+        return sorted(qs.values_list("id", flat=True))
+
+    def _python_filtered_ids(self, column_filters):
+        with patch.object(queries, "_apply_column_filter_db", return_value=None):
+            return self._filtered_ids(column_filters)
+
+    def test_projection_follows_saves(self):
+        anna = self.inscripcions[0]
+        self.assertEqual(
+            dict(InscripcioExtraValue.objects.filter(inscripcio=anna).values_list("code", "token")),
+            {"nivell": "Alt", "dorsal": "7", "excel__categoria": "Nova"},
+        )
+
+        anna.extra = {"nivell": "Baix"}
+        anna.save()
+        anna.ordre_sortida = 10
+        anna.save(update_fields=["ordre_sortida"])
+        self.assertEqual(
+            list(InscripcioExtraValue.objects.filter(inscripcio=anna).values_list("code", "token")),
+            [("nivell", "Baix")],
+        )
+
+        Inscripcio.objects.filter(pk=anna.pk).update(extra={"nivell": "Mig"})
+        rebuild_competicio_extra_values(self.competicio)
+        self.assertEqual(self._filtered_ids({"nivell": ["Mig"]}), sorted([anna.id, self.inscripcions[5].id]))
+
+    def test_column_filters_match_the_python_resolution(self):
+        cases = [
+            {"nivell": ["Alt"]},
+            {"nivell": ["alt", COLUMN_FILTER_EMPTY_TOKEN]},
+            {"nivell": [COLUMN_FILTER_EMPTY_TOKEN]},
+            {"dorsal": ["7", "True"]},
+            {"dorsal": ["12.5", COLUMN_FILTER_EMPTY_TOKEN]},
+            {"excel__categoria": ["Antiga"]},
+            {"excel__categoria": ["Nova", COLUMN_FILTER_EMPTY_TOKEN]},
+            {"entitat": ["Club A"]},
+            {"entitat": [COLUMN_FILTER_EMPTY_TOKEN]},
+            {"data_naixement": ["2012-03-01", "no-data"]},
+            {"ordre_sortida": ["2", "5"]},
+            {"entitat": ["Club B"], "nivell": ["Mig", COLUMN_FILTER_EMPTY_TOKEN]},
+        ]
+        for column_filters in cases:
+            with self.subTest(column_filters=column_filters):
+                self.assertEqual(self._filtered_ids(column_filters), self._python_filtered_ids(column_filters))
+
+    def test_extra_filter_is_resolved_without_loading_inscripcions(self):
+        with self.assertNumQueries(0):
+            qs = _build_inscripcions_filtered_qs(self.competicio, {"column_filters": {"nivell": ["Alt"]}})
+        with self.assertNumQueries(1):
+            self.assertEqual(list(qs.values_list("nom_i_cognoms", flat=True)), ["Anna"])
+
+    def test_value_stats_match_the_python_resolution(self):
+        qs = Inscripcio.objects.filter(competicio=self.competicio)
+        for code in ("nivell", "dorsal", "entitat", "data_naixement"):
+            with self.subTest(code=code):
+                stats, empty_count = column_value_stats_from_db(qs, code)
+                records = list(_build_sort_records_queryset(qs, [code]))
+                expected = _collect_sort_field_value_stats(records, code)
+                self.assertEqual(stats, expected)
+                self.assertEqual(empty_count, len(records) - sum(row["count"] for row in expected.values()))
+        self.assertIsNone(column_value_stats_from_db(qs, "grup"))
+        self.assertIsNone(column_value_stats_from_db(qs, "excel__categoria"))
+
+    def test_projection_handles_bools_and_long_values(self):
+        carla = self.inscripcions[2]
+        self.assertIsNone(InscripcioExtraValue.objects.get(inscripcio=carla, code="dorsal").sort_number)
+        self.assertEqual(InscripcioExtraValue.objects.get(inscripcio=self.inscripcions[0], code="dorsal").sort_number, 7.0)
+
+        carla.extra = {"nivell": "x" * 10000}
+        carla.save()
+        self.assertEqual(self._filtered_ids({"nivell": ["x" * 10000]}), [carla.id])
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..base import _BaseTrampoliDataMixin
+from ...models import GrupCompeticio, Inscripcio
+from ...models.rotacions import (
+    RotacioAssignacio,
+    RotacioAssignacioGrup,
+    RotacioEstacio,
+    RotacioFranja,
+)
+from ...services.rotacions import validation
+from ...services.rotacions.validation import clear_rotacions_validation_cache, validate_rotacions_program
+from ...views.rotacions._shared import _sync_assignacio_groups
+
+
+class RotacionsProgramValidationTests(_BaseTrampoliDataMixin, TestCase):
+    def setUp(self):
+        clear_rotacions_validation_cache()
+        self.addCleanup(clear_rotacions_validation_cache)
+        self.competicio = self._create_competicio("Validacio rotacions")
+
+    def _validate_and_compare_with_cold_run(self):
+        result = validate_rotacions_program(self.competicio)
+        clear_rotacions_validation_cache()
+        self.assertEqual(result, validate_rotacions_program(self.competicio))
+        return result
+
+    def _build_program(self, n_estacions, n_franges, codi="VAL"):
+        """Programa ple: cada cel.la te un grup propi amb un participant."""
+        estacions = []
+        for idx in range(n_estacions):
+            aparell = self._create_aparell(f"{codi}{idx}", f"Aparell {idx}")
+            estacions.append(
+                RotacioEstacio.objects.create(
+                    competicio=self.competicio,
+                    tipus="aparell",
+                    comp_aparell=self._create_comp_aparell(self.competicio, aparell, ordre=idx + 1),
+                    ordre=idx + 1,
+                )
+            )
+        start = datetime(2026, 1, 1, 8, 0)
+        franges = RotacioFranja.objects.bulk_create([
+            RotacioFranja(
+                competicio=self.competicio,
+                hora_inici=(start + timedelta(minutes=5 * idx)).time(),
+                hora_fi=(start + timedelta(minutes=5 * idx + 5)).time(),
+                ordre=idx + 1,
+                ordre_visual=idx + 1,
+                titol=f"F{idx + 1}",
+            )
+            for idx in range(n_franges)
+        ])
+        groups = GrupCompeticio.objects.bulk_create([
+            GrupCompeticio(competicio=self.competicio, display_num=idx + 1, nom=f"Grup {idx + 1}")
+            for idx in range(n_estacions * n_franges)
+        ])
+        Inscripcio.objects.bulk_create([
+            Inscripcio(competicio=self.competicio, nom_i_cognoms=f"P{group.display_num}", grup_competicio=group)
+            for group in groups
+        ])
+        assignacions = RotacioAssignacio.objects.bulk_create([
+            RotacioAssignacio(competicio=self.competicio, franja=franja, estacio=estacio)
+            for franja in franges
+            for estacio in estacions
+        ])
+        RotacioAssignacioGrup.objects.bulk_create([
+            RotacioAssignacioGrup(assignacio=assignacio, grup=group, ordre=1)
+            for assignacio, group in zip(assignacions, groups)
+        ])
+        return estacions, franges, groups, assignacions
+
+    def test_reports_program_conflicts(self):
+        estacions, franges, groups, assignacions = self._build_program(2, 3)
+        descans = RotacioEstacio.objects.create(competicio=self.competicio, tipus="descans", ordre=9)
+        extra = GrupCompeticio.objects.create(competicio=self.competicio, display_num=99, nom="Grup pendent")
+        RotacioAssignacio.objects.filter(franja=franges[2]).delete()
+        RotacioAssignacioGrup.objects.create(assignacio=assignacions[1], grup=groups[0], ordre=2)
+        descans_cell = RotacioAssignacio.objects.create(competicio=self.competicio, franja=franges[1], estacio=descans)
+        RotacioAssignacioGrup.objects.create(assignacio=descans_cell, grup=extra, ordre=1)
+
+        result = validate_rotacions_program(self.competicio)
+
+        codes = [item["code"] for item in result["errors"]]
+        self.assertEqual(
+            codes,
+            ["simultaneous_subject", "incompatible_station", "duplicate_program_item_same_franja"],
+        )
+        self.assertEqual(result["errors"][1]["estacio_id"], descans.id)
+        self.assertEqual([item["code"] for item in result["warnings"]], ["empty_franja", "pending_program_items"])
+        self.assertEqual(result["warnings"][0]["franja_id"], franges[2].id)
+        self.assertIn("Queden 2 programables", result["warnings"][1]["message"])
+
+    def test_revalidation_reflects_edits_including_bulk_updates(self):
+        estacions, franges, groups, assignacions = self._build_program(3, 4)
+        self.assertEqual(validate_rotacions_program(self.competicio)["errors"], [])
+
+        # Moure un grup a una altra franja (duplicat entre franges).
+        RotacioAssignacioGrup.objects.create(assignacio=assignacions[5], grup=groups[0], ordre=2)
+        result = self._validate_and_compare_with_cold_run()
+        self.assertEqual([item["code"] for item in result["errors"]], ["duplicate_program_item"])
+
+        # Canvis d'estructura massius (sense senyals): estacio convertida en descans.
+        RotacioEstacio.objects.filter(pk=estacions[1].pk).update(tipus="descans", comp_aparell=None)
+        Inscripcio.objects.filter(grup_competicio=groups[3]).update(grup_competicio=groups[5])
+        result = self._validate_and_compare_with_cold_run()
+        self.assertIn("incompatible_station", [item["code"] for item in result["errors"]])
+
+        # Franja convertida en descans: deixa de comptar.
+        RotacioFranja.objects.filter(pk=franges[0].pk).update(tipus=RotacioFranja.TIPUS_BREAK)
+        result = self._validate_and_compare_with_cold_run()
+        self.assertNotIn(franges[0].id, {item["franja_id"] for item in result["errors"] + result["warnings"]})
+
+        # Esborrat massiu de cel.les (queryset.delete envia senyals per fila).
+        RotacioAssignacio.objects.filter(franja=franges[1]).delete()
+        result = self._validate_and_compare_with_cold_run()
+        self.assertIn(franges[1].id, {item["franja_id"] for item in result["warnings"]})
+
+    def test_revalidation_reads_and_rechecks_only_written_franges(self):
+        estacions, franges, groups, assignacions = self._build_program(10, 20)
+        validate_rotacions_program(self.competicio)
+
+        # El planner desa amb bulk_create/bulk_update, que no envien senyals.
+        target = assignacions[57]
+        _sync_assignacio_groups(target, [groups[57].id, groups[3].id], {group.id: group for group in groups})
+        with patch.object(validation, "_program_cells", wraps=validation._program_cells) as read_cells, \
+                patch.object(validation, "_check_franja_cells", wraps=validation._check_franja_cells) as check:
+            result = validate_rotacions_program(self.competicio)
+
+        read_cells.assert_called_once()
+        self.assertEqual(set(read_cells.call_args.args[1]), {target.franja_id})
+        self.assertEqual(check.call_count, 1)
+        self.assertEqual([item["code"] for item in result["errors"]], ["duplicate_program_item"])
+        clear_rotacions_validation_cache()
+        self.assertEqual(result, validate_rotacions_program(self.competicio))
+
+    def test_query_count_does_not_grow_with_the_program(self):
+        self._build_program(2, 3)
+        with CaptureQueriesContext(connection) as small_queries:
+            validate_rotacions_program(self.competicio)
+
+        self.competicio = self._create_competicio("Validacio rotacions gran")
+        estacions, franges, groups, assignacions = self._build_program(40, 200, codi="GRAN")
+        RotacioAssignacioGrup.objects.filter(assignacio=assignacions[4321]).update(grup=groups[4322])
+        with CaptureQueriesContext(connection) as large_queries:
+            result = validate_rotacions_program(self.competicio)
+
+        self.assertEqual(len(large_queries), len(small_queries))
+        self.assertEqual(
+            [item["code"] for item in result["errors"]],
+            ["simultaneous_subject", "duplicate_program_item_same_franja"],
+        )
@@ -299,7 +299,7 @@ class FranjaVisualOrderingTests(_BaseTrampoliDataMixin, TestCase):
         res = self.client.get(url, {"mode": "groups"})
         self.assertEqual(res.status_code, 200)
 
-        wb = load_workbook(filename=BytesIO(res.content))
+        wb = load_workbook(filename=BytesIO(res.getvalue()))
         ws = wb.active
         franja_rows = []
         for row_idx in range(1, ws.max_row + 1):
@@ -1,6 +1,8 @@
 import json
 from importlib import import_module
+import os
 import re
+import tempfile
 from io import BytesIO, StringIO
 from datetime import date, timedelta
 from types import SimpleNamespace
@@ -12,8 +14,9 @@ from django.contrib.sessions.backends.db import SessionStore
 from django.core.management import call_command
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import JsonResponse
 from django.db.models import Max
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import Resolver404, resolve, reverse
 from django.utils import timezone
 from openpyxl import load_workbook
@@ -36,6 +39,7 @@ from ....models.judging import (
     JudgeConversation,
     JudgeConversationMessage,
     JudgeDeviceToken,
+    JudgeVideoUpload,
     PublicLiveToken,
 )
 from ....models.classificacions import ClassificacioConfig, ClassificacioTemplateGlobal
@@ -67,6 +71,7 @@ from ....models.competicio import (
 from ....models import CompeticioMembership
 from ....scoring_engine import ScoringEngine
 from ....services.inscripcions.groups import renumber_groups_for_competicio
+from ....services.scoring.video_ingest import ingest_judge_video, upload_part_path
 from ....services.inscripcions.sorting import (
     _split_custom_sort_tokens,
     sort_records_by_field_stable,
@@ -147,17 +152,24 @@ class JudgeVideoApiTests(_BaseTrampoliDataMixin, TestCase):
             is_active=True,
         )
         self._probe_patcher = patch(
-            "competicions_trampoli.views.judge.video._probe_uploaded_video_metadata",
-            side_effect=self._fake_probe_uploaded_video_metadata,
+            "competicions_trampoli.services.scoring.video_ingest.probe_video_file",
+            side_effect=self._fake_probe_video_file,
         )
         self._probe_patcher.start()
         self.addCleanup(self._probe_patcher.stop)
+        # sense broker: la ingesta de heavy_queue s'executa en linia en fer commit
+        enqueue_patcher = patch(
+            "competicions_trampoli.tasks.ingest_judge_video_task.apply_async",
+            side_effect=lambda args, **_kwargs: ingest_judge_video(*args),
+        )
+        enqueue_patcher.start()
+        self.addCleanup(enqueue_patcher.stop)
 
     @staticmethod
-    def _fake_probe_uploaded_video_metadata(uploaded_file):
+    def _fake_probe_video_file(path, *, original_filename=""):
         from competicions_trampoli.views.judge import VideoValidationError
 
-        name = (getattr(uploaded_file, "name", "") or "").lower()
+        name = (original_filename or path or "").lower()
         if name.endswith(".txt"):
             raise VideoValidationError(
                 "Tipus MIME no permes: text/plain",
@@ -166,6 +178,7 @@ class JudgeVideoApiTests(_BaseTrampoliDataMixin, TestCase):
             )
         return {
             "duration_seconds": 12,
+            "duration_float": 12.0,
             "mime_type": "video/mp4",
             "format_name": "mp4",
             "video_codec": "h264",
@@ -176,31 +189,22 @@ class JudgeVideoApiTests(_BaseTrampoliDataMixin, TestCase):
 
     def test_video_upload_creates_scoreentry_and_video(self):
         upload_url = reverse("judge_video_upload", kwargs={"token": self.token.id})
-        r = self.client.post(
-            upload_url,
-            data={
-                "inscripcio_id": self.ins_allowed.id,
-                "exercici": 1,
-                "duration_seconds": 12,
-                "video_file": self._sample_video(),
-            },
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(
+                upload_url,
+                data={
+                    "inscripcio_id": self.ins_allowed.id,
+                    "exercici": 1,
+                    "duration_seconds": 12,
+                    "video_file": self._sample_video(),
+                },
+            )
         self.assertEqual(r.status_code, 200)
         payload = r.json()
         self.assertTrue(payload.get("ok"))
         self.assertTrue(payload.get("created"))
-        self.assertIn(
-            reverse(
-                "judge_video_file",
-                kwargs={
-                    "token": self.token.id,
-                    "subject_kind": "inscripcio",
-                    "subject_id": self.ins_allowed.id,
-                    "exercici": 1,
-                },
-            ),
-            ((payload.get("video") or {}).get("url") or ""),
-        )
+        self.assertEqual(payload["video"]["status"], ScoreEntryVideo.Status.PROCESSING)
+        self.assertIsNone(payload["video"]["url"])
 
         entry = ScoreEntry.objects.get(
             competicio=self.comp,
@@ -221,6 +225,58 @@ class JudgeVideoApiTests(_BaseTrampoliDataMixin, TestCase):
         ).first()
         self.assertIsNotNone(ev)
 
+        status = self.client.get(
+            reverse("judge_video_status", kwargs={"token": self.token.id}),
+            {"inscripcio_id": self.ins_allowed.id, "exercici": 1},
+        ).json()
+        self.assertEqual(status["video"]["status"], ScoreEntryVideo.Status.READY)
+        self.assertIn(
+            reverse(
+                "judge_video_file",
+                kwargs={
+                    "token": self.token.id,
+                    "subject_kind": "inscripcio",
+                    "subject_id": self.ins_allowed.id,
+                    "exercici": 1,
+                },
+            ),
+            status["video"]["url"] or "",
+        )
+
+    def test_video_file_serves_byte_ranges_and_revalidation(self):
+        upload_url = reverse("judge_video_upload", kwargs={"token": self.token.id})
+        with tempfile.TemporaryDirectory() as tmp, override_settings(MEDIA_ROOT=tmp):
+            with self.captureOnCommitCallbacks(execute=True):
+                r = self.client.post(
+                    upload_url,
+                    data={
+                        "inscripcio_id": self.ins_allowed.id,
+                        "exercici": 1,
+                        "duration_seconds": 12,
+                        "video_file": self._sample_video(size=2048),
+                    },
+                )
+            self.assertEqual(r.status_code, 200)
+            file_url = reverse(
+                "judge_video_file",
+                kwargs={
+                    "token": self.token.id,
+                    "subject_kind": "inscripcio",
+                    "subject_id": self.ins_allowed.id,
+                    "exercici": 1,
+                },
+            )
+
+            partial = self.client.get(file_url, HTTP_RANGE="bytes=100-199")
+            body = b"".join(partial.streaming_content)
+            cached = self.client.get(file_url, HTTP_IF_NONE_MATCH=partial["ETag"])
+
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial["Content-Range"], "bytes 100-199/2048")
+        self.assertEqual(partial["Content-Type"], "video/mp4")
+        self.assertEqual(len(body), 100)
+        self.assertEqual(cached.status_code, 304)
+
     def test_video_status_returns_false_when_absent(self):
         status_url = reverse("judge_video_status", kwargs={"token": self.token.id})
         r = self.client.get(status_url, {"inscripcio_id": self.ins_allowed.id, "exercici": 1})
@@ -448,3 +504,191 @@ class JudgeVideoApiTests(_BaseTrampoliDataMixin, TestCase):
         )
 
 
+
+    def test_resumable_upload_resumes_from_server_offset(self):
+        content = bytes(range(256)) * 12
+        with tempfile.TemporaryDirectory() as tmp, override_settings(MEDIA_ROOT=tmp, JUDGE_VIDEO_UPLOAD_DIR=""):
+            created = self.client.post(
+                reverse("judge_video_upload_create", kwargs={"token": self.token.id}),
+                data={
+                    "inscripcio_id": self.ins_allowed.id,
+                    "exercici": 1,
+                    "original_filename": "routine.webm",
+                    "content_type": "video/webm",
+                },
+                HTTP_UPLOAD_LENGTH=str(len(content)),
+            )
+            self.assertEqual(created.status_code, 201)
+            chunk_url = created["Location"]
+            upload = JudgeVideoUpload.objects.get(pk=created.json()["upload_id"])
+
+            first = self.client.patch(
+                chunk_url,
+                data=content[:1000],
+                content_type="application/offset+octet-stream",
+                HTTP_UPLOAD_OFFSET="0",
+            )
+            stale = self.client.patch(
+                chunk_url,
+                data=content[:1000],
+                content_type="application/offset+octet-stream",
+                HTTP_UPLOAD_OFFSET="0",
+            )
+            head = self.client.head(chunk_url)
+            with self.captureOnCommitCallbacks(execute=True):
+                last = self.client.patch(
+                    chunk_url,
+                    data=content[1000:],
+                    content_type="application/offset+octet-stream",
+                    HTTP_UPLOAD_OFFSET=head["Upload-Offset"],
+                )
+            part_left = os.path.exists(upload_part_path(upload))
+            video = ScoreEntryVideo.objects.get(score_entry__inscripcio=self.ins_allowed, score_entry__exercici=1)
+            with video.video_file.open("rb") as fh:
+                stored = fh.read()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()["upload_offset"], 1000)
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(head["Upload-Offset"], "1000")
+        self.assertEqual(last.status_code, 200)
+        self.assertEqual(last.json()["video"]["status"], ScoreEntryVideo.Status.PROCESSING)
+        self.assertEqual(stored, content)
+        self.assertEqual(video.status, ScoreEntryVideo.Status.READY)
+        self.assertEqual(video.original_filename, "routine.webm")
+        self.assertFalse(JudgeVideoUpload.objects.exists())
+        self.assertFalse(part_left)
+
+    def test_resumable_upload_keeps_the_session_when_storing_fails(self):
+        content = bytes(range(256)) * 4
+        with tempfile.TemporaryDirectory() as tmp, override_settings(MEDIA_ROOT=tmp, JUDGE_VIDEO_UPLOAD_DIR=""):
+            created = self.client.post(
+                reverse("judge_video_upload_create", kwargs={"token": self.token.id}),
+                data={
+                    "inscripcio_id": self.ins_allowed.id,
+                    "exercici": 1,
+                    "original_filename": "routine.webm",
+                    "content_type": "video/webm",
+                },
+                HTTP_UPLOAD_LENGTH=str(len(content)),
+            )
+            chunk_url = created["Location"]
+            upload = JudgeVideoUpload.objects.get(pk=created.json()["upload_id"])
+
+            failing = JsonResponse({"ok": False, "error": "storage caigut"}, status=500)
+            with patch("competicions_trampoli.views.judge.video._store_video_for_target", return_value=failing):
+                failed = self.client.patch(
+                    chunk_url,
+                    data=content,
+                    content_type="application/offset+octet-stream",
+                    HTTP_UPLOAD_OFFSET="0",
+                )
+            upload.refresh_from_db()
+            part_kept = os.path.exists(upload_part_path(upload))
+            staging = os.listdir(os.path.dirname(upload_part_path(upload)))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                retried = self.client.patch(
+                    chunk_url,
+                    data=b"",
+                    content_type="application/offset+octet-stream",
+                    HTTP_UPLOAD_OFFSET=str(len(content)),
+                )
+            video = ScoreEntryVideo.objects.get(score_entry__inscripcio=self.ins_allowed, score_entry__exercici=1)
+            with video.video_file.open("rb") as fh:
+                stored = fh.read()
+
+        self.assertEqual(failed.status_code, 500)
+        self.assertEqual(upload.upload_offset, len(content))
+        self.assertTrue(part_kept)
+        self.assertEqual(staging, [os.path.basename(upload_part_path(upload))])
+        self.assertEqual(retried.status_code, 200)
+        self.assertEqual(stored, content)
+        self.assertFalse(JudgeVideoUpload.objects.exists())
+
+    def test_ingest_with_stub_binaries_marks_ready_or_failed(self):
+        self._probe_patcher.stop()
+        with tempfile.TemporaryDirectory() as tmp:
+            ffprobe_ok = self._stub_binary(
+                tmp,
+                "ffprobe_ok",
+                'echo \'{"streams":[{"codec_type":"video","codec_name":"h264"}],'
+                '"format":{"duration":"7.2","format_name":"mov,mp4,m4a,3gp,3g2,mj2"}}\'',
+            )
+            ffprobe_bad = self._stub_binary(tmp, "ffprobe_bad", 'echo "Invalid data" >&2; exit 1')
+            # escriu el fitxer de sortida (ultim argument) amb uns bytes fixos
+            ffmpeg = self._stub_binary(tmp, "ffmpeg", 'for last; do :; done; printf "remuxed" > "$last"')
+            media = os.path.join(tmp, "media")
+            with override_settings(
+                MEDIA_ROOT=media,
+                JUDGE_VIDEO_FFPROBE_BIN=ffprobe_ok,
+                JUDGE_VIDEO_FFMPEG_BIN=ffmpeg,
+                JUDGE_VIDEO_POSTER=True,
+                JUDGE_VIDEO_FASTSTART=True,
+            ):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.client.post(
+                        reverse("judge_video_upload", kwargs={"token": self.token.id}),
+                        data={"inscripcio_id": self.ins_allowed.id, "exercici": 1, "video_file": self._sample_video()},
+                    )
+                video = ScoreEntryVideo.objects.get(score_entry__inscripcio=self.ins_allowed, score_entry__exercici=1)
+                with video.video_file.open("rb") as fh:
+                    remuxed = fh.read()
+                status = self.client.get(
+                    reverse("judge_video_status", kwargs={"token": self.token.id}),
+                    {"inscripcio_id": self.ins_allowed.id, "exercici": 1},
+                ).json()
+                poster = self.client.get(status["video"]["poster_url"])
+
+                with override_settings(JUDGE_VIDEO_FFPROBE_BIN=ffprobe_bad):
+                    with self.captureOnCommitCallbacks(execute=True):
+                        self.client.post(
+                            reverse("judge_video_upload", kwargs={"token": self.token.id}),
+                            data={"inscripcio_id": self.ins_allowed.id, "exercici": 1, "video_file": self._sample_video()},
+                        )
+                    restored = ScoreEntryVideo.objects.get(pk=video.pk)
+                    restored_file = self.client.get(status["video"]["url"])
+                    stored_names = {
+                        os.path.relpath(os.path.join(root, name), media).replace(os.sep, "/")
+                        for root, _dirs, files in os.walk(media)
+                        for name in files
+                    }
+                    with self.captureOnCommitCallbacks(execute=True):
+                        self.client.post(
+                            reverse("judge_video_delete", kwargs={"token": self.token.id}),
+                            data={"inscripcio_id": self.ins_allowed.id, "exercici": 1},
+                        )
+                    with self.captureOnCommitCallbacks(execute=True):
+                        self.client.post(
+                            reverse("judge_video_upload", kwargs={"token": self.token.id}),
+                            data={"inscripcio_id": self.ins_allowed.id, "exercici": 1, "video_file": self._sample_video()},
+                        )
+                    failed = ScoreEntryVideo.objects.get(score_entry__inscripcio=self.ins_allowed, score_entry__exercici=1)
+
+        self.assertEqual(video.status, ScoreEntryVideo.Status.READY)
+        self.assertEqual(video.duration_seconds, 8)
+        self.assertEqual(video.mime_type, "video/mp4")
+        self.assertEqual(remuxed, b"remuxed")
+        self.assertTrue(video.poster_file.name.endswith(".jpg"))
+        self.assertEqual(poster.status_code, 200)
+        self.assertEqual(poster["Content-Type"], "image/jpeg")
+        # Una nova pujada rebutjada no destrueix la darrera versio bona.
+        self.assertEqual(restored.status, ScoreEntryVideo.Status.READY)
+        self.assertEqual((restored.video_file.name, restored.poster_file.name), (video.video_file.name, video.poster_file.name))
+        self.assertEqual(restored.error_message, "El fitxer no sembla un video valid.")
+        self.assertEqual(restored.previous_version, {})
+        self.assertEqual(restored_file.status_code, 200)
+        self.assertEqual(b"".join(restored_file.streaming_content), b"remuxed")
+        # El fitxer rebutjat s'ha esborrat; nomes queden els de la versio restaurada.
+        self.assertEqual(stored_names, {video.video_file.name, video.poster_file.name})
+        # Sense versio anterior, el video queda ``failed``.
+        self.assertEqual(failed.status, ScoreEntryVideo.Status.FAILED)
+        self.assertEqual(failed.error_message, "El fitxer no sembla un video valid.")
+
+    @staticmethod
+    def _stub_binary(directory, name, body):
+        path = os.path.join(directory, name)
+        with open(path, "w") as fh:
+            fh.write(f"#!/bin/sh\n{body}\n")
+        os.chmod(path, 0o755)
+        return path
@@ -114,6 +114,7 @@ from ....services.scoring.team_scoring import (
     build_permission_label,
     build_team_subjects_for_comp_aparell,
     resolve_permission_runtime_entries,
+    runtime_engine_for_comp_aparell,
     runtime_schema_for_comp_aparell,
 )
 from ....services.teams.team_series import safe_deactivate_empty_serie
@@ -1,4 +1,11 @@
-﻿from ._shared import *  # noqa: F401,F403
+﻿from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ....services.inscripcions.aparell_participation import apply_participation_config
+from ....services.scoring.team_scoring import sync_team_subjects_for_comp_aparell
+from ....services.scoring.team_subject_cache import clear_team_subjects_cache
+from ._shared import *  # noqa: F401,F403
 
 
 class TeamContextScoringBuilderAndSchemaResolutionTests(TeamContextScoringFlowTestBase):
@@ -581,3 +588,54 @@ class TeamContextScoringBuilderAndSchemaResolutionTests(TeamContextScoringFlowTe
         self.assertNotIn(self.comp_app.id, team_scoreables)
 
 
+
+    def test_team_subjects_second_read_is_served_from_cache(self):
+        clear_team_subjects_cache()
+        first, first_issues = build_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+
+        with self.assertNumQueries(0):
+            second, second_issues = build_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+
+        self.assertEqual(second, first)
+        self.assertEqual(second_issues, first_issues)
+        second[0]["name"] = "Mutat"
+        third, _issues = build_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+        self.assertEqual(third[0]["name"], first[0]["name"])
+
+    def test_team_subjects_sync_skips_writes_when_nothing_changed(self):
+        sync_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+
+        with CaptureQueriesContext(connection) as ctx:
+            subjects, _issues = sync_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith(("INSERT", "UPDATE"))]
+        self.assertEqual(writes, [])
+        self.assertEqual(len(subjects), 1)
+
+    def test_team_subjects_cache_is_invalidated_by_membership_changes(self):
+        clear_team_subjects_cache()
+        subjects, _issues = build_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+        self.assertEqual(len(subjects[0]["members"]), 2)
+
+        ins3 = self._create_inscripcio(self.comp, "Nuria", ordre=3, grup=1)
+        InscripcioEquipAssignacio.objects.create(
+            competicio=self.comp,
+            context=self.ctx,
+            inscripcio=ins3,
+            equip=self.equip,
+        )
+        subjects, _issues = build_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+        self.assertEqual(len(subjects[0]["members"]), 3)
+
+        build_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+        apply_participation_config(self.comp, self.comp_app, {"mode": "all"})
+        with CaptureQueriesContext(connection) as ctx:
+            build_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+        self.assertGreater(len(ctx.captured_queries), 0)
+
+    @override_settings(TEAM_SUBJECTS_CACHE_TTL_SECONDS=0)
+    def test_team_subjects_cache_can_be_disabled(self):
+        build_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+        with CaptureQueriesContext(connection) as ctx:
+            build_team_subjects_for_comp_aparell(self.comp, self.comp_app)
+        self.assertGreater(len(ctx.captured_queries), 0)
@@ -1,4 +1,7 @@
-﻿from ._shared import *  # noqa: F401,F403
+﻿from unittest.mock import patch as mock_patch
+
+from ....services.scoring import team_scoring
+from ._shared import *  # noqa: F401,F403
 
 
 class TeamMemberTreatmentSchemaTests(_BaseTrampoliDataMixin, TestCase):
@@ -303,4 +306,30 @@ class TeamMemberTreatmentSchemaTests(_BaseTrampoliDataMixin, TestCase):
         self.assertAlmostEqual(result.outputs["E_MEMBER__m2"], 1.5)
         self.assertAlmostEqual(result.total, 1.6)
 
+    def test_runtime_schema_expansion_is_memoized_per_schema_and_member_count(self):
+        team_scoring.clear_runtime_schema_cache()
+        schema = {
+            "fields": [{"code": "E", "label": "Exec", "type": "number", "scope": "member"}],
+            "computed": [{"code": "TOTAL", "label": "Total", "formula": "members_sum(E)"}],
+        }
+        first = runtime_schema_for_comp_aparell(schema, self.comp_app, member_count=2)
+        first["computed"][0]["formula"] = "0"
+
+        with mock_patch.object(team_scoring.ast, "parse", side_effect=AssertionError("no s'ha de reexpandir")):
+            second = runtime_schema_for_comp_aparell(dict(schema), self.comp_app, member_count=2)
+        self.assertEqual(second["computed"][0]["formula"], "members_sum([E__m1, E__m2])")
+
+        three = runtime_schema_for_comp_aparell(schema, self.comp_app, member_count=3)
+        self.assertIn("E__m3", three["computed"][0]["formula"])
+
+    def test_runtime_engine_is_shared_per_expansion(self):
+        schema = {
+            "fields": [{"code": "E", "label": "Exec", "type": "number", "scope": "member"}],
+            "computed": [{"code": "TOTAL", "label": "Total", "formula": "members_sum(E)"}],
+        }
+        engine = runtime_engine_for_comp_aparell(schema, self.comp_app, member_count=2)
+        self.assertIs(runtime_engine_for_comp_aparell(schema, self.comp_app, member_count=2), engine)
+        self.assertIsNot(runtime_engine_for_comp_aparell(schema, self.comp_app, member_count=3), engine)
 
+        result = engine.compute({"E__m1": 8.0, "E__m2": 7.5})
+        self.assertAlmostEqual(result.total, 15.5)
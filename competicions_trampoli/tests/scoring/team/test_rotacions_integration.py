@@ -83,7 +83,7 @@ class TeamContextRotacionsIntegrationTests(TeamContextScoringFlowTestBase):
         )
         self.assertEqual(response.status_code, 200)
 
-        ws = load_workbook(filename=BytesIO(response.content)).active
+        ws = load_workbook(filename=BytesIO(response.getvalue())).active
         header_row = next(
             row
             for row in range(1, ws.max_row + 1)
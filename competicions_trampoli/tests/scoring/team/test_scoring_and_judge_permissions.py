@@ -989,7 +989,7 @@ class TeamContextScoringAndJudgePermissionsTests(TeamContextScoringFlowTestBase)
             "video_codec": "h264",
         }
 
-        with patch("competicions_trampoli.views.judge.video._probe_uploaded_video_metadata", return_value=probe_data):
+        with patch("competicions_trampoli.services.scoring.video_ingest.probe_video_file", return_value=probe_data):
             upload_res = self.client.post(
                 reverse("judge_video_upload", kwargs={"token": token.id}),
                 data={
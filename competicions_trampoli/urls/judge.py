@@ -123,6 +123,16 @@ urlpatterns = [
         name="judge_video_file",
     ),
     path("judge/<uuid:token>/api/video/upload/", views_judge.judge_video_upload, name="judge_video_upload"),
+    path(
+        "judge/<uuid:token>/api/video/uploads/",
+        views_judge.judge_video_upload_create,
+        name="judge_video_upload_create",
+    ),
+    path(
+        "judge/<uuid:token>/api/video/uploads/<uuid:upload_id>/",
+        views_judge.judge_video_upload_chunk,
+        name="judge_video_upload_chunk",
+    ),
     path("judge/<uuid:token>/api/video/delete/", views_judge.judge_video_delete, name="judge_video_delete"),
     path(
         "judge/<uuid:token>/api/messages/request-support/",
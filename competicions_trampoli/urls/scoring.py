@@ -8,7 +8,7 @@ from ..views.competition.aparatus import (
     CompeticioAparellUpdate,
     TrampoliAparellList,
 )
-from ..views.competition.phases import CompeticioAparellFasesPlanner, CompeticioFasesPlanner
+from ..views.competition.phases import CompeticioAparellFasesPlanner, CompeticioFasesPlanner, fases_dashboard_revision
 from ..views.competition.legacy import ConfiguracioCompeticio
 from ..views.scoring.media import (
     scoring_judge_video_file,
@@ -59,6 +59,11 @@ urlpatterns = [
         competition_view(CompeticioFasesPlanner.as_view(), "scoring.edit"),
         name="trampoli_fases",
     ),
+    path(
+        "competicio/<int:pk>/notes/trampoli/fases/revisio/",
+        competition_view(fases_dashboard_revision, "scoring.edit"),
+        name="trampoli_fases_revision",
+    ),
     path(
         "competicio/<int:pk>/notes/trampoli/aparells/<int:app_id>/fases/",
         competition_view(CompeticioAparellFasesPlanner.as_view(), "scoring.edit"),
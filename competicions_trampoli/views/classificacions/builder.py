@@ -472,6 +472,7 @@ def classificacio_preview(request, pk, cid):
         competicio,
         schema_local=cfg.schema or {},
         tipus=cfg.tipus,
+        cfg=cfg,
         compute_fn=compute_classificacio,
         invalid_message="Configuració de classificació invàlida per previsualitzar.",
         runtime_message="No s'ha pogut previsualitzar la classificació.",
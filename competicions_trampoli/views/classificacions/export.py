@@ -1,10 +1,7 @@
-from io import BytesIO
-
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.http import HttpResponseBadRequest
 from django.shortcuts import get_object_or_404
-from openpyxl import Workbook
 
-from ...models import Competicio
+from ...models import Competicio, Inscripcio
 from ...models.classificacions import ClassificacioConfig
 from ...services.classificacions.compute import compute_classificacio
 from ...services.classificacions.export import (
@@ -14,15 +11,12 @@ from ...services.classificacions.export import (
 )
 from ...services.classificacions.live import default_live_columns
 from ...services.classificacions.runtime import execute_classificacio_runtime
+from ...services.shared.excel_export import ExcelExportError, respond_with_excel_export
 
 
 def classificacions_live_export_excel(request, pk):
     competicio = get_object_or_404(Competicio, pk=pk)
-    cfg_qs = (
-        ClassificacioConfig.objects
-        .filter(competicio=competicio, activa=True)
-        .order_by("ordre", "id")
-    )
+    cfg_qs = _active_cfgs_qs(competicio)
 
     cfg_id_raw = (request.GET.get("cfg_id") or "").strip()
     selected_cfg_id = None
@@ -37,25 +31,48 @@ def classificacions_live_export_excel(request, pk):
     if not cfgs:
         return HttpResponseBadRequest("No hi ha classificacions actives per exportar.")
 
-    wb = Workbook()
-    used_sheet_names = set()
-    for idx, cfg in enumerate(cfgs):
-        ws = wb.active if idx == 0 else wb.create_sheet()
-        ws.title = build_excel_sheet_name(cfg.nom or f"Classificacio {idx + 1}", used_sheet_names)
+    suffix = f"_cfg_{selected_cfg_id}" if selected_cfg_id else ""
+    filename = f"classificacions_{sanitize_filename_component(competicio.nom)}{suffix}.xlsx"
+    return respond_with_excel_export(
+        "classificacions",
+        competicio,
+        {"cfg_id": selected_cfg_id},
+        filename=filename,
+        estimate_rows=lambda: Inscripcio.objects.filter(competicio=competicio).count() * len(cfgs),
+    )
 
+
+def _active_cfgs_qs(competicio):
+    return (
+        ClassificacioConfig.objects
+        .filter(competicio=competicio, activa=True)
+        .order_by("ordre", "id")
+    )
+
+
+def build_classificacions_workbook(competicio, params, workbook):
+    cfg_qs = _active_cfgs_qs(competicio)
+    selected_cfg_id = (params or {}).get("cfg_id")
+    if selected_cfg_id:
+        cfg_qs = cfg_qs.filter(id=selected_cfg_id)
+
+    used_sheet_names = set()
+    for idx, cfg in enumerate(cfg_qs):
         runtime = execute_classificacio_runtime(
             competicio,
             schema_local=cfg.schema or {},
             tipus=cfg.tipus,
+            cfg=cfg,
             compute_fn=compute_classificacio,
             invalid_message="Configuracio de classificacio invalida.",
             runtime_message="No s'ha pogut renderitzar la classificacio.",
         )
         if runtime["error"]:
             reasons = " | ".join(runtime["error"]["errors"])
-            return HttpResponseBadRequest(
+            raise ExcelExportError(
                 f"La classificacio '{cfg.nom}' no es pot exportar: {runtime['error']['message']} | {reasons}"
             )
+        ws = workbook.create_sheet(build_excel_sheet_name(cfg.nom or f"Classificacio {idx + 1}", used_sheet_names))
         parts = runtime["parts"]
         columns = runtime["columns"] or default_live_columns()
         write_cfg_excel_sheet(
@@ -68,16 +85,5 @@ def classificacions_live_export_excel(request, pk):
             schema=runtime["schema"],
         )
 
-    content = BytesIO()
-    wb.save(content)
-    response = HttpResponse(
-        content.getvalue(),
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
-    suffix = f"_cfg_{selected_cfg_id}" if selected_cfg_id else ""
-    filename = f"classificacions_{sanitize_filename_component(competicio.nom)}{suffix}.xlsx"
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return response
-
 
-__all__ = ["classificacions_live_export_excel"]
+__all__ = ["build_classificacions_workbook", "classificacions_live_export_excel"]
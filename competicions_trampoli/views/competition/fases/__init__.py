@@ -1,3 +1,3 @@
-from .planner import CompeticioAparellFasesPlanner, CompeticioFasesPlanner
+from .planner import CompeticioAparellFasesPlanner, CompeticioFasesPlanner, fases_dashboard_revision
 
-__all__ = ["CompeticioAparellFasesPlanner", "CompeticioFasesPlanner"]
+__all__ = ["CompeticioAparellFasesPlanner", "CompeticioFasesPlanner", "fases_dashboard_revision"]
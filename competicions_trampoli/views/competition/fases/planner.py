@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views import View
+from django.views.decorators.http import require_GET
 
 from ....forms import (
     CompeticioAparellFaseForm,
@@ -15,6 +17,7 @@ from ....models import Competicio
 from ....models.competicio import CompeticioAparell, CompeticioAparellFase
 from ....services.avatar.aparells.messages import AVATAR_MESSAGES as PHASES_AVATAR_MESSAGES
 from ....services.fases.dashboard import _source_row_text, phase_dashboard_context
+from ....services.fases.dashboard_snapshot import fase_dashboard_revision
 from .actions import handle_phase_post
 
 
@@ -130,13 +133,19 @@ class CompeticioFasesPlanner(View):
             competicio=self.competicio,
         )
 
+    def _default_comp_aparell(self):
+        if self.comp_aparell is not None and self.comp_aparell.actiu:
+            return self.comp_aparell
+        return (
+            CompeticioAparell.objects
+            .filter(competicio=self.competicio, actiu=True)
+            .order_by("ordre", "id")
+            .first()
+        )
+
     def get(self, request, *args, **kwargs):
         if "phase" not in request.GET:
-            dashboard = phase_dashboard_context(
-                self.competicio,
-                selected_app_id=getattr(self.comp_aparell, "id", None),
-            )
-            selected_app = dashboard.get("comp_aparell")
+            selected_app = self._default_comp_aparell()
             if selected_app is not None:
                 return self.redirect_to_selected_app(selected_app, phase=BASE_PHASE_QUERY_VALUE)
         return render(request, self.template_name, self.get_context())
@@ -239,4 +248,10 @@ class CompeticioAparellFasesPlanner(CompeticioFasesPlanner):
     pass
 
 
-__all__ = ["CompeticioAparellFasesPlanner", "CompeticioFasesPlanner"]
+@require_GET
+def fases_dashboard_revision(request, pk):
+    competicio = get_object_or_404(Competicio, pk=pk)
+    return JsonResponse({"ok": True, **fase_dashboard_revision(competicio)})
+
+
+__all__ = ["CompeticioAparellFasesPlanner", "CompeticioFasesPlanner", "fases_dashboard_revision"]
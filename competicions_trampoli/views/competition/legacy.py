@@ -6,7 +6,7 @@ from django.views.generic import TemplateView
 from ...models import Competicio
 from ...models.judging import JudgeDeviceToken, PublicLiveToken
 from ...models.rotacions import RotacioAssignacio, RotacioFranja
-from ...services.fases.dashboard import phase_dashboard_context
+from ...services.fases.dashboard import phase_app_summaries
 
 
 class ConfiguracioCompeticio(TemplateView):
@@ -40,10 +40,10 @@ class ConfiguracioCompeticio(TemplateView):
             is_active=True,
             revoked_at__isnull=True,
         ).count()
-        phase_ctx = phase_dashboard_context(competicio)
+        app_summaries = phase_app_summaries(competicio)
         phase_summaries_by_app_id = {
             int(summary["app"].id): summary
-            for summary in phase_ctx["app_summaries"]
+            for summary in app_summaries
         }
         aparell_phase_summaries = []
         for comp_aparell in aparells_cfg:
@@ -78,10 +78,10 @@ class ConfiguracioCompeticio(TemplateView):
                 "qr_judge_count": qr_judge_count,
                 "qr_public_count": qr_public_count,
                 "qr_total_count": qr_judge_count + qr_public_count,
-                "app_summaries": phase_ctx["app_summaries"],
-                "total_phase_count": phase_ctx["total_phase_count"],
-                "total_unit_count": phase_ctx["total_unit_count"],
-                "total_pending_unit_count": phase_ctx["total_pending_unit_count"],
+                "app_summaries": app_summaries,
+                "total_phase_count": sum(item["phase_count"] for item in app_summaries),
+                "total_unit_count": sum(item["unit_count"] for item in app_summaries),
+                "total_pending_unit_count": sum(item["pending_unit_count"] for item in app_summaries),
             }
         )
 
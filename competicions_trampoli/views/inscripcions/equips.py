@@ -54,6 +54,7 @@ from ...services.inscripcions.queries import (
     _normalize_sort_filters,
     get_allowed_group_fields,
 )
+from ...services.scoring.team_subject_cache import invalidate_team_subjects
 from ...services.shared.competition_groups import group_label
 from ...services.shared.partition_plans import normalize_creation_strategy
 from ...services.teams.creation_plans import buckets_to_apply, grouped_from_strategy
@@ -1213,6 +1214,7 @@ def equips_auto_create(request, pk):
         InscripcioEquipAssignacio.objects.bulk_create(creates, batch_size=500)
     if updates:
         InscripcioEquipAssignacio.objects.bulk_update(updates, ["equip", "origen", "criteri", "updated_at"], batch_size=500)
+    invalidate_team_subjects(competicio.id)
     updated = len(creates) + len(updates)
 
     record_inscripcions_history_entry(
@@ -1302,6 +1304,7 @@ def equips_create_manual(request, pk):
             InscripcioEquipAssignacio.objects.bulk_create(creates, batch_size=500)
         if updates:
             InscripcioEquipAssignacio.objects.bulk_update(updates, ["equip", "origen", "criteri", "updated_at"], batch_size=500)
+        invalidate_team_subjects(competicio.id)
         updated = len(creates) + len(updates)
 
     record_inscripcions_history_entry(
@@ -1382,6 +1385,7 @@ def equips_assign(request, pk):
         InscripcioEquipAssignacio.objects.bulk_create(creates, batch_size=500)
     if updates:
         InscripcioEquipAssignacio.objects.bulk_update(updates, ["equip", "origen", "criteri", "updated_at"], batch_size=500)
+    invalidate_team_subjects(competicio.id)
     updated = len(creates) + len(updates)
     record_inscripcions_history_entry(
         request,
@@ -70,6 +70,7 @@ from ...services.inscripcions.queries import (
     reconcile_inscripcions_sort_context_state,
 )
 from ...services.inscripcions.sorting import sort_records_by_field_stable
+from ...services.scoring.team_subject_cache import invalidate_team_subjects
 
 
 def _normalize_group_workspace_filters(raw_filters):
@@ -1072,6 +1073,7 @@ def _apply_group_transform_plan(competicio, plan):
                 updates.append(inscripcio)
             if updates:
                 Inscripcio.objects.bulk_update(updates, ["grup_competicio", "grup", "ordre_competicio"], batch_size=500)
+                invalidate_team_subjects(competicio.id)
             suggested_name = str(assignment.get("suggested_name") or "").strip()
             if suggested_name and (assignment.get("preview_kind") == "created" or (assignment.get("rename_existing") and not str(group.nom or "").strip())):
                 if group.nom != suggested_name:
@@ -1890,6 +1892,7 @@ def inscripcions_groups_from_sort(request, pk):
     with transaction.atomic():
         qs.filter(id__in=target_ids).update(grup=None)
         Inscripcio.objects.bulk_update(updates, ["grup"], batch_size=500)
+        invalidate_team_subjects(competicio.id)
         sync_stable_groups_from_legacy(competicio)
         _persist_group_suggested_names(competicio, preview_groups)
     record_inscripcions_history_entry(request, competicio, action_type="groups_from_sort", action_label="Crear grups des del panell", before_snapshot=before_snapshot, after_snapshot=capture_inscripcions_history_snapshot(request, competicio))
@@ -1979,6 +1982,7 @@ def inscripcions_reorder(request, pk):
                 else:
                     old_group = moved.grup_competicio
                     Inscripcio.objects.filter(id=moved_id).update(grup=None, grup_competicio=None, ordre_competicio=None)
+                    invalidate_team_subjects(competicio.id)
                     compact_competition_order_for_group(old_group)
 
     sync_competicio_group_names_view(competicio)
@@ -34,6 +34,7 @@ from ...services.teams.equip_contexts import (
     normalize_equip_context_code,
 )
 from ...services.scoring.team_scoring import build_team_subjects_for_comp_aparell, is_team_context_app
+from ...services.scoring.team_subject_cache import invalidate_team_subjects
 from ...services.teams.team_series import get_series_summary_payload
 from ...services.inscripcions.history import (
     capture_inscripcions_history_snapshot,
@@ -884,6 +885,7 @@ def inscripcions_set_aparells(request, pk):
             InscripcioAparellExclusio.objects.bulk_create(
                 [InscripcioAparellExclusio(inscripcio_id=inscripcio.id, comp_aparell_id=app_id) for app_id in excluded_ids]
             )
+        invalidate_team_subjects(competicio.id)
 
     selected_ids = [app_id for app_id in active_ids if app_id in selected_set]
     record_inscripcions_history_entry(
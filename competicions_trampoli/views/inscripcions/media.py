@@ -6,12 +6,14 @@ from decimal import Decimal
 
 from django.db import transaction
 from django.db.models import Count, Q
-from django.http import FileResponse, Http404, HttpResponseBadRequest, JsonResponse
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.http import require_POST
 
+from ceeb_web.protected_media import protected_media_response
+
 from ...models import Competicio, Inscripcio, InscripcioMedia
 from ...services.inscripcions.history import (
     capture_inscripcions_history_snapshot,
@@ -398,20 +400,12 @@ def inscripcions_media_file(request, pk, media_id):
         pk=media_id,
         competicio=competicio,
     )
-    if not item.fitxer or not getattr(item.fitxer, "name", ""):
-        raise Http404("Fitxer no disponible")
-    try:
-        file_handle = item.fitxer.open("rb")
-    except Exception as exc:
-        raise Http404("Fitxer no disponible") from exc
-    response = FileResponse(
-        file_handle,
-        as_attachment=False,
-        filename=(item.original_filename or "").strip() or None,
+    return protected_media_response(
+        request,
+        item.fitxer,
+        original_filename=item.original_filename,
+        mime_type=item.mime_type,
     )
-    if item.mime_type:
-        response["Content-Type"] = item.mime_type
-    return response
 
 
 @require_POST
@@ -35,6 +35,7 @@ from ...services.inscripcions.queries import (
     _resolve_sort_field_runtime,
     _sort_scalar,
     build_inscripcions_sort_context_key,
+    column_value_stats_from_db,
     clear_inscripcions_sort_context_state,
     compute_inscripcions_order_signature_from_ids,
     get_allowed_group_fields,
@@ -64,31 +65,8 @@ def _normalize_competition_order_tail_flag(raw_value):
     return token in {"1", "true", "yes", "on"}
 
 
-def _collect_column_filter_value_rows(records, column_code):
-    out = OrderedDict()
-    empty_count = 0
-    context = _build_sort_field_runtime_context(records, column_code)
-    for obj in records:
-        runtime = _resolve_sort_field_runtime(obj, column_code, context=context)
-        token = runtime.get("token") or ""
-        if not token:
-            empty_count += 1
-            continue
-        key = _custom_sort_token_key(token)
-        if not key:
-            continue
-        row = out.get(key)
-        if row is None:
-            row = {
-                "token": token,
-                "label": runtime.get("label") or token,
-                "count": 0,
-                "sort_scalar": runtime.get("sort_scalar"),
-            }
-            out[key] = row
-        row["count"] += 1
-
-    values = list(out.values())
+def _column_filter_value_rows(stats, empty_count):
+    values = list(stats.values())
     values.sort(key=lambda row: row["sort_scalar"])
     if empty_count:
         values.append(
@@ -102,6 +80,11 @@ def _collect_column_filter_value_rows(records, column_code):
     return values
 
 
+def _collect_column_filter_value_rows(records, column_code):
+    stats = _collect_sort_field_value_stats(records, column_code)
+    return _column_filter_value_rows(stats, len(records) - sum(row["count"] for row in stats.values()))
+
+
 def _collect_sort_field_value_stats(records, sort_code):
     out = OrderedDict()
     context = _build_sort_field_runtime_context(records, sort_code)
@@ -126,6 +109,13 @@ def _collect_sort_field_value_stats(records, sort_code):
     return out
 
 
+def _sort_field_value_stats(qs, sort_code):
+    db_stats = column_value_stats_from_db(qs, sort_code)
+    if db_stats is not None:
+        return db_stats[0]
+    return _collect_sort_field_value_stats(list(_build_sort_records_queryset(qs, [sort_code])), sort_code)
+
+
 def _sort_criterion_identity(entry):
     if not isinstance(entry, dict):
         return ("", "all", None)
@@ -718,8 +708,12 @@ def inscripcions_filter_values(request, pk):
     filters_without_self["column_filters"] = dict(filters.get("column_filters") or {})
     filters_without_self["column_filters"].pop(column_code, None)
     qs = _build_inscripcions_filtered_qs(competicio, filters_without_self)
-    records = list(_build_sort_records_queryset(qs, [column_code]))
-    values = _collect_column_filter_value_rows(records, column_code)
+    db_stats = column_value_stats_from_db(qs, column_code)
+    if db_stats is not None:
+        values = _column_filter_value_rows(*db_stats)
+    else:
+        records = list(_build_sort_records_queryset(qs, [column_code]))
+        values = _collect_column_filter_value_rows(records, column_code)
 
     value_rows = []
     seen = set()
@@ -762,10 +756,8 @@ def inscripcions_sort_custom_values(request, pk):
     allowed_group_codes = {field["code"] for field in allowed_group_fields}
     selected_group_codes_context = _normalize_sort_group_by(payload.get("group_by"), allowed_group_codes, fallback_group_by=competicio.group_by_default or [])
     filters = _normalize_sort_filters(payload.get("filters"))
-    context_records = list(_build_sort_records_queryset(_build_inscripcions_filtered_qs(competicio, filters), [sort_key]))
-    context_stats = _collect_sort_field_value_stats(context_records, sort_key)
-    global_records = list(_build_sort_records_queryset(Inscripcio.objects.filter(competicio=competicio), [sort_key]))
-    global_stats = _collect_sort_field_value_stats(global_records, sort_key)
+    context_stats = _sort_field_value_stats(_build_inscripcions_filtered_qs(competicio, filters), sort_key)
+    global_stats = _sort_field_value_stats(Inscripcio.objects.filter(competicio=competicio), sort_key)
     custom_order_raw = get_competicio_custom_sort_order_values(competicio, sort_key, allowed_sort_codes=sort_codes)
     custom_order, stale_order = _split_custom_sort_tokens(custom_order_raw, global_stats.keys())
 
@@ -830,8 +822,7 @@ def inscripcions_sort_custom_save(request, pk):
             stack.append(norm)
     competition_order_tail_active = bool(stack) and bool(state.get("competition_order_tail"))
 
-    global_records = list(_build_sort_records_queryset(Inscripcio.objects.filter(competicio=competicio), [sort_key]))
-    global_stats = _collect_sort_field_value_stats(global_records, sort_key)
+    global_stats = _sort_field_value_stats(Inscripcio.objects.filter(competicio=competicio), sort_key)
     global_keys = set(global_stats.keys())
     existing_raw = get_competicio_custom_sort_order_values(competicio, sort_key, allowed_sort_codes=sort_codes)
     existing_active, existing_stale = _split_custom_sort_tokens(existing_raw, global_keys)
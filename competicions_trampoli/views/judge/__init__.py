@@ -15,6 +15,8 @@ from .video import (
     judge_video_file,
     judge_video_status,
     judge_video_upload,
+    judge_video_upload_chunk,
+    judge_video_upload_create,
 )
 
 __all__ = [
@@ -33,5 +35,7 @@ __all__ = [
     "judge_video_file",
     "judge_video_status",
     "judge_video_upload",
+    "judge_video_upload_chunk",
+    "judge_video_upload_create",
     "public_live_qr_png",
 ]
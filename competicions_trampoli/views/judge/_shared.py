@@ -1,19 +1,15 @@
 import io
 import json
 import logging
-import math
-import mimetypes
-import os
-import subprocess
-import tempfile
 from urllib.parse import urlencode
 
-from django.conf import settings
-from django.http import FileResponse, Http404, HttpResponse
+from django.http import HttpResponse
 from django.urls import reverse
 
-from ...models.scoring import ScoreEntryVideo
+from ceeb_web.protected_media import protected_media_response
+
 from ...services.scoring.scoring_subjects import serialize_subject_payload, subject_video_models
+from ...services.scoring.video_ingest import VideoValidationError  # noqa: F401
 from ...services.scoring.update_payloads import (
     filter_inputs_for_allowed_codes as shared_filter_inputs_for_allowed_codes,
 )
@@ -33,14 +29,6 @@ except ImportError:  # pragma: no cover - optional at import time, required at r
     qrcode = None
 
 
-class VideoValidationError(Exception):
-    def __init__(self, message: str, reason: str = "video_validation_failed", payload=None):
-        super().__init__(message)
-        self.message = message
-        self.reason = reason
-        self.payload = payload or {}
-
-
 def _require_qrcode():
     if qrcode is None:
         raise RuntimeError("La dependencia 'qrcode' no esta disponible.")
@@ -54,163 +42,6 @@ def _qr_png_response(url: str) -> HttpResponse:
     return HttpResponse(buf.getvalue(), content_type="image/png")
 
 
-def _mime_from_probe(format_name: str, original_filename: str = "") -> str:
-    fmt = (format_name or "").strip().lower()
-    tokens = {x.strip() for x in fmt.split(",") if x.strip()}
-    ext = os.path.splitext((original_filename or "").lower())[1]
-
-    if "webm" in tokens or ext == ".webm":
-        return "video/webm"
-
-    has_mp4_family = bool(tokens.intersection({"mp4", "m4a", "3gp", "3g2", "mj2"}))
-    has_mov = "mov" in tokens
-    if ext == ".mov":
-        return "video/quicktime"
-    if has_mp4_family:
-        return "video/mp4"
-    if has_mov:
-        return "video/quicktime"
-
-    guessed, _ = mimetypes.guess_type(original_filename or "")
-    return (guessed or "").strip().lower()
-
-
-def _probe_uploaded_video_metadata(uploaded_file):
-    suffix = os.path.splitext(getattr(uploaded_file, "name", "") or "")[1]
-    temp_path = None
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            temp_path = tmp.name
-            for chunk in uploaded_file.chunks():
-                tmp.write(chunk)
-
-        ffprobe_bin = getattr(settings, "JUDGE_VIDEO_FFPROBE_BIN", os.getenv("JUDGE_VIDEO_FFPROBE_BIN", "ffprobe"))
-        ffprobe_timeout = int(
-            getattr(
-                settings,
-                "JUDGE_VIDEO_FFPROBE_TIMEOUT_SECONDS",
-                os.getenv("JUDGE_VIDEO_FFPROBE_TIMEOUT_SECONDS", "15"),
-            )
-        )
-
-        cmd = [
-            ffprobe_bin,
-            "-v",
-            "error",
-            "-show_entries",
-            "format=duration,format_name:stream=codec_type,codec_name",
-            "-of",
-            "json",
-            temp_path,
-        ]
-
-        try:
-            proc = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=max(1, ffprobe_timeout),
-                check=False,
-            )
-        except FileNotFoundError as exc:
-            raise VideoValidationError(
-                "La validacio de video no esta disponible al servidor (ffprobe).",
-                reason="ffprobe_missing",
-            ) from exc
-        except subprocess.TimeoutExpired as exc:
-            raise VideoValidationError(
-                "No s'ha pogut validar el video dins del temps limit.",
-                reason="ffprobe_timeout",
-            ) from exc
-
-        if proc.returncode != 0:
-            stderr = (proc.stderr or "").strip()
-            raise VideoValidationError(
-                "El fitxer no sembla un video valid.",
-                reason="ffprobe_failed",
-                payload={"stderr": stderr[:300]},
-            )
-
-        try:
-            parsed = json.loads(proc.stdout or "{}")
-        except Exception as exc:
-            raise VideoValidationError(
-                "No s'han pogut llegir metadades del video.",
-                reason="ffprobe_json_parse_failed",
-            ) from exc
-
-        streams = parsed.get("streams") or []
-        video_stream = next(
-            (s for s in streams if str((s or {}).get("codec_type", "")).lower() == "video"),
-            None,
-        )
-        if not video_stream:
-            raise VideoValidationError(
-                "El fitxer no conte cap pista de video valida.",
-                reason="no_video_stream",
-            )
-
-        fmt = parsed.get("format") or {}
-        duration_raw = fmt.get("duration")
-        try:
-            duration_float = float(duration_raw)
-        except Exception as exc:
-            raise VideoValidationError(
-                "No s'ha pogut calcular la durada real del video.",
-                reason="duration_missing",
-            ) from exc
-
-        if not math.isfinite(duration_float) or duration_float <= 0:
-            raise VideoValidationError(
-                "Durada de video invalida.",
-                reason="invalid_duration",
-                payload={"duration": duration_raw},
-            )
-
-        duration_seconds = int(math.ceil(duration_float))
-        if duration_seconds > ScoreEntryVideo.VIDEO_MAX_DURATION_SECONDS:
-            raise VideoValidationError(
-                (
-                    "La durada supera el limit "
-                    f"de {ScoreEntryVideo.VIDEO_MAX_DURATION_SECONDS} segons."
-                ),
-                reason="duration_too_long",
-                payload={"duration_seconds": duration_seconds},
-            )
-
-        format_name = str(fmt.get("format_name") or "").strip().lower()
-        mime_type = _mime_from_probe(format_name, getattr(uploaded_file, "name", "") or "")
-        if not mime_type:
-            raise VideoValidationError(
-                "No s'ha pogut identificar el tipus MIME real del video.",
-                reason="missing_mime_from_probe",
-                payload={"format_name": format_name},
-            )
-        if mime_type not in ScoreEntryVideo.ALLOWED_MIME_TYPES:
-            raise VideoValidationError(
-                f"Tipus MIME no permes: {mime_type}",
-                reason="mime_not_allowed",
-                payload={"mime_type": mime_type, "format_name": format_name},
-            )
-
-        return {
-            "duration_seconds": duration_seconds,
-            "mime_type": mime_type,
-            "format_name": format_name,
-            "video_codec": str((video_stream or {}).get("codec_name") or "").strip().lower(),
-        }
-    finally:
-        if temp_path:
-            try:
-                os.remove(temp_path)
-            except Exception:
-                pass
-        try:
-            uploaded_file.seek(0)
-        except Exception:
-            pass
-
-
 def _filter_inputs_for_allowed_codes(inputs: dict, allowed_codes: set) -> dict:
     return shared_filter_inputs_for_allowed_codes(inputs, allowed_codes)
 
@@ -266,22 +97,21 @@ def _judge_item_labels_map_for_comp_aparell(comp_aparell) -> dict:
     return out
 
 
-def _protected_video_response(video_file, *, original_filename: str = "", mime_type: str = ""):
-    if not video_file or not getattr(video_file, "name", ""):
-        raise Http404("Video no disponible")
-    try:
-        file_handle = video_file.open("rb")
-    except Exception as exc:
-        raise Http404("Video no disponible") from exc
-    response = FileResponse(file_handle, as_attachment=False, filename=(original_filename or "").strip() or None)
-    if mime_type:
-        response["Content-Type"] = mime_type
-    return response
+def _protected_video_response(request, video_file, *, original_filename: str = "", mime_type: str = ""):
+    return protected_media_response(
+        request,
+        video_file,
+        original_filename=original_filename,
+        mime_type=mime_type,
+        missing_message="Video no disponible",
+    )
 
 
 def _serialize_video_record(video_record, request, *, token_obj=None, subject=None, exercici=None, assignment_id=None):
     url = None
-    if video_record.video_file and token_obj is not None and subject is not None and exercici is not None:
+    poster_url = None
+    ready = video_record.status == type(video_record).Status.READY
+    if ready and video_record.video_file and token_obj is not None and subject is not None and exercici is not None:
         try:
             media_url = reverse(
                 "judge_video_file",
@@ -292,11 +122,15 @@ def _serialize_video_record(video_record, request, *, token_obj=None, subject=No
                     "exercici": int(exercici),
                 },
             )
+            query = {}
             if assignment_id not in (None, "", 0, "0"):
-                media_url = f"{media_url}?{urlencode({'assignment_id': assignment_id})}"
-            url = request.build_absolute_uri(media_url)
+                query["assignment_id"] = assignment_id
+            url = request.build_absolute_uri(f"{media_url}?{urlencode(query)}" if query else media_url)
+            if getattr(video_record, "poster_file", None):
+                poster_url = request.build_absolute_uri(f"{media_url}?{urlencode({**query, 'poster': 1})}")
         except Exception:
             url = None
+            poster_url = None
 
     return {
         "id": video_record.id,
@@ -305,8 +139,10 @@ def _serialize_video_record(video_record, request, *, token_obj=None, subject=No
         "file_size_bytes": int(video_record.file_size_bytes or 0),
         "mime_type": video_record.mime_type or "",
         "original_filename": video_record.original_filename or "",
+        "error_message": video_record.error_message or "",
         "updated_at": video_record.updated_at.isoformat() if video_record.updated_at else None,
         "url": url,
+        "poster_url": poster_url,
     }
 
 
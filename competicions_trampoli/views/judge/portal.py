@@ -808,6 +808,11 @@ def judge_portal(request, token, assignment_id=None):
         if video_capture_enabled
         else ""
     )
+    video_uploads_url = (
+        scoped_api_url(reverse("judge_video_upload_create", kwargs={"token": str(tok.id)}))
+        if video_capture_enabled
+        else ""
+    )
 
     ctx = {
         "token_obj": tok,
@@ -843,6 +848,7 @@ def judge_portal(request, token, assignment_id=None):
         "video_status_url": video_status_url,
         "video_upload_url": video_upload_url,
         "video_delete_url": video_delete_url,
+        "video_uploads_url": video_uploads_url,
         "video_max_duration_seconds": ScoreEntryVideo.VIDEO_MAX_DURATION_SECONDS,
         "video_max_size_bytes": ScoreEntryVideo.VIDEO_MAX_SIZE_BYTES,
         "exercicis": exercicis,
@@ -1,14 +1,19 @@
 import logging
+import os
+import shutil
 import time
+import uuid
 
 from django.core.exceptions import ValidationError
+from django.core.files import File
 from django.db import transaction
 from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.views.decorators.http import require_POST, require_http_methods
 
 from ...models import Inscripcio
-from ...models.judging import JudgeDeviceToken
+from ...models.judging import JudgeDeviceToken, JudgeVideoUpload
 from ...models.scoring import ScoreEntryVideo, ScoreEntryVideoEvent, TeamCompetitiveSubject
 from ...services.scoring.scoring_subjects import (
     get_or_create_subject_entry_locked,
@@ -18,6 +23,16 @@ from ...services.scoring.scoring_subjects import (
     subject_video_models,
 )
 from ...services.scoring.team_scoring import build_team_subjects_for_comp_aparell, is_team_context_app
+from ...services.scoring.video_ingest import (
+    declared_video_mime,
+    delete_files_on_commit,
+    enqueue_video_ingest,
+    remove_upload_part,
+    upload_part_path,
+    upload_staging_dir,
+    version_file_names,
+    video_version_snapshot,
+)
 from ...services.scoring.team_subject_contract import build_team_subject_registry
 from ._assignment_scope import (
     assignment_id_from_request,
@@ -28,11 +43,9 @@ from ._assignment_scope import (
     resolve_assignment_scope_for_request,
 )
 from ._shared import (
-    VideoValidationError,
     _create_video_audit_event,
     _judge_video_capture_enabled_for_token,
     _log_video_event,
-    _probe_uploaded_video_metadata,
     _protected_video_response,
     _request_meta,
     _serialize_video_record,
@@ -41,6 +54,8 @@ from ._shared import (
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_READ_CHUNK_SIZE = 256 * 1024
+
 
 @require_http_methods(["GET"])
 def judge_video_status(request, token):
@@ -217,60 +232,30 @@ def judge_video_status(request, token):
     )
     return out
 
-@require_POST
-@transaction.atomic
-def judge_video_upload(request, token):
-    started = time.monotonic()
-    req_meta = _request_meta(request)
-    tok = get_object_or_404(JudgeDeviceToken, pk=token)
-    if not tok.is_valid():
-        _log_video_event(
-            "warning",
-            "video_upload_denied_token",
-            token=str(token),
-            latency_ms=int((time.monotonic() - started) * 1000),
-            **req_meta,
-        )
-        return JsonResponse({"ok": False, "error": "Token invàlid o revocat"}, status=403)
-    if not _judge_video_capture_enabled_for_token(tok):
-        _log_video_event(
-            "warning",
-            "video_upload_disabled_by_config",
-            token=str(token),
-            latency_ms=int((time.monotonic() - started) * 1000),
-            **req_meta,
-        )
-        return JsonResponse(
-            {
-                "ok": False,
-                "error": "La gravacio de video esta desactivada per aquest QR.",
-                "reason": "video_disabled",
-            },
-            status=403,
-        )
-    tok.touch()
-
+def _resolve_video_upload_target(request, tok, params, *, assignment_id, started, req_meta):
+    """Subjecte, abast i ``_reject`` d'una pujada (directa o reprenible); ``(target, error_response)``."""
+    token = str(tok.id)
     subject_payload = {
-        "subject_kind": request.POST.get("subject_kind"),
-        "subject_id": request.POST.get("subject_id"),
-        "inscripcio_id": request.POST.get("inscripcio_id"),
+        "subject_kind": params.get("subject_kind"),
+        "subject_id": params.get("subject_id"),
+        "inscripcio_id": params.get("inscripcio_id"),
     }
     if not subject_payload.get("subject_id") and not subject_payload.get("inscripcio_id"):
         _log_video_event(
             "warning",
             "video_upload_bad_request",
-            token=str(token),
+            token=token,
             reason="missing_subject_id",
             latency_ms=int((time.monotonic() - started) * 1000),
             **req_meta,
         )
-        return JsonResponse({"ok": False, "error": "Falta subject_id/inscripcio_id"}, status=400)
+        return None, JsonResponse({"ok": False, "error": "Falta subject_id/inscripcio_id"}, status=400)
 
-    scope, scope_error = resolve_assignment_scope_for_request(tok, assignment_id_from_request(request))
+    scope, scope_error = resolve_assignment_scope_for_request(tok, assignment_id)
     if scope_error is not None:
-        return scope_error
+        return None, scope_error
 
-    exercici = clamp_exercici_for_scope(scope, request.POST.get("exercici") or request.POST.get("ex"))
+    exercici = clamp_exercici_for_scope(scope, params.get("exercici") or params.get("ex"))
     competicio = scope.competicio
     comp_aparell = scope.comp_aparell
 
@@ -313,7 +298,7 @@ def judge_video_upload(request, token):
             _log_video_event(
                 "warning",
                 "video_upload_rejected",
-                token=str(token),
+                token=token,
                 **serialize_subject_payload(rejected_subject["subject_kind"], rejected_subject["subject_id"]),
                 exercici=exercici,
                 comp_aparell_id=comp_aparell.id,
@@ -333,19 +318,19 @@ def judge_video_upload(request, token):
                 judge_token=tok,
                 payload={"reason": "subject_not_allowed"},
             )
-        return error_response
+        return None, error_response
     scope_subject_error = ensure_subject_scoreable_for_scope(scope, subject)
     if scope_subject_error is not None:
-        return scope_subject_error
+        return None, scope_subject_error
     assignment_subject_error = ensure_subject_allowed_for_assignment(scope, subject)
     if assignment_subject_error is not None:
-        return assignment_subject_error
+        return None, assignment_subject_error
 
     def _reject(message, status_code, reason, score_entry=None, payload=None):
         _log_video_event(
             "warning",
             "video_upload_rejected",
-            token=str(token),
+            token=token,
             **serialize_subject_payload(subject["subject_kind"], subject["subject_id"]),
             exercici=exercici,
             comp_aparell_id=comp_aparell.id,
@@ -369,33 +354,47 @@ def judge_video_upload(request, token):
         )
         return JsonResponse({"ok": False, "error": message}, status=status_code)
 
-    uploaded = request.FILES.get("video_file") or request.FILES.get("video")
-    if not uploaded:
-        return _reject("Falta el fitxer de video (video_file).", 400, "missing_file")
+    return {
+        "scope": scope,
+        "competicio": competicio,
+        "comp_aparell": comp_aparell,
+        "exercici": exercici,
+        "subject": subject,
+        "reject": _reject,
+    }, None
 
-    file_size = int(getattr(uploaded, "size", 0) or 0)
+
+def _precheck_video_upload(target, *, file_size, original_filename, content_type):
+    """Comprovacions barates abans d'acceptar bytes; el worker fa la validacio real amb ffprobe."""
+    reject = target["reject"]
     if file_size <= 0:
-        return _reject("Fitxer de video buit.", 400, "empty_file")
+        return "", reject("Fitxer de video buit.", 400, "empty_file")
     if file_size > ScoreEntryVideo.VIDEO_MAX_SIZE_BYTES:
-        return _reject(
+        return "", reject(
             f"El fitxer supera el limit de {ScoreEntryVideo.VIDEO_MAX_SIZE_BYTES} bytes.",
             400,
             "file_too_large",
             payload={"size": file_size},
         )
-
-    try:
-        server_meta = _probe_uploaded_video_metadata(uploaded)
-    except VideoValidationError as exc:
-        return _reject(
-            exc.message,
+    mime_type = declared_video_mime(original_filename, content_type)
+    if not mime_type:
+        return "", reject(
+            "Tipus de fitxer no permes. Formats acceptats: MP4, WebM o MOV.",
             400,
-            exc.reason,
-            payload={"size": file_size, **(exc.payload or {})},
+            "mime_not_allowed",
+            payload={"size": file_size, "content_type": str(content_type or "")[:100]},
         )
+    return mime_type, None
+
 
-    mime_type = server_meta["mime_type"]
-    duration_seconds = server_meta["duration_seconds"]
+def _store_video_for_target(request, tok, target, video_source, *, file_size, mime_type, original_filename, started, req_meta):
+    """Desa el fitxer com a video ``processing`` del subjecte i encua la ingesta."""
+    reject = target["reject"]
+    scope = target["scope"]
+    subject = target["subject"]
+    competicio = target["competicio"]
+    comp_aparell = target["comp_aparell"]
+    exercici = target["exercici"]
 
     entry, _created = get_or_create_subject_entry_locked(
         competicio=competicio,
@@ -416,7 +415,7 @@ def judge_video_upload(request, token):
         },
     )
     if not created_video and getattr(video, "judge_token_id", None) and not _video_belongs_to_same_token(video, tok):
-        return _reject(
+        return reject(
             "Aquest video ja esta vinculat a un altre QR i no es pot substituir des d'aquest dispositiu.",
             403,
             "video_owned_by_other_token",
@@ -425,21 +424,31 @@ def judge_video_upload(request, token):
         )
 
     previous_file_name = video.video_file.name if video.video_file else ""
+    previous_poster_name = video.poster_file.name if video.poster_file else ""
+    storage = video.video_file.storage
+    if previous_file_name and video.status == video_model.Status.READY:
+        # La versio bona es conserva fins que la ingesta accepti la nova.
+        stale_names = version_file_names(video.previous_version)
+        video.previous_version = video_version_snapshot(video)
+    else:
+        # Fitxers pendents o rebutjats: no hi ha res a restaurar.
+        stale_names = [previous_file_name, previous_poster_name]
 
-    video.video_file = uploaded
+    video.video_file = video_source
+    video.poster_file = ""
     video.judge_token = tok
-    video.status = video_model.Status.READY
-    video.duration_seconds = duration_seconds
+    video.status = video_model.Status.PROCESSING
+    video.duration_seconds = None
     video.file_size_bytes = file_size
     video.mime_type = mime_type
-    video.original_filename = request.POST.get("original_filename") or (uploaded.name or "")
+    video.original_filename = original_filename
     video.error_message = ""
     try:
         video.full_clean()
         video.save()
     except ValidationError as exc:
         msg = str(exc)
-        return _reject(
+        return reject(
             msg,
             400,
             "validation_error",
@@ -448,7 +457,7 @@ def judge_video_upload(request, token):
         )
     except Exception:
         logger.exception("Unexpected error saving uploaded judge video")
-        return _reject(
+        return reject(
             "Error inesperat guardant el video.",
             500,
             "save_exception",
@@ -456,11 +465,8 @@ def judge_video_upload(request, token):
             payload={"mime_type": mime_type, "size": file_size},
         )
 
-    if previous_file_name and previous_file_name != video.video_file.name:
-        try:
-            video.video_file.storage.delete(previous_file_name)
-        except Exception:
-            pass
+    delete_files_on_commit(storage, stale_names, keep=[video.video_file.name])
+    enqueue_video_ingest(video)
 
     action = ScoreEntryVideoEvent.Action.REPLACE if previous_file_name else ScoreEntryVideoEvent.Action.UPLOAD
     _create_video_audit_event(
@@ -478,17 +484,15 @@ def judge_video_upload(request, token):
             "video_id": video.id,
             "mime_type": mime_type,
             "file_size_bytes": file_size,
-            "duration_seconds": duration_seconds,
-            "format_name": server_meta.get("format_name", ""),
-            "video_codec": server_meta.get("video_codec", ""),
-            "server_validated": True,
+            "server_validated": False,
+            "ingest_queued": True,
             "replaced_previous": bool(previous_file_name),
         },
     )
     _log_video_event(
         "info",
         "video_upload_ok",
-        token=str(token),
+        token=str(tok.id),
         **serialize_subject_payload(subject["subject_kind"], subject["subject_id"]),
         exercici=exercici,
         comp_aparell_id=comp_aparell.id,
@@ -497,7 +501,6 @@ def judge_video_upload(request, token):
         action=action,
         mime_type=mime_type,
         file_size_bytes=file_size,
-        duration_seconds=duration_seconds,
         latency_ms=int((time.monotonic() - started) * 1000),
         **req_meta,
     )
@@ -521,6 +524,306 @@ def judge_video_upload(request, token):
     )
 
 
+def _video_capture_denied(tok, token, event_prefix, started, req_meta):
+    if not tok.is_valid():
+        _log_video_event(
+            "warning",
+            f"{event_prefix}_denied_token",
+            token=str(token),
+            latency_ms=int((time.monotonic() - started) * 1000),
+            **req_meta,
+        )
+        return JsonResponse({"ok": False, "error": "Token invàlid o revocat"}, status=403)
+    if not _judge_video_capture_enabled_for_token(tok):
+        _log_video_event(
+            "warning",
+            f"{event_prefix}_disabled_by_config",
+            token=str(token),
+            latency_ms=int((time.monotonic() - started) * 1000),
+            **req_meta,
+        )
+        return JsonResponse(
+            {
+                "ok": False,
+                "error": "La gravacio de video esta desactivada per aquest QR.",
+                "reason": "video_disabled",
+            },
+            status=403,
+        )
+    return None
+
+
+@require_POST
+@transaction.atomic
+def judge_video_upload(request, token):
+    started = time.monotonic()
+    req_meta = _request_meta(request)
+    tok = get_object_or_404(JudgeDeviceToken, pk=token)
+    denied = _video_capture_denied(tok, token, "video_upload", started, req_meta)
+    if denied is not None:
+        return denied
+    tok.touch()
+
+    target, error_response = _resolve_video_upload_target(
+        request,
+        tok,
+        request.POST,
+        assignment_id=assignment_id_from_request(request),
+        started=started,
+        req_meta=req_meta,
+    )
+    if error_response is not None:
+        return error_response
+
+    uploaded = request.FILES.get("video_file") or request.FILES.get("video")
+    if not uploaded:
+        return target["reject"]("Falta el fitxer de video (video_file).", 400, "missing_file")
+
+    file_size = int(getattr(uploaded, "size", 0) or 0)
+    original_filename = request.POST.get("original_filename") or (uploaded.name or "")
+    mime_type, error_response = _precheck_video_upload(
+        target,
+        file_size=file_size,
+        original_filename=uploaded.name or original_filename,
+        content_type=getattr(uploaded, "content_type", ""),
+    )
+    if error_response is not None:
+        return error_response
+
+    return _store_video_for_target(
+        request,
+        tok,
+        target,
+        uploaded,
+        file_size=file_size,
+        mime_type=mime_type,
+        original_filename=original_filename,
+        started=started,
+        req_meta=req_meta,
+    )
+
+
+def _upload_session_response(request, tok, upload, *, status=200):
+    upload_url = request.build_absolute_uri(
+        reverse("judge_video_upload_chunk", kwargs={"token": str(tok.id), "upload_id": str(upload.id)})
+    )
+    response = JsonResponse(
+        {
+            "ok": True,
+            "upload_id": str(upload.id),
+            "upload_url": upload_url,
+            "upload_offset": int(upload.upload_offset),
+            "upload_length": int(upload.upload_length),
+        },
+        status=status,
+    )
+    response["Location"] = upload_url
+    response["Upload-Offset"] = str(upload.upload_offset)
+    response["Upload-Length"] = str(upload.upload_length)
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+@require_POST
+@transaction.atomic
+def judge_video_upload_create(request, token):
+    """Obre una pujada reprenible; els bytes arriben despres a ``judge_video_upload_chunk``."""
+    started = time.monotonic()
+    req_meta = _request_meta(request)
+    tok = get_object_or_404(JudgeDeviceToken, pk=token)
+    denied = _video_capture_denied(tok, token, "video_upload", started, req_meta)
+    if denied is not None:
+        return denied
+    tok.touch()
+
+    assignment_id = assignment_id_from_request(request)
+    target, error_response = _resolve_video_upload_target(
+        request,
+        tok,
+        request.POST,
+        assignment_id=assignment_id,
+        started=started,
+        req_meta=req_meta,
+    )
+    if error_response is not None:
+        return error_response
+
+    try:
+        upload_length = int(request.META.get("HTTP_UPLOAD_LENGTH") or request.POST.get("upload_length") or 0)
+    except (TypeError, ValueError):
+        upload_length = 0
+    original_filename = str(request.POST.get("original_filename") or "")[:255]
+    content_type = str(request.POST.get("content_type") or "")[:100]
+    _mime_type, error_response = _precheck_video_upload(
+        target,
+        file_size=upload_length,
+        original_filename=original_filename,
+        content_type=content_type,
+    )
+    if error_response is not None:
+        return error_response
+
+    subject = target["subject"]
+    upload = JudgeVideoUpload.objects.create(
+        judge_token=tok,
+        assignment_id=target["scope"].assignment_id or None,
+        subject_kind=subject["subject_kind"],
+        subject_id=int(subject["subject_id"]),
+        exercici=target["exercici"],
+        original_filename=original_filename,
+        content_type=content_type,
+        upload_length=upload_length,
+    )
+    os.makedirs(upload_staging_dir(), exist_ok=True)
+    open(upload_part_path(upload), "wb").close()
+    _log_video_event(
+        "info",
+        "video_upload_session_created",
+        token=str(token),
+        **serialize_subject_payload(subject["subject_kind"], subject["subject_id"]),
+        exercici=target["exercici"],
+        upload_id=str(upload.id),
+        upload_length=upload_length,
+        latency_ms=int((time.monotonic() - started) * 1000),
+        **req_meta,
+    )
+    return _upload_session_response(request, tok, upload, status=201)
+
+
+@require_http_methods(["HEAD", "GET", "PATCH", "POST"])
+def judge_video_upload_chunk(request, token, upload_id):
+    """
+    ``HEAD``/``GET`` retorna l'offset rebut; ``PATCH`` (o ``POST``) afegeix el
+    cos a partir de ``Upload-Offset``. Amb l'ultim tros el video es desa i
+    s'encua la ingesta (la resposta es la mateixa que ``judge_video_upload``).
+    """
+    started = time.monotonic()
+    req_meta = _request_meta(request)
+    tok = get_object_or_404(JudgeDeviceToken, pk=token)
+    denied = _video_capture_denied(tok, token, "video_upload", started, req_meta)
+    if denied is not None:
+        return denied
+    upload = get_object_or_404(JudgeVideoUpload, pk=upload_id, judge_token=tok)
+    if request.method in ("HEAD", "GET"):
+        return _upload_session_response(request, tok, upload)
+
+    try:
+        client_offset = int(request.META.get("HTTP_UPLOAD_OFFSET", ""))
+    except (TypeError, ValueError):
+        return JsonResponse({"ok": False, "error": "Falta la capcalera Upload-Offset."}, status=400)
+
+    if client_offset != upload.upload_offset:
+        return _upload_session_response(request, tok, upload, status=409)
+    part_path = upload_part_path(upload)
+    if not os.path.exists(part_path):
+        upload.delete()
+        return JsonResponse({"ok": False, "error": "La pujada ha caducat. Torna-ho a provar."}, status=410)
+
+    # El cos arriba per una xarxa lenta: es bolca a un fitxer propi fora de cap
+    # transaccio i nomes es bloqueja la fila per validar l'offset i afegir-lo.
+    remaining = upload.upload_length - client_offset
+    chunk_path = f"{part_path}.{uuid.uuid4().hex}.chunk"
+    try:
+        received = _receive_upload_chunk(request, upload, chunk_path, remaining)
+        if received is None:
+            return JsonResponse(
+                {"ok": False, "error": "El tros supera la mida declarada de la pujada."},
+                status=413,
+            )
+        with transaction.atomic():
+            upload = JudgeVideoUpload.objects.select_for_update().filter(pk=upload.pk).first()
+            if upload is None:
+                return JsonResponse({"ok": False, "error": "La pujada ja s'ha completat."}, status=409)
+            if client_offset != upload.upload_offset:
+                # una altra peticio ha avancat l'offset mentre arribava aquest tros
+                return _upload_session_response(request, tok, upload, status=409)
+            if not os.path.exists(part_path):
+                upload.delete()
+                return JsonResponse({"ok": False, "error": "La pujada ha caducat. Torna-ho a provar."}, status=410)
+            with open(part_path, "r+b") as part, open(chunk_path, "rb") as chunk:
+                part.seek(upload.upload_offset)
+                shutil.copyfileobj(chunk, part, UPLOAD_READ_CHUNK_SIZE)
+                part.truncate(upload.upload_offset + received)
+            upload.upload_offset += received
+            upload.save(update_fields=["upload_offset", "updated_at"])
+    finally:
+        remove_upload_part(chunk_path)
+
+    if not upload.is_complete:
+        return _upload_session_response(request, tok, upload)
+    return _finish_video_upload(request, tok, upload, started=started, req_meta=req_meta)
+
+
+def _receive_upload_chunk(request, upload, chunk_path, remaining):
+    """Bolca el cos de la peticio a ``chunk_path``. ``None`` si supera ``remaining``."""
+    received = 0
+    with open(chunk_path, "wb") as chunk_file:
+        while True:
+            try:
+                chunk = request.read(UPLOAD_READ_CHUNK_SIZE)
+            except Exception:
+                # connexio tallada: ens quedem el que ha arribat i el client reprendra
+                logger.info("Video upload %s interrupted at offset %s", upload.id, upload.upload_offset + received)
+                break
+            if not chunk:
+                break
+            if received + len(chunk) > remaining:
+                return None
+            chunk_file.write(chunk)
+            received += len(chunk)
+    return received
+
+
+@transaction.atomic
+def _finish_video_upload(request, tok, upload, *, started, req_meta):
+    """
+    Desa el video complet. La sessio i el fitxer parcial nomes s'esborren quan
+    el video s'ha desat (i la ingesta queda encuada al commit); si es rebutja,
+    la sessio es conserva perque el jutge pugui tornar-ho a provar.
+    """
+    upload = JudgeVideoUpload.objects.select_for_update().filter(pk=upload.pk).first()
+    if upload is None:
+        return JsonResponse({"ok": False, "error": "La pujada ja s'ha completat."}, status=409)
+    part_path = upload_part_path(upload)
+    upload_length = upload.upload_length
+
+    target, error_response = _resolve_video_upload_target(
+        request,
+        tok,
+        {"subject_kind": upload.subject_kind, "subject_id": upload.subject_id, "exercici": upload.exercici},
+        assignment_id=upload.assignment_id,
+        started=started,
+        req_meta=req_meta,
+    )
+    if error_response is None:
+        mime_type, error_response = _precheck_video_upload(
+            target,
+            file_size=upload_length,
+            original_filename=upload.original_filename,
+            content_type=upload.content_type,
+        )
+    if error_response is not None:
+        return error_response
+
+    with open(part_path, "rb") as part:
+        response = _store_video_for_target(
+            request,
+            tok,
+            target,
+            File(part, name=upload.original_filename or os.path.basename(part_path)),
+            file_size=upload_length,
+            mime_type=mime_type,
+            original_filename=upload.original_filename,
+            started=started,
+            req_meta=req_meta,
+        )
+    if response.status_code == 200:
+        upload.delete()
+        transaction.on_commit(lambda: remove_upload_part(part_path))
+    response["Upload-Offset"] = str(upload_length)
+    return response
+
+
 @require_POST
 @transaction.atomic
 def judge_video_delete(request, token):
@@ -707,8 +1010,10 @@ def judge_video_delete(request, token):
         payload={"deleted_path": deleted_path},
     )
 
-    if video.video_file:
-        video.video_file.delete(save=False)
+    delete_files_on_commit(
+        video.video_file.storage,
+        [deleted_path, video.poster_file.name if video.poster_file else "", *version_file_names(video.previous_version)],
+    )
     video.delete()
 
     _log_video_event(
@@ -785,10 +1090,15 @@ def judge_video_file(request, token, subject_kind, subject_id, exercici):
     video_model, _event_model = subject_video_models(comp_aparell)
     video_lookup = {"team_score_entry": entry} if subject["subject_kind"] == "team_unit" else {"score_entry": entry}
     video_obj = video_model.objects.filter(**video_lookup).first()
-    if not video_obj:
+    if not video_obj or video_obj.status != video_model.Status.READY:
         raise Http404("Video absent")
 
+    if request.GET.get("poster"):
+        if not video_obj.poster_file:
+            raise Http404("Poster absent")
+        return _protected_video_response(request, video_obj.poster_file, mime_type="image/jpeg")
     return _protected_video_response(
+        request,
         video_obj.video_file,
         original_filename=video_obj.original_filename,
         mime_type=video_obj.mime_type,
@@ -20,6 +20,7 @@ from ...services.rotacions.rotacions_ordering import (
     normalize_positive_int_list,
     unique_ordered,
 )
+from ...services.rotacions.validation import mark_rotacions_franges_dirty
 
 
 def _normalize_grups(value):
@@ -72,6 +73,9 @@ def _sync_assignacio_groups(assignacio, group_ids, groups_by_id):
         RotacioAssignacioGrup.objects.bulk_create(creates, batch_size=200)
     if updates:
         RotacioAssignacioGrup.objects.bulk_update(updates, ["ordre"], batch_size=200)
+    if creates or updates:
+        # bulk_create/bulk_update no envien senyals
+        mark_rotacions_franges_dirty(assignacio.competicio_id, [assignacio.franja_id])
 
     legacy_display_nums = _group_display_nums_for_ids(
         [group_id for group_id, _idx in desired],
@@ -166,6 +170,9 @@ def _sync_assignacio_series(assignacio, serie_ids, series_by_id):
         RotacioAssignacioSerieEquip.objects.bulk_create(creates, batch_size=200)
     if updates:
         RotacioAssignacioSerieEquip.objects.bulk_update(updates, ["ordre"], batch_size=200)
+    if creates or updates:
+        # bulk_create/bulk_update no envien senyals
+        mark_rotacions_franges_dirty(assignacio.competicio_id, [assignacio.franja_id])
     return [serie_id for serie_id, _idx in desired]
 
 
@@ -208,6 +215,9 @@ def _sync_assignacio_program_units(assignacio, program_unit_ids, program_units_b
         RotacioAssignacioProgramUnit.objects.bulk_create(creates, batch_size=200)
     if updates:
         RotacioAssignacioProgramUnit.objects.bulk_update(updates, ["ordre"], batch_size=200)
+    if creates or updates:
+        # bulk_create/bulk_update no envien senyals
+        mark_rotacions_franges_dirty(assignacio.competicio_id, [assignacio.franja_id])
     return [program_unit_id for program_unit_id, _idx in desired]
 
 
@@ -5,12 +5,11 @@ from datetime import date, datetime
 
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
-from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.utils.dateparse import parse_date
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.http import require_POST
-from openpyxl import Workbook
 from openpyxl.drawing.image import Image as XLImage
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.utils import get_column_letter
@@ -36,6 +35,7 @@ from ...services.rotacions.rotacions_ordering import (
 from ...services.fases.labels import program_unit_display_name
 from ...services.inscripcions.admission import load_excluded_app_ids_by_inscripcio
 from ...services.scoring.team_scoring import build_team_subjects_for_comp_aparell, is_team_context_app
+from ...services.shared.excel_export import respond_with_excel_export
 from ...services.teams.team_series import serie_label
 from ._shared import (
     _assignacio_program_keys,
@@ -174,11 +174,32 @@ def rotacions_export_logo_clear(request, pk):
 
 
 
+def _franges_export_mode(raw) -> str:
+    mode = str(raw or "participants").strip().lower()
+    return mode if mode in {"participants", "groups"} else "participants"
+
+
+def _estimate_rotacions_export_rows(competicio, mode: str) -> int:
+    if mode == "groups":
+        return RotacioFranja.objects.filter(competicio=competicio).count()
+    return Inscripcio.objects.filter(competicio=competicio).count()
+
+
 def franges_export_excel(request, pk):
     competicio = get_object_or_404(Competicio, pk=pk)
-    mode = (request.GET.get("mode") or "participants").strip().lower()
-    if mode not in {"participants", "groups"}:
-        mode = "participants"
+    mode = _franges_export_mode(request.GET.get("mode"))
+    suffix = "participants" if mode == "participants" else "grups"
+    return respond_with_excel_export(
+        "rotacions",
+        competicio,
+        {"mode": mode},
+        filename=f"rotacions_{competicio.id}_{suffix}.xlsx",
+        estimate_rows=lambda: _estimate_rotacions_export_rows(competicio, mode),
+    )
+
+
+def build_rotacions_workbook(competicio, params, workbook):
+    mode = _franges_export_mode((params or {}).get("mode"))
 
     estacions = list(
         RotacioEstacio.objects
@@ -244,7 +265,8 @@ def franges_export_excel(request, pk):
     })
     ins_by_grup = {}
     excluded_pairs = set()
-    if group_ids:
+    # En mode "groups" nomes calen les etiquetes: no carreguem participants.
+    if mode == "participants" and group_ids:
         qs = (
             Inscripcio.objects
             .filter(competicio=competicio, grup_competicio_id__in=group_ids)
@@ -293,7 +315,7 @@ def franges_export_excel(request, pk):
         .select_related("fase", "fase__comp_aparell", "fase__comp_aparell__aparell")
     }
     team_subjects_by_serie = {}
-    if serie_ids:
+    if mode == "participants" and serie_ids:
         app_ids_for_series = sorted({int(serie.comp_aparell_id) for serie in series_by_id.values()})
         for app_id in app_ids_for_series:
             comp_aparell = CompeticioAparell.objects.filter(pk=app_id, competicio=competicio).select_related("aparell").first()
@@ -519,9 +541,7 @@ def franges_export_excel(request, pk):
     data_txt = data_comp.strftime("%d/%m/%Y") if data_comp else ""
     logo_path = str(export_meta.get("logo_path", "") or "").strip()
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Rotacions"
+    ws = workbook.create_sheet("Rotacions")
 
     center = Alignment(horizontal="center", vertical="center", wrap_text=True)
     left_center = Alignment(horizontal="left", vertical="center", wrap_text=False)
@@ -557,12 +577,29 @@ def franges_export_excel(request, pk):
     c.fill = fill_sub
     c.alignment = center_no_wrap
 
-    ws.append([])
+    logo_added = False
+    if logo_path:
+        logo_abs = _logo_abs_path(logo_path)
+        if logo_abs and os.path.exists(logo_abs):
+            try:
+                img = XLImage(logo_abs)
+                img.height = 52
+                img.width = 120
+                anchor_col = max(1, total_cols - 1)
+                img.anchor = f"{get_column_letter(anchor_col)}1"
+                ws.add_image(img)
+                logo_added = True
+            except Exception:
+                logo_added = False
 
+    ws.row_dimensions[1].height = 42 if logo_added else 28
+    ws.row_dimensions[2].height = 20
     ws.column_dimensions[get_column_letter(1)].width = 22
 
+    # Les files s'escriuen en streaming: amplades, alcades de capçalera i
+    # freeze_panes s'han de fixar abans de bolcar la primera fila.
     if mode == "participants":
-        header_row_top = ws.max_row + 1
+        header_row_top = 4
         header_row_sub = header_row_top + 1
         data_start_row = header_row_sub + 1
 
@@ -631,8 +668,13 @@ def franges_export_excel(request, pk):
                 width = field_width_map.get(code, 14)
                 ws.column_dimensions[get_column_letter(start_col + idx)].width = width
 
+        ws.row_dimensions[header_row_top].height = 24
+        ws.row_dimensions[header_row_sub].height = 22
+        ws.freeze_panes = f"B{data_start_row}"
+
         current_row = data_start_row
         for i, f in enumerate(franges, start=1):
+            ws.flush(before_row=current_row)
             label = getattr(f, "display_label", None) or (f.titol or "").strip() or "Franja"
             fr_txt = f"{label}\n{f.hora_inici.strftime('%H:%M')}-{f.hora_fi.strftime('%H:%M')}"
             is_competitive = _is_competitive_franja(f)
@@ -724,12 +766,8 @@ def franges_export_excel(request, pk):
                         cell.font = Font(color=row_font_color)
 
             current_row = end_row + 1
-
-        ws.row_dimensions[header_row_top].height = 24
-        ws.row_dimensions[header_row_sub].height = 22
-        ws.freeze_panes = f"B{data_start_row}"
     else:
-        header_row = ws.max_row + 1
+        header_row = 4
         ws.cell(row=header_row, column=1, value="Franja").font = bold
         ws.cell(row=header_row, column=1).fill = fill_hdr
         ws.cell(row=header_row, column=1).alignment = center_no_wrap
@@ -742,8 +780,15 @@ def franges_export_excel(request, pk):
             cell.alignment = center_no_wrap
             cell.border = border
 
+        for j in range(2, total_cols + 1):
+            ws.column_dimensions[get_column_letter(j)].width = 24
+
+        ws.row_dimensions[header_row].height = 22
+        ws.freeze_panes = f"B{header_row + 1}"
+
         for i, f in enumerate(franges, start=1):
             r = header_row + i
+            ws.flush(before_row=r)
             label = getattr(f, "display_label", None) or (f.titol or "").strip() or "Franja"
             fr_txt = f"{label}\n{f.hora_inici.strftime('%H:%M')}-{f.hora_fi.strftime('%H:%M')}"
             row_fill, row_font_color, row_border = _franja_excel_style_parts(f)
@@ -788,41 +833,11 @@ def franges_export_excel(request, pk):
 
             ws.row_dimensions[r].height = 30
 
-        for j in range(2, total_cols + 1):
-            ws.column_dimensions[get_column_letter(j)].width = 24
-
-        ws.row_dimensions[header_row].height = 22
-        ws.freeze_panes = f"B{header_row + 1}"
-
-    logo_added = False
-    if logo_path:
-        logo_abs = _logo_abs_path(logo_path)
-        if logo_abs and os.path.exists(logo_abs):
-            try:
-                img = XLImage(logo_abs)
-                img.height = 52
-                img.width = 120
-                anchor_col = max(1, total_cols - 1)
-                img.anchor = f"{get_column_letter(anchor_col)}1"
-                ws.add_image(img)
-                logo_added = True
-            except Exception:
-                logo_added = False
-
-    ws.row_dimensions[1].height = 42 if logo_added else 28
-    ws.row_dimensions[2].height = 20
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    suffix = "participants" if mode == "participants" else "grups"
-    response["Content-Disposition"] = (
-        f'attachment; filename="rotacions_{competicio.id}_{suffix}.xlsx"'
-    )
-    wb.save(response)
-    return response
+    ws.flush()
 
 
 __all__ = [
+    "build_rotacions_workbook",
     "franges_export_excel",
     "rotacions_export_logo_clear",
     "rotacions_export_logo_upload",
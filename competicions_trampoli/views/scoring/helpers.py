@@ -1,8 +1,9 @@
 import copy
 
-from django.http import FileResponse, Http404
 from django.urls import reverse
 
+from ceeb_web.protected_media import protected_media_response
+
 from ...models import InscripcioMedia
 from ...models.scoring import TeamScoreEntryVideo
 from ...services.scoring.team_scoring import is_team_context_app, runtime_schema_for_comp_aparell
@@ -11,21 +12,13 @@ from ...services.scoring.team_subject_contract import build_team_subject_registr
 from ...services.scoring.update_payloads import build_score_update_payload, filter_inputs_for_allowed_codes
 
 
-def _protected_file_response(file_field, *, original_filename: str = "", mime_type: str = ""):
-    if not file_field or not getattr(file_field, "name", ""):
-        raise Http404("Fitxer no disponible")
-    try:
-        file_handle = file_field.open("rb")
-    except Exception as exc:
-        raise Http404("Fitxer no disponible") from exc
-    response = FileResponse(
-        file_handle,
-        as_attachment=False,
-        filename=(original_filename or "").strip() or None,
+def _protected_file_response(request, file_field, *, original_filename: str = "", mime_type: str = ""):
+    return protected_media_response(
+        request,
+        file_field,
+        original_filename=original_filename,
+        mime_type=mime_type,
     )
-    if mime_type:
-        response["Content-Type"] = mime_type
-    return response
 
 
 def _allowed_input_codes_for_schema(schema: dict, comp_aparell=None) -> set:
@@ -199,6 +192,9 @@ def _split_media_for_playback(items: list) -> dict:
 def _serialize_judge_video_for_playback(video_obj, competicio_id=None):
     if not video_obj or not video_obj.video_file or not competicio_id:
         return None
+    if video_obj.status != type(video_obj).Status.READY:
+        # encara a la cua d'ingesta (o rebutjat pel worker): no es reprodueix
+        return None
     video_kind = "team" if isinstance(video_obj, TeamScoreEntryVideo) else "individual"
     return {
         "id": video_obj.id,
@@ -31,6 +31,7 @@ def scoring_media_file(request, pk, media_id):
         competicio=competicio,
     )
     return _protected_file_response(
+        request,
         item.fitxer,
         original_filename=item.original_filename,
         mime_type=item.mime_type,
@@ -212,6 +213,7 @@ def scoring_judge_video_file(request, pk, video_kind, video_id):
     else:
         raise Http404("Tipus de video invalid")
     return _protected_file_response(
+        request,
         video_obj.video_file,
         original_filename=video_obj.original_filename,
         mime_type=video_obj.mime_type,
@@ -8,7 +8,7 @@ from django.views.decorators.http import require_POST
 
 from ...models import Competicio
 from ...models.competicio import CompeticioAparell
-from ...scoring_engine import ScoringEngine, ScoringError
+from ...scoring_engine import ScoringError
 from ...services.scoring.scoring_subjects import (
     get_or_create_subject_entry_locked,
     resolve_scoring_phase,
@@ -29,6 +29,7 @@ from ...services.scoring.team_scoring import (
     is_team_context_app,
     logical_team_inputs_to_runtime_inputs,
     runtime_inputs_to_logical_team_inputs,
+    runtime_engine_for_comp_aparell,
     runtime_schema_for_comp_aparell,
 )
 from .helpers import (
@@ -115,7 +116,7 @@ def scoring_save(request, pk):
         runtime_inputs = build_runtime_inputs_from_canonical(canonical_inputs, schema)
 
     try:
-        engine = ScoringEngine(schema)
+        engine = runtime_engine_for_comp_aparell(base_schema, comp_aparell, member_count=team_member_count)
         result = engine.compute(runtime_inputs)
     except ScoringError as exc:
         return JsonResponse({"ok": False, "error": str(exc)}, status=400)
@@ -252,7 +253,7 @@ def scoring_save_partial(request, pk):
     runtime_inputs = build_runtime_inputs_from_canonical(canonical_inputs, schema)
 
     try:
-        engine = ScoringEngine(schema)
+        engine = runtime_engine_for_comp_aparell(base_schema, comp_aparell, member_count=team_member_count)
         result = engine.compute(runtime_inputs)
     except ScoringError as exc:
         return JsonResponse({"ok": False, "error": str(exc)}, status=400)
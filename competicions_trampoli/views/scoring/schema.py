@@ -13,7 +13,7 @@ from ...forms import ScoringSchemaForm
 from ...models import Competicio
 from ...models.competicio import Aparell, CompeticioAparell
 from ...models.scoring import ScoringSchema
-from ...scoring_engine import ScoringEngine, ScoringError
+from ...scoring_engine import ScoringError
 from ...services.avatar.aparells.schema.messages import AVATAR_MESSAGES as SCORING_SCHEMA_AVATAR_MESSAGES
 from ...services.scoring.scoring_subjects import subject_entry_model
 from ...services.scoring.schema_resolution import (
@@ -29,6 +29,7 @@ from ...services.scoring.team_scoring import (
     is_team_context_app,
     logical_team_inputs_to_runtime_inputs,
     runtime_inputs_to_logical_team_inputs,
+    runtime_engine_for_comp_aparell,
     runtime_schema_for_comp_aparell,
 )
 from ...services.scoring.team_subject_contract import build_team_subject_registry, runtime_schema_for_team_subjects
@@ -76,7 +77,7 @@ def _recalculate_scores_for_comp_aparell(
     pending_updates = []
     if not is_team_app:
         try:
-            engine = ScoringEngine(runtime_schema_for_comp_aparell(base_schema, comp_aparell))
+            engine = runtime_engine_for_comp_aparell(base_schema, comp_aparell)
         except Exception as exc:
             summary["engine_error"] = str(exc)
             logger.exception(
@@ -101,7 +102,7 @@ def _recalculate_scores_for_comp_aparell(
                 runtime_schema = runtime_schema_for_comp_aparell(base_schema, comp_aparell, member_count=member_count)
                 canonical_inputs = logical_team_inputs_to_runtime_inputs(known_inputs, team_subject, base_schema)
                 runtime_inputs = build_runtime_inputs_from_canonical(canonical_inputs, runtime_schema)
-                result = ScoringEngine(runtime_schema).compute(runtime_inputs)
+                result = runtime_engine_for_comp_aparell(base_schema, comp_aparell, member_count=member_count).compute(runtime_inputs)
                 logical_inputs = runtime_inputs_to_logical_team_inputs(
                     persist_inputs_after_compute(canonical_inputs, result.inputs, runtime_schema),
                     team_subject,
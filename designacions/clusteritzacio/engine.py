@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import numpy as np
-import pandas as pd
-from sklearn.cluster import DBSCAN
+from ceeb_web.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+sklearn_cluster = lazy_import("sklearn.cluster")
 
 
 EARTH_RADIUS_KM = 6371.0088
@@ -107,7 +109,7 @@ def cluster_points_dataframe(
     if not coords.empty:
         coords_rad = np.radians(coords.to_numpy())
         eps = (float(eps_m) / 1000.0) / EARTH_RADIUS_KM
-        model = DBSCAN(eps=eps, min_samples=int(min_samples), metric="haversine")
+        model = sklearn_cluster.DBSCAN(eps=eps, min_samples=int(min_samples), metric="haversine")
         labels = model.fit_predict(coords_rad)
         out.loc[coords.index, cluster_col] = pd.Series(labels, index=coords.index, dtype="Int64")
 
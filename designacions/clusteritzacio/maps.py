@@ -4,11 +4,14 @@ import hashlib
 import json
 from pathlib import Path
 
-import folium
 from html import escape
 
+from ceeb_web.lazy_imports import lazy_import
+
 from .contracts import PreviewScenario
 
+folium = lazy_import("folium")
+
 
 def _color_for_cluster(cluster_id) -> str:
     if cluster_id in (None, -1):
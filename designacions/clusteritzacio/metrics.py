@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import statistics
 
-import pandas as pd
+from ceeb_web.lazy_imports import lazy_import
 
 from .contracts import PreviewMetrics
 
+pd = lazy_import("pandas")
+
 
 def _safe_cluster_values(df: pd.DataFrame) -> list[int]:
     values = []
@@ -6,11 +6,14 @@ import time
 import uuid
 from pathlib import Path
 
-import pandas as pd
 from django.conf import settings
 
+from ceeb_web.lazy_imports import lazy_import
+
 from .contracts import PreviewClusterOverride
 
+pd = lazy_import("pandas")
+
 
 PREVIEW_OVERRIDE_REL_DIR = os.path.join("designacions", "preview_overrides")
 
@@ -4,10 +4,10 @@ import os
 from collections import defaultdict
 from pathlib import Path
 
-import pandas as pd
 from asgiref.sync import async_to_sync
 from django.conf import settings
 
+from ceeb_web.lazy_imports import lazy_import
 from logs import push_log
 
 from ..geolocate import extreu_municipi
@@ -22,6 +22,8 @@ from .metrics import build_preview_metrics
 from .overrides import apply_preview_overrides, enrich_preview_overrides, resolve_preview_overrides
 from .selectors import build_eps_options, pick_recommended_scenario
 
+pd = lazy_import("pandas")
+
 
 def _log(task_id: str | None, message: str, progress: int | None = None):
     if task_id:
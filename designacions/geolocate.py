@@ -1,21 +1,24 @@
-import pandas as pd
-from geopy.geocoders import Nominatim
+from __future__ import annotations
+
 from time import sleep
 import re
 import time
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
 import sys
 from pathlib import Path
 import hashlib
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import folium
-from sklearn.cluster import DBSCAN
 from asgiref.sync import async_to_sync
 
-import numpy as np
-import matplotlib.pyplot as plt
+from ceeb_web.lazy_imports import lazy_import
+
+# pila cientifica diferida: preview_service i geocoding_db importen aquest
+# modul des de les vistes
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+plt = lazy_import("matplotlib.pyplot")
+folium = lazy_import("folium")
+geopy_exc = lazy_import("geopy.exc")
+geopy_geocoders = lazy_import("geopy.geocoders")
+sklearn_cluster = lazy_import("sklearn.cluster")
 
 class GeocodingRateLimitedError(RuntimeError):
     pass
@@ -151,7 +154,7 @@ def clusteritza_i_plota(
     kms_per_radian = 6371.0088
     eps = (eps_metres / 1000.0) / kms_per_radian
 
-    model = DBSCAN(eps=eps, min_samples=min_samples, metric="haversine")
+    model = sklearn_cluster.DBSCAN(eps=eps, min_samples=min_samples, metric="haversine")
     labels = model.fit_predict(coords_rad)
 
     # Assignar labels al df (respectant índexos després de dropna)
@@ -382,7 +385,7 @@ def geocode_amb_reintents_limitat(
             if loc:
                 return loc
             return None
-        except (GeocoderTimedOut, GeocoderUnavailable):
+        except (geopy_exc.GeocoderTimedOut, geopy_exc.GeocoderUnavailable):
             time.sleep(pausa * (i + 1))
 
         except Exception as e:
@@ -595,7 +598,7 @@ def geocodificar(document_csv, existing_adrecces="domicilis_geocodificats.csv"):
     df_master = df_master.drop_duplicates(subset=["adreca"], keep="first").drop(columns=["_te_coords"])
 
     # Geocodificar només adreces sense lat/lon
-    geolocator = Nominatim(user_agent="geocodificacio_ceeb")
+    geolocator = geopy_geocoders.Nominatim(user_agent="geocodificacio_ceeb")
 
 
     mask_falten = df_master["lat"].isna() | df_master["lon"].isna()
@@ -12,7 +12,7 @@ from designacions.services.addressing import build_address_payload, resolve_addr
 from designacions.services.geocoding_db import addresses_to_df
 from designacions.services.manual_assignment import (
     build_manual_assignment_context,
-    diagnose_assignment_for_referee,
+    diagnose_with_context,
     update_run_mobility_summary,
 )
 
@@ -197,14 +197,7 @@ class Command(BaseCommand):
             update_run_mobility_summary(run, context=context, save=not audit_only)
             assignments = run.assignments.select_related("match", "referee").filter(referee__isnull=False)
             for assignment in assignments:
-                diagnosis = diagnose_assignment_for_referee(
-                    run,
-                    assignment,
-                    assignment.referee,
-                    availability_lookup=context["availability_lookup"],
-                    assignments_by_referee=context["assignments_by_referee"],
-                    cluster_by_match_id=context["cluster_by_match_id"],
-                )
+                diagnosis = diagnose_with_context(run, assignment, assignment.referee, context)
                 if diagnosis["is_valid"]:
                     if assignment.manual_override_warning:
                         stats["warnings_total"] += 1
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("designacions", "0013_runanalyticssnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="runanalyticssnapshot",
+            name="pending_revision",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="runanalyticssnapshot",
+            name="changed_dates",
+            field=models.JSONField(blank=True, default=list, null=True),
+        ),
+    ]
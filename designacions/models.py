@@ -230,3 +230,22 @@ class AddressCluster(models.Model):
 
     class Meta:
         unique_together = ("run", "address")
+
+
+class RunAnalyticsSnapshot(models.Model):
+    """Analitica calculada d'un run per a una revisio concreta de les seves assignacions."""
+
+    run = models.OneToOneField(DesignationRun, on_delete=models.CASCADE, related_name="analytics_snapshot")
+    revision = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)
+    # diagnosi per partit pendent, reutilitzada en els canvis manuals
+    unassigned_entries = models.JSONField(default=dict, blank=True)
+    # canvis manuals pendents de recalcular: revisio esperada despres de l'ultim canvi i
+    # dies tocats (null: hi ha hagut altres canvis i cal recalcular-ho tot)
+    pending_revision = models.CharField(max_length=255, blank=True, default="")
+    changed_dates = models.JSONField(default=list, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Analytics run {self.run_id} ({self.revision})"
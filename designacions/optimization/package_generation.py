@@ -19,10 +19,12 @@ from .levels import (
     level_fit,
 )
 from .route_points import (
+    config_venue_matrix,
     required_gap as atomic_required_gap,
     route_points_from_segments,
     transition_requires_vehicle as atomic_transition_requires_vehicle,
 )
+from .venue_matrix import with_venue_matrix
 
 
 try:
@@ -216,23 +218,24 @@ def _clusters_need_vehicle(cluster_ids: Iterable[Any]) -> bool:
     return len(cleaned) > 1
 
 
-def _route_requires_vehicle(segments: Iterable[Any]) -> bool:
+def _route_requires_vehicle(segments: Iterable[Any], config: dict[str, Any] | None = None) -> bool:
     segment_list = list(segments)
     points = route_points_from_segments(segment_list)
     if len(points) >= 2:
-        return any(atomic_transition_requires_vehicle(left, right) for left, right in zip(points, points[1:]))
+        matrix = config_venue_matrix(config)
+        return any(atomic_transition_requires_vehicle(left, right, matrix) for left, right in zip(points, points[1:]))
     cluster_ids = [cluster for segment in segment_list for cluster in list(_obj_get(segment, "cluster_ids", []) or [])]
     if _clusters_need_vehicle(cluster_ids):
         return True
     return _has_uncertain_cluster(segment_list) and not _segments_same_location(segment_list)
 
 
-def _transition_requires_vehicle(left: Any, right: Any) -> bool:
+def _transition_requires_vehicle(left: Any, right: Any, config: dict[str, Any] | None = None) -> bool:
     left_points = route_points_from_segments([left])
     right_points = route_points_from_segments([right])
     if left_points and right_points:
-        return atomic_transition_requires_vehicle(left_points[-1], right_points[0])
-    return _route_requires_vehicle([left, right])
+        return atomic_transition_requires_vehicle(left_points[-1], right_points[0], config_venue_matrix(config))
+    return _route_requires_vehicle([left, right], config)
 
 
 def _has_uncertain_cluster(segments: Iterable[Any]) -> bool:
@@ -710,13 +713,13 @@ def _can_route(left: Any, right: Any, config: dict[str, Any]) -> bool:
     minutes = _gap_minutes(left, right)
     if minutes is None or minutes < 0:
         return False
-    return minutes >= _required_gap(left, right, config, _transition_requires_vehicle(left, right))
+    return minutes >= _required_gap(left, right, config, _transition_requires_vehicle(left, right, config))
 
 
 def _merge_route(left: Any, right: Any, pressure_summary: Any, tutors: list[Any] | None = None, config: dict[str, Any] | None = None) -> Any:
     cluster_ids = list(_obj_get(left, "cluster_ids", []) or []) + list(_obj_get(right, "cluster_ids", []) or [])
     statuses = list(_obj_get(left, "cluster_statuses", []) or []) + list(_obj_get(right, "cluster_statuses", []) or [])
-    requires_vehicle = _route_requires_vehicle([left, right])
+    requires_vehicle = _route_requires_vehicle([left, right], config)
     vehicle_preferred = _has_unreliable_cluster(cluster_ids, statuses)
     component_ids = [_obj_get(left, "id"), _obj_get(right, "id")]
     kind = "merged_route"
@@ -803,6 +806,8 @@ def generate_package_candidates(
             _obj_get(item, "id"),
         ),
     )
+    # every candidate pair below looks its transitions up in one shared table
+    config = with_venue_matrix(config, ordered)
     route_candidates_by_group: dict[tuple[Any, str], list[tuple[Any, dict[str, int]]]] = {}
     for left, right in combinations(ordered, 2):
         if not _can_route(left, right, config):
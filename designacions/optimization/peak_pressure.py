@@ -176,54 +176,8 @@ def estimate_phase_bucket_pressure(
         if not (set(_fragment_match_ids(fragment)) & assigned_match_ids)
     ]
     buckets = compute_time_buckets(fragments, cfg)
-    tutors = [_normalize_tutor(tutor) for tutor in eligible_tutors or []]
-
-    pressures: list[PhaseBucketPressure] = []
-    for bucket in buckets:
-        matching = [tutor for tutor in tutors if _modality_matches(tutor["modality"], bucket.modality)]
-        available = [
-            tutor
-            for tutor in matching
-            if _availability_covers_bucket(tutor["availability_by_date"], bucket, cfg)
-        ]
-        route_load = _bucket_route_load(state, bucket)
-        busy_ids = route_load["busy_tutor_ids"]
-        available_not_busy = [tutor for tutor in available if tutor["id"] not in busy_ids]
-        vehicle_count = sum(1 for tutor in available_not_busy if tutor["has_vehicle"])
-
-        load_units = (
-            route_load["route_count"] * float(cfg["peak_pressure_existing_route_weight"])
-            + route_load["match_count"] * float(cfg["peak_pressure_existing_match_weight"])
-        )
-        effective_supply = max(float(len(available_not_busy)) - load_units, 0.0)
-        demand_pressure = _pressure(bucket.weighted_demand, effective_supply)
-        vehicle_pressure = _pressure(bucket.requires_vehicle_count, vehicle_count)
-        if bucket.requires_vehicle_count <= 0:
-            vehicle_pressure = 0.0
-        load_pressure = _pressure(float(route_load["match_count"]), max(len(matching), 1))
-        score = (
-            demand_pressure
-            + vehicle_pressure * float(cfg["peak_pressure_vehicle_shortage_weight"])
-            + load_pressure
-            + bucket.classification_importance * float(cfg["peak_pressure_classification_weight"])
-        )
-        pressures.append(
-            PhaseBucketPressure(
-                bucket=bucket,
-                eligible_tutor_count=len(matching),
-                available_tutor_count=len(available),
-                effective_tutor_supply=round(effective_supply, 4),
-                vehicle_tutor_count=vehicle_count,
-                busy_tutor_count=len(busy_ids),
-                existing_route_count=int(route_load["route_count"]),
-                existing_match_count=int(route_load["match_count"]),
-                demand_pressure=round(demand_pressure, 4),
-                vehicle_pressure=round(vehicle_pressure, 4),
-                load_pressure=round(load_pressure, 4),
-                pressure_score=round(score, 4),
-            )
-        )
-
+    pool = _TutorPool([_normalize_tutor(tutor) for tutor in eligible_tutors or []], cfg)
+    pressures = [_pressure_for_bucket(bucket, pool, state, cfg) for bucket in buckets]
     return sorted(pressures, key=_pressure_rank)
 
 
@@ -304,7 +258,7 @@ def estimate_phase_local_pressure(
         if not (set(_fragment_match_ids(fragment)) & assigned_match_ids)
     ]
     fragments = [fragment for fragment in fragments if fragment["match_ids"]]
-    tutors = [_normalize_tutor(tutor) for tutor in eligible_tutors or []]
+    pool = _TutorPool([_normalize_tutor(tutor) for tutor in eligible_tutors or []], cfg)
     radius = max(int(cfg.get("peak_local_window_radius_minutes") or int(cfg.get("peak_local_window_minutes", 60) or 60) / 2), 1)
 
     centers: dict[tuple[str, str, datetime], list[dict[str, Any]]] = {}
@@ -326,7 +280,7 @@ def estimate_phase_local_pressure(
         if not local_fragments:
             continue
         bucket = _local_bucket(date_key, modality, center_dt, local_fragments)
-        pressures.append(_pressure_for_bucket(bucket, tutors, state, cfg))
+        pressures.append(_pressure_for_bucket(bucket, pool, state, cfg))
 
     return sorted(pressures, key=_pressure_rank)
 
@@ -374,31 +328,27 @@ def _local_bucket(
 
 def _pressure_for_bucket(
     bucket: TimeBucket,
-    tutors: list[dict[str, Any]],
+    pool: _TutorPool,
     state: Any,
     cfg: Mapping[str, Any],
 ) -> PhaseBucketPressure:
-    matching = [tutor for tutor in tutors if _modality_matches(tutor["modality"], bucket.modality)]
-    available = [
-        tutor
-        for tutor in matching
-        if _availability_covers_bucket(tutor["availability_by_date"], bucket, cfg)
-    ]
+    matching = pool.modality_mask(bucket.modality)
+    available = matching & pool.available_mask(bucket)
     route_load = _bucket_route_load(state, bucket)
     busy_ids = route_load["busy_tutor_ids"]
-    available_not_busy = [tutor for tutor in available if tutor["id"] not in busy_ids]
-    vehicle_count = sum(1 for tutor in available_not_busy if tutor["has_vehicle"])
+    available_not_busy = available & ~pool.id_mask(busy_ids)
+    vehicle_count = _popcount(available_not_busy & pool.vehicle_mask)
 
     load_units = (
         route_load["route_count"] * float(cfg["peak_pressure_existing_route_weight"])
         + route_load["match_count"] * float(cfg["peak_pressure_existing_match_weight"])
     )
-    effective_supply = max(float(len(available_not_busy)) - load_units, 0.0)
+    effective_supply = max(float(_popcount(available_not_busy)) - load_units, 0.0)
     demand_pressure = _pressure(bucket.weighted_demand, effective_supply)
     vehicle_pressure = _pressure(bucket.requires_vehicle_count, vehicle_count)
     if bucket.requires_vehicle_count <= 0:
         vehicle_pressure = 0.0
-    load_pressure = _pressure(float(route_load["match_count"]), max(len(matching), 1))
+    load_pressure = _pressure(float(route_load["match_count"]), max(_popcount(matching), 1))
     score = (
         demand_pressure
         + vehicle_pressure * float(cfg["peak_pressure_vehicle_shortage_weight"])
@@ -407,8 +357,8 @@ def _pressure_for_bucket(
     )
     return PhaseBucketPressure(
         bucket=bucket,
-        eligible_tutor_count=len(matching),
-        available_tutor_count=len(available),
+        eligible_tutor_count=_popcount(matching),
+        available_tutor_count=_popcount(available),
         effective_tutor_supply=round(effective_supply, 4),
         vehicle_tutor_count=vehicle_count,
         busy_tutor_count=len(busy_ids),
@@ -519,31 +469,148 @@ def _route_overlaps_bucket(route_state: Any, bucket: TimeBucket) -> bool:
     return route_start < bucket_end and bucket_start < route_end
 
 
-def _availability_covers_bucket(availability_by_date: Any, bucket: TimeBucket, cfg: Mapping[str, Any]) -> bool:
-    if not availability_by_date:
-        return bool(cfg.get("assume_available_when_missing", True))
-    if bucket.start_dt is None:
-        return bool(cfg.get("assume_available_when_time_missing", True))
-    if not isinstance(availability_by_date, Mapping):
-        return bool(availability_by_date)
-
-    day_value = _availability_for_date(availability_by_date, bucket.date)
-    if day_value is None:
-        return bool(cfg.get("assume_available_when_missing", True))
-    if isinstance(day_value, bool):
-        return day_value
-    if isinstance(day_value, Mapping):
-        if "available" in day_value and not bool(day_value["available"]):
+class _TutorPool:
+    """Eligible tutors as bitmasks (bit ``i`` is ``tutors[i]``) for bucket counts.
+
+    Each tutor's availability is looked up once per date and its windows
+    parsed once into time intervals, so a bucket only compares times and the
+    counts are popcounts of mask intersections. ``available_mask`` caches by
+    ``(date, bucket_start, bucket_end)``; local windows sharing a span reuse it.
+    """
+
+    def __init__(self, tutors: list[dict[str, Any]], cfg: Mapping[str, Any]):
+        self.cfg = cfg
+        self.all_mask = (1 << len(tutors)) - 1
+        self.vehicle_mask = 0
+        self.wildcard_modality_mask = 0
+        self.modality_masks: dict[str, int] = {}
+        self.id_masks: dict[str, int] = {}
+        self.missing_mask = 0
+        self.undated_available_mask = 0
+        self.dated: list[tuple[int, Mapping[Any, Any]]] = []
+        for index, tutor in enumerate(tutors):
+            bit = 1 << index
+            modality = tutor["modality"]
+            if modality in {"any", "unknown", ""}:
+                self.wildcard_modality_mask |= bit
+            else:
+                self.modality_masks[modality] = self.modality_masks.get(modality, 0) | bit
+            if tutor["has_vehicle"]:
+                self.vehicle_mask |= bit
+            self.id_masks[tutor["id"]] = self.id_masks.get(tutor["id"], 0) | bit
+            availability = tutor["availability_by_date"]
+            if not availability:
+                self.missing_mask |= bit
+            elif isinstance(availability, Mapping):
+                self.dated.append((bit, availability))
+            else:
+                self.undated_available_mask |= bit
+        self._days: dict[str, list[tuple[int, _DayAvailability | None]]] = {}
+        self._available: dict[tuple[str, str, str], int] = {}
+
+    def modality_mask(self, bucket_modality: str) -> int:
+        if bucket_modality in {"unknown", ""}:
+            return self.all_mask
+        return self.modality_masks.get(bucket_modality, 0) | self.wildcard_modality_mask
+
+    def id_mask(self, tutor_ids: Iterable[str]) -> int:
+        mask = 0
+        for tutor_id in tutor_ids:
+            mask |= self.id_masks.get(tutor_id, 0)
+        return mask
+
+    def available_mask(self, bucket: TimeBucket) -> int:
+        assume_missing = bool(self.cfg.get("assume_available_when_missing", True))
+        mask = self.missing_mask if assume_missing else 0
+        if bucket.start_dt is None:
+            if bool(self.cfg.get("assume_available_when_time_missing", True)):
+                mask |= self.all_mask & ~self.missing_mask
+            return mask
+
+        cache_key = (bucket.date, bucket.bucket_start, bucket.bucket_end)
+        dated_mask = self._available.get(cache_key)
+        if dated_mask is None:
+            dated_mask = 0
+            start = _time_value(bucket.bucket_start)
+            end = _time_value(bucket.bucket_end)
+            for bit, day in self._day_availability(bucket.date):
+                if day is None:
+                    if assume_missing:
+                        dated_mask |= bit
+                elif day.covers(bucket.bucket_start, start, end):
+                    dated_mask |= bit
+            self._available[cache_key] = dated_mask
+        return mask | self.undated_available_mask | dated_mask
+
+    def _day_availability(self, date_key: str) -> list[tuple[int, _DayAvailability | None]]:
+        days = self._days.get(date_key)
+        if days is None:
+            days = []
+            for bit, availability in self.dated:
+                day_value = _availability_for_date(availability, date_key)
+                days.append((bit, None if day_value is None else _DayAvailability.from_value(day_value)))
+            self._days[date_key] = days
+        return days
+
+
+@dataclass(frozen=True)
+class _DayAvailability:
+    """One tutor-day of availability: a constant, or slots plus parsed time intervals."""
+
+    constant: bool | None = None
+    always: bool = False
+    slots: frozenset[str] = frozenset()
+    intervals: tuple[tuple[time, time], ...] = ()
+
+    @classmethod
+    def from_value(cls, day_value: Any) -> _DayAvailability:
+        if isinstance(day_value, bool):
+            return cls(constant=day_value)
+        if isinstance(day_value, Mapping):
+            if "available" in day_value and not bool(day_value["available"]):
+                return cls(constant=False)
+            windows = day_value.get("windows") or day_value.get("intervals") or day_value.get("slots")
+            if windows is None and ("start" in day_value or "end" in day_value or "Hora Inici" in day_value):
+                windows = [day_value]
+            if windows is None:
+                return cls(constant=any(bool(value) for value in day_value.values()))
+            return cls._from_windows(windows)
+        if isinstance(day_value, (list, tuple, set)):
+            return cls._from_windows(day_value)
+        return cls(constant=bool(day_value))
+
+    @classmethod
+    def _from_windows(cls, windows: Any) -> _DayAvailability:
+        if isinstance(windows, str):
+            return cls(slots=frozenset({windows}))
+        always = False
+        slots: set[str] = set()
+        intervals: list[tuple[time, time]] = []
+        for window in windows or []:
+            if isinstance(window, str):
+                slots.add(window)
+                continue
+            if isinstance(window, Mapping):
+                start = _time_value(window.get("start") or window.get("from") or window.get("Hora Inici"))
+                end = _time_value(window.get("end") or window.get("to") or window.get("Hora Fi"))
+            elif isinstance(window, tuple) and len(window) >= 2:
+                start = _time_value(window[0])
+                end = _time_value(window[1])
+            else:
+                always = always or bool(window)
+                continue
+            if start is not None and end is not None:
+                intervals.append((start, end))
+        return cls(always=always, slots=frozenset(slots), intervals=tuple(intervals))
+
+    def covers(self, bucket_start: str, start: time | None, end: time | None) -> bool:
+        if self.constant is not None:
+            return self.constant
+        if self.always or bucket_start in self.slots:
+            return True
+        if start is None or end is None:
             return False
-        windows = day_value.get("windows") or day_value.get("intervals") or day_value.get("slots")
-        if windows is None and ("start" in day_value or "end" in day_value or "Hora Inici" in day_value):
-            windows = [day_value]
-        if windows is None:
-            return any(bool(value) for value in day_value.values())
-        return _any_window_overlaps(windows, bucket)
-    if isinstance(day_value, (list, tuple, set)):
-        return _any_window_overlaps(day_value, bucket)
-    return bool(day_value)
+        return any(window_start < end and start < window_end for window_start, window_end in self.intervals)
 
 
 def _availability_for_date(availability_by_date: Mapping[Any, Any], date_key: str) -> Any:
@@ -553,30 +620,8 @@ def _availability_for_date(availability_by_date: Mapping[Any, Any], date_key: st
     return None
 
 
-def _any_window_overlaps(windows: Any, bucket: TimeBucket) -> bool:
-    if isinstance(windows, str):
-        return windows == bucket.bucket_start
-    return any(_window_overlaps(window, bucket) for window in windows or [])
-
-
-def _window_overlaps(window: Any, bucket: TimeBucket) -> bool:
-    if isinstance(window, str):
-        return window == bucket.bucket_start
-    if isinstance(window, Mapping):
-        start = _time_value(window.get("start") or window.get("from") or window.get("Hora Inici"))
-        end = _time_value(window.get("end") or window.get("to") or window.get("Hora Fi"))
-    elif isinstance(window, tuple) and len(window) >= 2:
-        start = _time_value(window[0])
-        end = _time_value(window[1])
-    else:
-        return bool(window)
-    if start is None or end is None:
-        return False
-    bucket_start = _time_value(bucket.bucket_start)
-    bucket_end = _time_value(bucket.bucket_end)
-    if bucket_start is None or bucket_end is None:
-        return False
-    return start < bucket_end and bucket_start < end
+def _popcount(mask: int) -> int:
+    return mask.bit_count()
 
 
 def _anchor_reason_codes(pressure: PhaseBucketPressure) -> list[str]:
@@ -833,10 +878,6 @@ def _transport_has_vehicle(value: Any) -> bool:
     return any(token in text for token in ("cotxe", "coche", "moto", "vehicle", "furgoneta"))
 
 
-def _modality_matches(tutor_modality: str, bucket_modality: str) -> bool:
-    return tutor_modality in {bucket_modality, "any", "unknown", ""} or bucket_modality in {"unknown", ""}
-
-
 def _clusters_need_vehicle(cluster_ids: Iterable[Any]) -> bool:
     cleaned = {_clean_key(cluster) for cluster in cluster_ids if _clean_key(cluster) != "unknown"}
     return len(cleaned) > 1
@@ -11,6 +11,7 @@ from .recommendations import build_swap_recommendations
 from .rescue import run_final_rescue, run_individual_rescue, run_new_route_rescue, run_partial_rescue
 from .route_generation import RouteCandidate, generate_phase_route_candidates
 from .state import DesignationState, apply_route_assignment, create_initial_state
+from .venue_matrix import with_venue_matrix
 
 
 @dataclass
@@ -43,6 +44,7 @@ def run_phased_route_solver(
 ) -> PhasedRouteSolverResult:
     config = dict(config or {})
     fragments = build_level_fragments(base_subgroups, config)
+    config = with_venue_matrix(config, fragments)
     tutor_list = list(tutors or [])
     all_match_ids = [match_id for fragment in fragments for match_id in _match_ids(fragment)]
     state = create_initial_state(all_match_ids)
@@ -86,8 +86,9 @@ def build_pressure_summary(
             })
             cluster_demand[cluster_key]["demand"] += demand
 
+    supply_index = _TutorSupplyIndex(tutor_rows, cfg)
     bucket_supply = {
-        key: _count_supply(entry, tutor_rows, cfg)
+        key: supply_index.count_supply(entry)
         for key, entry in bucket_demand.items()
     }
 
@@ -136,7 +137,7 @@ def build_pressure_summary(
         entry = bucket_demand[key]
         for level in sorted(level_demand[key]):
             demand = level_demand[key][level]
-            supply = _count_level_supply(entry, level, tutor_rows, cfg)
+            supply = supply_index.count_level_supply(entry, level)
             pressure = _pressure(demand, supply)
             level_key = _join_key(key, level)
             row = {
@@ -157,7 +158,7 @@ def build_pressure_summary(
     for key in sorted(cluster_demand):
         entry = cluster_demand[key]
         bucket_key = _join_key(entry["date"], entry["modality"], entry["bucket"])
-        supply = _count_cluster_supply(entry, tutor_rows, bucket_supply.get(bucket_key, {}), cfg)
+        supply = supply_index.count_cluster_supply(entry, bucket_supply.get(bucket_key, {}))
         pressure = _pressure(entry["demand"], supply)
         row = {
             "key": key,
@@ -285,55 +286,103 @@ def _join_key(*parts: Any) -> str:
     return "|".join(str(part) for part in parts)
 
 
-def _count_supply(bucket: dict[str, Any], tutors: list[dict[str, Any]], cfg: dict[str, Any]) -> dict[str, int]:
-    matching = [
-        tutor for tutor in tutors
-        if _modality_matches(tutor["modality"], bucket["modality"])
-        and _is_available(tutor.get("availability_by_date"), bucket["date"], bucket["bucket"])
-    ]
-    return {
-        "total": len(matching),
-        "vehicle": sum(1 for tutor in matching if tutor["has_vehicle"]),
-    }
+class _TutorSupplyIndex:
+    """Tutor sets as bitmasks (bit ``i`` is ``tutors[i]``) for bucket supply counts.
 
+    Modality, vehicle, level and cluster masks are built once; availability is
+    resolved once per tutor and date and once per ``(date, bucket)``. Every
+    bucket, level and cluster count is then an AND of masks plus a popcount
+    instead of a scan that re-parses ``availability_by_date``.
+    """
 
-def _count_level_supply(bucket: dict[str, Any], level: str, tutors: list[dict[str, Any]], cfg: dict[str, Any]) -> int:
-    return sum(
-        1 for tutor in tutors
-        if _modality_matches(tutor["modality"], bucket["modality"])
-        and _level_acceptable(tutor["level"], level, cfg)
-        and _is_available(tutor.get("availability_by_date"), bucket["date"], bucket["bucket"])
-    )
-
-
-def _count_cluster_supply(
-    cluster_bucket: dict[str, Any],
-    tutors: list[dict[str, Any]],
-    bucket_supply: dict[str, Any],
-    cfg: dict[str, Any],
-) -> int:
-    cluster_id = str(cluster_bucket["cluster_id"])
-    local = [
-        tutor for tutor in tutors
-        if cluster_id in tutor["cluster_ids"]
-        and _modality_matches(tutor["modality"], cluster_bucket["modality"])
-        and _is_available(tutor.get("availability_by_date"), cluster_bucket["date"], cluster_bucket["bucket"])
-    ]
-    if local:
-        return len(local)
-    return int(bucket_supply.get("total", 0))
-
-
-def _is_available(availability_by_date: Any, date_key: str, bucket: str) -> bool:
-    if not availability_by_date:
-        return True
-    if not isinstance(availability_by_date, dict):
-        return bool(availability_by_date)
+    def __init__(self, tutors: list[dict[str, Any]], cfg: dict[str, Any]):
+        self.tutors = tutors
+        self.cfg = cfg
+        self.all_mask = (1 << len(tutors)) - 1
+        self.vehicle_mask = 0
+        self.wildcard_modality_mask = 0
+        self.modality_masks: dict[str, int] = {}
+        self.level_masks: dict[str, int] = {}
+        self.cluster_masks: dict[str, int] = {}
+        # sense disponibilitat per dates (buida o no-dict) el tutor compta sempre
+        self.static_available_mask = 0
+        self.dated: list[tuple[int, dict[Any, Any]]] = []
+        for index, tutor in enumerate(tutors):
+            bit = 1 << index
+            modality = tutor["modality"]
+            if modality in {"any", "unknown"}:
+                self.wildcard_modality_mask |= bit
+            else:
+                self.modality_masks[modality] = self.modality_masks.get(modality, 0) | bit
+            if tutor["has_vehicle"]:
+                self.vehicle_mask |= bit
+            self.level_masks[tutor["level"]] = self.level_masks.get(tutor["level"], 0) | bit
+            for cluster_id in tutor["cluster_ids"]:
+                self.cluster_masks[cluster_id] = self.cluster_masks.get(cluster_id, 0) | bit
+            availability = tutor.get("availability_by_date")
+            if isinstance(availability, dict) and availability:
+                self.dated.append((bit, availability))
+            else:
+                self.static_available_mask |= bit
+        self._day_values: dict[str, list[tuple[int, Any]]] = {}
+        self._available: dict[tuple[str, str], int] = {}
+        self._acceptable_levels: dict[str, int] = {}
+
+    def count_supply(self, bucket: dict[str, Any]) -> dict[str, int]:
+        matching = self._candidates(bucket)
+        return {
+            "total": _popcount(matching),
+            "vehicle": _popcount(matching & self.vehicle_mask),
+        }
 
-    day_value = _availability_for_date(availability_by_date, date_key)
-    if day_value is None:
-        return True
-    return _availability_value_allows(day_value, bucket)
+    def count_level_supply(self, bucket: dict[str, Any], level: str) -> int:
+        return _popcount(self._candidates(bucket) & self._level_mask(level))
+
+    def count_cluster_supply(self, cluster_bucket: dict[str, Any], bucket_supply: dict[str, Any]) -> int:
+        local = self._candidates(cluster_bucket) & self.cluster_masks.get(str(cluster_bucket["cluster_id"]), 0)
+        if local:
+            return _popcount(local)
+        return int(bucket_supply.get("total", 0))
+
+    def _candidates(self, bucket: dict[str, Any]) -> int:
+        return self._modality_mask(bucket["modality"]) & self._available_mask(bucket["date"], bucket["bucket"])
+
+    def _modality_mask(self, bucket_modality: str) -> int:
+        if bucket_modality == "unknown":
+            return self.all_mask
+        return self.modality_masks.get(bucket_modality, 0) | self.wildcard_modality_mask
+
+    def _level_mask(self, demand_level: str) -> int:
+        mask = self._acceptable_levels.get(demand_level)
+        if mask is None:
+            mask = 0
+            for tutor_level, level_mask in self.level_masks.items():
+                if _level_acceptable(tutor_level, demand_level, self.cfg):
+                    mask |= level_mask
+            self._acceptable_levels[demand_level] = mask
+        return mask
+
+    def _available_mask(self, date_key: str, bucket: str) -> int:
+        cache_key = (date_key, bucket)
+        mask = self._available.get(cache_key)
+        if mask is None:
+            mask = self.static_available_mask
+            for bit, day_value in self._day_values_for(date_key):
+                if day_value is None or _availability_value_allows(day_value, bucket):
+                    mask |= bit
+            self._available[cache_key] = mask
+        return mask
+
+    def _day_values_for(self, date_key: str) -> list[tuple[int, Any]]:
+        values = self._day_values.get(date_key)
+        if values is None:
+            values = [(bit, _availability_for_date(availability, date_key)) for bit, availability in self.dated]
+            self._day_values[date_key] = values
+        return values
+
+
+def _popcount(mask: int) -> int:
+    return mask.bit_count()
 
 
 def _availability_for_date(availability_by_date: dict[Any, Any], date_key: str) -> Any:
@@ -493,10 +542,6 @@ def _normalize_modality(value: Any, cfg: dict[str, Any]) -> str:
     return str(cfg.get("modality_aliases", {}).get(modality, modality))
 
 
-def _modality_matches(tutor_modality: str, bucket_modality: str) -> bool:
-    return tutor_modality in {bucket_modality, "any", "unknown"} or bucket_modality == "unknown"
-
-
 def _parse_datetime(value: Any) -> datetime | date | None:
     if isinstance(value, (datetime, date)):
         return value
@@ -3,9 +3,11 @@ from __future__ import annotations
 from dataclasses import asdict, dataclass, is_dataclass
 from datetime import date, datetime, time, timedelta
 from itertools import combinations
+from time import monotonic
 from typing import Any, Iterable, Mapping
 
 from .route_points import (
+    config_venue_matrix,
     required_gap as atomic_required_gap,
     route_points_from_segments,
     transition_requires_vehicle as atomic_transition_requires_vehicle,
@@ -19,6 +21,8 @@ DEFAULT_NEW_ROUTE_TOP_N_PER_TUTOR = 30
 DEFAULT_NEW_ROUTE_TOP_N_PER_MATCH = 10
 DEFAULT_INDIVIDUAL_TOP_N_TUTORS = 8
 DEFAULT_INDIVIDUAL_MAX_ITERATIONS = 5
+DEFAULT_RESCUE_CP_SAT_TIME_LIMIT_SEC = 10.0
+DEFAULT_RESCUE_CP_SAT_MAX_CANDIDATES = 5000
 
 
 @dataclass
@@ -133,7 +137,7 @@ def run_new_route_rescue(
         top_n_per_tutor=int(cfg.get("rescue_new_routes_top_n_per_tutor", DEFAULT_NEW_ROUTE_TOP_N_PER_TUTOR) or 0),
         top_n_per_match=int(cfg.get("rescue_new_routes_top_n_per_match", DEFAULT_NEW_ROUTE_TOP_N_PER_MATCH) or 0),
     )
-    selected_routes = _select_non_overlapping_routes(viable_candidates, prefer_coverage=True)
+    selected_routes, selection = _select_rescue_routes(viable_candidates, cfg)
     recovered_match_ids = sorted(
         {
             match_id
@@ -154,6 +158,7 @@ def run_new_route_rescue(
             "blocking_reason_counts": blocking_reason_counts,
             "unrecovered_match_ids": sorted(set(attempted_match_ids) - set(recovered_match_ids)),
             "route_draft_count": len(route_drafts),
+            "selection": selection,
         },
     ).to_dict()
 
@@ -231,7 +236,7 @@ def run_individual_rescue(
             top_n_per_tutor=0,
             top_n_per_match=int(cfg.get("individual_rescue_top_n_tutors", DEFAULT_INDIVIDUAL_TOP_N_TUTORS) or 0),
         )
-        selected_this_iteration = _select_non_overlapping_routes(viable_candidates, prefer_coverage=True)
+        selected_this_iteration, selection = _select_rescue_routes(viable_candidates, cfg)
         if max_total_assignments is not None:
             remaining_slots = max(0, max_total_assignments - len(recovered))
             selected_this_iteration = selected_this_iteration[:remaining_slots]
@@ -264,6 +269,7 @@ def run_individual_rescue(
                 "recovered_match_count": len(newly_recovered),
                 "pending_after": len(pending_after),
                 "blocking_reason_counts": blocking_counts,
+                "selection": selection,
                 "stopped_reason": stopped_reason or None,
             }
         )
@@ -352,7 +358,7 @@ def _run_rescue(
             continue
         viable_candidates.append(candidate_dict)
 
-    selected_routes = _select_non_overlapping_routes(viable_candidates, prefer_coverage=True)
+    selected_routes, selection = _select_rescue_routes(viable_candidates, config)
     recovered_match_ids = sorted(
         {
             match_id
@@ -373,6 +379,7 @@ def _run_rescue(
         "viable_candidate_count": len(viable_candidates),
         "blocking_reason_counts": blocking_reason_counts,
         "unrecovered_match_ids": sorted(set(attempted_match_ids) - set(recovered_match_ids)),
+        "selection": selection,
     }
     return RescueResult(
         selected_routes=selected_routes,
@@ -660,29 +667,100 @@ def _generate_direct_candidates(
     allow_exceptional = bool(config.get("allow_exceptional_routes", False))
     candidates: list[dict[str, Any]] = []
     blocking_reason_counts: dict[str, int] = {}
-    for tutor in tutors or []:
-        tutor_id = _tutor_id(tutor)
-        if not tutor_id:
+    index = _RescueTutorIndex(tutors, config)
+    pairs: list[tuple[int, int]] = []
+    for draft_position, draft in enumerate(drafts):
+        eligible, pruned_counts = index.eligible_positions(draft)
+        for reason, count in pruned_counts.items():
+            blocking_reason_counts[reason] = blocking_reason_counts.get(reason, 0) + count
+        pairs.extend((tutor_position, draft_position) for tutor_position in eligible)
+
+    assigned_counts: dict[str, int] = {}
+    level_cache: dict[tuple[str, str, float], tuple[str, float]] = {}
+    for tutor_position, draft_position in sorted(pairs):
+        tutor = index.tutors[tutor_position]
+        tutor_id = index.tutor_ids[tutor_position]
+        if tutor_id not in assigned_counts:
+            assigned_counts[tutor_id] = _assigned_count_for_tutor(state, tutor_id)
+        candidate, blocking_reasons = _score_direct_candidate(
+            tutor,
+            drafts[draft_position],
+            state,
+            config,
+            rescue_kind=rescue_kind,
+            include_existing_route_conflicts=include_existing_route_conflicts,
+            allow_exceptional=allow_exceptional,
+            assigned_count=assigned_counts[tutor_id],
+            level_cache=level_cache,
+        )
+        if blocking_reasons:
+            for reason in sorted(set(blocking_reasons)):
+                blocking_reason_counts[reason] = blocking_reason_counts.get(reason, 0) + 1
             continue
-        for draft in drafts:
-            candidate, blocking_reasons = _score_direct_candidate(
-                tutor,
-                draft,
-                state,
-                config,
-                rescue_kind=rescue_kind,
-                include_existing_route_conflicts=include_existing_route_conflicts,
-                allow_exceptional=allow_exceptional,
-            )
-            if blocking_reasons:
-                for reason in sorted(set(blocking_reasons)):
-                    blocking_reason_counts[reason] = blocking_reason_counts.get(reason, 0) + 1
-                continue
-            if candidate is not None:
-                candidates.append(candidate)
+        if candidate is not None:
+            candidates.append(candidate)
     return candidates, blocking_reason_counts
 
 
+class _RescueTutorIndex:
+    """Modality/date index that skips tutor x draft pairs that can never be viable.
+
+    Only the checks that do not depend on the tutor's current routes are
+    indexed (modality and availability window). Pruned pairs are counted under
+    that reason only; every surviving pair is still fully scored.
+    """
+
+    def __init__(self, tutors: Iterable[Any], config: Mapping[str, Any]):
+        self.config = config
+        self.tutors: list[Any] = []
+        self.tutor_ids: list[str] = []
+        self._any_modality: list[int] = []
+        self._by_modality: dict[str, list[int]] = {}
+        self._windows: dict[tuple[int, str, date], list[tuple[time, time]] | None] = {}
+        for tutor in tutors or []:
+            tutor_id = _tutor_id(tutor)
+            if not tutor_id:
+                continue
+            position = len(self.tutors)
+            self.tutors.append(tutor)
+            self.tutor_ids.append(tutor_id)
+            modality = _normalize_text(_get(tutor, "modality", "Modalitat", default=""))
+            if modality:
+                self._by_modality.setdefault(modality, []).append(position)
+            else:
+                self._any_modality.append(position)
+
+    def eligible_positions(self, draft: Mapping[str, Any]) -> tuple[list[int], dict[str, int]]:
+        pruned: dict[str, int] = {}
+        draft_modality = _normalize_text(draft.get("modality"))
+        if draft_modality:
+            positions = sorted(self._any_modality + self._by_modality.get(draft_modality, []))
+            if len(positions) < len(self.tutors):
+                pruned["modality_mismatch"] = len(self.tutors) - len(positions)
+        else:
+            positions = list(range(len(self.tutors)))
+
+        segments = _draft_fragments(draft)
+        start_dt = _route_start(segments)
+        end_dt = _route_end(segments)
+        route_date = str(draft.get("date") or "")
+        eligible = [position for position in positions if self._covers(position, route_date, start_dt, end_dt)]
+        if len(eligible) < len(positions):
+            pruned["outside_availability_window"] = len(positions) - len(eligible)
+        return eligible, pruned
+
+    def _covers(self, position: int, route_date: str, start_dt: datetime | None, end_dt: datetime | None) -> bool:
+        if start_dt is None or end_dt is None:
+            return _availability_covers(self.tutors[position], route_date, start_dt, end_dt, self.config)
+        key = (position, route_date, start_dt.date())
+        if key not in self._windows:
+            self._windows[key] = _availability_windows(self.tutors[position], route_date, start_dt)
+        windows = self._windows[key]
+        if windows is None:
+            return bool(self.config.get("assume_available_when_missing", True))
+        return any(_window_covers(start_dt, end_dt, start, end, self.config) for start, end in windows)
+
+
 def _score_direct_candidate(
     tutor: Any,
     draft: Mapping[str, Any],
@@ -692,6 +770,8 @@ def _score_direct_candidate(
     rescue_kind: str,
     include_existing_route_conflicts: bool,
     allow_exceptional: bool,
+    assigned_count: int | None = None,
+    level_cache: dict[tuple[str, str, float], tuple[str, float]] | None = None,
 ) -> tuple[dict[str, Any] | None, list[str]]:
     tutor_id = _tutor_id(tutor)
     match_ids = _normalize_ids(draft.get("match_ids"))
@@ -714,7 +794,7 @@ def _score_direct_candidate(
     elif not _availability_respects_buffer(tutor, route_date, _route_start(draft_segments), _route_end(draft_segments), config):
         warnings.append("availability_end_buffer_warning")
 
-    needs_vehicle = _route_requires_vehicle(full_segments)
+    needs_vehicle = _route_requires_vehicle(full_segments, config)
     tutor_has_vehicle = _tutor_has_vehicle(tutor)
     if needs_vehicle and not tutor_has_vehicle:
         blocking.append("vehicle_required")
@@ -726,10 +806,12 @@ def _score_direct_candidate(
     if gap_blocked:
         blocking.append("gap_too_short")
 
-    fit = _level_fit(
+    fit, level_cost = _cached_level_scores(
+        level_cache if level_cache is not None else {},
         _get(tutor, "level", "nivell", "Nivell", default=None),
         draft.get("level_demand"),
-        {**dict(config), "classification_importance": draft.get("classification_importance", 0.0)},
+        draft.get("classification_importance", 0.0),
+        config,
     )
     if _is_level_forbidden(fit):
         blocking.append("level_forbidden")
@@ -748,7 +830,8 @@ def _score_direct_candidate(
     if blocking:
         return None, blocking
 
-    assigned_count = _assigned_count_for_tutor(state, tutor_id)
+    if assigned_count is None:
+        assigned_count = _assigned_count_for_tutor(state, tutor_id)
     existing_route_count = int(_get(existing_route, "route_count", default=1 if existing_segments else 0) or 0)
     weighted = float(draft.get("weighted_coverage_value") or len(match_ids))
     load_penalty = (
@@ -758,11 +841,6 @@ def _score_direct_candidate(
     underused_bonus = float(config.get("underused_tutor_bonus", 50.0)) if assigned_count == 0 else 0.0
     exceptional_penalty = float(config.get("exceptional_level_penalty", 3000.0)) if _is_level_exceptional(fit) else 0.0
     mobility_cost = (40.0 if needs_vehicle else 0.0) + 10.0 * len(set(warnings))
-    level_cost = _level_distance_cost(
-        _get(tutor, "level", "nivell", "Nivell", default=None),
-        draft.get("level_demand"),
-        float(config.get("level_distance_weight", 1000.0)),
-    )
     coverage_reward = weighted * float(config.get("coverage_reward", 1000.0))
     cost = max(0.0, level_cost + exceptional_penalty + mobility_cost + load_penalty - underused_bonus - coverage_reward)
     phase_name = str(config.get("_rescue_phase_name") or draft.get("phase_name") or rescue_kind)
@@ -835,11 +913,9 @@ def _prune_direct_candidates(
 
 
 def _direct_candidate_rank(candidate: Mapping[str, Any]) -> tuple[Any, ...]:
-    match_ids = _normalize_ids(candidate.get("new_match_ids") or candidate.get("match_ids"))
     warnings = _normalize_ids(candidate.get("warning_codes"))
-    breakdown = candidate.get("score_breakdown") or {}
     return (
-        -float(breakdown.get("weighted_coverage_value", len(match_ids)) or 0.0),
+        -_weighted_coverage(candidate),
         _is_exceptional(candidate),
         len(warnings),
         float(candidate.get("cost") or 0.0),
@@ -875,6 +951,137 @@ def _select_non_overlapping_routes(candidates: list[dict[str, Any]], *, prefer_c
     return selected
 
 
+def _select_rescue_routes(candidates: list[dict[str, Any]], config: Mapping[str, Any]) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Pick non-overlapping rescue routes, exactly when CP-SAT is available.
+
+    The greedy coverage-first selection is always computed; it seeds the
+    CP-SAT model as a hint and is returned whenever the solver is disabled,
+    unavailable, over the candidate limit or does not beat it.
+    """
+
+    greedy = _select_non_overlapping_routes(candidates, prefer_coverage=True)
+    packable = [candidate for candidate in candidates if _normalize_ids(candidate.get("new_match_ids") or candidate.get("match_ids"))]
+    backend = str(config.get("rescue_selection_backend", config.get("phase_solver_backend", "cp_sat")) or "cp_sat").strip().lower()
+    if backend not in {"cp_sat", "cpsat", "ilp", "auto"}:
+        return greedy, {"strategy": "greedy", "solver_backend": "greedy"}
+    if len(greedy) == len(packable):
+        return greedy, {"strategy": "greedy_conflict_free", "solver_backend": "greedy"}
+    max_candidates = int(config.get("rescue_cp_sat_max_candidates", DEFAULT_RESCUE_CP_SAT_MAX_CANDIDATES) or 0)
+    if max_candidates and len(packable) > max_candidates:
+        return greedy, {"strategy": "greedy", "solver_backend": "greedy", "fallback_reason": "candidate_limit"}
+
+    solved = _cp_sat_set_packing(packable, greedy, config)
+    if solved is None:
+        return greedy, {"strategy": "greedy", "solver_backend": "greedy", "fallback_reason": "cp_sat_failed"}
+    selected, meta = solved
+    if _selection_coverage(selected) < _selection_coverage(greedy):
+        return greedy, {**meta, "strategy": "greedy", "fallback_reason": "cp_sat_worse_than_greedy"}
+    return selected, meta
+
+
+def _cp_sat_set_packing(
+    candidates: list[dict[str, Any]],
+    hint: list[dict[str, Any]],
+    config: Mapping[str, Any],
+) -> tuple[list[dict[str, Any]], dict[str, Any]] | None:
+    try:
+        from ortools.sat.python import cp_model
+    except Exception:
+        return None
+
+    hinted_ids = {str(candidate.get("id")) for candidate in hint}
+    objectives = [
+        ("recovered_match_count", [len(_normalize_ids(c.get("new_match_ids") or c.get("match_ids"))) for c in candidates], True),
+        ("weighted_coverage_value", [int(round(_weighted_coverage(c) * 1000)) for c in candidates], True),
+        ("exceptional_count", [1 if _is_exceptional(c) else 0 for c in candidates], False),
+        ("warning_count", [len(_normalize_ids(c.get("warning_codes"))) for c in candidates], False),
+        ("total_cost", [int(round(float(c.get("cost") or 0.0) * 100)) for c in candidates], False),
+    ]
+    total_limit = float(config.get("rescue_cp_sat_time_limit_sec", DEFAULT_RESCUE_CP_SAT_TIME_LIMIT_SEC) or DEFAULT_RESCUE_CP_SAT_TIME_LIMIT_SEC)
+    num_workers = int(config.get("rescue_cp_sat_num_workers", 1) or 1)
+    started = monotonic()
+    fixed: list[tuple[list[int], int]] = []
+    statuses: list[dict[str, Any]] = []
+    selected_indexes: list[int] | None = None
+    solver_status = "OPTIMAL"
+
+    for name, coefficients, maximize in objectives:
+        remaining = total_limit - (monotonic() - started)
+        if remaining <= 0:
+            solver_status = "TIME_LIMIT"
+            break
+        model = cp_model.CpModel()
+        variables = [model.NewBoolVar(f"rescue_{index}") for index in range(len(candidates))]
+        by_match: dict[str, list[Any]] = {}
+        by_tutor_day: dict[tuple[str, str], list[Any]] = {}
+        for index, candidate in enumerate(candidates):
+            for match_id in _normalize_ids(candidate.get("new_match_ids") or candidate.get("match_ids")):
+                by_match.setdefault(match_id, []).append(variables[index])
+            by_tutor_day.setdefault(
+                (str(candidate.get("tutor_id") or ""), str(candidate.get("date") or "")), []
+            ).append(variables[index])
+        for group in list(by_match.values()) + list(by_tutor_day.values()):
+            if len(group) > 1:
+                model.AddAtMostOne(group)
+        for fixed_coefficients, value in fixed:
+            model.Add(sum(coefficient * variables[index] for index, coefficient in enumerate(fixed_coefficients)) == value)
+        for index, candidate in enumerate(candidates):
+            if selected_indexes is None:
+                model.AddHint(variables[index], str(candidate.get("id")) in hinted_ids)
+            else:
+                model.AddHint(variables[index], index in selected_indexes)
+        expression = sum(coefficient * variables[index] for index, coefficient in enumerate(coefficients))
+        if maximize:
+            model.Maximize(expression)
+        else:
+            model.Minimize(expression)
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max(0.1, remaining)
+        solver.parameters.num_search_workers = num_workers
+        status = solver.Solve(model)
+        status_name = solver.StatusName(status)
+        statuses.append({"objective": name, "status": status_name, "maximize": maximize})
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            if selected_indexes is None:
+                return None
+            solver_status = status_name
+            break
+        selected_indexes = [index for index, variable in enumerate(variables) if solver.BooleanValue(variable)]
+        if status != cp_model.OPTIMAL:
+            solver_status = status_name
+            break
+        value = int(round(solver.ObjectiveValue()))
+        statuses[-1]["value"] = value
+        fixed.append((coefficients, value))
+
+    if selected_indexes is None:
+        return None
+    selected = sorted((candidates[index] for index in selected_indexes), key=_direct_candidate_rank)
+    return [_json_safe(candidate) for candidate in selected], {
+        "strategy": "cp_sat_optimal" if solver_status == "OPTIMAL" else "cp_sat_feasible",
+        "solver_backend": "cp_sat",
+        "solver_status": solver_status,
+        "solver_objective_steps": statuses,
+        "solver_elapsed_sec": round(monotonic() - started, 4),
+        "candidate_count": len(candidates),
+        "hint_route_count": len(hint),
+    }
+
+
+def _weighted_coverage(candidate: Mapping[str, Any]) -> float:
+    match_ids = _normalize_ids(candidate.get("new_match_ids") or candidate.get("match_ids"))
+    breakdown = candidate.get("score_breakdown") or {}
+    return float(breakdown.get("weighted_coverage_value", len(match_ids)) or 0.0)
+
+
+def _selection_coverage(selected: list[dict[str, Any]]) -> tuple[int, float]:
+    return (
+        sum(len(_normalize_ids(candidate.get("new_match_ids") or candidate.get("match_ids"))) for candidate in selected),
+        round(sum(_weighted_coverage(candidate) for candidate in selected), 6),
+    )
+
+
 def _candidate_to_dict(candidate: Any, *, rescue_kind: str) -> dict[str, Any]:
     data = _object_to_dict(candidate)
     match_ids = _normalize_ids(data.get("new_match_ids") or data.get("match_ids"))
@@ -1048,10 +1255,11 @@ def _clusters_need_vehicle(cluster_ids: Iterable[Any]) -> bool:
     return len(cleaned) > 1
 
 
-def _route_requires_vehicle(segments: list[Any]) -> bool:
+def _route_requires_vehicle(segments: list[Any], config: Mapping[str, Any] | None = None) -> bool:
     points = route_points_from_segments(segments)
     if len(points) >= 2:
-        return any(atomic_transition_requires_vehicle(left, right) for left, right in zip(points, points[1:]))
+        matrix = config_venue_matrix(config)
+        return any(atomic_transition_requires_vehicle(left, right, matrix) for left, right in zip(points, points[1:]))
     if _clusters_need_vehicle(_combined_cluster_ids(segments)):
         return True
     return _has_uncertain_cluster(segments) and not _segments_same_location(segments)
@@ -1161,18 +1369,30 @@ def _availability_window_check(
     *,
     use_buffer: bool,
 ) -> bool:
-    availability = _get(tutor, "availability_by_date", default=None)
-    if not availability:
+    windows = _availability_windows(tutor, route_date, start_dt) if start_dt is not None else None
+    if windows is None and not _get(tutor, "availability_by_date", default=None):
         return bool(config.get("assume_available_when_missing", True))
     if start_dt is None or end_dt is None:
         return bool(config.get("assume_available_when_time_missing", True))
+    return any(
+        _window_covers(start_dt, end_dt, start, end, config, use_buffer=use_buffer)
+        for start, end in windows or []
+    )
+
+
+def _availability_windows(tutor: Any, route_date: str, start_dt: datetime) -> list[tuple[time, time]] | None:
+    """Parsed (start, end) windows for the route day; None when the tutor declares no availability."""
+
+    availability = _get(tutor, "availability_by_date", default=None)
+    if not availability:
+        return None
     raw = None
     if isinstance(availability, Mapping):
         raw = availability.get(route_date) or availability.get(start_dt.date()) or availability.get(start_dt.date().isoformat())
     if raw is None:
-        return False
-    windows = raw if isinstance(raw, list) else [raw]
-    for window in windows:
+        return []
+    windows: list[tuple[time, time]] = []
+    for window in raw if isinstance(raw, list) else [raw]:
         if isinstance(window, Mapping):
             start = _time_value(window.get("start") or window.get("Hora Inici") or window.get("hora_inici"))
             end = _time_value(window.get("end") or window.get("Hora Fi") or window.get("hora_fi"))
@@ -1181,9 +1401,9 @@ def _availability_window_check(
             end = _time_value(window[1])
         else:
             continue
-        if start is not None and end is not None and _window_covers(start_dt, end_dt, start, end, config, use_buffer=use_buffer):
-            return True
-    return False
+        if start is not None and end is not None:
+            windows.append((start, end))
+    return windows
 
 
 def _window_covers(start_dt: datetime, end_dt: datetime, start: time, end: time, config: Mapping[str, Any], *, use_buffer: bool = False) -> bool:
@@ -1203,6 +1423,22 @@ def _hardest_level(levels: Iterable[Any]) -> Any:
         return cleaned[-1] if cleaned else None
 
 
+def _cached_level_scores(
+    cache: dict[tuple[str, str, float], tuple[str, float]],
+    tutor_level: Any,
+    level_demand: Any,
+    classification_importance: Any,
+    config: Mapping[str, Any],
+) -> tuple[str, float]:
+    importance = _float_value({"value": classification_importance}, "value")
+    key = (repr(tutor_level), repr(level_demand), importance)
+    if key not in cache:
+        fit = _level_fit(tutor_level, level_demand, {**dict(config), "classification_importance": classification_importance})
+        cost = _level_distance_cost(tutor_level, level_demand, float(config.get("level_distance_weight", 1000.0)))
+        cache[key] = (fit, cost)
+    return cache[key]
+
+
 def _level_fit(tutor_level: Any, level_demand: Any, config: Mapping[str, Any]) -> str:
     try:
         from .levels import level_fit
@@ -18,9 +18,12 @@ from .levels import (
 from .phases import PhaseSpec, phase_allows_fragment, phase_allows_tutor
 from .peak_pressure import PeakAnchor, build_peak_anchors
 from .route_points import (
+    TRANSITION_SAME_LOCATION,
+    TRANSITION_VEHICLE,
+    config_venue_matrix,
     required_gap as atomic_required_gap,
     route_points_from_segments,
-    same_location as atomic_same_location,
+    transition_kind,
     transition_requires_vehicle as atomic_transition_requires_vehicle,
     validate_atomic_gaps,
 )
@@ -147,7 +150,7 @@ def _score_route_candidate(
     elif not _availability_respects_buffer(tutor, draft.date, _route_start(full_segments), _route_end(full_segments), config):
         warnings.append("availability_end_buffer_warning")
 
-    needs_vehicle = _route_requires_vehicle(full_segments)
+    needs_vehicle = _route_requires_vehicle(full_segments, config)
     tutor_has_vehicle = _tutor_has_vehicle(tutor)
     if needs_vehicle and not tutor_has_vehicle:
         blocking.append("vehicle_required")
@@ -542,6 +545,7 @@ def _gap_laxity_summary(segments: list[Any], config: dict[str, Any]) -> list[dic
 
 def _gap_laxity_items(segments: list[Any], config: dict[str, Any]) -> list[dict[str, Any]]:
     points = route_points_from_segments(segments)
+    matrix = config_venue_matrix(config)
     items: list[dict[str, Any]] = []
     for left, right in zip(points, points[1:]):
         left_end = left.end_dt or left.start_dt
@@ -549,12 +553,13 @@ def _gap_laxity_items(segments: list[Any], config: dict[str, Any]) -> list[dict[
         if left_end is None or right_start is None:
             continue
         actual = (right_start - left_end).total_seconds() / 60.0
-        required = float(atomic_required_gap(left, right, config))
+        kind = transition_kind(left, right, matrix)
+        required = float(atomic_required_gap(left, right, config, matrix))
         extra = max(0.0, actual - required)
-        if atomic_same_location(left, right):
+        if kind == TRANSITION_SAME_LOCATION:
             gap_type = "same_pitch"
             weight = float(config.get("gap_laxity_same_pitch_weight", 0.25) or 0.25)
-        elif atomic_transition_requires_vehicle(left, right):
+        elif kind == TRANSITION_VEHICLE:
             gap_type = "diff_cluster"
             weight = float(config.get("gap_laxity_diff_cluster_weight", 1.0) or 1.0)
         else:
@@ -725,10 +730,11 @@ def _combined_cluster_ids(segments: list[Any]) -> list[Any]:
     return out
 
 
-def _route_requires_vehicle(segments: list[Any]) -> bool:
+def _route_requires_vehicle(segments: list[Any], config: dict[str, Any] | None = None) -> bool:
     points = route_points_from_segments(segments)
     if len(points) >= 2:
-        return any(atomic_transition_requires_vehicle(left, right) for left, right in zip(points, points[1:]))
+        matrix = config_venue_matrix(config)
+        return any(atomic_transition_requires_vehicle(left, right, matrix) for left, right in zip(points, points[1:]))
     if _clusters_need_vehicle(_combined_cluster_ids(segments)):
         return True
     return _has_uncertain_cluster(segments) and not _segments_same_location(segments)
@@ -7,6 +7,12 @@ from typing import Any, Iterable, Mapping
 
 UNCERTAIN_CLUSTER_STATUSES = {"outlier", "missing_geocode", "pending", "not_found", "missing", "unknown"}
 
+TRANSITION_SAME_LOCATION = 0
+TRANSITION_SAME_CLUSTER = 1
+TRANSITION_VEHICLE = 2
+
+VENUE_MATRIX_CONFIG_KEY = "_venue_matrix"
+
 
 @dataclass(frozen=True)
 class AtomicRoutePoint:
@@ -36,35 +42,41 @@ def route_points_from_segments(segments: Iterable[Any]) -> list[AtomicRoutePoint
     return sorted(points, key=_point_sort_key)
 
 
-def same_location(left: Any, right: Any) -> bool:
+def transition_kind(left: Any, right: Any, matrix: Any = None) -> int:
+    """Classify the move between two points as one of the ``TRANSITION_*`` kinds.
+
+    ``matrix`` is an optional precomputed ``VenueTransitionMatrix``; points it
+    does not know fall back to the scalar comparison.
+    """
     left_point = _coerce_point(left)
     right_point = _coerce_point(right)
-    left_venue_id = _normalize_text(left_point.venue_id)
-    right_venue_id = _normalize_text(right_point.venue_id)
-    if left_venue_id and right_venue_id:
-        return left_venue_id == right_venue_id
-    left_venue = _normalize_text(left_point.venue)
-    right_venue = _normalize_text(right_point.venue)
-    return bool(left_venue and right_venue and left_venue == right_venue)
+    if matrix is not None:
+        kind = matrix.kind(left_point, right_point)
+        if kind is not None:
+            return kind
+    return _point_transition_kind(left_point, right_point)
 
 
-def transition_requires_vehicle(left: Any, right: Any) -> bool:
-    if same_location(left, right):
-        return False
-    left_point = _coerce_point(left)
-    right_point = _coerce_point(right)
-    if _reliable_same_cluster(left_point, right_point):
-        return False
-    return True
+def same_location(left: Any, right: Any, matrix: Any = None) -> bool:
+    return transition_kind(left, right, matrix) == TRANSITION_SAME_LOCATION
+
+
+def transition_requires_vehicle(left: Any, right: Any, matrix: Any = None) -> bool:
+    return transition_kind(left, right, matrix) == TRANSITION_VEHICLE
 
 
-def required_gap(left: Any, right: Any, config: Mapping[str, Any] | None = None) -> int:
+def required_gap(left: Any, right: Any, config: Mapping[str, Any] | None = None, matrix: Any = None) -> int:
     config = config or {}
-    if same_location(left, right):
-        return _int_config(config, "gap_same_pitch_min", 90)
-    if transition_requires_vehicle(left, right):
-        return _int_config(config, "gap_diff_cluster_min", 150)
-    return _int_config(config, "gap_diff_pitch_min", 120)
+    if matrix is None:
+        matrix = config_venue_matrix(config)
+    return _gap_for_kind(transition_kind(left, right, matrix), config)
+
+
+def config_venue_matrix(config: Mapping[str, Any] | None) -> Any:
+    """Return the run-level venue matrix carried by an engine config, if any."""
+    if not config:
+        return None
+    return config.get(VENUE_MATRIX_CONFIG_KEY)
 
 
 def validate_atomic_gaps(
@@ -73,23 +85,25 @@ def validate_atomic_gaps(
 ) -> tuple[list[str], bool]:
     config = config or {}
     points = route_points_from_segments(points_or_segments)
+    matrix = config_venue_matrix(config)
     warnings: list[str] = []
     blocked = False
     has_vehicle = _config_has_vehicle(config)
 
     for left, right in zip(points, points[1:]):
+        kind = transition_kind(left, right, matrix)
         left_end = left.end_dt or left.start_dt
         right_start = right.start_dt
-        warnings.extend(_transition_warnings(left, right))
+        warnings.extend(_transition_warnings(left, right, kind))
 
-        if transition_requires_vehicle(left, right) and has_vehicle is False:
+        if kind == TRANSITION_VEHICLE and has_vehicle is False:
             warnings.append("vehicle_required")
             blocked = True
 
         if left_end is None or right_start is None:
             continue
         minutes = (right_start - left_end).total_seconds() / 60.0
-        if minutes < required_gap(left, right, config):
+        if minutes < _gap_for_kind(kind, config):
             warnings.append("gap_too_short")
             blocked = True
 
@@ -163,14 +177,14 @@ def _coerce_point(value: Any) -> AtomicRoutePoint:
     return points[0] if points else _point_from_aggregate({}, 0)
 
 
-def _transition_warnings(left: AtomicRoutePoint, right: AtomicRoutePoint) -> list[str]:
+def _transition_warnings(left: AtomicRoutePoint, right: AtomicRoutePoint, kind: int) -> list[str]:
     warnings: list[str] = []
     uncertain = _is_uncertain(left) or _is_uncertain(right)
-    if same_location(left, right):
+    if kind == TRANSITION_SAME_LOCATION:
         if uncertain:
             warnings.extend(_uncertain_warnings(left, right))
         return warnings
-    if transition_requires_vehicle(left, right):
+    if kind == TRANSITION_VEHICLE:
         warnings.append("cross_cluster_with_vehicle_warning")
         warnings.extend(_uncertain_warnings(left, right))
     else:
@@ -178,6 +192,32 @@ def _transition_warnings(left: AtomicRoutePoint, right: AtomicRoutePoint) -> lis
     return warnings
 
 
+def _point_transition_kind(left: AtomicRoutePoint, right: AtomicRoutePoint) -> int:
+    if _points_same_location(left, right):
+        return TRANSITION_SAME_LOCATION
+    if _reliable_same_cluster(left, right):
+        return TRANSITION_SAME_CLUSTER
+    return TRANSITION_VEHICLE
+
+
+def _points_same_location(left: AtomicRoutePoint, right: AtomicRoutePoint) -> bool:
+    left_venue_id = _normalize_text(left.venue_id)
+    right_venue_id = _normalize_text(right.venue_id)
+    if left_venue_id and right_venue_id:
+        return left_venue_id == right_venue_id
+    left_venue = _normalize_text(left.venue)
+    right_venue = _normalize_text(right.venue)
+    return bool(left_venue and right_venue and left_venue == right_venue)
+
+
+def _gap_for_kind(kind: int, config: Mapping[str, Any]) -> int:
+    if kind == TRANSITION_SAME_LOCATION:
+        return _int_config(config, "gap_same_pitch_min", 90)
+    if kind == TRANSITION_VEHICLE:
+        return _int_config(config, "gap_diff_cluster_min", 150)
+    return _int_config(config, "gap_diff_pitch_min", 120)
+
+
 def _uncertain_warnings(left: AtomicRoutePoint, right: AtomicRoutePoint) -> list[str]:
     statuses = {_normalize_text(left.cluster_status), _normalize_text(right.cluster_status)}
     warnings: list[str] = []
@@ -415,9 +455,15 @@ def _dedupe(values: Iterable[str]) -> list[str]:
 
 __all__ = [
     "AtomicRoutePoint",
+    "TRANSITION_SAME_CLUSTER",
+    "TRANSITION_SAME_LOCATION",
+    "TRANSITION_VEHICLE",
+    "VENUE_MATRIX_CONFIG_KEY",
+    "config_venue_matrix",
     "required_gap",
     "route_points_from_segments",
     "same_location",
+    "transition_kind",
     "transition_requires_vehicle",
     "validate_atomic_gaps",
 ]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Mapping
+
+from ceeb_web.lazy_imports import lazy_import
+
+from .route_points import (
+    TRANSITION_SAME_CLUSTER,
+    TRANSITION_SAME_LOCATION,
+    TRANSITION_VEHICLE,
+    VENUE_MATRIX_CONFIG_KEY,
+    AtomicRoutePoint,
+    _int_config,
+    _is_uncertain,
+    _normalize_text,
+    route_points_from_segments,
+)
+
+
+np = lazy_import("numpy")
+
+
+class VenueTransitionMatrix:
+    """Precomputed venue-to-venue transition kinds for one designation run.
+
+    Every distinct location seen in the run (venue id, venue name, cluster and
+    cluster status) gets an index, and ``kinds[i, j]`` holds the
+    ``TRANSITION_*`` kind of moving from ``i`` to ``j``. The matrix is built
+    once with numpy and later checks are plain lookups; it travels through
+    the engine config under ``VENUE_MATRIX_CONFIG_KEY``.
+    """
+
+    def __init__(self, points: Iterable[AtomicRoutePoint]):
+        self._index: dict[tuple[Any, Any, Any, Any], int] = {}
+        locations: list[AtomicRoutePoint] = []
+        for point in points:
+            key = _location_key(point)
+            if key not in self._index:
+                self._index[key] = len(locations)
+                locations.append(point)
+        self.kinds = _build_kinds(locations)
+        self._rows = self.kinds.tolist()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def kind(self, left: AtomicRoutePoint, right: AtomicRoutePoint) -> int | None:
+        """Return the transition kind, or ``None`` when a point is unknown."""
+        left_index = self._index.get(_location_key(left))
+        if left_index is None:
+            return None
+        right_index = self._index.get(_location_key(right))
+        if right_index is None:
+            return None
+        return self._rows[left_index][right_index]
+
+    def required_gaps(self, config: Mapping[str, Any] | None = None) -> Any:
+        """Return the minimum gap in minutes for every pair of locations."""
+        config = config or {}
+        gaps = np.array(
+            [
+                _int_config(config, "gap_same_pitch_min", 90),
+                _int_config(config, "gap_diff_pitch_min", 120),
+                _int_config(config, "gap_diff_cluster_min", 150),
+            ],
+            dtype=np.int32,
+        )
+        return gaps[self.kinds]
+
+
+def build_venue_matrix(segments: Iterable[Any]) -> VenueTransitionMatrix:
+    """Build the matrix for every atomic point of the given segments/fragments."""
+    return VenueTransitionMatrix(route_points_from_segments(segments))
+
+
+def with_venue_matrix(config: Mapping[str, Any] | None, segments: Iterable[Any]) -> dict[str, Any]:
+    """Return a config copy carrying a venue matrix, reusing one already present."""
+    cfg = dict(config or {})
+    if cfg.get(VENUE_MATRIX_CONFIG_KEY) is None:
+        cfg[VENUE_MATRIX_CONFIG_KEY] = build_venue_matrix(segments)
+    return cfg
+
+
+def _location_key(point: AtomicRoutePoint) -> tuple[Any, Any, Any, Any]:
+    return (point.venue_id, point.venue, point.cluster_id, point.cluster_status)
+
+
+def _build_kinds(locations: list[AtomicRoutePoint]) -> Any:
+    venue_ids = _codes(_normalize_text(point.venue_id) for point in locations)
+    venues = _codes(_normalize_text(point.venue) for point in locations)
+    clusters = _codes(_normalize_text(point.cluster_id) for point in locations)
+    reliable = np.array([not _is_uncertain(point) for point in locations], dtype=bool)
+
+    both_venue_ids = (venue_ids[:, None] > 0) & (venue_ids[None, :] > 0)
+    same_venue = (venues[:, None] > 0) & (venues[:, None] == venues[None, :])
+    same_location = np.where(both_venue_ids, venue_ids[:, None] == venue_ids[None, :], same_venue)
+    same_cluster = (
+        (clusters[:, None] > 0)
+        & (clusters[:, None] == clusters[None, :])
+        & reliable[:, None]
+        & reliable[None, :]
+    )
+    return np.where(
+        same_location,
+        TRANSITION_SAME_LOCATION,
+        np.where(same_cluster, TRANSITION_SAME_CLUSTER, TRANSITION_VEHICLE),
+    ).astype(np.int8)
+
+
+def _codes(values: Iterable[str]) -> Any:
+    # 0 marks an empty value so it never compares equal to anything
+    interned: dict[str, int] = {}
+    codes = [interned.setdefault(value, len(interned) + 1) if value else 0 for value in values]
+    return np.array(codes, dtype=np.int64).reshape(-1)
+
+
+__all__ = [
+    "VenueTransitionMatrix",
+    "build_venue_matrix",
+    "with_venue_matrix",
+]
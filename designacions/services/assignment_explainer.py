@@ -3,9 +3,10 @@ from __future__ import annotations
 from .manual_assignment import (
     LOAD_BALANCING_PENALTY_PER_ASSIGNMENT,
     build_manual_assignment_context,
+    candidate_diagnoses_for_assignment,
     classify_level_fit,
     compute_cost_breakdown,
-    diagnose_assignment_for_referee,
+    diagnose_with_context,
     serialize_proposal,
 )
 
@@ -42,25 +43,6 @@ def _ensure_context(run, context=None):
     return context or build_manual_assignment_context(run)
 
 
-def _build_candidate_diagnoses_for_assignment(run, assignment, context):
-    cache = context.setdefault("_candidate_diagnoses_by_assignment", {})
-    if assignment.id in cache:
-        return cache[assignment.id]
-
-    diagnoses = {}
-    for referee in context["referees_by_assignment"].get(assignment.id, []):
-        diagnoses[referee.id] = diagnose_assignment_for_referee(
-            run,
-            assignment,
-            referee,
-            availability_lookup=context["availability_lookup"],
-            assignments_by_referee=context["assignments_by_referee"],
-            cluster_by_match_id=context["cluster_by_match_id"],
-        )
-    cache[assignment.id] = diagnoses
-    return diagnoses
-
-
 def _feasibility_status(diagnosis: dict) -> str:
     blocking_reasons = diagnosis.get("blocking_reasons")
     if blocking_reasons is None:
@@ -73,7 +55,7 @@ def _feasibility_status(diagnosis: dict) -> str:
 
 
 def _better_candidate_exists(run, assignment, candidate_diagnosis: dict, context) -> bool:
-    compatible_diagnoses = _build_candidate_diagnoses_for_assignment(run, assignment, context)
+    compatible_diagnoses = candidate_diagnoses_for_assignment(run, assignment, context)
     for other_referee_id, other_diagnosis in compatible_diagnoses.items():
         if other_referee_id == candidate_diagnosis["referee"].id:
             continue
@@ -283,17 +265,10 @@ def _build_explanation_payload(run, assignment, diagnosis: dict, context, *, man
 
 def explain_candidate_for_assignment(run, assignment, referee, context=None):
     context = _ensure_context(run, context)
-    compatible_diagnoses = _build_candidate_diagnoses_for_assignment(run, assignment, context)
+    compatible_diagnoses = candidate_diagnoses_for_assignment(run, assignment, context)
     diagnosis = compatible_diagnoses.get(referee.id)
     if diagnosis is None:
-        diagnosis = diagnose_assignment_for_referee(
-            run,
-            assignment,
-            referee,
-            availability_lookup=context["availability_lookup"],
-            assignments_by_referee=context["assignments_by_referee"],
-            cluster_by_match_id=context["cluster_by_match_id"],
-        )
+        diagnosis = diagnose_with_context(run, assignment, referee, context)
 
     return _build_explanation_payload(run, assignment, diagnosis, context)
 
@@ -315,17 +290,10 @@ def _serialize_explained_candidate(run, assignment, diagnosis: dict, context, *,
 
 def find_better_alternatives(run, assignment, assigned_referee, limit: int = 3, context=None):
     context = _ensure_context(run, context)
-    compatible_diagnoses = _build_candidate_diagnoses_for_assignment(run, assignment, context)
+    compatible_diagnoses = candidate_diagnoses_for_assignment(run, assignment, context)
     assigned_diagnosis = compatible_diagnoses.get(assigned_referee.id)
     if assigned_diagnosis is None:
-        assigned_diagnosis = diagnose_assignment_for_referee(
-            run,
-            assignment,
-            assigned_referee,
-            availability_lookup=context["availability_lookup"],
-            assignments_by_referee=context["assignments_by_referee"],
-            cluster_by_match_id=context["cluster_by_match_id"],
-        )
+        assigned_diagnosis = diagnose_with_context(run, assignment, assigned_referee, context)
 
     better_alternatives = []
     for referee_id, diagnosis in compatible_diagnoses.items():
@@ -359,14 +327,8 @@ def explain_current_assignment(run, assignment, context=None):
         raise ValueError("L'assignacio no te tutor assignat.")
 
     context = _ensure_context(run, context)
-    diagnosis = diagnose_assignment_for_referee(
-        run,
-        assignment,
-        context["referee_summaries_by_id"].get(assignment.referee_id, assignment.referee),
-        availability_lookup=context["availability_lookup"],
-        assignments_by_referee=context["assignments_by_referee"],
-        cluster_by_match_id=context["cluster_by_match_id"],
-    )
+    assigned_referee = context["referee_summaries_by_id"].get(assignment.referee_id, assignment.referee)
+    diagnosis = diagnose_with_context(run, assignment, assigned_referee, context)
     explanation = _build_explanation_payload(
         run,
         assignment,
@@ -389,7 +351,7 @@ def explain_current_assignment(run, assignment, context=None):
         "better_alternatives": find_better_alternatives(
             run,
             assignment,
-            context["referee_summaries_by_id"].get(assignment.referee_id, assignment.referee),
+            assigned_referee,
             context=context,
         ),
     }
@@ -4,8 +4,9 @@ from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 import unicodedata
 
-import pandas as pd
+from ceeb_web.lazy_imports import lazy_import
 
+pd = lazy_import("pandas")
 
 DEFAULT_AVAILABILITY_END_BUFFER_MIN = 60
 DEFAULT_GAP_SAME_PITCH_MIN = 60
@@ -325,6 +326,13 @@ def _descriptor_route_point(descriptor: MatchDescriptor):
     )
 
 
+def build_descriptor_venue_matrix(descriptors: list[MatchDescriptor]):
+    """Precompute the venue transition matrix shared by many mobility checks."""
+    from designacions.optimization.venue_matrix import VenueTransitionMatrix
+
+    return VenueTransitionMatrix(_descriptor_route_point(descriptor) for descriptor in descriptors)
+
+
 def _blocking_uncertain_cluster_code(left_cluster_status: str | None, right_cluster_status: str | None) -> str:
     if left_cluster_status == "outlier" or right_cluster_status == "outlier":
         return "outlier_cluster_for_mobility_validation"
@@ -400,6 +408,7 @@ def inspect_mobility_transitions(
     gap_diff_pitch_min: int,
     gap_diff_cluster_min: int,
     candidate_identifiers=None,
+    venue_matrix=None,
 ):
     candidate_identifiers = {
         normalize_text(identifier)
@@ -435,9 +444,9 @@ def inspect_mobility_transitions(
 
         left_point = _descriptor_route_point(left)
         right_point = _descriptor_route_point(right)
-        same_pitch_transition = atomic_same_location(left_point, right_point)
-        requires_vehicle = atomic_transition_requires_vehicle(left_point, right_point)
-        transition_gap = atomic_required_gap(left_point, right_point, gap_config)
+        same_pitch_transition = atomic_same_location(left_point, right_point, venue_matrix)
+        requires_vehicle = atomic_transition_requires_vehicle(left_point, right_point, venue_matrix)
+        transition_gap = atomic_required_gap(left_point, right_point, gap_config, venue_matrix)
         minutes = abs(
             (right.match_datetime.to_pydatetime() - left.match_datetime.to_pydatetime()).total_seconds()
         ) / 60.0
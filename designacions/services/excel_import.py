@@ -1,13 +1,18 @@
 # designacions_app/services/excel_import.py
-import pandas as pd
+from __future__ import annotations
+
 from django.db import transaction
-import numpy as np
 from ..models import Referee, Match, Availability, Assignment
 import datetime as dt
 import json
 
+from ceeb_web.lazy_imports import lazy_import
+
 from .run_scope import load_scoped_run_data
 
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
 def _read_xlsx(path: str) -> pd.DataFrame:
     return pd.read_excel(path, engine="openpyxl")
 
@@ -1,20 +1,26 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from time import sleep
 from typing import Iterable
 
-import pandas as pd
 from asgiref.sync import async_to_sync
-from geopy.geocoders import Nominatim
 
+from ceeb_web.lazy_imports import lazy_import
 from designacions.geolocate import GeocodingRateLimitedError, extreu_municipi, geocode_address_amb_fallback
 from designacions.models import Address
 from logs import push_log
 
 from .addressing import build_address_payload, resolve_address
 
+pd = lazy_import("pandas")
 
-_geolocator = Nominatim(user_agent="designacions_ceeb")
+
+@lru_cache(maxsize=1)
+def _get_geolocator():
+    from geopy.geocoders import Nominatim
+
+    return Nominatim(user_agent="designacions_ceeb")
 
 
 def geocodifica_adreces(adreces: Iterable[str], *, sleep_seconds: float = 2.0, task_id=None) -> list[Address]:
@@ -84,7 +90,7 @@ def geocodifica_adreces(adreces: Iterable[str], *, sleep_seconds: float = 2.0, t
                 percentage,
             )
         try:
-            lat, lon, query_used = geocode_address_amb_fallback(_geolocator, payload["text"])
+            lat, lon, query_used = geocode_address_amb_fallback(_get_geolocator(), payload["text"])
         except GeocodingRateLimitedError:
             rate_limited = True
             address.geocode_status = "pending"
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import copy
 from collections import defaultdict
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import date, datetime, time
 
 from django.db.models import Count, Q
-import pandas as pd
+
+from ceeb_web.lazy_imports import lazy_import
+from ceeb_web.profiling import profiled
 
 from ..models import AddressCluster, Assignment, Referee
 from .assignment_feasibility import (
@@ -16,11 +19,14 @@ from .assignment_feasibility import (
     DEFAULT_GAP_SAME_PITCH_MIN,
     availability_covers_descriptors,
     availability_respects_buffer_descriptors,
+    build_descriptor_venue_matrix,
     build_match_descriptor,
     combine_date_time,
     inspect_mobility_transitions,
 )
 
+pd = lazy_import("pandas")
+
 TUTOR_LEVEL_ORDER = ["NIVELLA1", "NIVELLB1", "NIVELLC1", "NIVELLD1", "D"]
 MATCH_LEVEL_ORDER = [
     "S\u00c8NIOR",
@@ -331,7 +337,7 @@ def build_assignment_availability_by_assignment(assignments, availability_lookup
 
 def build_assigned_by_referee(run):
     assigned = defaultdict(list)
-    for assignment in run.assignments.select_related("match", "referee").filter(referee__isnull=False):
+    for assignment in run.assignments.select_related("match", "referee").filter(referee__isnull=False).order_by("id"):
         assigned[assignment.referee_id].append(assignment)
     return assigned
 
@@ -365,19 +371,29 @@ def build_cluster_by_match_id(run):
     }
 
 
-def build_referee_options_by_assignment(run, assignments, referees_with_counts=None):
-    referees_with_counts = list(referees_with_counts or build_run_scoped_referee_summaries(run))
+def _group_referees_by_modality(referees):
     by_modality = defaultdict(list)
-    for referee in referees_with_counts:
+    for referee in referees:
         by_modality[_normalized_modality(referee.modality)].append(referee)
+    return by_modality
+
+
+def _referee_options_for_modality(match_modality: str, by_modality, referees):
+    return by_modality.get(match_modality, []) if match_modality else referees
+
+
+def build_referee_options_by_assignment(run, assignments, referees_with_counts=None):
+    referees_with_counts = list(referees_with_counts or build_run_scoped_referee_summaries(run))
+    by_modality = _group_referees_by_modality(referees_with_counts)
 
     options = {}
     for assignment in assignments:
         match_modality = _normalized_modality(assignment.match.modality)
-        options[assignment.id] = by_modality.get(match_modality, []) if match_modality else referees_with_counts
+        options[assignment.id] = _referee_options_for_modality(match_modality, by_modality, referees_with_counts)
     return options
 
 
+@profiled("designacions.manual_context")
 def build_manual_assignment_context(run, referees_with_counts=None):
     referees_with_counts = list(referees_with_counts or get_run_referees_with_counts(run))
     referee_summaries = build_run_scoped_referee_summaries(run, referees_with_counts=referees_with_counts)
@@ -388,9 +404,10 @@ def build_manual_assignment_context(run, referees_with_counts=None):
         match_id: location.get("cluster_id")
         for match_id, location in match_location_by_match_id.items()
     }
+    assignments = list(run.assignments.select_related("match").all())
     referees_by_assignment = build_referee_options_by_assignment(
         run,
-        run.assignments.select_related("match").all(),
+        assignments,
         referees_with_counts=referee_summaries,
     )
     return {
@@ -402,6 +419,71 @@ def build_manual_assignment_context(run, referees_with_counts=None):
         "cluster_by_match_id": cluster_by_match_id,
         "match_location_by_match_id": match_location_by_match_id,
         "referees_by_assignment": referees_by_assignment,
+        "match_modality_by_assignment": {
+            assignment.id: _normalized_modality(assignment.match.modality)
+            for assignment in assignments
+        },
+        # Versio de la ruta de cada tutor: les diagnosis cachejades d'un tutor
+        # deixen de valer quan una assignacio manual li afegeix o treu un partit.
+        "referee_revisions": {},
+        "_candidate_diagnoses_by_assignment": {},
+    }
+
+
+def apply_assignment_change_to_context(context, assignment, *, previous_referee_id):
+    """
+    Return a copy of ``context`` reflecting a single saved (re)assignment.
+
+    Only the routes, counts and candidate lists of the previous and the new
+    referee change; everything else (availability, match locations, cached
+    diagnoses of untouched referees) is shared with the original context,
+    which stays valid for readers still holding it.
+    """
+    affected_ids = {referee_id for referee_id in (previous_referee_id, assignment.referee_id) if referee_id}
+
+    assignments_by_referee = defaultdict(list)
+    assignments_by_referee.update(context["assignments_by_referee"])
+    for referee_id in affected_ids:
+        route = [item for item in assignments_by_referee.get(referee_id, []) if item.id != assignment.id]
+        if referee_id == assignment.referee_id:
+            route.append(assignment)
+            route.sort(key=lambda item: item.id)
+        if route:
+            assignments_by_referee[referee_id] = route
+        else:
+            assignments_by_referee.pop(referee_id, None)
+    if not affected_ids:
+        return {**context, "assignments_by_referee": assignments_by_referee}
+
+    referees_with_counts = []
+    for referee in context["referees_with_counts"]:
+        if referee.id in affected_ids:
+            referee = copy.copy(referee)
+            referee.n = len(assignments_by_referee.get(referee.id, []))
+        referees_with_counts.append(referee)
+    referee_summaries = [
+        replace(summary, n=len(assignments_by_referee.get(summary.id, [])))
+        if summary.id in affected_ids
+        else summary
+        for summary in context["referee_summaries"]
+    ]
+    by_modality = _group_referees_by_modality(referee_summaries)
+    match_modality_by_assignment = context["match_modality_by_assignment"]
+    referee_revisions = dict(context["referee_revisions"])
+    for referee_id in affected_ids:
+        referee_revisions[referee_id] = referee_revisions.get(referee_id, 0) + 1
+
+    return {
+        **context,
+        "referees_with_counts": referees_with_counts,
+        "referee_summaries": referee_summaries,
+        "referee_summaries_by_id": {summary.id: summary for summary in referee_summaries},
+        "assignments_by_referee": assignments_by_referee,
+        "referees_by_assignment": {
+            assignment_id: _referee_options_for_modality(match_modality, by_modality, referee_summaries)
+            for assignment_id, match_modality in match_modality_by_assignment.items()
+        },
+        "referee_revisions": referee_revisions,
     }
 
 
@@ -589,10 +671,12 @@ def diagnose_assignment_for_referee(
     availability_lookup=None,
     assignments_by_referee=None,
     cluster_by_match_id=None,
+    match_location_by_match_id=None,
 ):
     availability_lookup = availability_lookup or build_availability_lookup_by_ref_and_date(run)
     assignments_by_referee = assignments_by_referee or build_assigned_by_referee(run)
-    match_location_by_match_id = build_match_location_by_match_id(run)
+    if match_location_by_match_id is None:
+        match_location_by_match_id = build_match_location_by_match_id(run)
     if cluster_by_match_id is None:
         cluster_by_match_id = {
             match_id: location.get("cluster_id")
@@ -684,6 +768,40 @@ def diagnose_assignment_for_referee(
     }
 
 
+def diagnose_with_context(run, assignment, referee, context):
+    return diagnose_assignment_for_referee(
+        run,
+        assignment,
+        referee,
+        availability_lookup=context["availability_lookup"],
+        assignments_by_referee=context["assignments_by_referee"],
+        cluster_by_match_id=context["cluster_by_match_id"],
+        match_location_by_match_id=context["match_location_by_match_id"],
+    )
+
+
+def candidate_diagnoses_for_assignment(run, assignment, context) -> dict:
+    """
+    Diagnose every compatible referee for ``assignment``, keyed by referee id.
+
+    Diagnoses are memoised in ``context`` per referee route revision, so a
+    context reused across requests only re-diagnoses the referees whose route
+    changed since. Callers must not mutate the returned diagnoses.
+    """
+    cache = context.setdefault("_candidate_diagnoses_by_assignment", {})
+    referee_revisions = context.get("referee_revisions") or {}
+    cached = cache.setdefault(assignment.id, {})
+    diagnoses = {}
+    for referee in context["referees_by_assignment"].get(assignment.id, []):
+        revision = referee_revisions.get(referee.id, 0)
+        entry = cached.get(referee.id)
+        if entry is None or entry[0] != revision:
+            entry = (revision, diagnose_with_context(run, assignment, referee, context))
+            cached[referee.id] = entry
+        diagnoses[referee.id] = entry[1]
+    return diagnoses
+
+
 def build_run_mobility_summary(run, *, context=None):
     context = context or build_manual_assignment_context(run)
     assignments_by_referee = context["assignments_by_referee"]
@@ -702,11 +820,20 @@ def build_run_mobility_summary(run, *, context=None):
     warning_counts_by_referee = Counter()
     error_counts_by_referee = Counter()
 
+    descriptors_by_referee = {
+        referee_id: [_build_assignment_descriptor(assignment, match_location_by_match_id) for assignment in assignments]
+        for referee_id, assignments in assignments_by_referee.items()
+        if assignments
+    }
+    venue_matrix = build_descriptor_venue_matrix(
+        [descriptor for descriptors in descriptors_by_referee.values() for descriptor in descriptors]
+    )
+
     for referee_id, assignments in assignments_by_referee.items():
         if not assignments:
             continue
 
-        descriptors = [_build_assignment_descriptor(assignment, match_location_by_match_id) for assignment in assignments]
+        descriptors = descriptors_by_referee[referee_id]
         descriptors_by_id = {str(descriptor.identifier): descriptor for descriptor in descriptors}
         referee = referee_summary_by_id.get(referee_id)
         issues = inspect_mobility_transitions(
@@ -716,6 +843,7 @@ def build_run_mobility_summary(run, *, context=None):
             gap_diff_pitch_min=gap_diff_pitch_min,
             gap_diff_cluster_min=gap_diff_cluster_min,
             candidate_identifiers=[],
+            venue_matrix=venue_matrix,
         )
 
         assignment_by_id = {str(assignment.id): assignment for assignment in assignments}
@@ -808,25 +936,13 @@ def update_run_mobility_summary(run, *, context=None, save: bool = True):
 
 def build_top_proposals_for_assignments(run, assignments, *, limit: int = 3, context=None):
     context = context or build_manual_assignment_context(run)
-    availability_lookup = context["availability_lookup"]
-    assignments_by_referee = context["assignments_by_referee"]
-    cluster_by_match_id = context["cluster_by_match_id"]
-    referees_by_assignment = context["referees_by_assignment"]
 
     proposals = {}
     for assignment in assignments:
         ranked = []
-        for referee in referees_by_assignment.get(assignment.id, []):
-            diagnosis = diagnose_assignment_for_referee(
-                run,
-                assignment,
-                referee,
-                availability_lookup=availability_lookup,
-                assignments_by_referee=assignments_by_referee,
-                cluster_by_match_id=cluster_by_match_id,
-            )
+        for diagnosis in candidate_diagnoses_for_assignment(run, assignment, context).values():
             if diagnosis["is_valid"] and diagnosis["cost"] is not None:
-                ranked.append(diagnosis)
+                ranked.append({**diagnosis, "assignment": assignment})
 
         ranked.sort(
             key=lambda item: (
@@ -0,0 +1,103 @@
+"""
+Per-process cache of the manual-assignment context of a run.
+
+Building the context (run-scoped referee summaries, availability lookup,
+routes per referee, match locations, candidate lists) scans the whole run, and
+every manual-assignment request used to rebuild it. The cache keeps one context
+per run keyed by ``run_analytics_revision``, so any change made elsewhere
+(another process, a new solve, an import) is picked up on the next read.
+A manual (re)assignment applies its delta to the cached context instead of
+rebuilding it, but only when the post-save revision is exactly the previous one
+plus that save; if anything else moved in between the entry is dropped and
+rebuilt.
+
+The revision covers ``Referee.active`` but not the rest of the referee master
+data; ``DESIGNACIONS_MANUAL_CONTEXT_CACHE_TTL_SECONDS`` bounds how stale it can
+get.
+"""
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+
+from .manual_assignment import apply_assignment_change_to_context, build_manual_assignment_context
+from .run_analytics import run_analytics_revision
+
+
+_MANUAL_CONTEXT_CACHE_MAX_RUNS = 32
+_cache: dict[int, tuple[float, str, dict]] = {}
+
+
+def _cache_ttl() -> float:
+    return float(getattr(settings, "DESIGNACIONS_MANUAL_CONTEXT_CACHE_TTL_SECONDS", 0) or 0)
+
+
+def _store(run_id: int, revision: str, context: dict, ttl: float) -> None:
+    if run_id not in _cache and len(_cache) >= _MANUAL_CONTEXT_CACHE_MAX_RUNS:
+        _cache.clear()
+    _cache[run_id] = (time.monotonic() + ttl, revision, context)
+
+
+def clear_manual_assignment_context_cache() -> None:
+    _cache.clear()
+
+
+def get_manual_assignment_context(run, *, revision: str | None = None) -> dict:
+    """Return the manual-assignment context for the current revision of ``run``, building it if needed."""
+
+    ttl = _cache_ttl()
+    if ttl <= 0 or not getattr(run, "pk", None):
+        return build_manual_assignment_context(run)
+
+    revision = revision or run_analytics_revision(run)
+    cached = _cache.get(run.pk)
+    if cached is not None and cached[0] > time.monotonic() and cached[1] == revision:
+        return cached[2]
+
+    context = build_manual_assignment_context(run)
+    _store(run.pk, revision, context, ttl)
+    return context
+
+
+def refresh_manual_assignment_context(
+    run,
+    assignment,
+    *,
+    previous_referee_id,
+    context: dict,
+    previous_revision: str,
+    revision: str | None,
+) -> dict:
+    """
+    Return the context after ``assignment`` was saved with a new referee.
+
+    ``context`` must be the context read at ``previous_revision`` (before the
+    save) and ``revision`` the result of ``revision_after_assignment_save``.
+    When the context is still the cached one and the save of ``assignment`` is
+    the only change since then, the delta is applied in place of a rebuild;
+    otherwise the context is rebuilt from the database.
+    """
+
+    ttl = _cache_ttl()
+    if ttl <= 0 or not getattr(run, "pk", None):
+        return build_manual_assignment_context(run)
+
+    cached = _cache.get(run.pk)
+    if cached is None or cached[1] != previous_revision or cached[2] is not context:
+        return get_manual_assignment_context(run)
+
+    if revision is None:
+        _cache.pop(run.pk, None)
+        return get_manual_assignment_context(run)
+
+    updated = apply_assignment_change_to_context(context, assignment, previous_referee_id=previous_referee_id)
+    _store(run.pk, revision, updated, ttl)
+    return updated
+
+
+__all__ = [
+    "clear_manual_assignment_context_cache",
+    "get_manual_assignment_context",
+    "refresh_manual_assignment_context",
+]
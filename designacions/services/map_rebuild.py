@@ -1,14 +1,19 @@
 # designacions_app/services/map_rebuild.py
 import os
-import pandas as pd
 from django.conf import settings
 
-from ..main_fixed import mapa_assignacions_interactiu
+from ceeb_web.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+
 def rebuild_run_map(run) -> str | None:
     """
     Regenera el mapa folium del run a partir de BD (Match + Assignment + Address).
     Retorna map_path (relatiu a MEDIA_ROOT) o None si no es pot construir.
     """
+    # el motor (folium, scikit-learn...) nomes es carrega quan cal dibuixar
+    from ..main_fixed import mapa_assignacions_interactiu
 
     matches = list(run.matches.select_related("address").all())
     if not matches:
@@ -1,7 +1,11 @@
 # designacions/services/modalitat_map_df.py
-import pandas as pd
+from __future__ import annotations
+
+from ceeb_web.lazy_imports import lazy_import
 from designacions.models import ModalityMap
 
+pd = lazy_import("pandas")
+
 CSV_COLS = ["Id Categoria", "Modalitat", "Nom", "Descripció", "Nom Abreviat", "Ordre", "CodiExtern"]
 
 def load_modalitat_map_df() -> pd.DataFrame:
@@ -1,19 +1,43 @@
+"""Run analytics payload, materialized per run revision.
+
+``build_run_analytics`` computes the full payload. ``get_run_analytics`` stores
+it in ``RunAnalyticsSnapshot`` under ``run_analytics_revision`` and rebuilds
+only when that revision moves. A manual reassignment only calls
+``mark_run_analytics_stale``, which records the changed match's day on the
+snapshot; the next read rebuilds the payload reusing the stored per-match
+viability diagnoses of every day those changes cannot affect.
+"""
+
 from __future__ import annotations
 
+import hashlib
+import heapq
+import json
+import re
+from bisect import bisect_left, bisect_right
 from collections import Counter, defaultdict
 from dataclasses import dataclass
 from datetime import date, datetime, time
 from typing import Any, Iterable
 
-from designacions.models import AddressCluster, Assignment, DesignationRun
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+
+from ceeb_web.profiling import profiled
+from designacions.models import AddressCluster, Assignment, DesignationRun, Referee, RunAnalyticsSnapshot
 from designacions.services.assignment_feasibility import DEFAULT_GAP_SAME_PITCH_MIN, has_vehicle
 from designacions.services.manual_assignment import (
     build_manual_assignment_context,
-    diagnose_assignment_for_referee,
+    diagnose_with_context,
 )
 
 
 DEFAULT_AVAILABILITY_END_BUFFER_MIN = 60
+# canviar-lo quan canvii la forma del payload o de les entrades materialitzades
+RUN_ANALYTICS_VERSION = 1
+_NO_MINUTES = 10**9
+_REVISION_ASSIGNMENTS_RE = re.compile(r"^(?P<head>v\d+:a\d+@)(?P<updated>.*?)(?P<tail>:d\d+\.\d+:r.*)$")
 
 
 @dataclass(frozen=True)
@@ -26,7 +50,144 @@ class _Window:
     has_level: bool = True
 
 
+def run_analytics_revision(run: DesignationRun) -> str:
+    """Revision of everything the analytics read: assignments, availability, referees, clusters, traces and config."""
+
+    assignments = Assignment.objects.filter(run=run).aggregate(total=Count("id"), updated=Max("updated_at"))
+    inactive_referee_ids = sorted(
+        set(Referee.objects.filter(availabilities__run=run, active=False).values_list("id", flat=True))
+    )
+    referees_digest = hashlib.sha1(json.dumps(inactive_referee_ids).encode("utf-8")).hexdigest()[:12]
+    availabilities = run.availabilities.aggregate(total=Count("id"), last=Max("id"))
+    clusters = AddressCluster.objects.filter(run=run).aggregate(total=Count("id"), last=Max("id"))
+    traces = run.assignment_traces.aggregate(total=Count("id"), last=Max("id"))
+    result_summary = getattr(run, "result_summary", None) or {}
+    config_digest = hashlib.sha1(
+        json.dumps(
+            [getattr(run, "params", None) or {}, result_summary.get("phase_solver_summary") or []],
+            sort_keys=True,
+            cls=DjangoJSONEncoder,
+        ).encode("utf-8")
+    ).hexdigest()[:16]
+    updated = assignments["updated"].isoformat() if assignments["updated"] else "-"
+    return (
+        f"v{RUN_ANALYTICS_VERSION}:a{assignments['total']}@{updated}"
+        f":d{availabilities['total']}.{availabilities['last'] or 0}:r{referees_digest}"
+        f":c{clusters['total']}.{clusters['last'] or 0}"
+        f":t{traces['total']}.{traces['last'] or 0}:{config_digest}"
+    )
+
+
+def revision_after_assignment_save(run: DesignationRun, assignment: Assignment, *, previous_revision: str) -> str | None:
+    """Return the current revision if saving ``assignment`` is the only change since ``previous_revision``.
+
+    The expected revision is ``previous_revision`` with the same assignment
+    count and ``assignment.updated_at`` as the latest update; any other
+    assignment saved after the previous latest update also disqualifies it.
+    Returns ``None`` when something else moved, so callers rebuild instead of
+    patching.
+    """
+
+    match = _REVISION_ASSIGNMENTS_RE.match(previous_revision or "")
+    if match is None or assignment.updated_at is None:
+        return None
+    revision = run_analytics_revision(run)
+    expected = f"{match.group('head')}{assignment.updated_at.isoformat()}{match.group('tail')}"
+    if revision != expected:
+        return None
+    previous_updated = match.group("updated")
+    if previous_updated != "-":
+        others = Assignment.objects.filter(run=run, updated_at__gt=datetime.fromisoformat(previous_updated))
+        if others.exclude(pk=assignment.pk).exists():
+            return None
+    return revision
+
+
+def get_run_analytics(run: DesignationRun) -> dict[str, Any]:
+    """Return the stored analytics payload for the current run revision, building it if needed."""
+
+    revision = run_analytics_revision(run)
+    snapshot = RunAnalyticsSnapshot.objects.filter(run=run).first()
+    if snapshot is not None and snapshot.revision == revision:
+        return snapshot.payload
+    reusable = {}
+    if snapshot is not None and snapshot.pending_revision == revision and snapshot.changed_dates is not None:
+        # only the recorded manual changes happened since the snapshot was built
+        changed_dates = set(snapshot.changed_dates)
+        reusable = {
+            key: entry
+            for key, entry in (snapshot.unassigned_entries or {}).items()
+            if entry.get("date") is not None and entry.get("date") not in changed_dates
+        }
+    payload, entries = _build_run_analytics(run, reusable_entries=reusable)
+    return _store_snapshot(run, snapshot, revision, payload, entries).payload
+
+
+def mark_run_analytics_stale(
+    run: DesignationRun,
+    assignment: Assignment,
+    *,
+    previous_revision: str,
+    revision: str | None,
+) -> None:
+    """Record one manual (re)assignment on the stored analytics without rebuilding them.
+
+    ``revision`` is the run revision right after the change, or ``None`` when
+    something else changed too (see ``revision_after_assignment_save``).
+    Viability of a pending match only depends on the tutors' routes of the same
+    day, so the snapshot keeps the days touched since it was built and the next
+    ``get_run_analytics`` diagnoses only those again. If the recorded changes do
+    not chain from the snapshot's revision, the next read rebuilds everything.
+    """
+
+    changed_date = assignment.match.date
+    with transaction.atomic():
+        snapshot = RunAnalyticsSnapshot.objects.select_for_update().filter(run=run).first()
+        if snapshot is None:
+            return
+        head = snapshot.pending_revision or snapshot.revision
+        if revision is None or changed_date is None or head != previous_revision or snapshot.changed_dates is None:
+            snapshot.changed_dates = None
+        else:
+            snapshot.changed_dates = sorted({*snapshot.changed_dates, changed_date.isoformat()})
+        snapshot.pending_revision = revision or "-"
+        snapshot.save(update_fields=["pending_revision", "changed_dates", "updated_at"])
+
+
+def _store_snapshot(
+    run: DesignationRun,
+    snapshot: RunAnalyticsSnapshot | None,
+    revision: str,
+    payload: dict[str, Any],
+    entries: dict[str, dict[str, Any]],
+) -> RunAnalyticsSnapshot:
+    if snapshot is None:
+        snapshot = RunAnalyticsSnapshot(run=run)
+    snapshot.revision = revision
+    snapshot.pending_revision = ""
+    snapshot.changed_dates = []
+    snapshot.payload = json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+    snapshot.unassigned_entries = json.loads(json.dumps(entries, cls=DjangoJSONEncoder))
+    try:
+        with transaction.atomic():
+            snapshot.save()
+    except IntegrityError:
+        # una altra peticio l'ha materialitzat alhora; el payload és el mateix
+        pass
+    return snapshot
+
+
 def build_run_analytics(run: DesignationRun) -> dict[str, Any]:
+    payload, _entries = _build_run_analytics(run)
+    return payload
+
+
+@profiled("designacions.run_analytics")
+def _build_run_analytics(
+    run: DesignationRun,
+    *,
+    reusable_entries: dict[str, dict[str, Any]] | None = None,
+) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
     assignments = list(
         run.assignments.select_related("match", "referee", "trace", "match__address").all()
     )
@@ -37,31 +198,37 @@ def build_run_analytics(run: DesignationRun) -> dict[str, Any]:
     windows = [_availability_window(row, availability_buffer) for row in availability_rows]
     unique_referee_ids = {row.referee_id for row in availability_rows}
     used_referee_ids = {assignment.referee_id for assignment in assigned if assignment.referee_id}
+    cluster_lookup = {
+        cluster.address_id: cluster
+        for cluster in AddressCluster.objects.filter(run=run).select_related("address")
+    }
 
     total_matches = len(assignments)
     assigned_count = len(assigned)
     unassigned_count = len(unassigned)
 
-    demand_by_hour = _demand_by_hour(run, assignments, windows)
+    demand_by_hour = _demand_by_hour(run, assignments, windows, cluster_lookup)
     coverage_by_category = _coverage_rows(assignments, lambda item: _clean(item.match.category) or "Sense categoria")
     coverage_by_modality = _coverage_rows(assignments, lambda item: _clean(item.match.modality) or "Sense modalitat")
-    geography_rows = _geography_rows(run, assignments)
+    geography_rows = _geography_rows(assignments, cluster_lookup)
     tutor_level_rows = _tutor_level_rows(availability_rows, used_referee_ids)
     load_distribution = _load_distribution(assigned, unique_referee_ids)
     origin_rows = _origin_rows(run, assigned, total_matches)
     vehicle_rows = _vehicle_rows(availability_rows, used_referee_ids)
-    unassigned_analysis = _unassigned_analysis(run, unassigned)
+    unassigned_entries = _unassigned_entries(run, unassigned, reusable_entries or {})
+    unassigned_analysis = _unassigned_analysis(list(unassigned_entries.values()))
     charts = _chart_payloads(
         run,
         assignments,
         availability_rows,
         windows,
+        cluster_lookup,
         demand_by_hour,
         origin_rows,
         unassigned_analysis,
     )
 
-    return {
+    payload = {
         "kpis": [
             _kpi("Cobertura", f"{assigned_count}/{total_matches}", _percent(assigned_count, total_matches)),
             _kpi("Partits pendents", str(unassigned_count), None),
@@ -89,23 +256,27 @@ def build_run_analytics(run: DesignationRun) -> dict[str, Any]:
         "unassigned_analysis": unassigned_analysis,
         "charts": charts,
     }
+    return payload, unassigned_entries
 
 
-def _demand_by_hour(run: DesignationRun, assignments: list[Assignment], windows: list[_Window]) -> list[dict[str, Any]]:
+def _demand_by_hour(
+    run: DesignationRun,
+    assignments: list[Assignment],
+    windows: list[_Window],
+    cluster_lookup: dict[int, Any],
+) -> list[dict[str, Any]]:
     same_pitch_gap_min = _config_int(run, "gap_same_pitch_min", DEFAULT_GAP_SAME_PITCH_MIN)
-    cluster_lookup = {
-        cluster.address_id: cluster
-        for cluster in AddressCluster.objects.filter(run=run).select_related("address")
-    }
     by_hour: dict[str, dict[str, Any]] = {}
+    assignments_by_label: dict[str, list[Assignment]] = defaultdict(list)
     for assignment in assignments:
         minutes = _time_to_minutes(assignment.match.hour_raw)
         label = _hour_label(minutes)
+        assignments_by_label[label].append(assignment)
         row = by_hour.setdefault(
             label,
             {
                 "label": label,
-                "minutes": minutes if minutes is not None else 10**9,
+                "minutes": minutes if minutes is not None else _NO_MINUTES,
                 "total": 0,
                 "assigned": 0,
                 "unassigned": 0,
@@ -127,55 +298,34 @@ def _demand_by_hour(run: DesignationRun, assignments: list[Assignment], windows:
         else:
             row["unassigned"] += 1
 
-    match_dates_by_hour: dict[str, set[date]] = defaultdict(set)
-    for assignment in assignments:
-        label = _hour_label(_time_to_minutes(assignment.match.hour_raw))
-        if assignment.match.date:
-            match_dates_by_hour[label].add(assignment.match.date)
+    dates_by_hour = _match_dates_by_hour(assignments)
+    hour_queries = {
+        row["label"]: (row["minutes"] if row["minutes"] != _NO_MINUTES else None, dates_by_hour.get(row["label"]) or {None})
+        for row in by_hour.values()
+    }
+    query_minutes = [minutes for minutes, _dates in hour_queries.values()]
+    raw_sweep = _WindowSweep(windows, query_minutes, effective=False)
+    schedule_sweep = _WindowSweep(windows, query_minutes, effective=True)
+    assigned_by_date = _AssignedMinutesByDate(assignments)
 
     for row in by_hour.values():
-        minutes = row["minutes"] if row["minutes"] != 10**9 else None
-        dates = match_dates_by_hour.get(row["label"]) or {None}
-        raw_available = {
-            _window_slot_key(window)
-            for window in windows
-            if _window_contains_any_date(window, dates) and _window_contains(window, minutes, effective=False)
-        }
-        schedule_available = {
-            _window_slot_key(window)
-            for window in windows
-            if _window_contains_any_date(window, dates) and _window_contains(window, minutes, effective=True)
-        }
+        minutes, dates = hour_queries[row["label"]]
+        raw_available = raw_sweep.slot_keys(minutes, dates)
+        schedule_available = schedule_sweep.slot_keys(minutes, dates)
+        schedule_available_with_level = schedule_sweep.slot_keys(minutes, dates, with_level=True)
         occupied = {
             (assignment.referee_id, assignment.match.date)
-            for assignment in assignments
-            if assignment.referee_id
-            and _hour_label(_time_to_minutes(assignment.match.hour_raw)) == row["label"]
-            and (not dates or assignment.match.date in dates)
-        }
-        gap_blocked = {
-            (assignment.referee_id, assignment.match.date)
-            for assignment in assignments
-            if assignment.referee_id
-            and (not dates or assignment.match.date in dates)
-            and _is_within_gap(minutes, _time_to_minutes(assignment.match.hour_raw), same_pitch_gap_min)
+            for assignment in assignments_by_label[row["label"]]
+            if assignment.referee_id and (not dates or assignment.match.date in dates)
         }
+        gap_blocked = assigned_by_date.within_gap(minutes, dates, same_pitch_gap_min)
         occupied_available = schedule_available & occupied
         gap_blocked_available = schedule_available & gap_blocked
-        schedule_available_with_level = {
-            _window_slot_key(window)
-            for window in windows
-            if window.has_level
-            and _window_contains_any_date(window, dates)
-            and _window_contains(window, minutes, effective=True)
-        }
         free_effective = schedule_available - gap_blocked
         free_effective_with_level = schedule_available_with_level - gap_blocked
         demanded_clusters = set()
         served_clusters = set()
-        for assignment in assignments:
-            if _hour_label(_time_to_minutes(assignment.match.hour_raw)) != row["label"]:
-                continue
+        for assignment in assignments_by_label[row["label"]]:
             if dates and assignment.match.date not in dates:
                 continue
             cluster_label = _assignment_cluster_label(assignment, cluster_lookup)
@@ -201,6 +351,89 @@ def _demand_by_hour(run: DesignationRun, assignments: list[Assignment], windows:
     return sorted(by_hour.values(), key=lambda item: item["minutes"])
 
 
+def _match_dates_by_hour(assignments: list[Assignment]) -> dict[str, set[date]]:
+    match_dates_by_hour: dict[str, set[date]] = defaultdict(set)
+    for assignment in assignments:
+        label = _hour_label(_time_to_minutes(assignment.match.hour_raw))
+        if assignment.match.date:
+            match_dates_by_hour[label].add(assignment.match.date)
+    return match_dates_by_hour
+
+
+class _WindowSweep:
+    """Availability windows active at each queried minute, per availability date.
+
+    Windows of one date are sorted by start and swept once in increasing minute
+    order with a min-heap on the end minute, so each query reads the active set
+    instead of scanning every window.
+    """
+
+    def __init__(self, windows: Iterable[_Window], minutes_values: Iterable[int | None], *, effective: bool):
+        by_date: dict[date | None, list[tuple[int, int, tuple[int, date | None], bool]]] = defaultdict(list)
+        for window in windows:
+            end_min = window.effective_end_min if effective else window.end_min
+            if window.start_min is None or end_min is None:
+                continue
+            by_date[window.date].append((window.start_min, end_min, _window_slot_key(window), window.has_level))
+
+        queries = sorted({minutes for minutes in minutes_values if minutes is not None})
+        self._active: dict[date | None, dict[int, list[tuple[tuple[int, date | None], bool]]]] = {}
+        for window_date, intervals in by_date.items():
+            intervals.sort()
+            heap: list[tuple[int, int, tuple[int, date | None], bool]] = []
+            position = 0
+            results = self._active.setdefault(window_date, {})
+            for minutes in queries:
+                while position < len(intervals) and intervals[position][0] <= minutes:
+                    start_min, end_min, key, has_level = intervals[position]
+                    heapq.heappush(heap, (end_min, start_min, key, has_level))
+                    position += 1
+                while heap and heap[0][0] < minutes:
+                    heapq.heappop(heap)
+                results[minutes] = [(key, has_level) for _end, _start, key, has_level in heap]
+
+    def slot_keys(self, minutes: int | None, dates: set[date | None], *, with_level: bool = False) -> set[tuple[int, date | None]]:
+        if minutes is None:
+            return set()
+        keys: set[tuple[int, date | None]] = set()
+        for window_date in {None} | set(dates):
+            for key, has_level in self._active.get(window_date, {}).get(minutes, []):
+                if has_level or not with_level:
+                    keys.add(key)
+        return keys
+
+
+class _AssignedMinutesByDate:
+    """Assigned (referee, date) slots indexed by match date and sorted by minute."""
+
+    def __init__(self, assignments: Iterable[Assignment]):
+        rows: dict[date | None, list[tuple[int, int]]] = defaultdict(list)
+        for assignment in assignments:
+            minutes = _time_to_minutes(assignment.match.hour_raw)
+            if assignment.referee_id and minutes is not None:
+                rows[assignment.match.date].append((minutes, assignment.referee_id))
+        self._minutes: dict[date | None, list[int]] = {}
+        self._referees: dict[date | None, list[int]] = {}
+        for match_date, values in rows.items():
+            values.sort()
+            self._minutes[match_date] = [minutes for minutes, _referee_id in values]
+            self._referees[match_date] = [referee_id for _minutes, referee_id in values]
+
+    def within_gap(self, minutes: int | None, dates: set[date | None], gap_min: int) -> set[tuple[int, date | None]]:
+        if minutes is None or int(gap_min or 0) <= 0:
+            return set()
+        gap = int(gap_min)
+        blocked: set[tuple[int, date | None]] = set()
+        for match_date in dates:
+            values = self._minutes.get(match_date)
+            if not values:
+                continue
+            low = bisect_right(values, minutes - gap)
+            high = bisect_left(values, minutes + gap)
+            blocked.update((referee_id, match_date) for referee_id in self._referees[match_date][low:high])
+        return blocked
+
+
 def _assignment_cluster_label(assignment: Assignment, cluster_lookup: dict[int, Any]) -> str:
     cluster = cluster_lookup.get(assignment.match.address_id)
     if cluster and cluster.cluster_id is not None:
@@ -225,11 +458,7 @@ def _coverage_rows(assignments: list[Assignment], label_fn) -> list[dict[str, An
     return sorted(rows.values(), key=lambda item: (-item["total"], item["label"]))
 
 
-def _geography_rows(run: DesignationRun, assignments: list[Assignment]) -> list[dict[str, Any]]:
-    cluster_lookup = {
-        cluster.address_id: cluster
-        for cluster in AddressCluster.objects.filter(run=run).select_related("address")
-    }
+def _geography_rows(assignments: list[Assignment], cluster_lookup: dict[int, Any]) -> list[dict[str, Any]]:
     rows: dict[tuple[str, str], dict[str, Any]] = {}
     for assignment in assignments:
         cluster = cluster_lookup.get(assignment.match.address_id)
@@ -289,13 +518,14 @@ def _chart_payloads(
     assignments: list[Assignment],
     availability_rows: list[Any],
     windows: list[_Window],
+    cluster_lookup: dict[int, Any],
     demand_by_hour: list[dict[str, Any]],
     origin_rows: list[dict[str, Any]],
     unassigned_analysis: dict[str, Any],
 ) -> dict[str, Any]:
     return {
         "hour_pressure": _hour_pressure_chart(demand_by_hour),
-        "cluster_hour_heatmap": _cluster_hour_heatmap(run, assignments, demand_by_hour),
+        "cluster_hour_heatmap": _cluster_hour_heatmap(assignments, cluster_lookup, demand_by_hour),
         "tutor_level_hour_heatmap": _tutor_level_hour_heatmap(availability_rows, windows, assignments, demand_by_hour),
         "phase_progress": _phase_progress_chart(origin_rows),
         "route_size_distribution": _route_size_distribution_chart(run),
@@ -323,18 +553,14 @@ def _hour_pressure_chart(demand_by_hour: list[dict[str, Any]]) -> dict[str, Any]
 
 
 def _cluster_hour_heatmap(
-    run: DesignationRun,
     assignments: list[Assignment],
+    cluster_lookup: dict[int, Any],
     demand_by_hour: list[dict[str, Any]],
     *,
     limit: int = 14,
 ) -> dict[str, Any]:
     hours = [row["label"] for row in demand_by_hour]
     hour_set = set(hours)
-    cluster_lookup = {
-        cluster.address_id: cluster
-        for cluster in AddressCluster.objects.filter(run=run).select_related("address")
-    }
     rows: dict[str, dict[str, Any]] = {}
     for assignment in assignments:
         hour = _hour_label(_time_to_minutes(assignment.match.hour_raw))
@@ -391,18 +617,12 @@ def _tutor_level_hour_heatmap(
     }
     levels = sorted(set(referee_levels.values()))
     rows = {level: [0 for _ in hours] for level in levels}
+    hour_minutes = {hour: (minutes_by_hour[hour] if minutes_by_hour[hour] != _NO_MINUTES else None) for hour in hours}
+    sweep = _WindowSweep(windows, hour_minutes.values(), effective=True)
     for hour_index, hour in enumerate(hours):
-        minutes = minutes_by_hour[hour] if minutes_by_hour[hour] != 10**9 else None
         dates = dates_by_hour.get(hour) or {None}
-        seen: set[tuple[int, date | None]] = set()
-        for window in windows:
-            if not _window_contains_any_date(window, dates) or not _window_contains(window, minutes, effective=True):
-                continue
-            key = _window_slot_key(window)
-            if key in seen:
-                continue
-            seen.add(key)
-            level = referee_levels.get(window.referee_id, "Sense nivell")
+        for referee_id, _window_date in sweep.slot_keys(hour_minutes[hour], dates):
+            level = referee_levels.get(referee_id, "Sense nivell")
             rows.setdefault(level, [0 for _ in hours])[hour_index] += 1
     return {
         "hours": hours,
@@ -615,8 +835,77 @@ def _summary_considered_match_count(source: dict[str, Any], fallback: int = 0) -
     )
 
 
-def _unassigned_analysis(run: DesignationRun, unassigned: list[Assignment]) -> dict[str, Any]:
-    if not unassigned:
+def _unassigned_entries(
+    run: DesignationRun,
+    unassigned: list[Assignment],
+    reusable_entries: dict[str, dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    entries: dict[str, dict[str, Any]] = {}
+    pending = []
+    for assignment in unassigned:
+        entry = reusable_entries.get(str(assignment.id))
+        if entry is not None:
+            entries[str(assignment.id)] = entry
+        else:
+            pending.append(assignment)
+    if not pending:
+        return entries
+
+    context = build_manual_assignment_context(run)
+    for assignment in pending:
+        entries[str(assignment.id)] = _unassigned_entry(run, assignment, context)
+    return {str(assignment.id): entries[str(assignment.id)] for assignment in unassigned}
+
+
+def _unassigned_entry(run: DesignationRun, assignment: Assignment, context: dict[str, Any]) -> dict[str, Any]:
+    viable_count = 0
+    manual_only_missing_level_count = 0
+    candidate_count = 0
+    blocking: Counter[str] = Counter()
+    for referee in context["referees_by_assignment"].get(assignment.id, []):
+        candidate_count += 1
+        diagnosis = diagnose_with_context(run, assignment, referee, context)
+        if diagnosis["is_valid"]:
+            if _referee_has_engine_level(referee):
+                viable_count += 1
+            else:
+                manual_only_missing_level_count += 1
+                blocking["missing_referee_level"] += 1
+            continue
+        for reason in diagnosis.get("blocking_reasons") or []:
+            blocking[reason] += 1
+
+    hour_label = _hour_label(_time_to_minutes(assignment.match.hour_raw))
+    return {
+        "date": assignment.match.date.isoformat() if assignment.match.date else None,
+        "hour_label": hour_label,
+        # llista de parelles: l'ordre d'aparicio desempata els motius més freqüents
+        "blocking": [[reason, count] for reason, count in blocking.items()],
+        "point": {
+            "code": assignment.match.code,
+            "hour": hour_label,
+            "hour_minutes": _time_to_minutes(assignment.match.hour_raw),
+            "cluster": _cluster_display_label(_assignment_cluster_label_from_context(assignment, context["cluster_by_match_id"])),
+            "category": assignment.match.category or "-",
+            "venue": assignment.match.venue or "-",
+            "viable_count": viable_count,
+            "manual_only_missing_level_count": manual_only_missing_level_count,
+            "candidate_count": candidate_count,
+        },
+        "bottleneck": {
+            "code": assignment.match.code,
+            "hour": assignment.match.hour_raw or "-",
+            "category": assignment.match.category or "-",
+            "venue": assignment.match.venue or "-",
+            "viable_count": viable_count,
+            "manual_only_missing_level_count": manual_only_missing_level_count,
+            "candidate_count": candidate_count,
+        },
+    }
+
+
+def _unassigned_analysis(entries: list[dict[str, Any]]) -> dict[str, Any]:
+    if not entries:
         return {
             "zero_viable_count": 0,
             "viability_bins": [],
@@ -626,70 +915,21 @@ def _unassigned_analysis(run: DesignationRun, unassigned: list[Assignment]) -> d
             "blocking_by_hour": {"hours": [], "reasons": [], "matrix": []},
         }
 
-    context = build_manual_assignment_context(run)
-    availability_lookup = context["availability_lookup"]
-    assignments_by_referee = context["assignments_by_referee"]
-    cluster_by_match_id = context["cluster_by_match_id"]
-    referees_by_assignment = context["referees_by_assignment"]
-
     viability_counter = Counter()
     blocking_counter = Counter()
     blocking_by_hour: dict[str, Counter[str]] = defaultdict(Counter)
     bottlenecks = []
     viability_points = []
 
-    for assignment in unassigned:
-        viable_count = 0
-        manual_only_missing_level_count = 0
-        candidate_count = 0
-        hour_label = _hour_label(_time_to_minutes(assignment.match.hour_raw))
-        for referee in referees_by_assignment.get(assignment.id, []):
-            candidate_count += 1
-            diagnosis = diagnose_assignment_for_referee(
-                run,
-                assignment,
-                referee,
-                availability_lookup=availability_lookup,
-                assignments_by_referee=assignments_by_referee,
-                cluster_by_match_id=cluster_by_match_id,
-            )
-            if diagnosis["is_valid"]:
-                if _referee_has_engine_level(referee):
-                    viable_count += 1
-                else:
-                    manual_only_missing_level_count += 1
-                    blocking_counter["missing_referee_level"] += 1
-                    blocking_by_hour[hour_label]["missing_referee_level"] += 1
-                continue
-            for reason in diagnosis.get("blocking_reasons") or []:
-                blocking_counter[reason] += 1
-                blocking_by_hour[hour_label][reason] += 1
+    for entry in entries:
+        for reason, count in entry["blocking"]:
+            blocking_counter[reason] += count
+            blocking_by_hour[entry["hour_label"]][reason] += count
+        viable_count = entry["point"]["viable_count"]
         bin_label = "0" if viable_count == 0 else "1" if viable_count == 1 else "2" if viable_count == 2 else "3+"
         viability_counter[bin_label] += 1
-        viability_points.append(
-            {
-                "code": assignment.match.code,
-                "hour": hour_label,
-                "hour_minutes": _time_to_minutes(assignment.match.hour_raw),
-                "cluster": _cluster_display_label(_assignment_cluster_label_from_context(assignment, cluster_by_match_id)),
-                "category": assignment.match.category or "-",
-                "venue": assignment.match.venue or "-",
-                "viable_count": viable_count,
-                "manual_only_missing_level_count": manual_only_missing_level_count,
-                "candidate_count": candidate_count,
-            }
-        )
-        bottlenecks.append(
-            {
-                "code": assignment.match.code,
-                "hour": assignment.match.hour_raw or "-",
-                "category": assignment.match.category or "-",
-                "venue": assignment.match.venue or "-",
-                "viable_count": viable_count,
-                "manual_only_missing_level_count": manual_only_missing_level_count,
-                "candidate_count": candidate_count,
-            }
-        )
+        viability_points.append(dict(entry["point"]))
+        bottlenecks.append(dict(entry["bottleneck"]))
 
     order = ["0", "1", "2", "3+"]
     max_bin = max(viability_counter.values(), default=0)
@@ -713,7 +953,7 @@ def _unassigned_analysis(run: DesignationRun, unassigned: list[Assignment]) -> d
         "viability_points": sorted(
             viability_points,
             key=lambda item: (
-                item["hour_minutes"] if item["hour_minutes"] is not None else 10**9,
+                item["hour_minutes"] if item["hour_minutes"] is not None else _NO_MINUTES,
                 item["viable_count"],
                 item["code"],
             ),
@@ -723,7 +963,7 @@ def _unassigned_analysis(run: DesignationRun, unassigned: list[Assignment]) -> d
 
 
 def _blocking_by_hour_payload(blocking_by_hour: dict[str, Counter[str]], blocking_counter: Counter[str]) -> dict[str, Any]:
-    hours = sorted(blocking_by_hour.keys(), key=lambda label: _time_to_minutes(label) if _time_to_minutes(label) is not None else 10**9)
+    hours = sorted(blocking_by_hour.keys(), key=lambda label: _time_to_minutes(label) if _time_to_minutes(label) is not None else _NO_MINUTES)
     reasons = [key for key, _value in blocking_counter.most_common(6)]
     return {
         "hours": hours,
@@ -766,31 +1006,10 @@ def _referee_has_engine_level(referee: Any) -> bool:
     return bool(_clean(getattr(referee, "level", None)))
 
 
-def _window_contains_any_date(window: _Window, dates: set[date | None]) -> bool:
-    if window.date is None:
-        return True
-    return window.date in dates
-
-
-def _window_contains(window: _Window, minutes: int | None, *, effective: bool) -> bool:
-    if minutes is None or window.start_min is None:
-        return False
-    end_min = window.effective_end_min if effective else window.end_min
-    if end_min is None:
-        return False
-    return window.start_min <= minutes <= end_min
-
-
 def _window_slot_key(window: _Window) -> tuple[int, date | None]:
     return (window.referee_id, window.date)
 
 
-def _is_within_gap(target_minutes: int | None, assignment_minutes: int | None, gap_min: int) -> bool:
-    if target_minutes is None or assignment_minutes is None:
-        return False
-    return abs(int(target_minutes) - int(assignment_minutes)) < int(gap_min or 0)
-
-
 def _unique_availability_referees(availability_rows: Iterable[Any]) -> dict[int, Any]:
     referees = {}
     for row in availability_rows:
@@ -4,7 +4,6 @@ from typing import Any
 
 from django.template.loader import render_to_string
 from django.utils import timezone
-from weasyprint import HTML
 
 from designacions.models import DesignationRun
 
@@ -18,4 +17,5 @@ def render_run_analytics_pdf(run: DesignationRun, analytics: dict[str, Any], bas
             "generated_at": timezone.localtime(),
         },
     )
+    from weasyprint import HTML
     return HTML(string=html, base_url=base_url).write_pdf()
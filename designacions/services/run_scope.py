@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-import pandas as pd
+from ceeb_web.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
 
 
 TUTOR_LICENSE_CATEGORY = "TUTOR/TUTORA DE JOC"
@@ -11,7 +11,6 @@ from django.utils import timezone
 
 from logs import _write_job, push_log
 
-from .main_fixed import main as engine_main
 from .models import DesignationRun
 from .services.excel_import import import_excels_to_db
 from .services.jobstore import preview_map_rel_path, write_preview_map_html_sync
@@ -46,6 +45,9 @@ def process_designacions_run(
         log_and_store(task_id, f"Import OK: {info}", 15)
 
         log_and_store(task_id, "Executant motor d'optimitzacio.", 20, "processing")
+        # import diferit: les vistes importen aquest modul per encuar tasques
+        from .main_fixed import main as engine_main
+
         result = engine_main(
             path_disponibilitats,
             path_partits,
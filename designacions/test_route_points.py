@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest import TestCase
 
 from designacions.optimization.route_points import (
+    VENUE_MATRIX_CONFIG_KEY,
     AtomicRoutePoint,
     required_gap,
     route_points_from_segments,
     same_location,
+    transition_kind,
     transition_requires_vehicle,
     validate_atomic_gaps,
 )
+from designacions.optimization.venue_matrix import VenueTransitionMatrix, build_venue_matrix
 
 
 @dataclass(frozen=True)
@@ -122,3 +125,68 @@ class RoutePointsTests(TestCase):
 
         self.assertTrue(blocked)
         self.assertIn("vehicle_required", warnings)
+
+
+class VenueTransitionMatrixTests(TestCase):
+    def _points(self):
+        start = datetime(2026, 5, 2, 9, 0)
+        locations = [
+            ("SAFA", None, "43", "ok"),
+            ("safa ", None, "43", "ok"),
+            ("Pista 2", "p-2", "43", "ok"),
+            ("Pista 2 bis", "P-2", "43", None),
+            ("Maristes", "p-9", "43", "ok"),
+            ("Maristes", None, "12", "ok"),
+            ("Municipal", None, None, None),
+            ("Municipal", None, "12", "outlier"),
+            ("", None, "12", "ok"),
+        ]
+        return [
+            AtomicRoutePoint(
+                f"m{index}",
+                start + timedelta(minutes=100 * index),
+                start + timedelta(minutes=100 * index),
+                venue,
+                venue_id=venue_id,
+                cluster_id=cluster_id,
+                cluster_status=cluster_status,
+            )
+            for index, (venue, venue_id, cluster_id, cluster_status) in enumerate(locations)
+        ]
+
+    def test_matrix_lookups_match_the_scalar_classification(self):
+        points = self._points()
+        matrix = VenueTransitionMatrix(points)
+        config = {"gap_same_pitch_min": 60, "gap_diff_pitch_min": 80, "gap_diff_cluster_min": 130}
+        gaps = matrix.required_gaps(config)
+
+        self.assertEqual(len(matrix), len(points))
+        for left_index, left in enumerate(points):
+            for right_index, right in enumerate(points):
+                with self.subTest(left=left.match_id, right=right.match_id):
+                    self.assertEqual(matrix.kind(left, right), transition_kind(left, right))
+                    self.assertEqual(same_location(left, right, matrix), same_location(left, right))
+                    self.assertEqual(
+                        transition_requires_vehicle(left, right, matrix),
+                        transition_requires_vehicle(left, right),
+                    )
+                    self.assertEqual(int(gaps[left_index, right_index]), required_gap(left, right, config))
+
+    def test_unknown_points_fall_back_to_the_scalar_rules(self):
+        points = self._points()
+        matrix = VenueTransitionMatrix(points[:2])
+        stranger = AtomicRoutePoint("x", None, None, "Altre", cluster_id="43")
+
+        self.assertIsNone(matrix.kind(points[0], stranger))
+        self.assertTrue(transition_requires_vehicle(points[0], points[6], matrix))
+        self.assertFalse(same_location(points[0], stranger, matrix))
+
+    def test_validate_atomic_gaps_is_unchanged_with_a_shared_matrix(self):
+        points = self._points()
+        config = {"gap_same_pitch_min": 60, "gap_diff_pitch_min": 90, "gap_diff_cluster_min": 150, "has_vehicle": False}
+
+        expected = validate_atomic_gaps(points, config)
+        shared = validate_atomic_gaps(points, {**config, VENUE_MATRIX_CONFIG_KEY: build_venue_matrix(points)})
+
+        self.assertEqual(shared, expected)
+        self.assertTrue(expected[1])
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 from datetime import date
+from unittest.mock import patch
 
 from django.test import TestCase
 from django.test import RequestFactory
 
-from designacions.models import Assignment, Availability, DesignationRun, Match, Referee
-from designacions.services.run_analytics import build_run_analytics
+from designacions.models import Assignment, Availability, DesignationRun, Match, Referee, RunAnalyticsSnapshot
+from designacions.services import run_analytics
+from designacions.services.run_analytics import (
+    build_run_analytics,
+    get_run_analytics,
+    mark_run_analytics_stale,
+    revision_after_assignment_save,
+    run_analytics_revision,
+)
 from designacions.views import export_analytics_pdf_view
 
 
@@ -145,3 +153,126 @@ class RunAnalyticsTests(TestCase):
         self.assertEqual(response["Content-Type"], "application/pdf")
         self.assertIn(f"analitica_run_{run.id}.pdf", response["Content-Disposition"])
         self.assertTrue(bytes(response.content).startswith(b"%PDF"))
+
+    def _two_day_run(self):
+        run = DesignationRun.objects.create(
+            name="analytics snapshot",
+            task_id="analytics-snapshot",
+            params={"availability_end_buffer_min": 0},
+        )
+        referee = Referee.objects.create(code="TS", name="Tutor Snapshot", level="NIVELLA1")
+        assignments = []
+        for day in (2, 3):
+            Availability.objects.create(
+                run=run,
+                referee=referee,
+                raw={"Data": f"2026-05-0{day}", "Hora Inici": "17:00", "Hora Fi": "20:00"},
+            )
+            match = Match.objects.create(run=run, code=f"M{day}", date=date(2026, 5, day), hour_raw="18:00")
+            assignments.append(Assignment.objects.create(run=run, match=match))
+        return run, referee, assignments
+
+    def test_get_run_analytics_reuses_snapshot_until_revision_changes(self):
+        run, referee, assignments = self._two_day_run()
+
+        first = get_run_analytics(run)
+        with patch.object(run_analytics, "_build_run_analytics", wraps=run_analytics._build_run_analytics) as build:
+            self.assertEqual(get_run_analytics(run), first)
+            build.assert_not_called()
+
+            assignments[0].referee = referee
+            assignments[0].save()
+            updated = get_run_analytics(run)
+
+        build.assert_called_once()
+        self.assertEqual(updated["summary"]["assigned_matches"], 1)
+        self.assertEqual(RunAnalyticsSnapshot.objects.get(run=run).revision, run_analytics_revision(run))
+
+    def _manual_change(self, run, assignment, referee):
+        previous_revision = run_analytics_revision(run)
+        assignment.referee = referee
+        assignment.save()
+        with patch.object(run_analytics, "_build_run_analytics") as build:
+            mark_run_analytics_stale(
+                run,
+                assignment,
+                previous_revision=previous_revision,
+                revision=revision_after_assignment_save(run, assignment, previous_revision=previous_revision),
+            )
+        build.assert_not_called()
+
+    def test_manual_assignment_marks_snapshot_and_read_rediagnoses_changed_days(self):
+        run, referee, assignments = self._two_day_run()
+        get_run_analytics(run)
+
+        self._manual_change(run, assignments[0], referee)
+        snapshot = RunAnalyticsSnapshot.objects.get(run=run)
+        self.assertEqual(snapshot.pending_revision, run_analytics_revision(run))
+        self.assertEqual(snapshot.changed_dates, ["2026-05-02"])
+        with patch.object(run_analytics, "_unassigned_entry", wraps=run_analytics._unassigned_entry) as diagnose:
+            payload = get_run_analytics(run)
+
+        diagnose.assert_not_called()
+        snapshot = RunAnalyticsSnapshot.objects.get(run=run)
+        self.assertEqual((snapshot.revision, snapshot.pending_revision), (run_analytics_revision(run), ""))
+        self.assertEqual(payload, build_run_analytics(run))
+        self.assertEqual(payload["summary"]["unassigned_matches"], 1)
+        self.assertEqual([point["code"] for point in payload["unassigned_analysis"]["viability_points"]], ["M3"])
+
+        # dos canvis seguits abans de cap lectura: es recalculen els dos dies
+        self._manual_change(run, assignments[0], None)
+        self._manual_change(run, assignments[1], referee)
+        self.assertEqual(RunAnalyticsSnapshot.objects.get(run=run).changed_dates, ["2026-05-02", "2026-05-03"])
+        with patch.object(run_analytics, "_unassigned_entry", wraps=run_analytics._unassigned_entry) as diagnose:
+            payload = get_run_analytics(run)
+
+        self.assertEqual([call.args[1].match.code for call in diagnose.call_args_list], ["M2"])
+        self.assertEqual(payload, build_run_analytics(run))
+
+    def test_manual_assignment_after_other_changes_rebuilds_every_day_on_read(self):
+        run, referee, assignments = self._two_day_run()
+        get_run_analytics(run)
+
+        assignments[1].note = "Canvi fora del flux manual"
+        assignments[1].save()
+        self._manual_change(run, assignments[0], referee)
+        self.assertIsNone(RunAnalyticsSnapshot.objects.get(run=run).changed_dates)
+        self._manual_change(run, assignments[0], None)
+        with patch.object(run_analytics, "_unassigned_entry", wraps=run_analytics._unassigned_entry) as diagnose:
+            payload = get_run_analytics(run)
+
+        self.assertEqual(sorted(call.args[1].match.code for call in diagnose.call_args_list), ["M2", "M3"])
+        self.assertEqual(payload, build_run_analytics(run))
+
+    def test_revision_tracks_referee_active_flag(self):
+        run, referee, _assignments = self._two_day_run()
+        previous_revision = run_analytics_revision(run)
+
+        referee.active = False
+        referee.save(update_fields=["active"])
+
+        self.assertNotEqual(run_analytics_revision(run), previous_revision)
+
+    def test_revision_after_assignment_save_rejects_concurrent_changes(self):
+        run, referee, assignments = self._two_day_run()
+
+        previous_revision = run_analytics_revision(run)
+        assignments[0].referee = referee
+        assignments[0].save()
+        self.assertEqual(
+            revision_after_assignment_save(run, assignments[0], previous_revision=previous_revision),
+            run_analytics_revision(run),
+        )
+
+        previous_revision = run_analytics_revision(run)
+        assignments[1].note = "Canvi d'una altra peticio"
+        assignments[1].save()
+        assignments[0].referee = None
+        assignments[0].save()
+        self.assertIsNone(revision_after_assignment_save(run, assignments[0], previous_revision=previous_revision))
+
+        previous_revision = run_analytics_revision(run)
+        assignments[0].referee = referee
+        assignments[0].save()
+        Referee.objects.filter(pk=referee.pk).update(active=False)
+        self.assertIsNone(revision_after_assignment_save(run, assignments[0], previous_revision=previous_revision))
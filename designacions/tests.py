@@ -56,6 +56,7 @@ from .services.manual_assignment import (
     build_top_proposals_for_assignments,
     diagnose_assignment_for_referee,
 )
+from .services.manual_context_cache import clear_manual_assignment_context_cache
 from .services.run_scope import load_scoped_run_data
 from .tasks import rebuild_run_map_task
 from .views import upload_view
@@ -68,7 +69,12 @@ from .optimization.phase_runner import _phase_assignment_config, run_phased_rout
 from .optimization.peak_pressure import build_peak_anchors
 from .optimization.phase_solver import solve_phase_routes
 from .optimization.pressure import build_pressure_summary
-from .optimization.rescue import run_individual_rescue, run_partial_rescue
+from .optimization.rescue import (
+    _select_non_overlapping_routes,
+    _select_rescue_routes,
+    run_individual_rescue,
+    run_partial_rescue,
+)
 from .optimization.route_generation import RouteCandidate, generate_phase_route_candidates
 from .optimization.solver import solve_assignment_candidates
 from .optimization.state import apply_route_assignment, create_initial_state
@@ -162,6 +168,36 @@ class DesignacionsOptimizationPackageSolverTests(SimpleTestCase):
         route_packages = [package for package in packages if package.kind == "merged_route"]
         self.assertLessEqual(len(route_packages), 1)
 
+    def test_pressure_summary_counts_supply_per_bucket_and_day(self):
+        subgroups = [
+            BaseSubgroup(
+                id=f"S{hour}",
+                match_ids=[f"M{hour}"],
+                date=date(2026, 3, 1),
+                modality="VOLEIBOL",
+                start_dt=datetime(2026, 3, 1, hour, 0),
+                end_dt=datetime(2026, 3, 1, hour, 0),
+                venues=["Pista"],
+                cluster_ids=["1"],
+                cluster_statuses=["clustered"],
+            )
+            for hour in (10, 18)
+        ]
+        tutors = [
+            TutorCandidate("W", "W", "VOLEIBOL", "NIVELLA1", "Bus", False, {"2026-03-01": [{"start": "17:00", "end": "21:00"}]}),
+            TutorCandidate("V", "V", "VOLEIBOL", "NIVELLA1", "Cotxe", True, {"2026-03-01": {"10:00": True, "18:00": False}}),
+            TutorCandidate("A", "A", "any", "NIVELLA1", "Bus", False, {}),
+            TutorCandidate("D", "D", "VOLEIBOL", "NIVELLA1", "Bus", False, {"2026-03-02": True}),
+            TutorCandidate("F", "F", "FUTBOL", "NIVELLA1", "Cotxe", True, {}),
+        ]
+
+        pressure = build_pressure_summary(subgroups, tutors, {"time_bucket_minutes": 60})
+        supply = {row["bucket"]: row["supply"] for row in pressure["pressure_by_hour"]}
+        vehicle_supply = {row["bucket"]: row["vehicle_supply"] for row in pressure["vehicle_pressure_by_hour"]}
+
+        self.assertEqual(supply, {"10:00": 3, "18:00": 3})
+        self.assertEqual(vehicle_supply, {"10:00": 1, "18:00": 0})
+
     def test_package_scoring_uses_level_letter_distance(self):
         package = PackageCandidate(
             id="SENIOR",
@@ -452,7 +488,7 @@ class DesignacionsOptimizationPackageSolverTests(SimpleTestCase):
                 date="2026-03-01",
                 start_dt=datetime(2026, 3, 1, 18, 0),
                 end_dt=datetime(2026, 3, 1, 18, 0),
-                level_demand="ALEVÍ",
+                level_demand="ALEV\u00cd",
                 level_fit="ideal",
                 requires_vehicle=False,
                 cost=0.0,
@@ -588,6 +624,65 @@ class DesignacionsOptimizationPackageSolverTests(SimpleTestCase):
         self.assertEqual(result["summary"]["recovered_match_count"], 1)
         self.assertEqual(result["selected_routes"][0]["phase_name"], "individual_rescue:1")
 
+    def test_individual_rescue_skips_tutors_outside_modality_or_window(self):
+        fragment = BaseSubgroup(
+            id="P1",
+            match_ids=["M1"],
+            date=date(2026, 3, 1),
+            modality="VOLEIBOL",
+            start_dt=datetime(2026, 3, 1, 18, 0),
+            end_dt=datetime(2026, 3, 1, 18, 0),
+            venues=["Pista"],
+            cluster_ids=["1"],
+            cluster_statuses=["clustered"],
+            level_demand="ALEV\u00cd",
+            rows=[],
+        )
+        tutors = [
+            TutorCandidate("F1", "F1", "FUTBOL", "NIVELLD1", "Bus", False, {"2026-03-01": [{"start": "17:00", "end": "21:00"}]}),
+            TutorCandidate("V1", "V1", "VOLEIBOL", "NIVELLD1", "Bus", False, {"2026-03-01": [{"start": "09:00", "end": "12:00"}]}),
+            TutorCandidate("V2", "V2", "VOLEIBOL", "NIVELLD1", "Bus", False, {"2026-03-01": [{"start": "17:00", "end": "21:00"}]}),
+        ]
+
+        result = run_individual_rescue([fragment], tutors, create_initial_state(["M1"]), {})
+        first_iteration = result["summary"]["iteration_summaries"][0]
+
+        self.assertEqual(result["selected_routes"][0]["tutor_id"], "V2")
+        self.assertEqual(first_iteration["candidate_count"], 1)
+        self.assertEqual(
+            first_iteration["blocking_reason_counts"],
+            {"modality_mismatch": 1, "outside_availability_window": 1},
+        )
+
+    def test_rescue_selection_packs_more_matches_than_greedy(self):
+        def candidate(candidate_id, tutor_id, match_ids):
+            return {
+                "id": candidate_id,
+                "tutor_id": tutor_id,
+                "date": "2026-03-01",
+                "new_match_ids": match_ids,
+                "match_ids": match_ids,
+                "warning_codes": [],
+                "cost": 0.0,
+                "score_breakdown": {"weighted_coverage_value": float(len(match_ids))},
+            }
+
+        candidates = [
+            candidate("A", "T1", ["M1", "M2"]),
+            candidate("B", "T2", ["M2", "M3"]),
+            candidate("C", "T3", ["M1"]),
+        ]
+
+        greedy = _select_non_overlapping_routes(candidates, prefer_coverage=True)
+        selected, selection = _select_rescue_routes(candidates, {})
+        greedy_only, greedy_selection = _select_rescue_routes(candidates, {"rescue_selection_backend": "greedy"})
+
+        self.assertEqual([route["id"] for route in greedy], ["A"])
+        self.assertEqual(sorted(route["id"] for route in selected), ["B", "C"])
+        self.assertEqual(selection["strategy"], "cp_sat_optimal")
+        self.assertEqual([route["id"] for route in greedy_only], ["A"])
+        self.assertEqual(greedy_selection["strategy"], "greedy")
+
     def test_individual_rescue_respects_max_iterations(self):
         fragments = [
             BaseSubgroup(
@@ -2751,7 +2846,7 @@ class DesignacionsManualAssignmentsTests(TestCase):
         self.assertEqual(payload["better_alternatives"][0]["code"], "5001 F5")
         self.assertNotIn("5008 F5", [item["code"] for item in payload["better_alternatives"]])
 
-    @patch("designacions.views.build_manual_assignment_context", wraps=build_manual_assignment_context)
+    @patch("designacions.services.manual_context_cache.build_manual_assignment_context", wraps=build_manual_assignment_context)
     def test_manual_assignment_suggestions_bulk_view_returns_sorted_items_and_builds_context_once(self, build_context_mock):
         other_run = DesignationRun.objects.create(task_id="task-other-run")
         other_match = Match.objects.create(
@@ -3087,6 +3182,34 @@ class DesignacionsManualAssignmentsTests(TestCase):
         self.assertTrue(payload["refresh_suggestions"])
         rebuild_map_delay_mock.assert_called_once_with(self.run.id)
 
+    @patch("designacions.views.rebuild_run_map_task.delay")
+    def test_manual_assignment_context_is_reused_and_patched_after_manual_update(self, rebuild_map_delay_mock):
+        clear_manual_assignment_context_cache()
+        options_url = reverse(
+            "designacions_manual_assignment_options",
+            args=[self.run.id, self.second_target_assignment.id],
+        )
+
+        with patch(
+            "designacions.services.manual_context_cache.build_manual_assignment_context",
+            wraps=build_manual_assignment_context,
+        ) as build_context_mock:
+            before_payload = self.client.get(options_url).json()
+            self.client.get(options_url)
+            response = self.client.post(
+                reverse("designacions_update_assignment_async", args=[self.run.id, self.target_assignment.id]),
+                data=json.dumps({"referee_id": self.ref_best.id, "note": "Manual", "locked": False}),
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 200)
+            cached_payload = self.client.get(options_url).json()
+            self.assertEqual(build_context_mock.call_count, 1)
+
+        clear_manual_assignment_context_cache()
+        fresh_payload = self.client.get(options_url).json()
+        self.assertNotEqual(before_payload["compatible_referees"], cached_payload["compatible_referees"])
+        self.assertEqual(cached_payload, fresh_payload)
+
     @patch("designacions.tasks.rebuild_run_map", return_value="designacions/maps/run_test.html")
     def test_rebuild_run_map_task_updates_map_status(self, rebuild_run_map_mock):
         self.run.map_status = "queued"
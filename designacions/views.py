@@ -1,17 +1,19 @@
 # views.py
+from __future__ import annotations
+
 from django.core.paginator import Paginator
 import os, uuid, json, time
-from redis import Redis
 from django.contrib import messages
 from .models import Address
 from django.conf import settings
-from django.http import JsonResponse, StreamingHttpResponse, HttpResponse, HttpResponseBadRequest
+from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.http import require_http_methods, require_GET, require_POST
 from django.db.models import Count, Q
 from .services.colors import color_per_tutor
 from django.http import Http404
+from ceeb_web.log_streams import job_logs_sse_response
 from .models import DesignationRun, Assignment, AssignmentTrace, Referee
 from .tasks import build_cluster_preview_task, process_designacions_run, rebuild_run_map_task
 from .clusteritzacio.contracts import PreviewAddressPoint, PreviewScenario
@@ -32,27 +34,33 @@ from .services.assignment_explainer import (
     explain_candidate_for_assignment,
     explain_current_assignment,
 )
-import pandas as pd
 from .services.assignment_feasibility import has_vehicle
 from .services.manual_assignment import (
     build_assignment_availability_by_assignment,
     build_availability_display_by_ref,
-    build_availability_lookup_by_ref_and_date,
     build_run_mobility_summary,
-    build_manual_assignment_context,
     build_run_scoped_referee_summaries,
     build_run_scoped_referee_summary_by_id,
     build_top_proposals_for_assignments,
-    diagnose_assignment_for_referee,
+    candidate_diagnoses_for_assignment,
+    diagnose_with_context,
     get_run_referees_with_counts,
     serialize_proposal,
     serialize_referee_option,
     update_run_mobility_summary,
 )
+from .services.manual_context_cache import get_manual_assignment_context, refresh_manual_assignment_context
 from .services.run_scope import load_scoped_run_data
-from .services.run_analytics import build_run_analytics
+from .services.run_analytics import (
+    get_run_analytics,
+    mark_run_analytics_stale,
+    revision_after_assignment_save,
+    run_analytics_revision,
+)
+from ceeb_web.lazy_imports import lazy_import
 
 
+pd = lazy_import("pandas")
 
 REDIS_URL = os.getenv("REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 
@@ -859,7 +867,7 @@ def _build_manual_suggestions_bulk_items(run, assignment_ids, *, limit: int = 3)
         assignment.id: assignment
         for assignment in run.assignments.select_related("match", "referee").filter(id__in=ordered_ids)
     }
-    context = build_manual_assignment_context(run)
+    context = get_manual_assignment_context(run)
     proposals_by_assignment = build_top_proposals_for_assignments(
         run,
         assignments.values(),
@@ -907,8 +915,9 @@ def _serialize_explained_proposal(run, assignment, diagnosis, context):
 
 def _apply_assignment_update(run, assignment, referee_id_raw, note, locked):
     previous_referee_id = assignment.referee_id
-    referee_lookup = {referee.id: referee for referee in get_run_referees_with_counts(run)}
-    context = build_manual_assignment_context(run, referees_with_counts=referee_lookup.values())
+    previous_analytics_revision = run_analytics_revision(run)
+    context = get_manual_assignment_context(run, revision=previous_analytics_revision)
+    referee_lookup = {referee.id: referee for referee in context["referees_with_counts"]}
 
     if referee_id_raw not in (None, ""):
         try:
@@ -928,14 +937,7 @@ def _apply_assignment_update(run, assignment, referee_id_raw, note, locked):
             raise ValueError("Aquest tutor no és compatible amb la modalitat del partit.")
 
         referee_summary = context["referee_summaries_by_id"].get(referee.id, referee)
-        diagnosis = diagnose_assignment_for_referee(
-            run,
-            assignment,
-            referee_summary,
-            availability_lookup=context["availability_lookup"],
-            assignments_by_referee=context["assignments_by_referee"],
-            cluster_by_match_id=context["cluster_by_match_id"],
-        )
+        diagnosis = diagnose_with_context(run, assignment, referee_summary, context)
         assignment.referee = referee
         assignment.manual_override_warning = not diagnosis["is_valid"]
         assignment.manual_override_reason = diagnosis["warning_text"]
@@ -964,17 +966,35 @@ def _apply_assignment_update(run, assignment, referee_id_raw, note, locked):
         _queue_map_rebuild(run)
         run.refresh_from_db(fields=["map_status", "map_path"])
 
-    updated_context = build_manual_assignment_context(run)
-    update_run_mobility_summary(run, context=updated_context)
-    referee_summaries = build_run_scoped_referee_summaries(run)
+    analytics_revision = revision_after_assignment_save(
+        run,
+        assignment,
+        previous_revision=previous_analytics_revision,
+    )
+    updated_context = refresh_manual_assignment_context(
+        run,
+        assignment,
+        previous_referee_id=previous_referee_id,
+        context=context,
+        previous_revision=previous_analytics_revision,
+        revision=analytics_revision,
+    )
+    mobility_summary = update_run_mobility_summary(run, context=updated_context)
+    mark_run_analytics_stale(
+        run,
+        assignment,
+        previous_revision=previous_analytics_revision,
+        revision=analytics_revision,
+    )
+    referee_summaries = updated_context["referee_summaries"]
     counts = _build_counts(run, referees_with_counts=referee_summaries)
     return {
         "assignment": assignment,
         "message": message,
         "counts": counts,
         "map_queued": map_queued,
-        "referee_summary_by_id": {summary.id: summary for summary in referee_summaries},
-        "mobility_summary": build_run_mobility_summary(run, context=updated_context),
+        "referee_summary_by_id": updated_context["referee_summaries_by_id"],
+        "mobility_summary": mobility_summary,
     }
 
 @require_http_methods(["GET", "POST"])
@@ -1337,7 +1357,7 @@ def cluster_preview_override_restore_view(request, preview_id: str):
 @require_GET
 def run_detail_view(request, run_id: int):
     run = get_object_or_404(DesignationRun, id=run_id)
-    mobility_summary = build_run_mobility_summary(run) if run.status == "done" else {
+    mobility_summary = build_run_mobility_summary(run, context=get_manual_assignment_context(run)) if run.status == "done" else {
         "mobility_warning_count": 0,
         "mobility_error_count": 0,
         "mobility_warnings": [],
@@ -1383,14 +1403,14 @@ def run_detail_view(request, run_id: int):
 @require_GET
 def run_analytics_view(request, run_id: int):
     run = get_object_or_404(DesignationRun, id=run_id)
-    analytics = build_run_analytics(run)
+    analytics = get_run_analytics(run)
     return render(request, "run_analytics.html", {"run": run, "analytics": analytics})
 
 
 @require_GET
 def export_analytics_pdf_view(request, run_id: int):
     run = get_object_or_404(DesignationRun, id=run_id)
-    analytics = build_run_analytics(run)
+    analytics = get_run_analytics(run)
     pdf = render_run_analytics_pdf(run, analytics, base_url=request.build_absolute_uri("/"))
     response = HttpResponse(pdf, content_type="application/pdf")
     response["Content-Disposition"] = f'attachment; filename="analitica_run_{run.id}.pdf"'
@@ -1551,27 +1571,7 @@ def cluster_preview_map_view(request, preview_id: str):
 
 @require_GET
 def logs_stream_view(request, task_id: str):
-    r = Redis.from_url(REDIS_URL, decode_responses=True)
-    pubsub = r.pubsub()
-    channel = f"job:{task_id}:channel"
-    pubsub.subscribe(channel)
-
-    def event_stream():
-        yield "data: " + json.dumps({"message": "Connectat al stream.", "progress": None}) + "\n\n"
-        try:
-            for msg in pubsub.listen():
-                if msg and msg.get("type") == "message":
-                    yield f"data: {msg.get('data')}\n\n"
-        finally:
-            try:
-                pubsub.close()
-            except Exception:
-                pass
-
-    resp = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
-    resp["Cache-Control"] = "no-cache"
-    resp["X-Accel-Buffering"] = "no"
-    return resp
+    return job_logs_sse_response(request, task_id, f"job:{task_id}:channel")
 
 
 def _availability_windows_for_referee(availability_lookup: dict, referee_id: int | None) -> list[str]:
@@ -1682,10 +1682,11 @@ def assignments_view(request, run_id: int):
         groups.append(current)
 
 
-    availability_lookup = build_availability_lookup_by_ref_and_date(run)
+    manual_context = get_manual_assignment_context(run)
+    availability_lookup = manual_context["availability_lookup"]
     availability_by_assignment = build_assignment_availability_by_assignment(assigned_qs, availability_lookup)
     availability_display_by_ref = build_availability_display_by_ref(run)
-    mobility_summary = build_run_mobility_summary(run)
+    mobility_summary = build_run_mobility_summary(run, context=manual_context)
     mobility_warning_assignment_ids = mobility_summary["warning_assignment_ids"]
     mobility_error_assignment_ids = mobility_summary["error_assignment_ids"]
     mobility_warning_counts_by_referee = mobility_summary["warning_counts_by_referee"]
@@ -1791,7 +1792,7 @@ def manual_assignment_options_view(request, run_id: int, assignment_id: int):
     )
     query = (request.GET.get("q") or "").strip().lower()
 
-    context = build_manual_assignment_context(run)
+    context = get_manual_assignment_context(run)
     compatible_referees = context["referees_by_assignment"].get(assignment.id, [])
     if query:
         compatible_referees = [
@@ -1801,16 +1802,10 @@ def manual_assignment_options_view(request, run_id: int, assignment_id: int):
         ]
 
     proposals = build_top_proposals_for_assignments(run, [assignment], context=context).get(assignment.id, [])
+    diagnoses = candidate_diagnoses_for_assignment(run, assignment, context)
     compatible_referee_payload = []
     for referee in compatible_referees:
-        diagnosis = diagnose_assignment_for_referee(
-            run,
-            assignment,
-            referee,
-            availability_lookup=context["availability_lookup"],
-            assignments_by_referee=context["assignments_by_referee"],
-            cluster_by_match_id=context["cluster_by_match_id"],
-        )
+        diagnosis = diagnoses[referee.id]
         item = serialize_referee_option(referee)
         item.update(
             {
@@ -1859,7 +1854,7 @@ def assignment_explanation_view(request, run_id: int, assignment_id: int):
     if not assignment.referee_id:
         return JsonResponse({"ok": False, "message": "L'assignacio no te tutor assignat."}, status=400)
 
-    explanation = explain_current_assignment(run, assignment, context=build_manual_assignment_context(run))
+    explanation = explain_current_assignment(run, assignment, context=get_manual_assignment_context(run))
     return JsonResponse({"ok": True, **explanation})
 
 
@@ -1,9 +1,9 @@
 # logs.py
 import json
 import os
+import sys
 import time
 
-import pandas as pd
 from redis import Redis
 from redis.asyncio import Redis as AsyncRedis
 
@@ -11,8 +11,14 @@ REDIS_URL = os.getenv("REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://re
 
 
 
+def _is_timestamp(obj) -> bool:
+    # sense importar pandas: si no s'ha carregat, cap valor pot ser un Timestamp
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(obj, pd.Timestamp)
+
+
 def _json_safe(obj):
-    if isinstance(obj, (pd.Timestamp,)):
+    if _is_timestamp(obj):
         return obj.isoformat()
     return str(obj) if not isinstance(obj, (str, int, float, bool, type(None), list, dict)) else obj
 
@@ -75,7 +81,7 @@ async def _write_job(task_id: str, data: dict):
 
         payload = _merge_job_payload(task_id, current, data)
         for k, v in payload.items():
-            if isinstance(v, (pd.Timestamp,)):
+            if _is_timestamp(v):
                 payload[k] = v.isoformat()
         await r.set(_job_key(task_id), json.dumps(payload, ensure_ascii=False, default=_json_safe))
     finally:
@@ -118,7 +124,7 @@ async def push_log(task_id: str, message: str, progress: int | None = None, stat
         if status is not None:
             event["status"] = status
         for k, v in event.items():
-            if isinstance(v, (pd.Timestamp,)):
+            if _is_timestamp(v):
                 event[k] = v.isoformat()
 
         await r.rpush(_logs_key(task_id), json.dumps(event, ensure_ascii=False, default=_json_safe))
@@ -13,6 +13,8 @@ from django.conf import settings
 from django.db import transaction
 from .specs import SPECS
 from .analysis_ocasionals import analyze_ocasionals
+from .dataset_cache import cache_root, prune_cache, read_dataset_cached
+from .plot_runner import PlotRunner
 from ..models import AnnualDataset, AnnualReport
 
 
@@ -57,6 +59,11 @@ def _read_excel(path: str) -> pd.DataFrame:
     return pd.read_excel(path, engine="openpyxl")
 
 
+def _plot_workers() -> Optional[int]:
+    workers = int(getattr(settings, "MARBELLA_PLOT_WORKERS", 0) or 0)
+    return workers if workers > 0 else None
+
+
 # ---------- Core steps ----------
 
 from collections import defaultdict
@@ -70,7 +77,7 @@ def load_datasets(report: AnnualReport):
         if not ds.fitxer:
             continue
         try:
-            df = _read_excel(ds.fitxer.path)
+            df = read_dataset_cached(ds.fitxer.path, _read_excel)
             df.columns = [str(c).strip() for c in df.columns]
 
             if ds.period:  # mensual
@@ -222,6 +229,14 @@ def run_analysis(
     plot_defaults = cfg.get("plot_defaults") or {}
     plot_overrides = cfg.get("plots") or {}
 
+    # Els plots s'encuen durant l'anàlisi i es renderitzen tots junts (en paral·lel
+    # i reaprofitant els que no han canviat des de l'última execució).
+    plot_runner = PlotRunner(
+        cache_dir=os.path.join(cache_root(), "plots"),
+        max_workers=_plot_workers(),
+    )
+    sections: List[Tuple[str, List[str], List[Dict[str, Any]]]] = []
+
     # ----- CLIENTS -----
     if "clients" in dfs_simple:
         _p(25, "analyzing_clients")
@@ -230,19 +245,11 @@ def run_analysis(
             plots_dir_abs=plots_dir_abs,
             year=report.any,
             plot_defaults=plot_defaults,
+            plot_runner=plot_runner,
             #plot_overrides=plot_overrides,
         )
         kpis["clients"] = clients_kpis
-        warnings += clients_warnings
-        for item in clients_plot_abs:  # (ara serà "items", tot i que el nom variable el canviaràs)
-            plot_items.append({
-                "key": item["key"],
-                "kind": item.get("kind", "image"),
-                "title": item.get("title") or item["key"],
-                "file": _media_rel(item["file_abs"]),
-                "params": item.get("params") or {},
-                "source": "clients",
-            })
+        sections.append(("clients", clients_warnings, clients_plot_abs))
     # ----- RESERVES -----
     if "reserves" in dfs_simple:
         _p(55, "analyzing_reserves")
@@ -251,19 +258,11 @@ def run_analysis(
             plots_dir_abs=plots_dir_abs,
             year=report.any,
             plot_defaults=plot_defaults,
+            plot_runner=plot_runner,
             #plot_overrides=plot_overrides,
         )
         kpis["reserves"] = reserves_kpis
-        warnings += reserves_warnings
-        for item in reserves_plot_abs:
-            plot_items.append({
-                "key": item["key"],
-                "kind": item.get("kind", "image"),
-                "title": item.get("title") or item["key"],
-                "file": _media_rel(item["file_abs"]),
-                "params": item.get("params") or {},
-                "source": "reserves",
-            })
+        sections.append(("reserves", reserves_warnings, reserves_plot_abs))
 
         #---- OCASIONALS (mensual) -----
     if AnnualDataset.DatasetType.OCASIONALS in dfs_monthly:
@@ -271,7 +270,7 @@ def run_analysis(
 
         missing = [m for m in range(1, 13) if m not in monthly]
         if missing:
-            warnings.append(f"Ocasionals: falten mesos {missing}")
+            sections.append(("", [f"Ocasionals: falten mesos {missing}"], []))
 
         _p(70, "analyzing_ocasionals")
         ocas_kpis, ocas_warn, ocas_plots = analyze_ocasionals(
@@ -279,20 +278,33 @@ def run_analysis(
             plots_dir_abs=plots_dir_abs,
             year=report.any,
             plot_defaults=plot_defaults,
+            plot_runner=plot_runner,
         )
         kpis["ocasionals"] = ocas_kpis
-        warnings += ocas_warn
-        for item in ocas_plots:
+        sections.append(("ocasionals", ocas_warn, ocas_plots))
+
+    _p(80, "rendering_plots")
+    plot_runner.run()
+    if plot_runner.failed:
+        warnings.append(f"{plot_runner.failed} gràfic(s) han fallat en renderitzar-se; la resta de l'informe s'ha generat.")
+    try:
+        prune_cache()
+    except OSError:
+        pass
+
+    # Un cop renderitzats, els warnings i items de cada secció ja són complets.
+    for source, section_warnings, section_plots in sections:
+        warnings += section_warnings
+        for item in section_plots:
             plot_items.append({
                 "key": item["key"],
                 "kind": item.get("kind", "image"),
                 "title": item.get("title") or item["key"],
                 "file": _media_rel(item["file_abs"]),
                 "params": item.get("params") or {},
-                "source": "ocasionals",
+                "source": source,
             })
 
-    
     _p(90, "writing_artifacts")
     artifacts = write_artifacts(run_dir_abs, kpis, warnings, plot_items)
 
@@ -315,5 +327,6 @@ def run_analysis(
     if verbose:
         print(f"[run_analysis] report={report_id} run_dir={artifacts.run_dir}")
         print(f"[run_analysis] warnings={len(warnings)} plots={len(plot_items)}")
+        print(f"[run_analysis] plots rendered={plot_runner.rendered} reused={plot_runner.reused}")
 
     return AnalysisOutput(kpis=kpis, warnings=warnings, artifacts=artifacts)
@@ -8,6 +8,8 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from .plot_runner import PlotRunner
+
 
 # Acceptem variants amb/ sense espai i DIC/DES
 MONTH_TOKENS = [
@@ -205,6 +207,7 @@ def analyze_clients(
     plots_dir_abs: str,
     year: Optional[int] = None,
     plot_defaults: Optional[Dict[str, Any]] = None,
+    plot_runner: Optional[PlotRunner] = None,
 ) -> Tuple[Dict[str, Any], List[str], List[str]]:    
     """
     Excel mensual d'abonats:
@@ -218,7 +221,10 @@ def analyze_clients(
       - kpis (dict)
       - warnings (list[str])
       - plot_paths_abs (list[str])  # ABSOLUTS
+
+    Amb `plot_runner`, els plots s'encuen i es resolen a `plot_runner.run()`.
     """
+    plot_runner = plot_runner or PlotRunner.inline()
     warnings: List[str] = []
     plot_items_abs: List[Dict[str, Any]] = []
     kpis: Dict[str, Any] = {}
@@ -256,23 +262,28 @@ def analyze_clients(
 
     os.makedirs(plots_dir_abs, exist_ok=True)
     out_abs_total = os.path.join(plots_dir_abs, "clients_evolucio_abonats_total.png")
-    if _plot_year_evolution(
+
+    def _on_total(ok: bool) -> None:
+        if ok:
+            plot_items_abs.append({
+                "key": "clients.total",
+                "kind": "line",
+                "title": "Evolució anual d'abonats (TOTAL mensual)",
+                "file_abs": out_abs_total,
+                "params": {"ylabel": "Total abonats"},})
+        else:
+            warnings.append("clients: no s'ha pogut generar el gràfic del TOTAL.")
+
+    plot_runner.submit(
+        _plot_year_evolution,
         month_labels,
         vals_total,
-        out_abs_total,
+        out_png=out_abs_total,
+        on_result=_on_total,
         title="Evolució anual d'abonats (TOTAL mensual)",
         ylabel="Total abonats",
         plot_defaults=plot_defaults,
-    ):
-        plot_items_abs.append({
-            "key": "clients.total",
-            "kind": "line",
-            "title": "Evolució anual d'abonats (TOTAL mensual)",
-            "file_abs": out_abs_total,
-            "params": {"ylabel": "Total abonats"},})
-        
-    else:
-        warnings.append("clients: no s'ha pogut generar el gràfic del TOTAL.")
+    )
 
     # 4) Fila "Accés puntual" (si existeix)
     punctual_row = _find_row_by_label_contains(table, label_col, "ACCÉS PUNTUAL")
@@ -292,22 +303,28 @@ def analyze_clients(
             kpis["acces_puntual_variacio_gener_desembre"] = float(vals_puntual[-1] - vals_puntual[0])
 
         out_abs_puntual = os.path.join(plots_dir_abs, "clients_evolucio_acces_puntual.png")
-        if _plot_year_evolution(
+
+        def _on_puntual(ok: bool) -> None:
+            if ok:
+                plot_items_abs.append({
+                    "key": "clients.puntual",
+                    "kind": "line",
+                    "title": "Evolució anual d'Accés puntual",
+                    "file_abs": out_abs_puntual,
+                    "params": {"ylabel": "Accessos puntuals"},
+                })
+            else:
+                warnings.append("clients: no s'ha pogut generar el gràfic d'Accés puntual.")
+
+        plot_runner.submit(
+            _plot_year_evolution,
             month_labels,
             vals_puntual,
-            out_abs_puntual,
+            out_png=out_abs_puntual,
+            on_result=_on_puntual,
             title="Evolució anual d'Accés puntual",
             ylabel="Accessos puntuals",
             plot_defaults=plot_defaults,
-        ):
-            plot_items_abs.append({
-                "key": "clients.puntual",
-                "kind": "line",
-                "title": "Evolució anual d'Accés puntual",
-                "file_abs": out_abs_puntual,
-                "params": {"ylabel": "Accessos puntuals"},
-            })
-        else:
-            warnings.append("clients: no s'ha pogut generar el gràfic d'Accés puntual.")
+        )
 
     return kpis, warnings, plot_items_abs
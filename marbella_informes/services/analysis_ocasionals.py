@@ -7,6 +7,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 
+from .plot_runner import PlotRunner
+
 
 # Tipologies normalitzades (clau interna → etiqueta)
 ACCESS_MAP = {
@@ -21,12 +23,60 @@ def _norm(s: object) -> str:
     return str(s).strip().upper()
 
 
+def _plot_accesses_stack(
+    pivot: pd.DataFrame,
+    ordered_cols: List[str],
+    out_png: str,
+    *,
+    plot_defaults: Optional[Dict[str, Any]] = None,
+) -> bool:
+    # aplica defaults globals (mateix patró que clients/reserves)
+    if plot_defaults:
+        style = plot_defaults.get("style")
+        if style and style != "default":
+            plt.style.use(style)
+        plt.rcParams.update({
+            "font.family": plot_defaults.get("font_family", "DejaVu Sans"),
+            "font.size": int(plot_defaults.get("font_size", 10)),
+            "axes.titlesize": int(plot_defaults.get("title_size", 14)),
+            "axes.titleweight": plot_defaults.get("title_weight", "bold"),
+        })
+
+    fig, ax = plt.subplots(figsize=plot_defaults.get("figsize_line", (10, 6)))
+    bottom = np.zeros(len(pivot))
+
+    colors = [
+        "#94a3b8",  # Ocasional
+        "#60a5fa",  # Espectadors
+        "#34d399",  # Esportius
+        "#fbbf24",  # No esportius
+    ]
+
+    for col, color in zip(ordered_cols, colors):
+        ax.bar(pivot.index, pivot[col], bottom=bottom, label=col, color=color)
+        bottom += pivot[col].values
+
+    ax.set_title("Accessos ocasionals per mes (barres acumulatives)")
+    ax.set_xlabel("Mes")
+    ax.set_ylabel("Nombre d'accessos")
+    ax.legend()
+
+    if plot_defaults.get("grid", True):
+        ax.grid(axis="y", alpha=float(plot_defaults.get("grid_alpha", 0.3)))
+
+    plt.tight_layout()
+    plt.savefig(out_png, dpi=int(plot_defaults.get("dpi", 200)))
+    plt.close(fig)
+    return True
+
+
 def analyze_ocasionals(
     monthly_dfs: Dict[int, pd.DataFrame],
     *,
     plots_dir_abs: str,
     year: Optional[int] = None,
     plot_defaults: Optional[Dict[str, Any]] = None,
+    plot_runner: Optional[PlotRunner] = None,
 ) -> Tuple[Dict[str, Any], List[str], List[Dict[str, Any]]]:
     """
     monthly_dfs: {1: df_gen, 2: df_feb, ...}
@@ -35,7 +85,10 @@ def analyze_ocasionals(
       - kpis (dict)
       - warnings (list[str])
       - plot_items_abs (list[dict])  # mateix format que clients/reserves
+
+    Amb `plot_runner`, el plot s'encua i es resol a `plot_runner.run()`.
     """
+    plot_runner = plot_runner or PlotRunner.inline()
     warnings: List[str] = []
     plot_items_abs: List[Dict[str, Any]] = []
     kpis: Dict[str, Any] = {}
@@ -103,53 +156,26 @@ def analyze_ocasionals(
     os.makedirs(plots_dir_abs, exist_ok=True)
     out_abs = os.path.join(plots_dir_abs, "ocasionals_accesos_mensuals_stack.png")
 
-    # aplica defaults globals (mateix patró que clients/reserves)
-    if plot_defaults:
-        style = plot_defaults.get("style")
-        if style and style != "default":
-            plt.style.use(style)
-        plt.rcParams.update({
-            "font.family": plot_defaults.get("font_family", "DejaVu Sans"),
-            "font.size": int(plot_defaults.get("font_size", 10)),
-            "axes.titlesize": int(plot_defaults.get("title_size", 14)),
-            "axes.titleweight": plot_defaults.get("title_weight", "bold"),
-        })
-
-    fig, ax = plt.subplots(figsize=plot_defaults.get("figsize_line", (10, 6)))
-    bottom = np.zeros(len(pivot))
-
-    colors = [
-        "#94a3b8",  # Ocasional
-        "#60a5fa",  # Espectadors
-        "#34d399",  # Esportius
-        "#fbbf24",  # No esportius
-    ]
-
-    for col, color in zip(ordered_cols, colors):
-        ax.bar(pivot.index, pivot[col], bottom=bottom, label=col, color=color)
-        bottom += pivot[col].values
-
-    ax.set_title("Accessos ocasionals per mes (barres acumulatives)")
-    ax.set_xlabel("Mes")
-    ax.set_ylabel("Nombre d'accessos")
-    ax.legend()
-
-    if plot_defaults.get("grid", True):
-        ax.grid(axis="y", alpha=float(plot_defaults.get("grid_alpha", 0.3)))
-
-    plt.tight_layout()
-    plt.savefig(out_abs, dpi=int(plot_defaults.get("dpi", 200)))
-    plt.close(fig)
-
-    plot_items_abs.append({
-        "key": "ocasionals.accesos_stack",
-        "kind": "bar",
-        "title": "Accessos ocasionals mensuals (apilat)",
-        "file_abs": out_abs,
-        "params": {
-            "stacked": True,
-            "categories": ordered_cols,
-        },
-    })
+    def _on_stack(ok: bool) -> None:
+        if ok:
+            plot_items_abs.append({
+                "key": "ocasionals.accesos_stack",
+                "kind": "bar",
+                "title": "Accessos ocasionals mensuals (apilat)",
+                "file_abs": out_abs,
+                "params": {
+                    "stacked": True,
+                    "categories": ordered_cols,
+                },
+            })
+
+    plot_runner.submit(
+        _plot_accesses_stack,
+        pivot,
+        ordered_cols,
+        out_png=out_abs,
+        on_result=_on_stack,
+        plot_defaults=plot_defaults,
+    )
 
     return kpis, warnings, plot_items_abs
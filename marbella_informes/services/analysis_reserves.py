@@ -6,6 +6,8 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from .plot_runner import PlotRunner
+
 
 # Columnes que vols (flexible: només agafem les que existeixen)
 WANTED_COLS = ["NombreCompleto", "Recurso", "FechaReserva", "DuracionHoras", "Deporte"]
@@ -281,13 +283,18 @@ def analyze_reserves(
     plots_dir_abs: str,
     year: Optional[int] = None,
     plot_defaults: Optional[Dict[str, Any]] = None,
+    plot_runner: Optional[PlotRunner] = None,
 ) -> Tuple[Dict[str, Any], List[str], List[str]]:
     """
     Retorna:
       - kpis (dict)
       - warnings (list[str])
       - plot_paths_abs (list[str])  # ABSOLUTS; l'orquestrador els convertirà a relatius
+
+    Si es passa `plot_runner`, els plots s'hi encuen i warnings/plot_paths_abs
+    s'omplen quan l'orquestrador fa `plot_runner.run()`.
     """
+    plot_runner = plot_runner or PlotRunner.inline()
     warnings: List[str] = []
     plot_items_abs: List[Dict[str, Any]] = []
 
@@ -430,29 +437,47 @@ def analyze_reserves(
     os.makedirs(plots_dir_abs, exist_ok=True)
 
     pie_abs = os.path.join(plots_dir_abs, "reserves_pie_hores_per_espai.png")
-    if _plot_pie_hours_by_recurso(df, pie_abs, plot_defaults=plot_defaults):
-        plot_items_abs.append({
-        "key": "reserves.hores_per_espai",
-        "kind": "pie",
-        "title": "Percentatge d'hores reservades per espai",
-        "file_abs": pie_abs,
-        "params": {},
-    })
-        
-    else:
-        warnings.append("No s'ha pogut generar el pastís (dades insuficients o nulls).")
+
+    def _on_pie(ok: bool) -> None:
+        if ok:
+            plot_items_abs.append({
+                "key": "reserves.hores_per_espai",
+                "kind": "pie",
+                "title": "Percentatge d'hores reservades per espai",
+                "file_abs": pie_abs,
+                "params": {},
+            })
+        else:
+            warnings.append("No s'ha pogut generar el pastís (dades insuficients o nulls).")
+
+    plot_runner.submit(
+        _plot_pie_hours_by_recurso,
+        df,
+        out_png=pie_abs,
+        on_result=_on_pie,
+        plot_defaults=plot_defaults,
+    )
 
     line_abs = os.path.join(plots_dir_abs, "reserves_evolucio_hores.png")
-    if _plot_year_evolution(df, line_abs, plot_defaults=plot_defaults):
-        plot_items_abs.append({
-        "key": "reserves.evolucio_hores",
-        "kind": "line",
-        "title": "Evolució anual d'hores reservades",
-        "file_abs": line_abs,
-        "params": {},
-    })
 
-    else:
-        warnings.append("No s'ha pogut generar l'evolució anual (dades insuficients o nulls).")
+    def _on_line(ok: bool) -> None:
+        if ok:
+            plot_items_abs.append({
+                "key": "reserves.evolucio_hores",
+                "kind": "line",
+                "title": "Evolució anual d'hores reservades",
+                "file_abs": line_abs,
+                "params": {},
+            })
+        else:
+            warnings.append("No s'ha pogut generar l'evolució anual (dades insuficients o nulls).")
+
+    plot_runner.submit(
+        _plot_year_evolution,
+        df,
+        out_png=line_abs,
+        on_result=_on_line,
+        plot_defaults=plot_defaults,
+    )
 
     return kpis, warnings, plot_items_abs
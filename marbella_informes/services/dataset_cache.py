@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import time
+from typing import Callable, Optional
+
+import pandas as pd
+from django.conf import settings
+
+
+# Els Excel de Marbella no canvien entre execucions: guardem el DataFrame ja
+# parsejat indexat pel hash del fitxer i així només paguem pd.read_excel un cop.
+# Format: pickle de pandas (columnar per blocs, sense dependències extra i
+# tolerant amb columnes de tipus mixt com les "Unnamed: x" dels Excel crus).
+CACHE_FORMAT_VERSION = "1"
+
+logger = logging.getLogger(__name__)
+
+
+def cache_root() -> str:
+    # Els pickles contenen dades d'alumnes: la cache no pot viure dins de MEDIA_ROOT
+    # (nginx el serveix a /media/). Per defecte, al costat de MEDIA_ROOT.
+    configured = str(getattr(settings, "MARBELLA_CACHE_DIR", "") or "").strip()
+    if configured:
+        return configured
+    media_root = os.path.abspath(str(settings.MEDIA_ROOT))
+    return os.path.join(os.path.dirname(media_root), "marbella_cache")
+
+
+def _legacy_cache_root() -> str:
+    return os.path.join(settings.MEDIA_ROOT, "marbella", "_cache")
+
+
+def touch(path: str) -> None:
+    """Marca una entrada com a usada (l'expulsio va per data de modificacio)."""
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def prune_cache(
+    root: Optional[str] = None,
+    *,
+    max_bytes: Optional[int] = None,
+    max_age_seconds: Optional[float] = None,
+) -> int:
+    """
+    Esborra les entrades mes velles que `max_age_seconds` i, si la cache encara
+    ocupa mes de `max_bytes`, les menys usades fins a quedar per sota.
+    Retorna quants fitxers s'han esborrat.
+    """
+    root = root or cache_root()
+    if max_bytes is None:
+        max_bytes = int(getattr(settings, "MARBELLA_CACHE_MAX_MB", 1024) or 0) * 1024 * 1024
+    if max_age_seconds is None:
+        max_age_seconds = float(getattr(settings, "MARBELLA_CACHE_MAX_AGE_DAYS", 30) or 0) * 86400
+
+    if root == cache_root() and os.path.isdir(_legacy_cache_root()):
+        # ubicacio antiga, publica: no s'hi ha de deixar res
+        shutil.rmtree(_legacy_cache_root(), ignore_errors=True)
+
+    entries = []
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+    now = time.time()
+    removed = 0
+    kept = []
+    for mtime, size, path in entries:
+        if max_age_seconds > 0 and now - mtime > max_age_seconds:
+            removed += _remove(path)
+        else:
+            kept.append((mtime, size, path))
+
+    if max_bytes > 0:
+        total = sum(size for _mtime, size, _path in kept)
+        for _mtime, size, path in sorted(kept):
+            if total <= max_bytes:
+                break
+            removed += _remove(path)
+            total -= size
+    return removed
+
+
+def _remove(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except OSError:
+        logger.warning("No s'ha pogut esborrar %s de la cache de Marbella.", path, exc_info=True)
+        return 0
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_path(digest: str, cache_dir: str) -> str:
+    tag = f"v{CACHE_FORMAT_VERSION}-pd{pd.__version__.split('.')[0]}"
+    return os.path.join(cache_dir, f"{digest}-{tag}.pkl")
+
+
+def read_dataset_cached(
+    path: str,
+    reader: Callable[[str], pd.DataFrame],
+    *,
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Llegeix `path` amb `reader` i en desa el resultat a la cache.
+    Si el fitxer (per contingut) ja s'havia llegit, retorna la còpia cachejada.
+    """
+    cache_dir = cache_dir or os.path.join(cache_root(), "datasets")
+    digest = file_sha256(path)
+    cached = _cache_path(digest, cache_dir)
+
+    if os.path.exists(cached):
+        try:
+            df = pd.read_pickle(cached)
+            touch(cached)
+            return df
+        except Exception:
+            # cache corrupta o incompatible: la regenerem
+            pass
+
+    df = reader(path)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, cached)
+    except OSError:
+        # la cache és una optimització: si no es pot escriure, seguim igualment
+        pass
+
+    return df
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from .dataset_cache import touch
+
+
+logger = logging.getLogger(__name__)
+
+# Puja'l quan canvii com es renderitzen els plots fora del codi de la funcio
+# (backend, inicialitzacio del worker...): invalida tots els PNG cachejats.
+PLOT_RENDERER_VERSION = "2"
+
+# ---------- Fingerprint ----------
+
+def _feed(h, value: Any) -> None:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(type(value).__name__.encode())
+        if isinstance(value, pd.DataFrame):
+            h.update(repr(list(value.columns)).encode())
+            h.update(repr([str(t) for t in value.dtypes]).encode())
+        else:
+            h.update(str(value.dtype).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        return
+    if isinstance(value, dict):
+        h.update(b"{")
+        for k in sorted(value, key=str):
+            h.update(str(k).encode())
+            _feed(h, value[k])
+        h.update(b"}")
+        return
+    if isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for v in value:
+            _feed(h, v)
+        h.update(b"]")
+        return
+    h.update(json.dumps(value, default=str, sort_keys=True).encode())
+
+
+_module_digests: Dict[str, tuple] = {}
+_environment_digest: Optional[str] = None
+
+
+def _module_source_digest(module_name: str) -> str:
+    """Hash del fitxer font del mòdul (helpers compartits, estils...)."""
+    path = getattr(sys.modules.get(module_name), "__file__", None) or ""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return ""
+    cached = _module_digests.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read())
+    _module_digests[path] = (mtime, h.hexdigest())
+    return _module_digests[path][1]
+
+
+def _renderer_digest() -> str:
+    """Versió del renderitzador, de matplotlib i de l'estil configurat."""
+    global _environment_digest
+    if _environment_digest is None:
+        import matplotlib
+
+        h = hashlib.sha256()
+        h.update(PLOT_RENDERER_VERSION.encode())
+        h.update(matplotlib.__version__.encode())
+        # estil configurat (matplotlibrc), llegit del fitxer i no dels rcParams vius del procés
+        h.update(repr(sorted((k, repr(v)) for k, v in matplotlib.rc_params().items() if k != "backend")).encode())
+        _environment_digest = h.hexdigest()
+    return _environment_digest
+
+
+def plot_fingerprint(fn: Callable[..., bool], args: tuple, kwargs: Dict[str, Any]) -> str:
+    """
+    Hash de la funció de plot (codi inclòs), del mòdul on viu (helpers com
+    `apply_plot_defaults`), de l'entorn de render i de totes les seves entrades.
+    Dos plots amb el mateix fingerprint generen el mateix PNG.
+    """
+    h = hashlib.sha256()
+    h.update(_renderer_digest().encode())
+    h.update(_module_source_digest(fn.__module__).encode())
+    h.update(_module_source_digest(__name__).encode())
+    h.update(f"{fn.__module__}.{fn.__qualname__}".encode())
+    code = getattr(fn, "__code__", None)
+    if code is not None:
+        h.update(code.co_code)
+        h.update(repr(code.co_consts).encode())
+    _feed(h, list(args))
+    _feed(h, kwargs)
+    return h.hexdigest()
+
+
+# ---------- Worker ----------
+
+def _init_plot_worker() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+
+
+def _call_plot(fn: Callable[..., bool], out_png: str, args: tuple, kwargs: Dict[str, Any]) -> Optional[bool]:
+    """Renderitza un plot. `None` si ha petat: la resta de l'informe continua."""
+    try:
+        return bool(fn(*args, out_png, **kwargs))
+    except Exception:
+        logger.exception("Error renderitzant el plot %s", getattr(fn, "__qualname__", fn))
+        return None
+
+
+# ---------- Runner ----------
+
+@dataclass
+class _PlotJob:
+    fn: Callable[..., bool]
+    args: tuple
+    out_png: str
+    kwargs: Dict[str, Any]
+    on_result: Optional[Callable[[bool], None]]
+    fingerprint: str = ""
+    result: Optional[bool] = None
+
+
+@dataclass
+class PlotRunner:
+    """
+    Recull els plots d'una anàlisi i els renderitza tots junts.
+
+    - Els plots amb entrades idèntiques a una execució anterior no es tornen a
+      dibuixar: es copia el PNG de la cache (`cache_dir`).
+    - La resta es renderitza en un pool de processos amb el backend Agg.
+    - Els callbacks `on_result(ok)` s'executen en ordre d'enviament, de manera
+      que l'ordre de plots i warnings és el mateix que en sèrie.
+
+    Les funcions de plot tenen la signatura `fn(*args, out_png, **kwargs) -> bool`
+    i han de ser de nivell de mòdul (picklables).
+    """
+
+    cache_dir: Optional[str] = None
+    max_workers: Optional[int] = None
+    immediate: bool = False
+    jobs: List[_PlotJob] = field(default_factory=list)
+    rendered: int = 0
+    reused: int = 0
+    failed: int = 0
+
+    @classmethod
+    def inline(cls) -> "PlotRunner":
+        """Runner sense cache ni pool: renderitza en el moment de `submit`."""
+        return cls(immediate=True, max_workers=1)
+
+    def submit(
+        self,
+        fn: Callable[..., bool],
+        *args: Any,
+        out_png: str,
+        on_result: Optional[Callable[[bool], None]] = None,
+        **kwargs: Any,
+    ) -> None:
+        job = _PlotJob(fn=fn, args=args, out_png=out_png, kwargs=kwargs, on_result=on_result)
+        if self.immediate:
+            self._finish(job, _call_plot(fn, out_png, args, kwargs))
+            return
+        self.jobs.append(job)
+
+    # -- cache --
+
+    def _cached_png(self, fp: str) -> str:
+        return os.path.join(self.cache_dir or "", f"{fp}.png")
+
+    def _cached_empty(self, fp: str) -> str:
+        return os.path.join(self.cache_dir or "", f"{fp}.empty")
+
+    def _try_reuse(self, job: _PlotJob) -> Optional[bool]:
+        if not self.cache_dir:
+            return None
+        png = self._cached_png(job.fingerprint)
+        if os.path.exists(png):
+            os.makedirs(os.path.dirname(job.out_png), exist_ok=True)
+            shutil.copyfile(png, job.out_png)
+            touch(png)
+            return True
+        if os.path.exists(self._cached_empty(job.fingerprint)):
+            return False
+        return None
+
+    def _store(self, job: _PlotJob, ok: Optional[bool]) -> None:
+        # un plot que ha petat no es cacheja: es torna a provar a la seguent execucio
+        if not self.cache_dir or ok is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if ok and os.path.exists(job.out_png):
+                tmp = f"{self._cached_png(job.fingerprint)}.{os.getpid()}.tmp"
+                shutil.copyfile(job.out_png, tmp)
+                os.replace(tmp, self._cached_png(job.fingerprint))
+            elif not ok:
+                with open(self._cached_empty(job.fingerprint), "w", encoding="utf-8"):
+                    pass
+        except OSError:
+            pass
+
+    # -- execució --
+
+    def _workers(self, pending: int) -> int:
+        wanted = self.max_workers or os.cpu_count() or 1
+        return max(1, min(int(wanted), pending))
+
+    def _render(self, pending: List[_PlotJob]) -> List[Optional[bool]]:
+        workers = self._workers(len(pending))
+        if workers > 1 and not multiprocessing.current_process().daemon:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_plot_worker) as pool:
+                    futures = [
+                        pool.submit(_call_plot, job.fn, job.out_png, job.args, job.kwargs)
+                        for job in pending
+                    ]
+                    return [_future_result(f) for f in futures]
+            except (OSError, AssertionError, NotImplementedError):
+                # entorns sense fork/processos fills: renderitzem en sèrie
+                pass
+
+        _init_plot_worker()
+        return [_call_plot(job.fn, job.out_png, job.args, job.kwargs) for job in pending]
+
+    def run(self) -> None:
+        jobs, self.jobs = self.jobs, []
+
+        pending: List[_PlotJob] = []
+        for job in jobs:
+            job.fingerprint = plot_fingerprint(job.fn, job.args, job.kwargs)
+            reused = self._try_reuse(job)
+            if reused is None:
+                pending.append(job)
+            else:
+                job.result = reused
+                self.reused += 1
+
+        if pending:
+            for job, ok in zip(pending, self._render(pending)):
+                job.result = bool(ok)
+                self._store(job, ok)
+                if ok is None:
+                    self.failed += 1
+                else:
+                    self.rendered += 1
+
+        for job in jobs:
+            if job.on_result:
+                job.on_result(bool(job.result))
+
+    def _finish(self, job: _PlotJob, ok: Optional[bool]) -> None:
+        job.result = bool(ok)
+        if ok is None:
+            self.failed += 1
+        else:
+            self.rendered += 1
+        if job.on_result:
+            job.on_result(job.result)
+
+
+def _future_result(future) -> Optional[bool]:
+    try:
+        return future.result()
+    except Exception:
+        # p. ex. arguments no picklables o un worker mort: nomes perdem aquest plot
+        logger.exception("Error al pool de plots")
+        return None
@@ -4,7 +4,6 @@ from django.utils import timezone
 from celery import shared_task
 from django.db import transaction
 from .models import AnnualReport
-from .services.analysis import run_analysis  
 from .services.reporting import generate_report  
 
 # --------------------- ANALYSIS TASK ---------------------
@@ -38,6 +37,9 @@ def run_analysis_task(self, report_id: int):
         last["status"] = status
 
     try:
+        # pandas/matplotlib nomes al worker: les vistes importen aquest modul
+        from .services.analysis import run_analysis
+
         print("[task] calling run_analysis")
 
         run_analysis(report_id, persist=True, verbose=False, progress_cb=progress_cb)
@@ -1,3 +1,155 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from unittest.mock import patch
 
-# Create your tests here.
+import pandas as pd
+from django.test import SimpleTestCase, override_settings
+
+from .services import plot_runner
+from .services.analysis_reserves import analyze_reserves
+from .services.dataset_cache import cache_root, prune_cache, read_dataset_cached
+from .services.plot_runner import PlotRunner, plot_fingerprint
+
+
+def _failing_plot(values, out_png):
+    raise RuntimeError("plot trencat")
+
+
+def _write_png(values, out_png):
+    os.makedirs(os.path.dirname(out_png), exist_ok=True)
+    with open(out_png, "wb") as f:
+        f.write(b"png")
+    return True
+
+
+def _reserves_df():
+    return pd.DataFrame(
+        {
+            "NombreCompleto": ["Club A", "Club B", "Club A"],
+            "Recurso": ["PISTA 1", "GESPA NORD", "PISTA 1"],
+            "FechaReserva": ["05/01/2025", "10/02/2025", "03/03/2025"],
+            "DuracionHoras": ["1,5", "2", "3"],
+            "Deporte": ["Futbol", "Rugbi", "Futbol"],
+            "Importe": [10, 20, 30],
+        }
+    )
+
+
+class DatasetCacheTests(SimpleTestCase):
+    def test_second_read_of_same_file_skips_reader(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clients.xlsx")
+            with open(path, "wb") as f:
+                f.write(b"fake excel bytes")
+            calls = []
+
+            def reader(p):
+                calls.append(p)
+                return pd.DataFrame({"a": [1, 2]})
+
+            first = read_dataset_cached(path, reader, cache_dir=os.path.join(tmp, "cache"))
+            second = read_dataset_cached(path, reader, cache_dir=os.path.join(tmp, "cache"))
+
+            self.assertEqual(len(calls), 1)
+            pd.testing.assert_frame_equal(first, second)
+
+            with open(path, "wb") as f:
+                f.write(b"other bytes")
+            read_dataset_cached(path, reader, cache_dir=os.path.join(tmp, "cache"))
+            self.assertEqual(len(calls), 2)
+
+    def test_cache_lives_outside_media_root_and_legacy_copy_is_removed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            media = os.path.join(tmp, "media")
+            legacy = os.path.join(media, "marbella", "_cache", "datasets")
+            os.makedirs(legacy)
+            with open(os.path.join(legacy, "old.pkl"), "wb") as f:
+                f.write(b"alumnes")
+            with override_settings(MEDIA_ROOT=media, MARBELLA_CACHE_DIR=""):
+                root = cache_root()
+                self.assertFalse(root.startswith(media + os.sep))
+                prune_cache()
+            self.assertFalse(os.path.exists(os.path.join(media, "marbella", "_cache")))
+
+    def test_prune_drops_old_entries_and_least_recently_used_over_budget(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            now = time.time()
+            for name, age in (("old", 40 * 86400), ("a", 300), ("b", 200), ("c", 100)):
+                path = os.path.join(tmp, name)
+                with open(path, "wb") as f:
+                    f.write(b"x" * 10)
+                os.utime(path, (now - age, now - age))
+
+            removed = prune_cache(tmp, max_bytes=20, max_age_seconds=30 * 86400)
+
+            self.assertEqual(removed, 2)
+            self.assertEqual(sorted(os.listdir(tmp)), ["b", "c"])
+
+
+class PlotRunnerTests(SimpleTestCase):
+    def _run_reserves(self, tmp, run_name, plot_defaults):
+        runner = PlotRunner(cache_dir=os.path.join(tmp, "cache"), max_workers=1)
+        kpis, warnings, items = analyze_reserves(
+            _reserves_df(),
+            plots_dir_abs=os.path.join(tmp, run_name),
+            year=2025,
+            plot_defaults=plot_defaults,
+            plot_runner=runner,
+        )
+        self.assertEqual(items, [])
+        runner.run()
+        return runner, warnings, items
+
+    def test_unchanged_plots_are_reused_from_previous_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first, warnings, items = self._run_reserves(tmp, "run1", {"dpi": 40})
+            self.assertEqual(warnings, [])
+            self.assertEqual([i["key"] for i in items], ["reserves.hores_per_espai", "reserves.evolucio_hores"])
+            self.assertEqual((first.rendered, first.reused), (2, 0))
+
+            second, _, items = self._run_reserves(tmp, "run2", {"dpi": 40})
+            self.assertEqual((second.rendered, second.reused), (0, 2))
+            self.assertTrue(all(os.path.exists(i["file_abs"]) for i in items))
+
+            third, _, _ = self._run_reserves(tmp, "run3", {"dpi": 41})
+            self.assertEqual((third.rendered, third.reused), (2, 0))
+
+    def test_inline_runner_keeps_serial_behaviour(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, warnings, items = analyze_reserves(
+                _reserves_df().iloc[0:0],
+                plots_dir_abs=tmp,
+                year=2025,
+                plot_defaults={"dpi": 40},
+            )
+            self.assertEqual(items, [])
+            self.assertEqual(len(warnings), 2)
+
+    def test_fingerprint_ignores_output_path_but_not_data(self):
+        df = _reserves_df()
+        fp = plot_fingerprint(_reserves_df, (df,), {"plot_defaults": {"dpi": 40}})
+        self.assertEqual(fp, plot_fingerprint(_reserves_df, (df.copy(),), {"plot_defaults": {"dpi": 40}}))
+        changed = df.copy()
+        changed.loc[0, "DuracionHoras"] = "9"
+        self.assertNotEqual(fp, plot_fingerprint(_reserves_df, (changed,), {"plot_defaults": {"dpi": 40}}))
+
+    def test_fingerprint_changes_with_the_renderer_version(self):
+        df = _reserves_df()
+        fp = plot_fingerprint(_reserves_df, (df,), {})
+        with patch.object(plot_runner, "PLOT_RENDERER_VERSION", "test"), patch.object(
+            plot_runner, "_environment_digest", None
+        ):
+            self.assertNotEqual(fp, plot_fingerprint(_reserves_df, (df,), {}))
+
+    def test_failing_plot_does_not_abort_the_others_and_is_not_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = []
+            runner = PlotRunner(cache_dir=os.path.join(tmp, "cache"), max_workers=1)
+            runner.submit(_failing_plot, [1], out_png=os.path.join(tmp, "a.png"), on_result=results.append)
+            runner.submit(_write_png, [2], out_png=os.path.join(tmp, "b.png"), on_result=results.append)
+            runner.run()
+
+            self.assertEqual(results, [False, True])
+            self.assertEqual((runner.failed, runner.rendered), (1, 1))
+            self.assertFalse(any(name.endswith(".empty") for name in os.listdir(os.path.join(tmp, "cache"))))
@@ -11,11 +11,12 @@ import os
 from django.conf import settings
 from .forms import PlotOverrideForm
 from django.shortcuts import get_object_or_404, redirect, render
-import pandas as pd
 from .tasks import generate_report_task
 from django.http import HttpResponse
-from weasyprint import HTML
 from django.template.loader import render_to_string
+from ceeb_web.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
 
 
 
@@ -382,6 +383,7 @@ class AnnualReportPdfView(DetailView):
             "plot_map": plot_map,
         })
 
+        from weasyprint import HTML
         pdf = HTML(string=html_str, base_url=request.build_absolute_uri("/")).write_pdf()
 
         resp = HttpResponse(pdf, content_type="application/pdf")